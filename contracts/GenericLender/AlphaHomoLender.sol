@@ -4,6 +4,7 @@ pragma experimental ABIEncoderV2;
 
 import "@openzeppelin/contracts/token/ERC20/IERC20.sol";
 import "@openzeppelin/contracts/math/SafeMath.sol";
+import "@openzeppelin/contracts/math/Math.sol";
 import "@openzeppelin/contracts/utils/Address.sol";
 import "@openzeppelin/contracts/token/ERC20/SafeERC20.sol";
 
@@ -91,6 +92,20 @@ contract AlphaHomo is GenericLenderBase {
         return _apr(amount);
     }
 
+    function lenderSnapshot(uint256 extraAmount)
+        external
+        view
+        override
+        returns (
+            uint256,
+            bool,
+            uint256,
+            uint256
+        )
+    {
+        return (_nav(), _hasAssets(), _apr(0), _apr(extraAmount));
+    }
+
     function _apr(uint256 amount) internal view returns (uint256) {
         Bank b = Bank(bank);
         BankConfig config = BankConfig(b.config());
@@ -179,6 +194,15 @@ contract AlphaHomo is GenericLenderBase {
     }
 
     function hasAssets() external view override returns (bool) {
+        return _hasAssets();
+    }
+
+    //what a withdrawal could pay out now, the market only has so much cash
+    function availableLiquidity() external view override returns (uint256) {
+        return Math.min(_nav(), want.balanceOf(address(this)).add(bank.balance));
+    }
+
+    function _hasAssets() internal view returns (bool) {
         uint256 bankBal = Bank(bank).balanceOf(address(this));
         uint256 wantBal = want.balanceOf(address(this));
 
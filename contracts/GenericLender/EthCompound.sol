@@ -5,6 +5,7 @@ pragma experimental ABIEncoderV2;
 import "../Interfaces/Compound/InterestRateModel.sol";
 import "@openzeppelin/contracts/token/ERC20/IERC20.sol";
 import "@openzeppelin/contracts/math/SafeMath.sol";
+import "@openzeppelin/contracts/math/Math.sol";
 import "@openzeppelin/contracts/utils/Address.sol";
 import "@openzeppelin/contracts/token/ERC20/SafeERC20.sol";
 
@@ -162,10 +163,37 @@ contract EthCompound is GenericLenderBase {
     }
 
     function hasAssets() external view override returns (bool) {
+        return _hasAssets();
+    }
+
+    //what a withdrawal could pay out now, the market only has so much cash
+    function availableLiquidity() external view override returns (uint256) {
+        return Math.min(_nav(), want.balanceOf(address(this)).add(crETH.getCash()));
+    }
+
+    function _hasAssets() internal view returns (bool) {
         return crETH.balanceOf(address(this)) > dust;
     }
 
     function aprAfterDeposit(uint256 amount) external view override returns (uint256) {
+        return _aprAfterDeposit(amount);
+    }
+
+    function lenderSnapshot(uint256 extraAmount)
+        external
+        view
+        override
+        returns (
+            uint256,
+            bool,
+            uint256,
+            uint256
+        )
+    {
+        return (_nav(), _hasAssets(), _apr(), _aprAfterDeposit(extraAmount));
+    }
+
+    function _aprAfterDeposit(uint256 amount) internal view returns (uint256) {
         uint256 cashPrior = crETH.getCash();
 
         uint256 borrows = crETH.totalBorrows();
@@ -4,12 +4,14 @@ pragma experimental ABIEncoderV2;
 
 import "@openzeppelin/contracts/token/ERC20/IERC20.sol";
 import "@openzeppelin/contracts/math/SafeMath.sol";
+import "@openzeppelin/contracts/math/Math.sol";
 import "@openzeppelin/contracts/utils/Address.sol";
 import "@openzeppelin/contracts/token/ERC20/SafeERC20.sol";
 
 import "../Interfaces/UniswapInterfaces/IUniswapV2Router02.sol";
 
 import "./GenericLenderBase.sol";
+import "./RewardPriceReporter.sol";
 import "../Interfaces/Aave/IAToken.sol";
 import "../Interfaces/Aave/IStakedAave.sol";
 import "../Interfaces/Aave/ILendingPool.sol";
@@ -25,7 +27,7 @@ import "../Libraries/Aave/DataTypes.sol";
  *
  ********************* */
 
-contract GenericAave is GenericLenderBase {
+contract GenericAave is GenericLenderBase, RewardPriceReporter {
     using SafeERC20 for IERC20;
     using Address for address;
     using SafeMath for uint256;
@@ -78,7 +80,10 @@ contract GenericAave is GenericLenderBase {
     function setIsIncentivised(bool _isIncentivised) external management {
         // NOTE: if the aToken is not incentivised, getIncentivesController() might revert (aToken won't implement it)
         // to avoid calling it, we use the OR and lazy evaluation
-        require(!_isIncentivised || address(aToken.getIncentivesController()) != address(0), "!aToken does not have incentives controller set up");
+        require(
+            !_isIncentivised || address(aToken.getIncentivesController()) != address(0),
+            "!aToken does not have incentives controller set up"
+        );
         isIncentivised = _isIncentivised;
     }
 
@@ -91,6 +96,11 @@ contract GenericAave is GenericLenderBase {
         keep3r = _keep3r;
     }
 
+    //shared RewardPriceOracle the apr views price AAVE with. 0 quotes the router
+    function setRewardPriceOracle(address _rewardPriceOracle) external management {
+        _setRewardPriceOracle(_rewardPriceOracle);
+    }
+
     function withdraw(uint256 amount) external override management returns (uint256) {
         return _withdraw(amount);
     }
@@ -143,7 +153,7 @@ contract GenericAave is GenericLenderBase {
             uint256 _emissionsPerSecond;
             (, _emissionsPerSecond, ) = _incentivesController().getAssetData(address(aToken));
             if(_emissionsPerSecond > 0) {
-                uint256 emissionsInWant = _AAVEtoWant(_emissionsPerSecond); // amount of emissions in want
+                uint256 emissionsInWant = _rewardToWant(AAVE, _emissionsPerSecond); // amount of emissions in want
 
                 uint256 incentivesRate = emissionsInWant.mul(SECONDS_IN_YEAR).mul(1e18).div(totalLiquidity); // APRs are in 1e18
 
@@ -154,6 +164,24 @@ contract GenericAave is GenericLenderBase {
     }
 
     function aprAfterDeposit(uint256 extraAmount) external view override returns (uint256) {
+        return _aprAfterDeposit(extraAmount);
+    }
+
+    function lenderSnapshot(uint256 extraAmount)
+        external
+        view
+        override
+        returns (
+            uint256,
+            bool,
+            uint256,
+            uint256
+        )
+    {
+        return (_nav(), _hasAssets(), _apr(), _aprAfterDeposit(extraAmount));
+    }
+
+    function _aprAfterDeposit(uint256 extraAmount) internal view returns (uint256) {
         // i need to calculate new supplyRate after Deposit (when deposit has not been done yet)
         DataTypes.ReserveData memory reserveData = _lendingPool().getReserveData(address(want));
 
@@ -174,11 +202,21 @@ contract GenericAave is GenericLenderBase {
                 reserveFactor
             );
 
-        uint256 incentivesRate = _incentivesRate(newLiquidity.add(totalStableDebt).add(totalVariableDebt)); // total supplied liquidity in Aave v2
+        // total supplied liquidity in Aave v2
+        uint256 incentivesRate = _incentivesRate(newLiquidity.add(totalStableDebt).add(totalVariableDebt));
         return newLiquidityRate.div(1e9).add(incentivesRate); // divided by 1e9 to go from Ray to Wad
     }
 
     function hasAssets() external view override returns (bool) {
+        return _hasAssets();
+    }
+
+    //what a withdrawal could pay out now, the market only has so much cash
+    function availableLiquidity() external view override returns (uint256) {
+        return Math.min(_nav(), want.balanceOf(address(this)).add(want.balanceOf(address(aToken))));
+    }
+
+    function _hasAssets() internal view returns (bool) {
         return aToken.balanceOf(address(this)) > 0;
     }
 
@@ -194,6 +232,7 @@ contract GenericAave is GenericLenderBase {
         }
 
         // sell AAVE for want
+        _reportRewardPrice(AAVE);
         uint256 aaveBalance = IERC20(AAVE).balanceOf(address(this));
         _sellAAVEForWant(aaveBalance);
 
@@ -224,7 +263,10 @@ contract GenericAave is GenericLenderBase {
     function _initialize(IAToken _aToken, bool _isIncentivised) internal {
         require(address(aToken) == address(0), "GenericAave already initialized");
 
-        require(!_isIncentivised || address(_aToken.getIncentivesController()) != address(0), "!aToken does not have incentives controller set up");
+        require(
+            !_isIncentivised || address(_aToken.getIncentivesController()) != address(0),
+            "!aToken does not have incentives controller set up"
+        );
         isIncentivised = _isIncentivised;
         aToken = _aToken;
         require(_lendingPool().getReserveData(address(want)).aTokenAddress == address(_aToken), "WRONG ATOKEN");
@@ -236,10 +278,12 @@ contract GenericAave is GenericLenderBase {
     }
 
     function _apr() internal view returns (uint256) {
-        uint256 liquidityRate = uint256(_lendingPool().getReserveData(address(want)).currentLiquidityRate).div(1e9);// dividing by 1e9 to pass from ray to wad
+        // dividing by 1e9 to pass from ray to wad
+        uint256 liquidityRate = uint256(_lendingPool().getReserveData(address(want)).currentLiquidityRate).div(1e9);
         (uint256 availableLiquidity, uint256 totalStableDebt, uint256 totalVariableDebt, , , , , , , ) =
                     protocolDataProvider.getReserveData(address(want));
-        uint256 incentivesRate = _incentivesRate(availableLiquidity.add(totalStableDebt).add(totalVariableDebt)); // total supplied liquidity in Aave v2
+        // total supplied liquidity in Aave v2
+        uint256 incentivesRate = _incentivesRate(availableLiquidity.add(totalStableDebt).add(totalVariableDebt));
         return liquidityRate.add(incentivesRate);
     }
 
@@ -319,6 +363,10 @@ contract GenericAave is GenericLenderBase {
         }
     }
 
+    function _spotRewardToWant(address /*_token*/, uint256 _amount) internal view override returns (uint256) {
+        return _AAVEtoWant(_amount);
+    }
+
     function _AAVEtoWant(uint256 _amount) internal view returns (uint256) {
         if(_amount == 0) {
             return 0;
@@ -390,7 +438,10 @@ contract GenericAave is GenericLenderBase {
 
     modifier keepers() {
         require(
-            msg.sender == address(keep3r) || msg.sender == address(strategy) || msg.sender == vault.governance() || msg.sender == IBaseStrategy(strategy).management(),
+            msg.sender == address(keep3r) ||
+                msg.sender == address(strategy) ||
+                msg.sender == vault.governance() ||
+                msg.sender == IBaseStrategy(strategy).management(),
             "!keepers"
         );
         _;
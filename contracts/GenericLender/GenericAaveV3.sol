@@ -4,12 +4,14 @@ pragma experimental ABIEncoderV2;
 
 import "@openzeppelin/contracts/token/ERC20/IERC20.sol";
 import "@openzeppelin/contracts/math/SafeMath.sol";
+import "@openzeppelin/contracts/math/Math.sol";
 import "@openzeppelin/contracts/utils/Address.sol";
 import "@openzeppelin/contracts/token/ERC20/SafeERC20.sol";
 
 import "../Interfaces/UniswapInterfaces/IUniswapV2Router02.sol";
 
-import "./GenericLenderBase.sol";
+import "./GenericLenderCloneBase.sol";
+import "./RewardPriceReporter.sol";
 import {IAToken} from "../Interfaces/Aave/V3/IAToken.sol";
 import {IStakedAave} from "../Interfaces/Aave/V3/IStakedAave.sol";
 import {IPool} from "../Interfaces/Aave/V3/IPool.sol";
@@ -48,14 +50,17 @@ interface IReserveInterestRateStrategy {
  *
  ********************* */
 
-contract GenericAaveV3 is GenericLenderBase {
+contract GenericAaveV3 is GenericLenderCloneBase, RewardPriceReporter {
     using SafeERC20 for IERC20;
     using Address for address;
     using SafeMath for uint256;
 
     //Should be the same for all EVM chains
     IProtocolDataProvider public constant protocolDataProvider = IProtocolDataProvider(address(0x69FA688f1Dc47d4B5d8029D5a35FB7a548310654));
-    IAToken public aToken;
+    //the aToken is the only clone arg after the base ones
+    uint256 internal constant ATOKEN_ARG = PLUGIN_ARGS;
+    //only set on the lender deployed with the constructor, clones read it from their code
+    IAToken internal storedAToken;
     
     //Only Applicable for Mainnet, We leave then since they wont be called on any other chain
     IStakedAave private constant stkAave = IStakedAave(0x4da27a545c0c5B758a6BA100e3a049001de870f5);
@@ -86,6 +91,12 @@ contract GenericAaveV3 is GenericLenderBase {
 
     uint256 constant internal SECONDS_IN_YEAR = 365 days;
 
+    //the reward tokens of the aToken and the reserve factor, which the apr views read from storage instead of asking aave on
+    //every call. refreshed by harvest and refreshCache, so a new reward token or reserve factor only counts after one of them.
+    //the emissions, distribution ends and the rate strategy are read live, aave changes those on its own
+    address[] internal cachedRewards;
+    uint256 public reserveFactor;
+
     /// @param _strategy The strategy that will connect the lender to
     /// @param _wNative The wrapped native token for chain. i.e. WETH/WFTM
     /// @param _baseRouter Address of a UniV2 Router to be used
@@ -99,17 +110,21 @@ contract GenericAaveV3 is GenericLenderBase {
         address _secondRouter,
         string memory name,
         bool _isIncentivised
-    ) public GenericLenderBase(_strategy, name) {
-        _initialize(_wNative, _baseRouter, _secondRouter, _isIncentivised);
+    ) public GenericLenderCloneBase(_strategy, name) {
+        storedAToken = IAToken(_lendingPool().getReserveData(address(storedWant)).aTokenAddress);
+        _initializeAave(storedAToken, storedWant, _wNative, _baseRouter, _secondRouter, _isIncentivised);
     }
 
     function initialize(
+        string memory _name,
         address _wNative,
         address _baseRouter,
         address _secondRouter,
         bool _isIncentivised
     ) external {
-        _initialize(_wNative, _baseRouter, _secondRouter, _isIncentivised);
+        IERC20 _want = want();
+        _initialize(_name, strategy(), _want);
+        _initializeAave(aToken(), _want, _wNative, _baseRouter, _secondRouter, _isIncentivised);
     }
 
     function cloneAaveLender(
@@ -119,27 +134,34 @@ contract GenericAaveV3 is GenericLenderBase {
         string memory _name,
         bool _isIncentivised
     ) external returns (address newLender) {
-        newLender = _clone(_strategy, _name);
-        GenericAaveV3(newLender).initialize(WNATIVE, _baseRouter, _secondRouter, _isIncentivised);
+        address _want = VaultAPI(IBaseStrategy(_strategy).vault()).token();
+        address _aToken = _lendingPool().getReserveData(_want).aTokenAddress;
+        newLender = _clone(_strategy, abi.encodePacked(_aToken));
+        GenericAaveV3(newLender).initialize(_name, WNATIVE, _baseRouter, _secondRouter, _isIncentivised);
     }
 
-    function _initialize(
+    function aToken() public view returns (IAToken) {
+        return _isClone() ? IAToken(_argAddress(ATOKEN_ARG)) : storedAToken;
+    }
+
+    //takes the aToken and want as arguments so the constructor never reads the clone args
+    function _initializeAave(
+        IAToken _aToken,
+        IERC20 _want,
         address _wNative, 
         address _baseRouter, 
         address _secondRouter, 
         bool _isIncentivised
     ) internal {
-        require(address(aToken) == address(0), "GenericAave already initialized");
-
-        aToken = IAToken(_lendingPool().getReserveData(address(want)).aTokenAddress);
+        require(address(_aToken) != address(0), "!aToken");
 
         if(_isIncentivised) {
-            address rewardController = address(aToken.getIncentivesController());
+            address rewardController = address(_aToken.getIncentivesController());
             require(rewardController != address(0), "!aToken does not have incentives controller set up");
         }
         isIncentivised = _isIncentivised;
 
-        IERC20(address(want)).safeApprove(address(_lendingPool()), type(uint256).max);
+        _want.safeApprove(address(_lendingPool()), type(uint256).max);
 
         //Set Chain Specific Addresses
         WNATIVE = _wNative;
@@ -147,6 +169,8 @@ contract GenericAaveV3 is GenericLenderBase {
         secondRouter = _secondRouter;
         profitFactor = 100;
         router = IUniswapV2Router02(_baseRouter);
+
+        _refreshCache(_aToken, _want);
     }
 
     // for the management to activate / deactivate incentives functionality
@@ -154,10 +178,38 @@ contract GenericAaveV3 is GenericLenderBase {
         // NOTE: if the aToken is not incentivised, getIncentivesController() might revert (aToken won't implement it)
         // to avoid calling it, we use the if else statement to check for valid address
         if(_isIncentivised) {
-            address rewardController = address(aToken.getIncentivesController());
+            address rewardController = address(aToken().getIncentivesController());
             require(rewardController != address(0), "!aToken does not have incentives controller set up");
         } 
         isIncentivised = _isIncentivised;
+        _refreshCache(aToken(), want());
+    }
+
+    //for keepers to pick up a new reward token or a new reserve factor between harvests
+    function refreshCache() external keepers {
+        _refreshCache(aToken(), want());
+    }
+
+    function _refreshCache(IAToken _aToken, IERC20 _want) internal {
+        (, , , , reserveFactor, , , , , ) = protocolDataProvider.getReserveConfigurationData(address(_want));
+
+        delete cachedRewards;
+        if(!isIncentivised) return;
+
+        address[] memory rewardTokens = _aToken.getIncentivesController().getRewardsByAsset(address(_aToken));
+        for(uint256 i = 0; i < rewardTokens.length && i < maxLoops; i ++) {
+            cachedRewards.push(rewardTokens[i]);
+        }
+    }
+
+    //the cached reward tokens
+    function getCachedRewards() external view returns (address[] memory) {
+        return cachedRewards;
+    }
+
+    //read live, aave can swap the strategy of a reserve at any time
+    function interestRateStrategy() public view returns (address) {
+        return _lendingPool().getReserveData(address(want())).interestRateStrategyAddress;
     }
 
     function changeRouter() external management {
@@ -179,8 +231,13 @@ contract GenericAaveV3 is GenericLenderBase {
         profitFactor = _profitFactor;
     }
 
+    //shared RewardPriceOracle the apr views price the rewards with. 0 quotes the router
+    function setRewardPriceOracle(address _rewardPriceOracle) external management {
+        _setRewardPriceOracle(_rewardPriceOracle);
+    }
+
     function deposit() external override management {
-        uint256 balance = want.balanceOf(address(this));
+        uint256 balance = want().balanceOf(address(this));
         _deposit(balance);
     }
 
@@ -190,9 +247,10 @@ contract GenericAaveV3 is GenericLenderBase {
 
     //emergency withdraw. sends balance plus amount to governance
     function emergencyWithdraw(uint256 amount) external override onlyGovernance {
-        _lendingPool().withdraw(address(want), amount, address(this));
+        IERC20 _want = want();
+        _lendingPool().withdraw(address(_want), amount, address(this));
 
-        want.safeTransfer(vault.governance(), want.balanceOf(address(this)));
+        _want.safeTransfer(vault().governance(), _want.balanceOf(address(this)));
     }
 
     function withdrawAll() external override management returns (bool) {
@@ -211,7 +269,7 @@ contract GenericAaveV3 is GenericLenderBase {
     }
 
     function underlyingBalanceStored() public view returns (uint256 balance) {
-        balance = aToken.balanceOf(address(this));
+        balance = aToken().balanceOf(address(this));
     }
 
     function apr() external view override returns (uint256) {
@@ -227,80 +285,164 @@ contract GenericAaveV3 is GenericLenderBase {
     function _incentivesRate(uint256 totalLiquidity, address rewardToken) public view returns (uint256) {
         // only returns != 0 if the incentives are in place at the moment.
         // Return 0 incase an improper address is sent so the whole tx doesnt fail
+        return _emissionsToRate(_emissionsInWant(rewardToken), totalLiquidity);
+    }
+
+    // emissions per second of rewardToken valued in want. 0 if the token is not being distributed
+    function _emissionsInWant(address rewardToken) internal view returns (uint256) {
         if(rewardToken == address(0)) return 0;
 
-        if(isIncentivised && block.timestamp < _incentivesController().getDistributionEnd(address(aToken), rewardToken)) {
+        address _aToken = address(aToken());
+        if(isIncentivised && block.timestamp < _incentivesController().getDistributionEnd(_aToken, rewardToken)) {
             uint256 _emissionsPerSecond;
-            (, _emissionsPerSecond, , ) = _incentivesController().getRewardsData(address(aToken), rewardToken);
-            if(_emissionsPerSecond > 0) {
-                uint256 emissionsInWant;
-                if(rewardToken == address(want)) {
-                    emissionsInWant = _emissionsPerSecond;
-                } else if(rewardToken == address(stkAave)){
-                    emissionsInWant = _checkPrice(AAVE, address(want), _emissionsPerSecond);
-                } else {
-                    emissionsInWant = _checkPrice(rewardToken, address(want), _emissionsPerSecond); // amount of emissions in want
-                }
-
-                uint256 incentivesRate = emissionsInWant.mul(SECONDS_IN_YEAR).mul(1e18).div(totalLiquidity); // APRs are in 1e18
-
-                return incentivesRate.mul(9_500).div(10_000); // 95% of estimated APR to avoid overestimations
-            }
+            (, _emissionsPerSecond, , ) = _incentivesController().getRewardsData(_aToken, rewardToken);
+            return _rewardInWant(rewardToken, _emissionsPerSecond);
         }
         return 0;
     }
 
-    function aprAfterDeposit(uint256 extraAmount) external view override returns (uint256) {
-        //need to calculate new supplyRate after Deposit (when deposit has not been done yet)
-        DataTypesV3.ReserveData memory reserveData = _lendingPool().getReserveData(address(want));
+    function _rewardInWant(address rewardToken, uint256 amount) internal view returns (uint256) {
+        if(amount == 0) return 0;
 
-        (uint256 unbacked, , , uint256 totalStableDebt, uint256 totalVariableDebt, , , , uint256 averageStableBorrowRate, , , ) =
-            protocolDataProvider.getReserveData(address(want));
+        address _want = address(want());
+        if(rewardToken == _want) {
+            return amount;
+        } else if(rewardToken == address(stkAave)){
+            return _rewardToWant(AAVE, amount);
+        } else {
+            return _rewardToWant(rewardToken, amount); // amount of emissions in want
+        }
+    }
 
-        uint256 availableLiquidity = want.balanceOf(address(aToken));
+    function _spotRewardToWant(address _token, uint256 _amount) internal view override returns (uint256) {
+        return _checkPrice(_token, address(want()), _amount);
+    }
 
-        uint256 newLiquidity = availableLiquidity.add(extraAmount);
+    //reports the price of every reward being distributed, stkAave as AAVE
+    function _reportRewardPrices() internal {
+        address _want = address(want());
+        uint256 length = cachedRewards.length;
+        address token;
+        for(uint256 i = 0; i < length; i ++) {
+            token = cachedRewards[i];
+            if(token == _want) continue;
 
-        uint256 totalLiquidity = newLiquidity.add(unbacked).add(totalStableDebt).add(totalVariableDebt);
+            _reportRewardPrice(token == address(stkAave) ? AAVE : token);
+        }
+    }
 
-        (, , , , uint256 reserveFactor, , , , , ) = protocolDataProvider.getReserveConfigurationData(address(want));
+    function _emissionsToRate(uint256 emissionsInWant, uint256 totalLiquidity) internal pure returns (uint256) {
+        if(emissionsInWant == 0) return 0;
 
-        DataTypesV3.CalculateInterestRatesParams memory params = DataTypesV3.CalculateInterestRatesParams(
-            unbacked,
-            extraAmount,
-            0,
-            totalStableDebt,
-            totalVariableDebt,
-            averageStableBorrowRate,
-            reserveFactor,
-            address(want),
-            address(aToken)
-        );
+        uint256 incentivesRate = emissionsInWant.mul(SECONDS_IN_YEAR).mul(1e18).div(totalLiquidity); // APRs are in 1e18
 
-        (uint256 newLiquidityRate, , ) = IReserveInterestRateStrategy(reserveData.interestRateStrategyAddress).calculateInterestRates(params);
+        return incentivesRate.mul(9_500).div(10_000); // 95% of estimated APR to avoid overestimations
+    }
 
-        uint256 incentivesRate = 0;
-        if(isIncentivised) {
+    // incentives rate for the current total liquidity and for the total liquidity after depositing extraAmount
+    // each reward token is only priced once for both. the reward list comes from the cache, its emissions are read live
+    function _incentivesRates(uint256 totalLiquidity, uint256 extraAmount)
+        internal
+        view
+        returns (uint256 incentivesRate, uint256 incentivesRateAfterDeposit)
+    {
+        if(!isIncentivised) return (0, 0);
 
-            address[] memory rewardTokens = _incentivesController().getRewardsByAsset(address(aToken));
-            uint256 i = 0;
-            uint256 _maxLoops = maxLoops;
-            uint256 tokenIncentivesRate;
-            //Passes the total Supply and the corresponding reward token address for each reward token the want has
-            while(i < rewardTokens.length && i < _maxLoops) {
-                tokenIncentivesRate = _incentivesRate(totalLiquidity, rewardTokens[i]); 
+        address _aToken = address(aToken());
+        IRewardsController controller = IAToken(_aToken).getIncentivesController();
+        uint256 length = cachedRewards.length;
+        uint256 emissionsInWant;
+        for(uint256 i = 0; i < length; i ++) {
+            address token = cachedRewards[i];
+            (, uint256 emissionsPerSecond, , uint256 distributionEnd) = controller.getRewardsData(_aToken, token);
+            if(block.timestamp >= distributionEnd) continue;
 
-                incentivesRate += tokenIncentivesRate;
+            emissionsInWant = _rewardInWant(token, emissionsPerSecond);
 
-                i ++;
-            }
+            incentivesRate += _emissionsToRate(emissionsInWant, totalLiquidity);
+            incentivesRateAfterDeposit += _emissionsToRate(emissionsInWant, totalLiquidity.add(extraAmount));
         }
+    }
+
+    // current liquidity rate, liquidity rate after depositing extraAmount (both in wad) and the current total liquidity
+    function _liquidityRates(uint256 extraAmount)
+        internal
+        view
+        returns (
+            uint256 liquidityRate,
+            uint256 newLiquidityRate,
+            uint256 totalLiquidity
+        )
+    {
+        //need to calculate new supplyRate after Deposit (when deposit has not been done yet)
+        //the reserve state and the rate strategy are live, the reserve factor is cached
+        DataTypesV3.CalculateInterestRatesParams memory params;
+        params.reserve = address(want());
+        params.aToken = address(aToken());
+        (params.unbacked, , , params.totalStableDebt, params.totalVariableDebt, liquidityRate, , , params.averageStableBorrowRate, , , ) =
+            protocolDataProvider.getReserveData(params.reserve);
+
+        params.reserveFactor = reserveFactor;
+
+        params.liquidityAdded = extraAmount;
+
+        uint256 availableLiquidity = IERC20(params.reserve).balanceOf(params.aToken);
+
+        totalLiquidity = availableLiquidity.add(params.unbacked).add(params.totalStableDebt).add(params.totalVariableDebt);
 
-        return newLiquidityRate.div(1e9).add(incentivesRate); // divided by 1e9 to go from Ray to Wad
+        (newLiquidityRate, , ) = IReserveInterestRateStrategy(interestRateStrategy()).calculateInterestRates(params);
+
+        // divided by 1e9 to go from Ray to Wad
+        liquidityRate = liquidityRate.div(1e9);
+        newLiquidityRate = newLiquidityRate.div(1e9);
+    }
+
+    function aprAfterDeposit(uint256 extraAmount) external view override returns (uint256) {
+        (, uint256 newLiquidityRate, uint256 totalLiquidity) = _liquidityRates(extraAmount);
+
+        (, uint256 incentivesRate) = _incentivesRates(totalLiquidity, extraAmount);
+
+        return newLiquidityRate.add(incentivesRate);
+    }
+
+    function lenderSnapshot(uint256 extraAmount)
+        external
+        view
+        override
+        returns (
+            uint256,
+            bool,
+            uint256,
+            uint256
+        )
+    {
+        //the reserve and the reward data are read once and shared between apr and aprAfterDeposit
+        (uint256 liquidityRate, uint256 newLiquidityRate, uint256 totalLiquidity) = _liquidityRates(extraAmount);
+
+        (uint256 incentivesRate, uint256 incentivesRateAfterDeposit) = _incentivesRates(totalLiquidity, extraAmount);
+
+        uint256 balanceUnderlying = underlyingBalanceStored();
+        uint256 looseBalance = want().balanceOf(address(this));
+        uint256 _dust = dust;
+
+        return (
+            balanceUnderlying.add(looseBalance),
+            balanceUnderlying > _dust || looseBalance > _dust,
+            liquidityRate.add(incentivesRate),
+            newLiquidityRate.add(incentivesRateAfterDeposit)
+        );
     }
 
     function hasAssets() external view override returns (bool) {
-        return aToken.balanceOf(address(this)) > dust || want.balanceOf(address(this)) > dust;
+        uint256 _dust = dust;
+        return underlyingBalanceStored() > _dust || want().balanceOf(address(this)) > _dust;
+    }
+
+    //what a withdrawal could pay out now, the market only has so much cash
+    function availableLiquidity() external view override returns (uint256) {
+        IERC20 _want = want();
+        uint256 looseBalance = _want.balanceOf(address(this));
+        return Math.min(looseBalance.add(underlyingBalanceStored()), looseBalance.add(_want.balanceOf(address(aToken()))));
     }
 
     // Only for incentivised aTokens
@@ -309,34 +451,40 @@ contract GenericAaveV3 is GenericLenderBase {
     function harvest() external keepers{
         require(isIncentivised, "Not incevtivised, Nothing to harvest");
 
+        //before any reward is sold
+        _reportRewardPrices();
+
         //Need to redeem and aave from StkAave if applicable before claiming rewards and staring cool down over
         redeemAave();
 
         //claim all rewards
         address[] memory assets = new address[](1);
-        assets[0] = address(aToken);
+        assets[0] = address(aToken());
         (address[] memory rewardsList, uint256[] memory claimedAmounts) = 
             _incentivesController().claimAllRewardsToSelf(assets);
         
         //swap as much as possible back to want
+        IERC20 _want = want();
         address token;
         for(uint256 i = 0; i < rewardsList.length; i ++) {
             token = rewardsList[i];
 
             if(token == address(stkAave)) {
                 harvestStkAave();
-            } else if(token == address(want)) {
+            } else if(token == address(_want)) {
                 continue;   
             } else {
-                _swapFrom(token, address(want), IERC20(token).balanceOf(address(this)));
+                _swapFrom(token, address(_want), IERC20(token).balanceOf(address(this)));
             }
         }
 
         // deposit want in lending protocol
-        uint256 balance = want.balanceOf(address(this));
+        uint256 balance = _want.balanceOf(address(this));
         if(balance > 0) {
             _deposit(balance);
         }
+
+        _refreshCache(IAToken(assets[0]), _want);
     }
 
     function redeemAave() internal {
@@ -350,7 +498,7 @@ contract GenericAaveV3 is GenericLenderBase {
         }
 
         // sell AAVE for want
-        _swapFrom(AAVE, address(want), IERC20(AAVE).balanceOf(address(this)));
+        _swapFrom(AAVE, address(want()), IERC20(AAVE).balanceOf(address(this)));
 
     }
 
@@ -367,7 +515,7 @@ contract GenericAaveV3 is GenericLenderBase {
         }
 
         address[] memory assets = new address[](1);
-        assets[0] = address(aToken);
+        assets[0] = address(aToken());
 
         //check the total rewards available
         (address[] memory tokens, uint256[] memory rewards) = 
@@ -391,44 +539,30 @@ contract GenericAaveV3 is GenericLenderBase {
     }
 
     function _nav() internal view returns (uint256) {
-        return want.balanceOf(address(this)).add(underlyingBalanceStored());
+        return want().balanceOf(address(this)).add(underlyingBalanceStored());
     }
 
     function _apr() internal view returns (uint256) {
-        uint256 liquidityRate = uint256(_lendingPool().getReserveData(address(want)).currentLiquidityRate).div(1e9);// dividing by 1e9 to pass from ray to wad
+        IERC20 _want = want();
+        (uint256 unbacked, , , uint256 totalStableDebt, uint256 totalVariableDebt, uint256 liquidityRate, , , , , , ) =
+            protocolDataProvider.getReserveData(address(_want));
+        liquidityRate = liquidityRate.div(1e9);// dividing by 1e9 to pass from ray to wad
 
-        (uint256 unbacked, , , uint256 totalStableDebt, uint256 totalVariableDebt, , , , , , , ) =
-            protocolDataProvider.getReserveData(address(want));
-
-        uint256 availableLiquidity = want.balanceOf(address(aToken));
+        uint256 availableLiquidity = _want.balanceOf(address(aToken()));
 
         uint256 totalLiquidity = availableLiquidity.add(unbacked).add(totalStableDebt).add(totalVariableDebt);
 
-        uint256 incentivesRate = 0;
-        if(isIncentivised) {
-
-            address[] memory rewardTokens = _incentivesController().getRewardsByAsset(address(aToken));
-            uint256 i = 0;
-            uint256 _maxLoops = maxLoops;
-            uint256 tokenIncentivesRate;
-            //Passes the total Supply and the corresponding reward token address for each reward token the want has
-            while(i < rewardTokens.length && i < _maxLoops) {
-           
-                tokenIncentivesRate = _incentivesRate(totalLiquidity, rewardTokens[i]); 
-
-                incentivesRate += tokenIncentivesRate;
-
-                i ++;
-            }
-        }
+        (uint256 incentivesRate, ) = _incentivesRates(totalLiquidity, 0);
 
         return liquidityRate.add(incentivesRate);
     }
 
     //withdraw an amount including any want balance
     function _withdraw(uint256 amount) internal returns (uint256) {
-        uint256 balanceUnderlying = underlyingBalanceStored();
-        uint256 looseBalance = want.balanceOf(address(this));
+        IERC20 _want = want();
+        IAToken _aToken = aToken();
+        uint256 balanceUnderlying = _aToken.balanceOf(address(this));
+        uint256 looseBalance = _want.balanceOf(address(this));
         uint256 total = balanceUnderlying.add(looseBalance);
 
         if (amount > total) {
@@ -437,38 +571,39 @@ contract GenericAaveV3 is GenericLenderBase {
         }
 
         if (looseBalance >= amount) {
-            want.safeTransfer(address(strategy), amount);
+            _want.safeTransfer(strategy(), amount);
             return amount;
         }
 
         //not state changing but OK because of previous call
-        uint256 liquidity = want.balanceOf(address(aToken));
+        uint256 liquidity = _want.balanceOf(address(_aToken));
 
         if (liquidity > dust) {
             uint256 toWithdraw = amount.sub(looseBalance);
 
             if (toWithdraw <= liquidity) {
                 //we can take all
-                _lendingPool().withdraw(address(want), toWithdraw, address(this));
+                _lendingPool().withdraw(address(_want), toWithdraw, address(this));
             } else {
                 //take all we can
-                _lendingPool().withdraw(address(want), liquidity, address(this));
+                _lendingPool().withdraw(address(_want), liquidity, address(this));
             }
         }
-        looseBalance = want.balanceOf(address(this));
-        want.safeTransfer(address(strategy), looseBalance);
+        looseBalance = _want.balanceOf(address(this));
+        _want.safeTransfer(strategy(), looseBalance);
         return looseBalance;
     }
 
     function _deposit(uint256 amount) internal {
         IPool lp = _lendingPool();
+        IERC20 _want = want();
         // NOTE: check if allowance is enough and acts accordingly
         // allowance might not be enough if
         //     i) initial allowance has been used (should take years)
         //     ii) lendingPool contract address has changed (Aave updated the contract address)
-        if(want.allowance(address(this), address(lp)) < amount){
-            IERC20(address(want)).safeApprove(address(lp), 0);
-            IERC20(address(want)).safeApprove(address(lp), type(uint256).max);
+        if(_want.allowance(address(this), address(lp)) < amount){
+            _want.safeApprove(address(lp), 0);
+            _want.safeApprove(address(lp), type(uint256).max);
         }
 
         uint16 referral;
@@ -479,7 +614,7 @@ contract GenericAaveV3 is GenericLenderBase {
             referral = DEFAULT_REFERRAL;
         }
 
-        lp.supply(address(want), amount, address(this), referral);
+        lp.supply(address(_want), amount, address(this), referral);
     }
 
     function _checkCooldown() internal view returns (bool) {
@@ -553,7 +688,7 @@ contract GenericAaveV3 is GenericLenderBase {
 
     function _incentivesController() internal view returns (IRewardsController) {
         if(isIncentivised) {
-            return aToken.getIncentivesController();
+            return aToken().getIncentivesController();
         } else {
             return IRewardsController(0);
         }
@@ -561,14 +696,18 @@ contract GenericAaveV3 is GenericLenderBase {
 
     function protectedTokens() internal view override returns (address[] memory) {
         address[] memory protected = new address[](2);
-        protected[0] = address(want);
-        protected[1] = address(aToken);
+        protected[0] = address(want());
+        protected[1] = address(aToken());
         return protected;
     }
 
     modifier keepers() {
+        address _strategy = strategy();
         require(
-            msg.sender == address(keep3r) || msg.sender == address(strategy) || msg.sender == vault.governance() || msg.sender == IBaseStrategy(strategy).strategist(),
+            msg.sender == address(keep3r) ||
+                msg.sender == _strategy ||
+                msg.sender == vault().governance() ||
+                msg.sender == IBaseStrategy(_strategy).strategist(),
             "!keepers"
         );
         _;
@@ -6,6 +6,7 @@ import "../Interfaces/Compound/CErc20I.sol";
 import "../Interfaces/Compound/InterestRateModel.sol";
 import "@openzeppelin/contracts/token/ERC20/IERC20.sol";
 import "@openzeppelin/contracts/math/SafeMath.sol";
+import "@openzeppelin/contracts/math/Math.sol";
 import "@openzeppelin/contracts/utils/Address.sol";
 import "@openzeppelin/contracts/token/ERC20/SafeERC20.sol";
 
@@ -166,11 +167,38 @@ contract GenericCompound is GenericLenderBase {
     }
 
     function hasAssets() external view override returns (bool) {
+        return _hasAssets();
+    }
+
+    //what a withdrawal could pay out now, the market only has so much cash
+    function availableLiquidity() external view override returns (uint256) {
+        return Math.min(_nav(), want.balanceOf(address(this)).add(want.balanceOf(address(cToken))));
+    }
+
+    function _hasAssets() internal view returns (bool) {
         //return cToken.balanceOf(address(this)) > 0;
         return cToken.balanceOf(address(this)) > 0 || want.balanceOf(address(this)) > 0;
     }
 
     function aprAfterDeposit(uint256 amount) external view override returns (uint256) {
+        return _aprAfterDeposit(amount);
+    }
+
+    function lenderSnapshot(uint256 extraAmount)
+        external
+        view
+        override
+        returns (
+            uint256,
+            bool,
+            uint256,
+            uint256
+        )
+    {
+        return (_nav(), _hasAssets(), _apr(), _aprAfterDeposit(extraAmount));
+    }
+
+    function _aprAfterDeposit(uint256 amount) internal view returns (uint256) {
         uint256 cashPrior = want.balanceOf(address(cToken));
 
         uint256 borrows = cToken.totalBorrows();
@@ -4,6 +4,7 @@ pragma experimental ABIEncoderV2;
 
 import "@openzeppelin/contracts/token/ERC20/IERC20.sol";
 import "@openzeppelin/contracts/math/SafeMath.sol";
+import "@openzeppelin/contracts/math/Math.sol";
 import "@openzeppelin/contracts/utils/Address.sol";
 import "@openzeppelin/contracts/token/ERC20/SafeERC20.sol";
 
@@ -13,7 +14,7 @@ import {CometRewards} from "../Interfaces/Compound/V3/CompoundV3.sol";
 import {ITradeFactory} from "../Interfaces/ySwaps/ITradeFactory.sol";
 import {ISwapRouter} from "../Interfaces/UniswapInterfaces/V3/ISwapRouter.sol";
 
-import "./GenericLenderBase.sol";
+import "./GenericLenderCloneBase.sol";
 
 /********************
  *   A lender plugin for LenderYieldOptimiser for any borrowable erc20 asset on compoundV3 (not eth)
@@ -26,7 +27,7 @@ interface IBaseFee {
     function isCurrentBaseFeeAcceptable() external view returns (bool);
 }
 
-contract GenericCompoundV3 is GenericLenderBase {
+contract GenericCompoundV3 is GenericLenderCloneBase {
     using Address for address;
     using SafeMath for uint256;
 
@@ -48,13 +49,24 @@ contract GenericCompoundV3 is GenericLenderBase {
         0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2;
     address public tradeFactory;
 
-    Comet public comet;
     CometRewards public constant rewardsContract = 
         CometRewards(0x1B0e765F6224C21223AeA2af16c1C46E38885a40); 
 
+    //clone args after the base ones: comet, then its base scale and base index scale
+    uint256 internal constant COMET_ARG = PLUGIN_ARGS;
+    uint256 internal constant BASE_MANTISSA_ARG = PLUGIN_ARGS + 20;
+    uint256 internal constant BASE_INDEX_SCALE_ARG = PLUGIN_ARGS + 52;
+
+    //only set on the lender deployed with the constructor, clones read them from their code
+    Comet internal storedComet;
     uint internal BASE_MANTISSA;
     uint internal BASE_INDEX_SCALE;
 
+    //resolved once so the apr views do not search comet's asset list on every call. see refreshCometConfig
+    address public compPriceFeed;
+    address public baseTokenPriceFeed;
+    CometStructs.RewardConfig internal rewardConfig;
+
     uint256 public minCompToSell;
     uint256 public minRewardToHarvest;
     address public keep3r;
@@ -63,27 +75,42 @@ contract GenericCompoundV3 is GenericLenderBase {
         address _strategy,
         string memory name,
         address _comet
-    ) public GenericLenderBase(_strategy, name) {
-        _initialize(_comet);
+    ) public GenericLenderCloneBase(_strategy, name) {
+        storedComet = Comet(_comet);
+        BASE_MANTISSA = storedComet.baseScale();
+        BASE_INDEX_SCALE = storedComet.baseIndexScale();
+
+        _initializeComet(storedComet, storedWant);
     }
 
-    function initialize(address _comet) external {
-        _initialize(_comet);
+    function initialize(string memory _name) external {
+        IERC20 _want = want();
+        _initialize(_name, strategy(), _want);
+        _initializeComet(comet(), _want);
     }
 
-    function _initialize(address _comet) internal {
-        require(address(comet) == address(0), "already initialized");
-        comet = Comet(_comet);
-        require(comet.baseToken() == address(want), "wrong token");
-        
-        BASE_MANTISSA = comet.baseScale();
-        BASE_INDEX_SCALE = comet.baseIndexScale();
+    //takes comet and want as arguments so the constructor never reads the clone args
+    function _initializeComet(Comet _comet, IERC20 _want) internal {
+        require(_comet.baseToken() == address(_want), "wrong token");
 
-        want.safeApprove(_comet, type(uint256).max);
+        _want.safeApprove(address(_comet), type(uint256).max);
         IERC20(comp).safeApprove(address(router), type(uint256).max);
 
         minCompToSell = 0.05 ether;
         minRewardToHarvest = 10 ether;
+
+        _refreshCometConfig(_comet);
+    }
+
+    //for when comet changes a price feed or the rewards contract changes the reward config
+    function refreshCometConfig() external management {
+        _refreshCometConfig(comet());
+    }
+
+    function _refreshCometConfig(Comet _comet) internal {
+        compPriceFeed = _comet.getAssetInfoByAddress(comp).priceFeed;
+        baseTokenPriceFeed = _comet.baseTokenPriceFeed();
+        rewardConfig = rewardsContract.rewardConfig(address(_comet));
     }
 
     function cloneCompoundV3Lender(
@@ -91,8 +118,22 @@ contract GenericCompoundV3 is GenericLenderBase {
         string memory _name,
         address _comet
     ) external returns (address newLender) {
-        newLender = _clone(_strategy, _name);
-        GenericCompoundV3(newLender).initialize(_comet);
+        //packed, so every scale is widened to the full word _argUint256 reads. baseIndexScale is a uint64
+        bytes memory args = abi.encodePacked(_comet, uint256(Comet(_comet).baseScale()), uint256(Comet(_comet).baseIndexScale()));
+        newLender = _clone(_strategy, args);
+        GenericCompoundV3(newLender).initialize(_name);
+    }
+
+    function comet() public view returns (Comet) {
+        return _isClone() ? Comet(_argAddress(COMET_ARG)) : storedComet;
+    }
+
+    function _baseMantissa() internal view returns (uint256) {
+        return _isClone() ? _argUint256(BASE_MANTISSA_ARG) : BASE_MANTISSA;
+    }
+
+    function _baseIndexScale() internal view returns (uint256) {
+        return _isClone() ? _argUint256(BASE_INDEX_SCALE_ARG) : BASE_INDEX_SCALE;
     }
 
     function setMinRewardAmounts(uint256 _minCompToSell, uint256 _minRewardToHavest) external management {
@@ -116,11 +157,11 @@ contract GenericCompoundV3 is GenericLenderBase {
     }
 
     function _nav() internal view returns (uint256) {
-        return want.balanceOf(address(this)).add(underlyingBalanceStored());
+        return want().balanceOf(address(this)).add(underlyingBalanceStored());
     }
 
     function underlyingBalanceStored() public view returns (uint256) {
-        return comet.balanceOf(address(this));
+        return comet().balanceOf(address(this));
     }
 
     function apr() external view override returns (uint256) {
@@ -128,9 +169,10 @@ contract GenericCompoundV3 is GenericLenderBase {
     }
 
     function _apr() internal view returns (uint256) {
-        uint utilization = comet.getUtilization();
-        uint supplyRate = comet.getSupplyRate(utilization).mul(SECONDS_PER_YEAR);
-        uint rewardRate = getRewardAprForSupplyBase(getPriceFeedAddress(comp), 0);
+        Comet _comet = comet();
+        uint utilization = _comet.getUtilization();
+        uint supplyRate = _comet.getSupplyRate(utilization).mul(SECONDS_PER_YEAR);
+        uint rewardRate = getRewardAprForSupplyBase(compPriceFeed, 0);
         return uint256(supplyRate.add(rewardRate));
     }
 
@@ -141,21 +183,22 @@ contract GenericCompoundV3 is GenericLenderBase {
     * @return The reward APR in USD as a decimal scaled up by 1e18
     */
     function getRewardAprForSupplyBase(address rewardTokenPriceFeed, uint newAmount) public view returns (uint) {
-        uint rewardToSuppliersPerDay = comet.baseTrackingSupplySpeed().mul(SECONDS_PER_DAY).mul(BASE_INDEX_SCALE).div(BASE_MANTISSA);
+        Comet _comet = comet();
+        uint rewardToSuppliersPerDay = _comet.baseTrackingSupplySpeed().mul(SECONDS_PER_DAY).mul(_baseIndexScale()).div(_baseMantissa());
         if(rewardToSuppliersPerDay == 0) return 0;
 
-        uint rewardTokenPriceInUsd = getCompoundPrice(rewardTokenPriceFeed);
-        uint wantPriceInUsd = getCompoundPrice(comet.baseTokenPriceFeed());
-        uint wantTotalSupply = comet.totalSupply().add(newAmount);
+        uint rewardTokenPriceInUsd = _comet.getPrice(rewardTokenPriceFeed);
+        uint wantPriceInUsd = _comet.getPrice(baseTokenPriceFeed);
+        uint wantTotalSupply = _comet.totalSupply().add(newAmount);
         return (rewardTokenPriceInUsd.mul(rewardToSuppliersPerDay).div((wantTotalSupply.mul(wantPriceInUsd)))).mul(DAYS_PER_YEAR);
     }
 
     function getPriceFeedAddress(address asset) public view returns (address) {
-        return comet.getAssetInfoByAddress(asset).priceFeed;
+        return comet().getAssetInfoByAddress(asset).priceFeed;
     }
 
     function getCompoundPrice(address singleAssetPriceFeed) public view returns (uint) {
-        return comet.getPrice(singleAssetPriceFeed);
+        return comet().getPrice(singleAssetPriceFeed);
     }
 
     function weightedApr() external view override returns (uint256) {
@@ -171,17 +214,20 @@ contract GenericCompoundV3 is GenericLenderBase {
     //Pass in uint256.max to withdraw everything
     function emergencyWithdraw(uint256 amount) external override onlyGovernance {
         //dont care about errors here. we want to exit what we can
-        comet.withdraw(address(want), amount);
+        IERC20 _want = want();
+        comet().withdraw(address(_want), amount);
 
-        want.safeTransfer(vault.governance(), want.balanceOf(address(this)));
+        _want.safeTransfer(vault().governance(), _want.balanceOf(address(this)));
     }
 
     //withdraw an amount including any want balance
     function _withdraw(uint256 amount) internal returns (uint256) { 
         //Accrue rewards and interest to the lender so all following calls are acurate
-        comet.accrueAccount(address(this));
-        uint256 balanceUnderlying = underlyingBalanceStored();
-        uint256 looseBalance = want.balanceOf(address(this));
+        Comet _comet = comet();
+        IERC20 _want = want();
+        _comet.accrueAccount(address(this));
+        uint256 balanceUnderlying = _comet.balanceOf(address(this));
+        uint256 looseBalance = _want.balanceOf(address(this));
         uint256 total = balanceUnderlying.add(looseBalance);
 
         if (amount > total) {
@@ -190,25 +236,26 @@ contract GenericCompoundV3 is GenericLenderBase {
         }
 
         if (looseBalance >= amount) {
-            want.safeTransfer(address(strategy), amount);
+            _want.safeTransfer(strategy(), amount);
             return amount;
         }
 
-        uint256 liquidity = comet.totalSupply().sub(comet.totalBorrow());
+        //comet can lend out its reserves too, so totalBorrow can be more than totalSupply. the cash it holds is what it can pay
+        uint256 liquidity = _want.balanceOf(address(_comet));
 
         if (liquidity > 1) {
             uint256 toWithdraw = amount.sub(looseBalance);
 
             if (toWithdraw <= liquidity) {
                 //we can take all
-                comet.withdraw(address(want), toWithdraw);
+                _comet.withdraw(address(_want), toWithdraw);
             } else {
                 //take all we can
-                comet.withdraw(address(want), liquidity);
+                _comet.withdraw(address(_want), liquidity);
             }
         }
-        looseBalance = want.balanceOf(address(this));
-        want.safeTransfer(address(strategy), looseBalance);
+        looseBalance = _want.balanceOf(address(this));
+        _want.safeTransfer(strategy(), looseBalance);
         return looseBalance;
     }
 
@@ -217,9 +264,10 @@ contract GenericCompoundV3 is GenericLenderBase {
 
         _disposeOfComp();
 
-        uint256 wantBalance = want.balanceOf(address(this));
+        IERC20 _want = want();
+        uint256 wantBalance = _want.balanceOf(address(this));
         if(wantBalance > 0) {
-            comet.supply(address(want), wantBalance);
+            comet().supply(address(_want), wantBalance);
         }
     }
 
@@ -233,14 +281,14 @@ contract GenericCompoundV3 is GenericLenderBase {
     * Gets the amount of reward tokens due to this contract address
     */
     function getRewardsOwed() public view returns (uint) {
-        CometStructs.RewardConfig memory config = rewardsContract.rewardConfig(address(comet));
-        uint256 accrued = comet.baseTrackingAccrued(address(this));
+        CometStructs.RewardConfig memory config = rewardConfig;
+        uint256 accrued = comet().baseTrackingAccrued(address(this));
         if (config.shouldUpscale) {
             accrued *= config.rescaleFactor;
         } else {
             accrued /= config.rescaleFactor;
         }
-        uint256 claimed = rewardsContract.rewardsClaimed(address(comet), address(this));
+        uint256 claimed = rewardsContract.rewardsClaimed(address(comet()), address(this));
 
         return accrued > claimed ? accrued - claimed : 0;
     }
@@ -256,7 +304,7 @@ contract GenericCompoundV3 is GenericLenderBase {
     * Claims the reward tokens due to this contract address
     */
     function _claimCometRewards() internal {
-        rewardsContract.claim(address(comet), address(this), true);
+        rewardsContract.claim(address(comet()), address(this), true);
     }
 
     function _disposeOfComp() internal {
@@ -267,11 +315,12 @@ contract GenericCompoundV3 is GenericLenderBase {
 
         if (_comp > minCompToSell) {
 
-            if(address(want) == weth) {
+            address _want = address(want());
+            if(_want == weth) {
                 ISwapRouter.ExactInputSingleParams memory params =
                     ISwapRouter.ExactInputSingleParams(
                         comp, // tokenIn
-                        address(want), // tokenOut
+                        _want, // tokenOut
                         compToEthFee, // comp-eth fee
                         address(this), // recipient
                         now, // deadline
@@ -289,7 +338,7 @@ contract GenericCompoundV3 is GenericLenderBase {
                         compToEthFee,
                         weth, // ETH-want
                         ethToWantFee,
-                        address(want)
+                        _want
                     );
 
                 // Proceeds from Comp are not subject to minExpectedSwapPercentage
@@ -308,41 +357,106 @@ contract GenericCompoundV3 is GenericLenderBase {
     }
 
     function deposit() external override management {
-        uint256 balance = want.balanceOf(address(this));
-        comet.supply(address(want), balance);
+        IERC20 _want = want();
+        uint256 balance = _want.balanceOf(address(this));
+        comet().supply(address(_want), balance);
     }
 
     function withdrawAll() external override management returns (bool) {
-        comet.accrueAccount(address(this));
+        comet().accrueAccount(address(this));
         uint256 invested = _nav();
         uint256 returned = _withdraw(invested);
         return returned >= invested;
     }
 
     function hasAssets() external view override returns (bool) {
-        return comet.balanceOf(address(this)) > 0 || want.balanceOf(address(this)) > 0;
+        return underlyingBalanceStored() > 0 || want().balanceOf(address(this)) > 0;
+    }
+
+    //what a withdrawal could pay out now, the market only has so much cash
+    function availableLiquidity() external view override returns (uint256) {
+        Comet _comet = comet();
+        IERC20 _want = want();
+        uint256 looseBalance = _want.balanceOf(address(this));
+        return Math.min(looseBalance.add(_comet.balanceOf(address(this))), looseBalance.add(_want.balanceOf(address(_comet))));
     }
 
     function aprAfterDeposit(uint256 amount) external view override returns (uint256) {
-        uint256 borrows = comet.totalBorrow();
-        uint256 supply = comet.totalSupply();
+        Comet _comet = comet();
+        uint256 supply = _comet.totalSupply();
 
-        uint256 newUtilization = borrows.mul(1e18).div(supply.add(amount));
-        uint256 newSupply = comet.getSupplyRate(newUtilization).mul(SECONDS_PER_YEAR);
+        uint256 newSupply = _supplyApr(_comet, supply, amount);
 
-        uint256 newReward = getRewardAprForSupplyBase(getPriceFeedAddress(comp), amount);
+        (, uint256 newReward) = _rewardAprs(_comet, supply, amount);
         return newSupply.add(newReward);
     }
 
+    function lenderSnapshot(uint256 extraAmount)
+        external
+        view
+        override
+        returns (
+            uint256,
+            bool,
+            uint256,
+            uint256
+        )
+    {
+        //totals, reward speed and prices are read once and shared between apr and aprAfterDeposit
+        Comet _comet = comet();
+        uint256 supply = _comet.totalSupply();
+
+        (uint256 rewardApr, uint256 rewardAprAfterDeposit) = _rewardAprs(_comet, supply, extraAmount);
+        uint256 currentApr = _supplyApr(_comet, supply, 0).add(rewardApr);
+
+        uint256 balanceUnderlying = _comet.balanceOf(address(this));
+        uint256 looseBalance = want().balanceOf(address(this));
+
+        return (
+            balanceUnderlying.add(looseBalance),
+            balanceUnderlying > 0 || looseBalance > 0,
+            currentApr,
+            extraAmount == 0 ? currentApr : _supplyApr(_comet, supply, extraAmount).add(rewardAprAfterDeposit)
+        );
+    }
+
+    //supply apr after depositing extraAmount. without a deposit it is comet's own utilization, the one apr() uses,
+    //otherwise the utilization is worked out from the accrued totals with the deposit added
+    function _supplyApr(
+        Comet _comet,
+        uint256 supply,
+        uint256 extraAmount
+    ) internal view returns (uint256) {
+        uint256 utilization = extraAmount == 0 ? _comet.getUtilization() : _comet.totalBorrow().mul(1e18).div(supply.add(extraAmount));
+        return _comet.getSupplyRate(utilization).mul(SECONDS_PER_YEAR);
+    }
+
+    //reward apr for the current supply and for the supply after depositing extraAmount
+    function _rewardAprs(Comet _comet, uint256 supply, uint256 extraAmount) internal view returns (uint256, uint256) {
+        uint rewardToSuppliersPerDay = _comet.baseTrackingSupplySpeed().mul(SECONDS_PER_DAY).mul(_baseIndexScale()).div(_baseMantissa());
+        if(rewardToSuppliersPerDay == 0) return (0, 0);
+
+        uint rewardValuePerDay = _comet.getPrice(compPriceFeed).mul(rewardToSuppliersPerDay);
+        uint wantPriceInUsd = _comet.getPrice(baseTokenPriceFeed);
+        return (
+            (rewardValuePerDay.div(supply.mul(wantPriceInUsd))).mul(DAYS_PER_YEAR),
+            (rewardValuePerDay.div(supply.add(extraAmount).mul(wantPriceInUsd))).mul(DAYS_PER_YEAR)
+        );
+    }
+
     function protectedTokens() internal view override returns (address[] memory) {
         address[] memory protected = new address[](1);
-        protected[0] = address(want);
+        protected[0] = address(want());
         return protected;
     }
 
     modifier keepers() {
+        address _strategy = strategy();
         require(
-            msg.sender == address(keep3r) || msg.sender == address(strategy) || msg.sender == vault.governance() || msg.sender == IBaseStrategy(strategy).strategist(),
+            msg.sender == address(keep3r) ||
+                msg.sender == _strategy ||
+                msg.sender == vault().governance() ||
+                msg.sender == IBaseStrategy(_strategy).strategist(),
             "!keepers"
         );
         _;
@@ -364,7 +478,7 @@ contract GenericCompoundV3 is GenericLenderBase {
         ITradeFactory tf = ITradeFactory(_tradeFactory);
 
         IERC20(comp).safeApprove(_tradeFactory, type(uint256).max);
-        tf.enable(comp, address(want));
+        tf.enable(comp, address(want()));
         
         tradeFactory = _tradeFactory;
     }
@@ -375,7 +489,7 @@ contract GenericCompoundV3 is GenericLenderBase {
 
     function _removeTradeFactoryPermissions() internal {
         IERC20(comp).safeApprove(tradeFactory, 0);
-        ITradeFactory(tradeFactory).disable(comp, address(want));
+        ITradeFactory(tradeFactory).disable(comp, address(want()));
         tradeFactory = address(0);
     }
 }
@@ -7,6 +7,7 @@ import "../Interfaces/DyDx/IInterestSetter.sol";
 
 import "@openzeppelin/contracts/token/ERC20/IERC20.sol";
 import "@openzeppelin/contracts/math/SafeMath.sol";
+import "@openzeppelin/contracts/math/Math.sol";
 import "@openzeppelin/contracts/utils/Address.sol";
 import "@openzeppelin/contracts/token/ERC20/SafeERC20.sol";
 
@@ -160,10 +161,31 @@ contract GenericDyDx is GenericLenderBase {
         return underlyingBalanceStored() > 0;
     }
 
+    //what a withdrawal could pay out now, the market only has so much cash
+    function availableLiquidity() external view override returns (uint256) {
+        return Math.min(_nav(), want.balanceOf(address(this)).add(want.balanceOf(SOLO)));
+    }
+
     function aprAfterDeposit(uint256 amount) external view override returns (uint256) {
         return _apr(amount);
     }
 
+    function lenderSnapshot(uint256 extraAmount)
+        external
+        view
+        override
+        returns (
+            uint256,
+            bool,
+            uint256,
+            uint256
+        )
+    {
+        //the account balances are only read once for both nav and hasAssets
+        uint256 underlying = underlyingBalanceStored();
+        return (want.balanceOf(address(this)).add(underlying), underlying > 0, _apr(0), _apr(extraAmount));
+    }
+
     function _apr(uint256 extraSupply) internal view returns (uint256) {
         ISoloMargin solo = ISoloMargin(SOLO);
         Types.TotalPar memory par = solo.getMarketTotalPar(dydxMarketId);
@@ -14,6 +14,7 @@ import "../Interfaces/Ironbank/IStakingRewards.sol";
 import "../Interfaces/Ironbank/IStakingRewardsFactory.sol";
 import "../Interfaces/ySwaps/ITradeFactory.sol";
 import "./GenericLenderBase.sol";
+import "./RewardPriceReporter.sol";
 
 /********************
  *   A lender plugin for LenderYieldOptimiser for any erc20 asset on IronBank (not eth)
@@ -40,7 +41,7 @@ interface IVeledrome {
     function getAmountsOut(uint amountIn, route[] memory routes) external view returns (uint256[] memory amounts);
 } 
 
-contract GenericIronBank is GenericLenderBase {
+contract GenericIronBank is GenericLenderBase, RewardPriceReporter {
     using Address for address;
     using SafeMath for uint256;
 
@@ -162,6 +163,11 @@ contract GenericIronBank is GenericLenderBase {
         keep3r = _keep3r;
     }
 
+    //shared RewardPriceOracle the apr views price ib with. 0 quotes the router
+    function setRewardPriceOracle(address _rewardPriceOracle) external management {
+        _setRewardPriceOracle(_rewardPriceOracle);
+    }
+
     function balanceOfWant() public view returns(uint256) {
         return want.balanceOf(address(this));
     }
@@ -224,7 +230,7 @@ contract GenericIronBank is GenericLenderBase {
             blockShareSupply = distributionPerSec.mul(1e18).div(totalStaked);
         }
 
-        uint256 estimatedWant = _priceCheck(ib, address(want), blockShareSupply);
+        uint256 estimatedWant = _rewardToWant(ib, blockShareSupply);
         uint256 compRate;
         if(estimatedWant != 0){
             compRate = estimatedWant.mul(9).div(10); //10% pessimist
@@ -243,6 +249,10 @@ contract GenericIronBank is GenericLenderBase {
         return amounts[amounts.length - 1];
     }
 
+    function _spotRewardToWant(address _token, uint256 _amount) internal view override returns (uint256) {
+        return _priceCheck(_token, address(want), _amount);
+    }
+
     function weightedApr() external view override returns (uint256) {
         uint256 a = _apr();
         return a.mul(_nav());
@@ -316,6 +326,7 @@ contract GenericIronBank is GenericLenderBase {
     }
 
     function harvest() external keepers {
+        _reportRewardPrice(ib);
         _disposeOfComp();
 
         uint256 wantBalance = balanceOfWant();
@@ -507,10 +518,37 @@ contract GenericIronBank is GenericLenderBase {
     }
 
     function hasAssets() external view override returns (bool) {
+        return _hasAssets();
+    }
+
+    //what a withdrawal could pay out now, the market only has so much cash
+    function availableLiquidity() external view override returns (uint256) {
+        return Math.min(_nav(), want.balanceOf(address(this)).add(want.balanceOf(address(cToken))));
+    }
+
+    function _hasAssets() internal view returns (bool) {
         return underlyingBalanceStored() > 0 || balanceOfWant() > 0;
     }
 
     function aprAfterDeposit(uint256 amount) external view override returns (uint256) {
+        return _aprAfterDeposit(amount);
+    }
+
+    function lenderSnapshot(uint256 extraAmount)
+        external
+        view
+        override
+        returns (
+            uint256,
+            bool,
+            uint256,
+            uint256
+        )
+    {
+        return (_nav(), _hasAssets(), _apr(), _aprAfterDeposit(extraAmount));
+    }
+
+    function _aprAfterDeposit(uint256 amount) internal view returns (uint256) {
         uint256 cashPrior = want.balanceOf(address(cToken));
 
         uint256 borrows = cToken.totalBorrows();
@@ -560,7 +598,10 @@ contract GenericIronBank is GenericLenderBase {
 
     modifier keepers() {
         require(
-            msg.sender == address(keep3r) || msg.sender == address(strategy) || msg.sender == vault.governance() || msg.sender == IBaseStrategy(strategy).strategist(),
+            msg.sender == address(keep3r) ||
+                msg.sender == address(strategy) ||
+                msg.sender == vault.governance() ||
+                msg.sender == IBaseStrategy(strategy).strategist(),
             "!keepers"
         );
         _;
@@ -0,0 +1,161 @@
+// SPDX-License-Identifier: GPL-3.0
+pragma solidity 0.6.12;
+
+import {VaultAPI} from "@yearnvaults/contracts/BaseStrategy.sol";
+import "@openzeppelin/contracts/token/ERC20/IERC20.sol";
+import "@openzeppelin/contracts/math/SafeMath.sol";
+import "@openzeppelin/contracts/token/ERC20/SafeERC20.sol";
+
+import "./IGenericLender.sol";
+import {IBaseStrategy} from "./GenericLenderBase.sol";
+
+/********************
+ *   Lender base for plugins whose clones read their constants from code instead of storage
+ *   A clone is an EIP-1167 proxy with strategy, vault and want appended to its runtime code, followed by
+ *   whatever the plugin appends (comet, aToken...). They are read with extcodecopy, which is far cheaper than
+ *   the cold SLOADs GenericLenderBase pays for them on every nav, apr, deposit and withdraw
+ *   The lender deployed with the constructor has no such args and keeps them in storage. solidity 0.6
+ *   immutables can not be read while constructing, so storage it is for that one
+ *   Whether the code running is a clone is decided by comparing address(this) with the immutable address of
+ *   the lender deployed with the constructor: clones delegatecall into its code, so they see its address. no
+ *   extcodesize, no storage read. Nothing reachable from the constructors may read it (or anything built on it
+ *   like strategy(), want() or the plugin's getters), the construction paths take those values as arguments
+ *
+ ********************* */
+
+abstract contract GenericLenderCloneBase is IGenericLender {
+    using SafeERC20 for IERC20;
+
+    //runtime code of the EIP-1167 proxy, the args start right after it
+    uint256 internal constant PROXY_LENGTH = 45;
+
+    //offsets of the args appended to a clone. the plugin args start at PLUGIN_ARGS
+    uint256 internal constant STRATEGY_ARG = 0;
+    uint256 internal constant VAULT_ARG = 20;
+    uint256 internal constant WANT_ARG = 40;
+    uint256 internal constant PLUGIN_ARGS = 60;
+
+    //the lender deployed with the constructor. any other address running this code is one of its clones
+    address private immutable original;
+
+    //only set on the lender deployed with the constructor
+    address internal storedStrategy;
+    VaultAPI internal storedVault;
+    IERC20 internal storedWant;
+
+    string public override lenderName;
+    uint256 public dust;
+    bool internal initialized;
+
+    event Cloned(address indexed clone);
+
+    constructor(address _strategy, string memory _name) public {
+        original = address(this);
+        storedStrategy = _strategy;
+        storedVault = VaultAPI(IBaseStrategy(_strategy).vault());
+        storedWant = IERC20(storedVault.token());
+
+        _initialize(_name, _strategy, storedWant);
+    }
+
+    //the constructor passes the stored values, a clone's initialize its args
+    function _initialize(
+        string memory _name,
+        address _strategy,
+        IERC20 _want
+    ) internal {
+        require(!initialized, "Lender already initialized");
+        initialized = true;
+
+        lenderName = _name;
+        dust = 10000;
+
+        _want.safeApprove(_strategy, uint256(-1));
+    }
+
+    function strategy() public view override returns (address) {
+        return _isClone() ? _argAddress(STRATEGY_ARG) : storedStrategy;
+    }
+
+    function vault() public view returns (VaultAPI) {
+        return _isClone() ? VaultAPI(_argAddress(VAULT_ARG)) : storedVault;
+    }
+
+    function want() public view returns (IERC20) {
+        return _isClone() ? IERC20(_argAddress(WANT_ARG)) : storedWant;
+    }
+
+    //deploys a proxy of this lender for _strategy with _pluginArgs appended after the base args
+    //the plugin initializes the clone afterwards
+    function _clone(address _strategy, bytes memory _pluginArgs) internal returns (address newLender) {
+        address _vault = IBaseStrategy(_strategy).vault();
+        bytes memory args = abi.encodePacked(_strategy, _vault, VaultAPI(_vault).token(), _pluginArgs);
+
+        bytes memory code =
+            abi.encodePacked(
+                //copies the runtime code and the args after it to memory and returns them
+                hex"3d61",
+                uint16(PROXY_LENGTH + args.length),
+                hex"80600b3d3981f3",
+                //EIP-1167 runtime code
+                hex"363d3d373d3d3d363d73",
+                address(this),
+                hex"5af43d82803e903d91602b57fd5bf3",
+                args
+            );
+
+        assembly {
+            newLender := create(0, add(code, 0x20), mload(code))
+        }
+        require(newLender != address(0), "!clone");
+
+        emit Cloned(newLender);
+    }
+
+    function _isClone() internal view returns (bool) {
+        return address(this) != original;
+    }
+
+    function _argAddress(uint256 _offset) internal view returns (address arg) {
+        uint256 codeOffset = PROXY_LENGTH + _offset;
+        assembly {
+            extcodecopy(address(), 0, codeOffset, 20)
+            arg := shr(96, mload(0))
+        }
+    }
+
+    function _argUint256(uint256 _offset) internal view returns (uint256 arg) {
+        uint256 codeOffset = PROXY_LENGTH + _offset;
+        assembly {
+            extcodecopy(address(), 0, codeOffset, 32)
+            arg := mload(0)
+        }
+    }
+
+    function setDust(uint256 _dust) external virtual override management {
+        dust = _dust;
+    }
+
+    function sweep(address _token) external virtual override management {
+        address[] memory _protectedTokens = protectedTokens();
+        for (uint256 i; i < _protectedTokens.length; i++) require(_token != _protectedTokens[i], "!protected");
+
+        IERC20(_token).safeTransfer(vault().governance(), IERC20(_token).balanceOf(address(this)));
+    }
+
+    function protectedTokens() internal view virtual returns (address[] memory);
+
+    modifier management() {
+        address _strategy = strategy();
+        require(
+            msg.sender == _strategy || msg.sender == vault().governance() || msg.sender == IBaseStrategy(_strategy).strategist(),
+            "!management"
+        );
+        _;
+    }
+
+    modifier onlyGovernance() {
+        require(msg.sender == vault().governance(), "!gov");
+        _;
+    }
+}
@@ -7,12 +7,14 @@ import "../Interfaces/Compound/ComptrollerI.sol";
 import "../Interfaces/Compound/InterestRateModel.sol";
 import "@openzeppelin/contracts/token/ERC20/IERC20.sol";
 import "@openzeppelin/contracts/math/SafeMath.sol";
+import "@openzeppelin/contracts/math/Math.sol";
 import "@openzeppelin/contracts/utils/Address.sol";
 import "@openzeppelin/contracts/token/ERC20/SafeERC20.sol";
 
 import "../Interfaces/UniswapInterfaces/IUniswapV2Router02.sol";
 
 import "./GenericLenderBase.sol";
+import "./RewardPriceReporter.sol";
 
 /********************
  *   A lender plugin for LenderYieldOptimiser for any erc20 asset on compound (not eth)
@@ -21,7 +23,7 @@ import "./GenericLenderBase.sol";
  *
  ********************* */
 
-contract GenericScream is GenericLenderBase {
+contract GenericScream is GenericLenderBase, RewardPriceReporter {
     using SafeERC20 for IERC20;
     using Address for address;
     using SafeMath for uint256;
@@ -75,6 +77,11 @@ contract GenericScream is GenericLenderBase {
         return _nav();
     }
 
+    //shared RewardPriceOracle the apr views price scream with. 0 quotes the router
+    function setRewardPriceOracle(address _rewardPriceOracle) external management {
+        _setRewardPriceOracle(_rewardPriceOracle);
+    }
+
     //adjust dust threshol
     function setDustThreshold(uint256 amount) external management {
         dustThreshold = amount;
@@ -125,7 +132,7 @@ contract GenericScream is GenericLenderBase {
             blockShareSupply = distributionPerBlock.mul(1e18).div(totalSupply);
         }
 
-        uint256 estimatedWant =  priceCheck(scream, address(want),blockShareSupply);
+        uint256 estimatedWant = _rewardToWant(scream, blockShareSupply);
         uint256 compRate;
         if(estimatedWant != 0){
             compRate = estimatedWant.mul(9).div(10); //10% pessimist
@@ -146,6 +153,10 @@ contract GenericScream is GenericLenderBase {
         return amounts[amounts.length - 1];
     }
 
+    function _spotRewardToWant(address _token, uint256 _amount) internal view override returns (uint256) {
+        return priceCheck(_token, address(want), _amount);
+    }
+
     function weightedApr() external view override returns (uint256) {
         uint256 a = _apr();
         return a.mul(_nav());
@@ -224,6 +235,7 @@ contract GenericScream is GenericLenderBase {
         uint256 _scream = IERC20(scream).balanceOf(address(this));
 
         if (_scream > minScreamToSell) {
+            _reportRewardPrice(scream);
             address[] memory path = getTokenOutPath(scream, address(want));
             IUniswapV2Router02(spookyRouter).swapExactTokensForTokens(_scream, uint256(0), path, address(this), now);
         }
@@ -284,11 +296,38 @@ contract GenericScream is GenericLenderBase {
     }
 
     function hasAssets() external view override returns (bool) {
+        return _hasAssets();
+    }
+
+    //what a withdrawal could pay out now, the market only has so much cash
+    function availableLiquidity() external view override returns (uint256) {
+        return Math.min(_nav(), want.balanceOf(address(this)).add(want.balanceOf(address(cToken))));
+    }
+
+    function _hasAssets() internal view returns (bool) {
         //return cToken.balanceOf(address(this)) > 0;
         return cToken.balanceOf(address(this)) > dustThreshold || want.balanceOf(address(this)) > 0;
     }
 
     function aprAfterDeposit(uint256 amount) external view override returns (uint256) {
+        return _aprAfterDeposit(amount);
+    }
+
+    function lenderSnapshot(uint256 extraAmount)
+        external
+        view
+        override
+        returns (
+            uint256,
+            bool,
+            uint256,
+            uint256
+        )
+    {
+        return (_nav(), _hasAssets(), _apr(), _aprAfterDeposit(extraAmount));
+    }
+
+    function _aprAfterDeposit(uint256 amount) internal view returns (uint256) {
         uint256 cashPrior = want.balanceOf(address(cToken));
 
         uint256 borrows = cToken.totalBorrows();
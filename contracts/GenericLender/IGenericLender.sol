@@ -22,9 +22,30 @@ interface IGenericLender {
 
     function hasAssets() external view returns (bool);
 
+    //what withdraw could pay out right now, at most nav
+    function availableLiquidity() external view returns (uint256);
+
     function aprAfterDeposit(uint256 amount) external view returns (uint256);
 
+    //nav, hasAssets, apr and aprAfterDeposit(extraAmount) from a single call
+    function lenderSnapshot(uint256 extraAmount)
+        external
+        view
+        returns (
+            uint256,
+            bool,
+            uint256,
+            uint256
+        );
+
     function setDust(uint256 _dust) external;
 
     function sweep(address _token) external;
 }
+
+//lenders that earn rewards they sell and supply back on harvest
+interface IHarvestableLender {
+    function harvestTrigger(uint256 callCost) external view returns (bool);
+
+    function harvest() external;
+}
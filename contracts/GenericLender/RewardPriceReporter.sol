@@ -0,0 +1,54 @@
+// SPDX-License-Identifier: GPL-3.0
+pragma solidity 0.6.12;
+
+import "@openzeppelin/contracts/token/ERC20/ERC20.sol";
+
+import "../RewardPriceOracle/IRewardPriceOracle.sol";
+
+/********************
+ *   Reward pricing for lenders that count their reward emissions in the apr
+ *   The lender reports the router quote of one reward token to the RewardPriceOracle when it harvests and
+ *   the apr views read the time weighted price back, one call instead of a multi hop router quote
+ *   Without an oracle, or before the first report, the apr views quote the router like they always did
+ *
+ ********************* */
+
+abstract contract RewardPriceReporter {
+    IRewardPriceOracle public rewardPriceOracle;
+
+    //router quote of _amount of _token in want
+    function _spotRewardToWant(address _token, uint256 _amount) internal view virtual returns (uint256);
+
+    function _setRewardPriceOracle(address _rewardPriceOracle) internal {
+        rewardPriceOracle = IRewardPriceOracle(_rewardPriceOracle);
+    }
+
+    function _rewardToWant(address _token, uint256 _amount) internal view returns (uint256) {
+        if (_amount == 0) {
+            return 0;
+        }
+
+        IRewardPriceOracle oracle = rewardPriceOracle;
+        if (address(oracle) != address(0)) {
+            uint256 inWant = oracle.consult(address(this), _token, _amount);
+            if (inWant != 0) {
+                return inWant;
+            }
+        }
+        return _spotRewardToWant(_token, _amount);
+    }
+
+    //called on harvest, before the rewards are sold and move the price
+    function _reportRewardPrice(address _token) internal {
+        IRewardPriceOracle oracle = rewardPriceOracle;
+        if (address(oracle) == address(0)) {
+            return;
+        }
+
+        uint256 unit = 10**uint256(ERC20(_token).decimals());
+        uint256 quote = _spotRewardToWant(_token, unit);
+        if (quote != 0) {
+            oracle.update(_token, unit, quote);
+        }
+    }
+}
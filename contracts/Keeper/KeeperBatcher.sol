@@ -0,0 +1,125 @@
+// SPDX-License-Identifier: GPL-3.0
+pragma solidity 0.6.12;
+
+import "@openzeppelin/contracts/math/SafeMath.sol";
+import "@openzeppelin/contracts/utils/Address.sol";
+
+import {IBaseStrategy} from "../GenericLender/GenericLenderBase.sol";
+
+/********************
+ *   Harvests and tends many strategies in one keeper transaction
+ *   Every strategy is checked with the same callCost. A due harvest goes before a due tend, tendTrigger is
+ *   false when harvestTrigger is true anyway. Each call gets at most gasLimit gas and runs in a try, so a
+ *   revert or running out of gas only fails that strategy. Worked reports what happened to each of them, Stopped
+ *   where the batch ran out of gas. The strategies from there on were not attempted, whether they were due or not
+ *   The batcher has to be the keeper of the strategies it works
+ *
+ ********************* */
+
+contract KeeperBatcher {
+    using Address for address;
+    using SafeMath for uint256;
+
+    uint256 public constant NONE = 0;
+    uint256 public constant TEND = 1;
+    uint256 public constant HARVEST = 2;
+    //gas kept back for the report and the rest of the loop when a call runs out of gas
+    uint256 internal constant RESERVE_GAS = 30_000;
+
+    address public governance;
+    mapping(address => bool) public keepers;
+
+    //one for every strategy work looked at. gasUsed is 0 when nothing was due
+    event Worked(address indexed strategy, uint256 action, bool success, uint256 gasUsed);
+    //not enough gas was left for the strategy at index next. it and the ones after it were not attempted
+    event Stopped(uint256 next);
+
+    constructor() public {
+        governance = msg.sender;
+        keepers[msg.sender] = true;
+    }
+
+    function setGovernance(address _governance) external onlyGovernance {
+        governance = _governance;
+    }
+
+    function setKeeper(address _keeper, bool _allowed) external onlyGovernance {
+        keepers[_keeper] = _allowed;
+    }
+
+    //the action due on each strategy, NONE, TEND or HARVEST
+    function workable(address[] calldata _strategies, uint256 _callCost) external view returns (uint256[] memory actions) {
+        actions = new uint256[](_strategies.length);
+        for (uint256 i = 0; i < _strategies.length; i++) {
+            actions[i] = _due(_strategies[i], _callCost);
+        }
+    }
+
+    //harvests or tends every strategy that is due. returns how many succeeded
+    //stops early when there is not enough gas left to give the next call its gasLimit, the rest waits for the next run
+    function work(
+        address[] calldata _strategies,
+        uint256 _callCost,
+        uint256 _gasLimit
+    ) external onlyKeepers returns (uint256 worked) {
+        uint256 gasNeeded = _gasLimit.mul(64).div(63).add(RESERVE_GAS);
+        for (uint256 i = 0; i < _strategies.length; i++) {
+            address strategy = _strategies[i];
+            uint256 action = _due(strategy, _callCost);
+            if (action == NONE) {
+                emit Worked(strategy, NONE, true, 0);
+                continue;
+            }
+            if (gasleft() < gasNeeded) {
+                emit Stopped(i);
+                break;
+            }
+
+            bool success;
+            uint256 gasBefore = gasleft();
+            if (action == HARVEST) {
+                try IBaseStrategy(strategy).harvest{gas: _gasLimit}() {
+                    success = true;
+                } catch {}
+            } else {
+                try IBaseStrategy(strategy).tend{gas: _gasLimit}() {
+                    success = true;
+                } catch {}
+            }
+            emit Worked(strategy, action, success, gasBefore.sub(gasleft()));
+
+            if (success) {
+                worked++;
+            }
+        }
+    }
+
+    function _due(address _strategy, uint256 _callCost) internal view returns (uint256) {
+        //calls to an address without code revert in the batcher itself, not in the try
+        if (!_strategy.isContract()) {
+            return NONE;
+        }
+
+        try IBaseStrategy(_strategy).harvestTrigger(_callCost) returns (bool due) {
+            if (due) {
+                return HARVEST;
+            }
+        } catch {}
+        try IBaseStrategy(_strategy).tendTrigger(_callCost) returns (bool due) {
+            if (due) {
+                return TEND;
+            }
+        } catch {}
+        return NONE;
+    }
+
+    modifier onlyGovernance() {
+        require(msg.sender == governance, "!gov");
+        _;
+    }
+
+    modifier onlyKeepers() {
+        require(keepers[msg.sender] || msg.sender == governance, "!keepers");
+        _;
+    }
+}
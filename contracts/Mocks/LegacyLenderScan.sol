@@ -0,0 +1,58 @@
+// SPDX-License-Identifier: GPL-3.0
+pragma solidity 0.6.12;
+
+import "@openzeppelin/contracts/math/SafeMath.sol";
+
+import "../GenericLender/IGenericLender.sol";
+
+/********************
+ *   The two loop lender scan the strategies used before lenderSnapshot
+ *   Only kept so the gas of the old path can be compared against the new one on a local chain
+ *
+ ********************* */
+
+contract LegacyLenderScan {
+    using SafeMath for uint256;
+
+    function estimateAdjustPosition(IGenericLender[] calldata lenders, uint256 looseAssets)
+        external
+        view
+        returns (
+            uint256 _lowest,
+            uint256 _lowestApr,
+            uint256 _highest,
+            uint256 _potential
+        )
+    {
+        _lowestApr = uint256(-1);
+        _lowest = 0;
+        uint256 lowestNav = 0;
+        for (uint256 i = 0; i < lenders.length; i++) {
+            if (lenders[i].hasAssets()) {
+                uint256 apr = lenders[i].apr();
+                if (apr < _lowestApr) {
+                    _lowestApr = apr;
+                    _lowest = i;
+                    lowestNav = lenders[i].nav();
+                }
+            }
+        }
+
+        uint256 toAdd = lowestNav.add(looseAssets);
+
+        uint256 highestApr = 0;
+        _highest = 0;
+
+        for (uint256 i = 0; i < lenders.length; i++) {
+            uint256 apr;
+            apr = lenders[i].aprAfterDeposit(looseAssets);
+
+            if (apr > highestApr) {
+                highestApr = apr;
+                _highest = i;
+            }
+        }
+
+        _potential = lenders[_highest].aprAfterDeposit(toAdd);
+    }
+}
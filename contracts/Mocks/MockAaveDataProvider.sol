@@ -0,0 +1,100 @@
+// SPDX-License-Identifier: GPL-3.0
+pragma solidity 0.6.12;
+pragma experimental ABIEncoderV2;
+
+import "@openzeppelin/contracts/token/ERC20/ERC20.sol";
+
+interface IMockAaveV3Pool {
+    function asset() external view returns (address);
+
+    function reserveFactor() external view returns (uint256);
+
+    function totalSupply() external view returns (uint256);
+
+    function totalVariableDebt() external view returns (uint256);
+
+    function currentLiquidityRate() external view returns (uint256);
+
+    function currentVariableBorrowRate() external view returns (uint256);
+
+    function liquidityIndex() external view returns (uint256);
+
+    function variableBorrowIndex() external view returns (uint256);
+
+    function lastUpdateTimestamp() external view returns (uint256);
+}
+
+/********************
+ *   Stand in for the Aave V3 ProtocolDataProvider on a local chain, reading from a MockAaveV3Pool
+ *   It is its own PoolAddressesProvider: ADDRESSES_PROVIDER() is this contract and getPool() the mock pool
+ *   The pool is kept in storage so it can be set after the code is copied to the hard coded address
+ *
+ ********************* */
+
+contract MockAaveDataProvider {
+    IMockAaveV3Pool internal pool;
+
+    function setPool(address _pool) external {
+        pool = IMockAaveV3Pool(_pool);
+    }
+
+    function ADDRESSES_PROVIDER() external view returns (address) {
+        return address(this);
+    }
+
+    function getPool() external view returns (address) {
+        return address(pool);
+    }
+
+    function getReserveConfigurationData(address asset)
+        external
+        view
+        returns (
+            uint256 decimals,
+            uint256 ltv,
+            uint256 liquidationThreshold,
+            uint256 liquidationBonus,
+            uint256 reserveFactor,
+            bool usageAsCollateralEnabled,
+            bool borrowingEnabled,
+            bool stableBorrowRateEnabled,
+            bool isActive,
+            bool isFrozen
+        )
+    {
+        require(asset == pool.asset(), "reserve not listed");
+        decimals = ERC20(asset).decimals();
+        reserveFactor = pool.reserveFactor();
+        borrowingEnabled = true;
+        isActive = true;
+    }
+
+    //no stable debt, no unbacked aTokens and nothing accrued to the treasury
+    function getReserveData(address asset)
+        external
+        view
+        returns (
+            uint256 unbacked,
+            uint256 accruedToTreasuryScaled,
+            uint256 totalAToken,
+            uint256 totalStableDebt,
+            uint256 totalVariableDebt,
+            uint256 liquidityRate,
+            uint256 variableBorrowRate,
+            uint256 stableBorrowRate,
+            uint256 averageStableBorrowRate,
+            uint256 liquidityIndex,
+            uint256 variableBorrowIndex,
+            uint40 lastUpdateTimestamp
+        )
+    {
+        require(asset == pool.asset(), "reserve not listed");
+        totalAToken = pool.totalSupply();
+        totalVariableDebt = pool.totalVariableDebt();
+        liquidityRate = pool.currentLiquidityRate();
+        variableBorrowRate = pool.currentVariableBorrowRate();
+        liquidityIndex = pool.liquidityIndex();
+        variableBorrowIndex = pool.variableBorrowIndex();
+        lastUpdateTimestamp = uint40(pool.lastUpdateTimestamp());
+    }
+}
@@ -0,0 +1,273 @@
+// SPDX-License-Identifier: GPL-3.0
+pragma solidity 0.6.12;
+pragma experimental ABIEncoderV2;
+
+import "@openzeppelin/contracts/token/ERC20/ERC20.sol";
+import "@openzeppelin/contracts/math/SafeMath.sol";
+import "@openzeppelin/contracts/token/ERC20/SafeERC20.sol";
+
+import {DataTypesV3} from "../Libraries/Aave/V3/DataTypesV3.sol";
+
+interface IIncentivesHandler {
+    function handleAction(
+        address user,
+        uint256 totalSupply,
+        uint256 userBalance
+    ) external;
+}
+
+/********************
+ *   An Aave V3 pool with a single reserve for GenericAaveV3 on a local chain
+ *   The pool is also the aToken and the interest rate strategy of its reserve: getReserveData points both
+ *   addresses back here, the cash sits here and the aToken balances are scaled by the liquidity index
+ *   Rates follow DefaultReserveInterestRateStrategy with its ray rounding and no stable rate slopes. The pool itself
+ *   only has variable debt, the stable debt in the params is priced like Aave does. Indices accrue linearly per second
+ *   The borrowers are not tracked, borrow just takes cash out of the reserve and adds to the variable debt
+ *   The incentives controller is told about every balance change, like the aTokens do
+ *
+ ********************* */
+
+contract MockAaveV3Pool {
+    using SafeERC20 for IERC20;
+    using SafeMath for uint256;
+
+    uint256 internal constant RAY = 1e27;
+    uint256 internal constant SECONDS_PER_YEAR = 365 days;
+    uint256 internal constant PERCENTAGE_FACTOR = 1e4;
+    uint256 internal constant RESERVE_FACTOR_START_BIT_POSITION = 64;
+
+    address public asset;
+    address public incentivesController;
+    //bps
+    uint256 public reserveFactor;
+
+    //rate strategy, in ray
+    uint256 public optimalUsageRatio;
+    uint256 public baseVariableBorrowRate;
+    uint256 public variableRateSlope1;
+    uint256 public variableRateSlope2;
+
+    uint256 public liquidityIndex;
+    uint256 public variableBorrowIndex;
+    uint256 public currentLiquidityRate;
+    uint256 public currentVariableBorrowRate;
+    uint256 public lastUpdateTimestamp;
+
+    uint256 public scaledTotalSupply;
+    uint256 public scaledVariableDebt;
+    mapping(address => uint256) public scaledBalanceOf;
+
+    constructor(
+        address _asset,
+        uint256 _optimalUsageRatio,
+        uint256 _baseVariableBorrowRate,
+        uint256 _variableRateSlope1,
+        uint256 _variableRateSlope2,
+        uint256 _reserveFactor
+    ) public {
+        asset = _asset;
+        optimalUsageRatio = _optimalUsageRatio;
+        baseVariableBorrowRate = _baseVariableBorrowRate;
+        variableRateSlope1 = _variableRateSlope1;
+        variableRateSlope2 = _variableRateSlope2;
+        reserveFactor = _reserveFactor;
+        liquidityIndex = RAY;
+        variableBorrowIndex = RAY;
+        lastUpdateTimestamp = block.timestamp;
+    }
+
+    function setIncentivesController(address _incentivesController) external {
+        incentivesController = _incentivesController;
+    }
+
+    function setReserveFactor(uint256 _reserveFactor) external {
+        _updateState();
+        reserveFactor = _reserveFactor;
+        _updateRates(0, 0);
+    }
+
+    // ---------------------- aToken ----------------------
+
+    function decimals() external view returns (uint8) {
+        return ERC20(asset).decimals();
+    }
+
+    function getIncentivesController() external view returns (address) {
+        return incentivesController;
+    }
+
+    function balanceOf(address user) external view returns (uint256) {
+        return scaledBalanceOf[user].mul(getReserveNormalizedIncome()).div(RAY);
+    }
+
+    function totalSupply() external view returns (uint256) {
+        return scaledTotalSupply.mul(getReserveNormalizedIncome()).div(RAY);
+    }
+
+    function totalVariableDebt() public view returns (uint256) {
+        return scaledVariableDebt.mul(getReserveNormalizedVariableDebt()).div(RAY);
+    }
+
+    // ---------------------- pool ----------------------
+
+    function getReserveNormalizedIncome() public view returns (uint256) {
+        return _accrue(liquidityIndex, currentLiquidityRate);
+    }
+
+    function getReserveNormalizedVariableDebt() public view returns (uint256) {
+        return _accrue(variableBorrowIndex, currentVariableBorrowRate);
+    }
+
+    function _accrue(uint256 index, uint256 rate) internal view returns (uint256) {
+        uint256 timeElapsed = block.timestamp.sub(lastUpdateTimestamp);
+        return index.add(index.mul(rate).mul(timeElapsed).div(SECONDS_PER_YEAR).div(RAY));
+    }
+
+    function getReserveData(address _asset) external view returns (DataTypesV3.ReserveData memory data) {
+        require(_asset == asset, "reserve not listed");
+        data.configuration.data = reserveFactor << RESERVE_FACTOR_START_BIT_POSITION;
+        data.liquidityIndex = uint128(liquidityIndex);
+        data.currentLiquidityRate = uint128(currentLiquidityRate);
+        data.variableBorrowIndex = uint128(variableBorrowIndex);
+        data.currentVariableBorrowRate = uint128(currentVariableBorrowRate);
+        data.lastUpdateTimestamp = uint40(lastUpdateTimestamp);
+        data.aTokenAddress = address(this);
+        data.interestRateStrategyAddress = address(this);
+    }
+
+    function supply(
+        address _asset,
+        uint256 amount,
+        address onBehalfOf,
+        uint16 /*referralCode*/
+    ) external {
+        require(_asset == asset, "reserve not listed");
+        _updateState();
+        _updateRates(amount, 0);
+        _handleAction(onBehalfOf);
+        uint256 scaled = amount.mul(RAY).div(liquidityIndex);
+        scaledBalanceOf[onBehalfOf] = scaledBalanceOf[onBehalfOf].add(scaled);
+        scaledTotalSupply = scaledTotalSupply.add(scaled);
+        IERC20(asset).safeTransferFrom(msg.sender, address(this), amount);
+    }
+
+    function withdraw(
+        address _asset,
+        uint256 amount,
+        address to
+    ) external returns (uint256) {
+        require(_asset == asset, "reserve not listed");
+        _updateState();
+        _handleAction(msg.sender);
+        uint256 balance = scaledBalanceOf[msg.sender].mul(liquidityIndex).div(RAY);
+        if (amount == uint256(-1)) {
+            amount = balance;
+        }
+        require(amount <= balance, "NOT_ENOUGH_AVAILABLE_USER_BALANCE");
+        //rounded up so nobody takes more than they own, capped for the dust of a full withdrawal
+        uint256 scaled = amount.mul(RAY).add(liquidityIndex - 1).div(liquidityIndex);
+        if (amount == balance || scaled > scaledBalanceOf[msg.sender]) {
+            scaled = scaledBalanceOf[msg.sender];
+        }
+        scaledBalanceOf[msg.sender] = scaledBalanceOf[msg.sender].sub(scaled);
+        scaledTotalSupply = scaledTotalSupply.sub(scaled);
+        _updateRates(0, amount);
+        IERC20(asset).safeTransfer(to, amount);
+        return amount;
+    }
+
+    //takes cash out of the reserve. there is no collateral, the debt only counts towards the variable debt
+    function borrow(uint256 amount) external {
+        _updateState();
+        scaledVariableDebt = scaledVariableDebt.add(amount.mul(RAY).div(variableBorrowIndex));
+        _updateRates(0, amount);
+        IERC20(asset).safeTransfer(msg.sender, amount);
+    }
+
+    function _handleAction(address user) internal {
+        if (incentivesController != address(0)) {
+            IIncentivesHandler(incentivesController).handleAction(user, scaledTotalSupply, scaledBalanceOf[user]);
+        }
+    }
+
+    function _updateState() internal {
+        liquidityIndex = getReserveNormalizedIncome();
+        variableBorrowIndex = getReserveNormalizedVariableDebt();
+        lastUpdateTimestamp = block.timestamp;
+    }
+
+    function _updateRates(uint256 liquidityAdded, uint256 liquidityTaken) internal {
+        DataTypesV3.CalculateInterestRatesParams memory params;
+        params.liquidityAdded = liquidityAdded;
+        params.liquidityTaken = liquidityTaken;
+        params.totalVariableDebt = totalVariableDebt();
+        params.reserveFactor = reserveFactor;
+        params.reserve = asset;
+        params.aToken = address(this);
+        (currentLiquidityRate, , currentVariableBorrowRate) = calculateInterestRates(params);
+    }
+
+    // ---------------------- interest rate strategy ----------------------
+
+    //the cash is read before a supply transfers it in or after a withdrawal transfers it out, like the pool
+    function calculateInterestRates(DataTypesV3.CalculateInterestRatesParams memory params)
+        public
+        view
+        returns (
+            uint256 liquidityRate,
+            uint256 stableBorrowRate,
+            uint256 variableBorrowRate
+        )
+    {
+        uint256 totalDebt = params.totalStableDebt.add(params.totalVariableDebt);
+        uint256 borrowUsageRatio;
+        uint256 supplyUsageRatio;
+        if (totalDebt != 0) {
+            uint256 availableLiquidity = IERC20(params.reserve).balanceOf(params.aToken).add(params.liquidityAdded).sub(params.liquidityTaken);
+            uint256 availableLiquidityPlusDebt = availableLiquidity.add(totalDebt);
+            borrowUsageRatio = _rayDiv(totalDebt, availableLiquidityPlusDebt);
+            supplyUsageRatio = _rayDiv(totalDebt, availableLiquidityPlusDebt.add(params.unbacked));
+        }
+
+        //no stable rate slopes or offsets, the stable rate stays at the first variable slope
+        stableBorrowRate = variableRateSlope1;
+        variableBorrowRate = baseVariableBorrowRate;
+        if (borrowUsageRatio > optimalUsageRatio) {
+            uint256 excessBorrowUsageRatio = _rayDiv(borrowUsageRatio.sub(optimalUsageRatio), RAY.sub(optimalUsageRatio));
+            variableBorrowRate = variableBorrowRate.add(variableRateSlope1).add(_rayMul(variableRateSlope2, excessBorrowUsageRatio));
+        } else {
+            variableBorrowRate = variableBorrowRate.add(_rayDiv(_rayMul(variableRateSlope1, borrowUsageRatio), optimalUsageRatio));
+        }
+
+        liquidityRate = _rayMul(_overallBorrowRate(params, variableBorrowRate), supplyUsageRatio);
+        liquidityRate = _percentMul(liquidityRate, PERCENTAGE_FACTOR.sub(params.reserveFactor));
+    }
+
+    function _overallBorrowRate(DataTypesV3.CalculateInterestRatesParams memory params, uint256 variableBorrowRate)
+        internal
+        pure
+        returns (uint256)
+    {
+        uint256 totalDebt = params.totalStableDebt.add(params.totalVariableDebt);
+        if (totalDebt == 0) {
+            return 0;
+        }
+        //wad to ray
+        uint256 weightedVariableRate = _rayMul(params.totalVariableDebt.mul(1e9), variableBorrowRate);
+        uint256 weightedStableRate = _rayMul(params.totalStableDebt.mul(1e9), params.averageStableBorrowRate);
+        return _rayDiv(weightedVariableRate.add(weightedStableRate), totalDebt.mul(1e9));
+    }
+
+    //WadRayMath and PercentageMath, rounding half up
+    function _rayMul(uint256 a, uint256 b) internal pure returns (uint256) {
+        return a.mul(b).add(RAY / 2).div(RAY);
+    }
+
+    function _rayDiv(uint256 a, uint256 b) internal pure returns (uint256) {
+        return a.mul(RAY).add(b / 2).div(b);
+    }
+
+    function _percentMul(uint256 value, uint256 percentage) internal pure returns (uint256) {
+        return value.mul(percentage).add(PERCENTAGE_FACTOR / 2).div(PERCENTAGE_FACTOR);
+    }
+}
@@ -0,0 +1,21 @@
+// SPDX-License-Identifier: GPL-3.0
+pragma solidity 0.6.12;
+
+/********************
+ *   Stand in for the yearn base fee oracle read by GenericCompoundV3
+ *   The base fee is acceptable unless a test says otherwise, so nothing has to be set after
+ *   the code is copied to the hard coded oracle address
+ *
+ ********************* */
+
+contract MockBaseFee {
+    bool internal baseFeeTooHigh;
+
+    function setBaseFeeTooHigh(bool _baseFeeTooHigh) external {
+        baseFeeTooHigh = _baseFeeTooHigh;
+    }
+
+    function isCurrentBaseFeeAcceptable() external view returns (bool) {
+        return !baseFeeTooHigh;
+    }
+}
@@ -0,0 +1,148 @@
+// SPDX-License-Identifier: GPL-3.0
+pragma solidity 0.6.12;
+
+import "@openzeppelin/contracts/token/ERC20/ERC20.sol";
+import "@openzeppelin/contracts/math/SafeMath.sol";
+import "@openzeppelin/contracts/math/Math.sol";
+import "@openzeppelin/contracts/token/ERC20/SafeERC20.sol";
+
+import "./MockInterestRateModel.sol";
+
+/********************
+ *   A Compound V2 style cToken for GenericCompound (and the other cToken plugins) on a local chain
+ *   Interest accrues per block on totalBorrows with the rates of the interest rate model, like CToken.accrueInterest
+ *   The borrowers are not tracked, borrow just takes cash out of the market and adds to totalBorrows
+ *   Errors are returned as non zero codes like the real cToken
+ *
+ ********************* */
+
+contract MockCToken is ERC20 {
+    using SafeERC20 for IERC20;
+    using SafeMath for uint256;
+
+    uint256 internal constant NO_ERROR = 0;
+    uint256 internal constant INSUFFICIENT_CASH = 14;
+    uint256 internal constant INSUFFICIENT_BALANCE = 9;
+
+    address public underlying;
+    MockInterestRateModel public interestRateModel;
+    uint256 public reserveFactorMantissa;
+    uint256 public totalBorrows;
+    uint256 public totalReserves;
+    uint256 public accrualBlockNumber;
+    uint256 internal initialExchangeRateMantissa;
+
+    constructor(
+        address _underlying,
+        MockInterestRateModel _interestRateModel,
+        uint256 _initialExchangeRateMantissa,
+        uint256 _reserveFactorMantissa,
+        string memory _name,
+        string memory _symbol
+    ) public ERC20(_name, _symbol) {
+        _setupDecimals(8);
+        underlying = _underlying;
+        interestRateModel = _interestRateModel;
+        initialExchangeRateMantissa = _initialExchangeRateMantissa;
+        reserveFactorMantissa = _reserveFactorMantissa;
+        accrualBlockNumber = block.number;
+    }
+
+    function setReserveFactor(uint256 _reserveFactorMantissa) external {
+        accrueInterest();
+        reserveFactorMantissa = _reserveFactorMantissa;
+    }
+
+    function getCash() public view returns (uint256) {
+        return IERC20(underlying).balanceOf(address(this));
+    }
+
+    function exchangeRateStored() public view returns (uint256) {
+        uint256 supply = totalSupply();
+        if (supply == 0) {
+            return initialExchangeRateMantissa;
+        }
+        return getCash().add(totalBorrows).sub(totalReserves).mul(1e18).div(supply);
+    }
+
+    function exchangeRateCurrent() external returns (uint256) {
+        accrueInterest();
+        return exchangeRateStored();
+    }
+
+    function borrowRatePerBlock() external view returns (uint256) {
+        return interestRateModel.getBorrowRate(getCash(), totalBorrows, totalReserves);
+    }
+
+    function supplyRatePerBlock() external view returns (uint256) {
+        return interestRateModel.getSupplyRate(getCash(), totalBorrows, totalReserves, reserveFactorMantissa);
+    }
+
+    function accrueInterest() public returns (uint256) {
+        uint256 blockDelta = block.number.sub(accrualBlockNumber);
+        if (blockDelta == 0) {
+            return NO_ERROR;
+        }
+        uint256 borrowRate = interestRateModel.getBorrowRate(getCash(), totalBorrows, totalReserves);
+        uint256 interest = borrowRate.mul(blockDelta).mul(totalBorrows).div(1e18);
+
+        totalBorrows = totalBorrows.add(interest);
+        totalReserves = totalReserves.add(interest.mul(reserveFactorMantissa).div(1e18));
+        accrualBlockNumber = block.number;
+        return NO_ERROR;
+    }
+
+    function balanceOfUnderlying(address owner) external returns (uint256) {
+        accrueInterest();
+        return balanceOf(owner).mul(exchangeRateStored()).div(1e18);
+    }
+
+    function mint(uint256 mintAmount) external returns (uint256) {
+        accrueInterest();
+        uint256 exchangeRate = exchangeRateStored();
+        IERC20(underlying).safeTransferFrom(msg.sender, address(this), mintAmount);
+        _mint(msg.sender, mintAmount.mul(1e18).div(exchangeRate));
+        return NO_ERROR;
+    }
+
+    function redeem(uint256 redeemTokens) external returns (uint256) {
+        accrueInterest();
+        return _redeem(redeemTokens, redeemTokens.mul(exchangeRateStored()).div(1e18));
+    }
+
+    function redeemUnderlying(uint256 redeemAmount) external returns (uint256) {
+        accrueInterest();
+        return _redeem(redeemAmount.mul(1e18).div(exchangeRateStored()), redeemAmount);
+    }
+
+    function _redeem(uint256 redeemTokens, uint256 redeemAmount) internal returns (uint256) {
+        if (redeemTokens > balanceOf(msg.sender)) {
+            return INSUFFICIENT_BALANCE;
+        }
+        if (redeemAmount > getCash()) {
+            return INSUFFICIENT_CASH;
+        }
+        _burn(msg.sender, redeemTokens);
+        IERC20(underlying).safeTransfer(msg.sender, redeemAmount);
+        return NO_ERROR;
+    }
+
+    //takes cash out of the market. there is no collateral, the debt only counts towards totalBorrows
+    function borrow(uint256 borrowAmount) external returns (uint256) {
+        accrueInterest();
+        if (borrowAmount > getCash()) {
+            return INSUFFICIENT_CASH;
+        }
+        totalBorrows = totalBorrows.add(borrowAmount);
+        IERC20(underlying).safeTransfer(msg.sender, borrowAmount);
+        return NO_ERROR;
+    }
+
+    function repayBorrow(uint256 repayAmount) external returns (uint256) {
+        accrueInterest();
+        repayAmount = Math.min(repayAmount, totalBorrows);
+        IERC20(underlying).safeTransferFrom(msg.sender, address(this), repayAmount);
+        totalBorrows = totalBorrows.sub(repayAmount);
+        return NO_ERROR;
+    }
+}
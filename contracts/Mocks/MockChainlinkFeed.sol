@@ -0,0 +1,63 @@
+// SPDX-License-Identifier: GPL-3.0
+pragma solidity 0.6.12;
+
+/********************
+ *   Chainlink price feed with a price set by the tests
+ *   Every answer is reported as a new round updated at the time it was set
+ *
+ ********************* */
+
+contract MockChainlinkFeed {
+    uint8 public decimals;
+    string public description;
+    uint256 public constant version = 4;
+
+    uint80 internal roundId;
+    int256 internal answer;
+    uint256 internal updatedAt;
+
+    constructor(
+        string memory _description,
+        uint8 _decimals,
+        int256 _answer
+    ) public {
+        description = _description;
+        decimals = _decimals;
+        setAnswer(_answer);
+    }
+
+    function setAnswer(int256 _answer) public {
+        roundId += 1;
+        answer = _answer;
+        updatedAt = block.timestamp;
+    }
+
+    function getRoundData(uint80 _roundId)
+        external
+        view
+        returns (
+            uint80,
+            int256,
+            uint256,
+            uint256,
+            uint80
+        )
+    {
+        require(_roundId == roundId, "No data present");
+        return (roundId, answer, updatedAt, updatedAt, roundId);
+    }
+
+    function latestRoundData()
+        external
+        view
+        returns (
+            uint80,
+            int256,
+            uint256,
+            uint256,
+            uint80
+        )
+    {
+        return (roundId, answer, updatedAt, updatedAt, roundId);
+    }
+}
@@ -0,0 +1,237 @@
+// SPDX-License-Identifier: GPL-3.0
+pragma solidity 0.6.12;
+pragma experimental ABIEncoderV2;
+
+import "@openzeppelin/contracts/token/ERC20/ERC20.sol";
+import "@openzeppelin/contracts/math/SafeMath.sol";
+import "@openzeppelin/contracts/token/ERC20/SafeERC20.sol";
+
+import {CometStructs} from "../Interfaces/Compound/V3/CompoundV3.sol";
+import "../Interfaces/Chainlink/AggregatorV3Interface.sol";
+
+/********************
+ *   A Compound V3 market for GenericCompoundV3 on a local chain. Base token only, there is no collateral
+ *   Supply and borrow indices, kinked rate curves and reward tracking work like Comet:
+ *   balances are principal * baseSupplyIndex, indices accrue every second with the rates at the stored utilization
+ *   and supply rewards are tracked in the 1e6 accrual scale read by CometRewards
+ *   The borrowers are not tracked, borrow just takes cash out of the market and adds to the total borrow
+ *
+ ********************* */
+
+contract MockComet {
+    using SafeERC20 for IERC20;
+    using SafeMath for uint256;
+
+    uint64 public constant baseIndexScale = 1e15;
+    uint256 internal constant FACTOR_SCALE = 1e18;
+    uint256 internal constant BASE_ACCRUAL_SCALE = 1e6;
+    uint256 internal constant SECONDS_PER_YEAR = 365 days;
+
+    address public baseToken;
+    address public baseTokenPriceFeed;
+    uint256 public baseScale;
+    uint256 public baseTrackingSupplySpeed;
+
+    //per second rates scaled by 1e18
+    uint256 public supplyKink;
+    uint256 public supplyPerSecondInterestRateSlopeLow;
+    uint256 public supplyPerSecondInterestRateSlopeHigh;
+    uint256 public supplyPerSecondInterestRateBase;
+    uint256 public borrowKink;
+    uint256 public borrowPerSecondInterestRateSlopeLow;
+    uint256 public borrowPerSecondInterestRateSlopeHigh;
+    uint256 public borrowPerSecondInterestRateBase;
+
+    uint256 public baseSupplyIndex;
+    uint256 public baseBorrowIndex;
+    uint256 public trackingSupplyIndex;
+    uint256 public lastAccrualTime;
+    uint256 public totalSupplyBase;
+    uint256 public totalBorrowBase;
+
+    mapping(address => uint256) public principal;
+    mapping(address => uint256) internal baseTrackingIndex;
+    mapping(address => uint256) internal trackingAccrued;
+    mapping(address => address) internal priceFeeds;
+
+    constructor(address _baseToken, address _baseTokenPriceFeed) public {
+        baseToken = _baseToken;
+        baseTokenPriceFeed = _baseTokenPriceFeed;
+        baseScale = 10**uint256(ERC20(_baseToken).decimals());
+        baseSupplyIndex = baseIndexScale;
+        baseBorrowIndex = baseIndexScale;
+        lastAccrualTime = block.timestamp;
+    }
+
+    //yearly rates scaled by 1e18, spread over the seconds of a year like the Comet configurator does
+    function setRates(
+        uint256 _supplyKink,
+        uint256 supplySlopeLow,
+        uint256 supplySlopeHigh,
+        uint256 supplyBase,
+        uint256 _borrowKink,
+        uint256 borrowSlopeLow,
+        uint256 borrowSlopeHigh,
+        uint256 borrowBase
+    ) external {
+        accrueAccount(address(0));
+        supplyKink = _supplyKink;
+        supplyPerSecondInterestRateSlopeLow = supplySlopeLow.div(SECONDS_PER_YEAR);
+        supplyPerSecondInterestRateSlopeHigh = supplySlopeHigh.div(SECONDS_PER_YEAR);
+        supplyPerSecondInterestRateBase = supplyBase.div(SECONDS_PER_YEAR);
+        borrowKink = _borrowKink;
+        borrowPerSecondInterestRateSlopeLow = borrowSlopeLow.div(SECONDS_PER_YEAR);
+        borrowPerSecondInterestRateSlopeHigh = borrowSlopeHigh.div(SECONDS_PER_YEAR);
+        borrowPerSecondInterestRateBase = borrowBase.div(SECONDS_PER_YEAR);
+    }
+
+    function setBaseTrackingSupplySpeed(uint256 speed) external {
+        accrueAccount(address(0));
+        baseTrackingSupplySpeed = speed;
+    }
+
+    function setAssetPriceFeed(address asset, address priceFeed) external {
+        priceFeeds[asset] = priceFeed;
+    }
+
+    function getAssetInfoByAddress(address asset) external view returns (CometStructs.AssetInfo memory info) {
+        info.asset = asset;
+        info.priceFeed = priceFeeds[asset];
+        info.scale = 1e18;
+    }
+
+    function getPrice(address priceFeed) external view returns (uint128) {
+        (, uint256 price, , , ) = AggregatorV3Interface(priceFeed).latestRoundData();
+        require(price > 0, "BadPrice");
+        return uint128(price);
+    }
+
+    function getSupplyRate(uint256 utilization) public view returns (uint256) {
+        return
+            _rate(
+                utilization,
+                supplyKink,
+                supplyPerSecondInterestRateSlopeLow,
+                supplyPerSecondInterestRateSlopeHigh,
+                supplyPerSecondInterestRateBase
+            );
+    }
+
+    function getBorrowRate(uint256 utilization) public view returns (uint256) {
+        return
+            _rate(
+                utilization,
+                borrowKink,
+                borrowPerSecondInterestRateSlopeLow,
+                borrowPerSecondInterestRateSlopeHigh,
+                borrowPerSecondInterestRateBase
+            );
+    }
+
+    function _rate(
+        uint256 utilization,
+        uint256 kink,
+        uint256 slopeLow,
+        uint256 slopeHigh,
+        uint256 base
+    ) internal pure returns (uint256) {
+        if (utilization <= kink) {
+            return base.add(slopeLow.mul(utilization).div(FACTOR_SCALE));
+        }
+        return base.add(slopeLow.mul(kink).div(FACTOR_SCALE)).add(slopeHigh.mul(utilization.sub(kink)).div(FACTOR_SCALE));
+    }
+
+    //at the stored indices, like Comet
+    function getUtilization() public view returns (uint256) {
+        uint256 totalSupply_ = totalSupplyBase.mul(baseSupplyIndex).div(baseIndexScale);
+        if (totalSupply_ == 0) {
+            return 0;
+        }
+        return totalBorrowBase.mul(baseBorrowIndex).div(baseIndexScale).mul(FACTOR_SCALE).div(totalSupply_);
+    }
+
+    function _accruedIndices()
+        internal
+        view
+        returns (
+            uint256 supplyIndex,
+            uint256 borrowIndex,
+            uint256 trackingIndex
+        )
+    {
+        supplyIndex = baseSupplyIndex;
+        borrowIndex = baseBorrowIndex;
+        trackingIndex = trackingSupplyIndex;
+        uint256 timeElapsed = block.timestamp.sub(lastAccrualTime);
+        if (timeElapsed > 0) {
+            uint256 utilization = getUtilization();
+            supplyIndex = supplyIndex.add(supplyIndex.mul(getSupplyRate(utilization)).mul(timeElapsed).div(FACTOR_SCALE));
+            borrowIndex = borrowIndex.add(borrowIndex.mul(getBorrowRate(utilization)).mul(timeElapsed).div(FACTOR_SCALE));
+            if (totalSupplyBase > 0) {
+                trackingIndex = trackingIndex.add(baseTrackingSupplySpeed.mul(timeElapsed).mul(baseScale).div(totalSupplyBase));
+            }
+        }
+    }
+
+    function balanceOf(address account) public view returns (uint256) {
+        (uint256 supplyIndex, , ) = _accruedIndices();
+        return principal[account].mul(supplyIndex).div(baseIndexScale);
+    }
+
+    function totalSupply() external view returns (uint256) {
+        (uint256 supplyIndex, , ) = _accruedIndices();
+        return totalSupplyBase.mul(supplyIndex).div(baseIndexScale);
+    }
+
+    function totalBorrow() external view returns (uint256) {
+        (, uint256 borrowIndex, ) = _accruedIndices();
+        return totalBorrowBase.mul(borrowIndex).div(baseIndexScale);
+    }
+
+    function baseTrackingAccrued(address account) external view returns (uint64) {
+        return uint64(trackingAccrued[account]);
+    }
+
+    function accrueAccount(address account) public {
+        (baseSupplyIndex, baseBorrowIndex, trackingSupplyIndex) = _accruedIndices();
+        lastAccrualTime = block.timestamp;
+
+        uint256 indexDelta = trackingSupplyIndex.sub(baseTrackingIndex[account]);
+        uint256 accrualDescaleFactor = baseScale.div(BASE_ACCRUAL_SCALE);
+        uint256 accrued = principal[account].mul(indexDelta).div(baseIndexScale).div(accrualDescaleFactor);
+        trackingAccrued[account] = trackingAccrued[account].add(accrued);
+        baseTrackingIndex[account] = trackingSupplyIndex;
+    }
+
+    function supply(address asset, uint256 amount) external {
+        require(asset == baseToken, "BadAsset");
+        accrueAccount(msg.sender);
+        IERC20(baseToken).safeTransferFrom(msg.sender, address(this), amount);
+        _setBalance(msg.sender, balanceOf(msg.sender).add(amount));
+    }
+
+    function withdraw(address asset, uint256 amount) external {
+        require(asset == baseToken, "BadAsset");
+        accrueAccount(msg.sender);
+        uint256 balance = balanceOf(msg.sender);
+        if (amount == uint256(-1)) {
+            amount = balance;
+        }
+        require(amount <= balance, "NotCollateralized");
+        _setBalance(msg.sender, balance.sub(amount));
+        IERC20(baseToken).safeTransfer(msg.sender, amount);
+    }
+
+    function _setBalance(address account, uint256 balance) internal {
+        uint256 newPrincipal = balance.mul(baseIndexScale).div(baseSupplyIndex);
+        totalSupplyBase = totalSupplyBase.sub(principal[account]).add(newPrincipal);
+        principal[account] = newPrincipal;
+    }
+
+    //takes cash out of the market. there is no collateral, the debt only counts towards the total borrow
+    function borrow(uint256 amount) external {
+        accrueAccount(address(0));
+        totalBorrowBase = totalBorrowBase.add(amount.mul(baseIndexScale).div(baseBorrowIndex));
+        IERC20(baseToken).safeTransfer(msg.sender, amount);
+    }
+}
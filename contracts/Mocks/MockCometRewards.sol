@@ -0,0 +1,67 @@
+// SPDX-License-Identifier: GPL-3.0
+pragma solidity 0.6.12;
+pragma experimental ABIEncoderV2;
+
+import "@openzeppelin/contracts/token/ERC20/IERC20.sol";
+import "@openzeppelin/contracts/math/SafeMath.sol";
+import "@openzeppelin/contracts/token/ERC20/SafeERC20.sol";
+
+import {CometStructs} from "../Interfaces/Compound/V3/CompoundV3.sol";
+
+interface IMockComet {
+    function accrueAccount(address account) external;
+
+    function baseTrackingAccrued(address account) external view returns (uint64);
+}
+
+/********************
+ *   Stand in for CometRewards on a local chain
+ *   Pays the rewards tracked by the comet out of its own balance, so tests mint the reward token to it first
+ *   The reward config is kept in storage so it can be set after the code is copied to the hard coded address
+ *
+ ********************* */
+
+contract MockCometRewards {
+    using SafeERC20 for IERC20;
+    using SafeMath for uint256;
+
+    mapping(address => CometStructs.RewardConfig) internal config;
+    mapping(address => mapping(address => uint256)) public rewardsClaimed;
+
+    function setRewardConfig(
+        address comet,
+        address token,
+        uint64 rescaleFactor,
+        bool shouldUpscale
+    ) external {
+        config[comet] = CometStructs.RewardConfig({token: token, rescaleFactor: rescaleFactor, shouldUpscale: shouldUpscale});
+    }
+
+    function rewardConfig(address comet) external view returns (CometStructs.RewardConfig memory) {
+        return config[comet];
+    }
+
+    function claim(
+        address comet,
+        address src,
+        bool shouldAccrue
+    ) external {
+        CometStructs.RewardConfig memory _config = config[comet];
+        require(_config.token != address(0), "NotSupported");
+        if (shouldAccrue) {
+            IMockComet(comet).accrueAccount(src);
+        }
+
+        uint256 accrued = IMockComet(comet).baseTrackingAccrued(src);
+        if (_config.shouldUpscale) {
+            accrued = accrued.mul(_config.rescaleFactor);
+        } else {
+            accrued = accrued.div(_config.rescaleFactor);
+        }
+        uint256 claimed = rewardsClaimed[comet][src];
+        if (accrued > claimed) {
+            rewardsClaimed[comet][src] = accrued;
+            IERC20(_config.token).safeTransfer(src, accrued - claimed);
+        }
+    }
+}
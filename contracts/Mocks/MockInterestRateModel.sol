@@ -0,0 +1,72 @@
+// SPDX-License-Identifier: GPL-3.0
+pragma solidity 0.6.12;
+
+import "@openzeppelin/contracts/math/SafeMath.sol";
+
+/********************
+ *   Compound's JumpRateModel for the mock cTokens
+ *   The yearly rates are spread over the same 2_300_000 blocks per year GenericCompound uses, so the
+ *   apr of the plugin gives back the rates the model was deployed with
+ *
+ ********************* */
+
+contract MockInterestRateModel {
+    using SafeMath for uint256;
+
+    uint256 public constant blocksPerYear = 2_300_000;
+
+    uint256 public baseRatePerBlock;
+    uint256 public multiplierPerBlock;
+    uint256 public jumpMultiplierPerBlock;
+    uint256 public kink;
+
+    constructor(
+        uint256 baseRatePerYear,
+        uint256 multiplierPerYear,
+        uint256 jumpMultiplierPerYear,
+        uint256 _kink
+    ) public {
+        baseRatePerBlock = baseRatePerYear.div(blocksPerYear);
+        multiplierPerBlock = multiplierPerYear.div(blocksPerYear);
+        jumpMultiplierPerBlock = jumpMultiplierPerYear.div(blocksPerYear);
+        kink = _kink;
+    }
+
+    function utilizationRate(
+        uint256 cash,
+        uint256 borrows,
+        uint256 reserves
+    ) public pure returns (uint256) {
+        if (borrows == 0) {
+            return 0;
+        }
+        return borrows.mul(1e18).div(cash.add(borrows).sub(reserves));
+    }
+
+    function getBorrowRate(
+        uint256 cash,
+        uint256 borrows,
+        uint256 reserves
+    ) public view returns (uint256) {
+        uint256 util = utilizationRate(cash, borrows, reserves);
+
+        if (util <= kink) {
+            return util.mul(multiplierPerBlock).div(1e18).add(baseRatePerBlock);
+        }
+        uint256 normalRate = kink.mul(multiplierPerBlock).div(1e18).add(baseRatePerBlock);
+        uint256 excessUtil = util.sub(kink);
+        return excessUtil.mul(jumpMultiplierPerBlock).div(1e18).add(normalRate);
+    }
+
+    function getSupplyRate(
+        uint256 cash,
+        uint256 borrows,
+        uint256 reserves,
+        uint256 reserveFactorMantissa
+    ) external view returns (uint256) {
+        uint256 oneMinusReserveFactor = uint256(1e18).sub(reserveFactorMantissa);
+        uint256 borrowRate = getBorrowRate(cash, borrows, reserves);
+        uint256 rateToPool = borrowRate.mul(oneMinusReserveFactor).div(1e18);
+        return utilizationRate(cash, borrows, reserves).mul(rateToPool).div(1e18);
+    }
+}
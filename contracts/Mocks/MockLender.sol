@@ -0,0 +1,184 @@
+// SPDX-License-Identifier: GPL-3.0
+pragma solidity 0.6.12;
+pragma experimental ABIEncoderV2;
+
+import "@openzeppelin/contracts/token/ERC20/IERC20.sol";
+import "@openzeppelin/contracts/math/SafeMath.sol";
+import "@openzeppelin/contracts/math/Math.sol";
+import "@openzeppelin/contracts/token/ERC20/SafeERC20.sol";
+
+import "../GenericLender/GenericLenderBase.sol";
+
+/********************
+ *   A lender plugin that lends to nobody. Used to run the strategy on a local chain without a fork
+ *   The want stays in the plugin and the apr is a fixed yearly interest shared between all suppliers:
+ *   apr = interestPerYear / (externalSupply + nav)
+ *   Profit is simulated by sending want to the plugin
+ *   pendingReward stands in for the unclaimed rewards of the incentivised plugins, in eth
+ *   liquidity caps what a single withdrawal can take out, like a market whose want is mostly borrowed
+ *   harvestFails makes harvest revert, like a reward swap that fails
+ *   liquidityFails makes availableLiquidity revert, like a market whose accounting underflows
+ *
+ ********************* */
+
+contract MockLender is GenericLenderBase {
+    using SafeERC20 for IERC20;
+    using SafeMath for uint256;
+
+    //interest paid by the borrowers of the mock protocol per year, in want
+    uint256 public interestPerYear;
+    //supply of the other users of the mock protocol
+    uint256 public externalSupply;
+    //rewards waiting to be claimed, in eth so harvestTrigger can compare it to the call cost
+    uint256 public pendingReward;
+    //most a withdrawal can take out of the plugin
+    uint256 public liquidity;
+    bool public harvestFails;
+    bool public liquidityFails;
+
+    constructor(
+        address _strategy,
+        string memory name,
+        uint256 _interestPerYear,
+        uint256 _externalSupply
+    ) public GenericLenderBase(_strategy, name) {
+        interestPerYear = _interestPerYear;
+        externalSupply = _externalSupply;
+        liquidity = uint256(-1);
+    }
+
+    function setRates(uint256 _interestPerYear, uint256 _externalSupply) external management {
+        interestPerYear = _interestPerYear;
+        externalSupply = _externalSupply;
+    }
+
+    function setLiquidity(uint256 _liquidity) external management {
+        liquidity = _liquidity;
+    }
+
+    function setPendingReward(uint256 _pendingReward) external management {
+        pendingReward = _pendingReward;
+    }
+
+    function setHarvestFails(bool _harvestFails) external management {
+        harvestFails = _harvestFails;
+    }
+
+    function setLiquidityFails(bool _liquidityFails) external management {
+        liquidityFails = _liquidityFails;
+    }
+
+    function harvestTrigger(uint256 callCost) external view returns (bool) {
+        return pendingReward > callCost;
+    }
+
+    //claims the pending rewards. the mock has nothing to swap them for so they are dropped
+    function harvest() external keepers {
+        require(!harvestFails, "!swap");
+        pendingReward = 0;
+    }
+
+    function nav() external view override returns (uint256) {
+        return _nav();
+    }
+
+    function _nav() internal view returns (uint256) {
+        return want.balanceOf(address(this));
+    }
+
+    function apr() external view override returns (uint256) {
+        return _apr(0);
+    }
+
+    function weightedApr() external view override returns (uint256) {
+        return _apr(0).mul(_nav());
+    }
+
+    function aprAfterDeposit(uint256 amount) external view override returns (uint256) {
+        return _apr(amount);
+    }
+
+    function _apr(uint256 extraSupply) internal view returns (uint256) {
+        uint256 supply = externalSupply.add(_nav()).add(extraSupply);
+        if (supply == 0) {
+            return 0;
+        }
+        return interestPerYear.mul(1e18).div(supply);
+    }
+
+    function hasAssets() external view override returns (bool) {
+        return _nav() > 0;
+    }
+
+    function availableLiquidity() external view override returns (uint256) {
+        require(!liquidityFails, "!liquidity");
+        return Math.min(_nav(), liquidity);
+    }
+
+    function lenderSnapshot(uint256 extraAmount)
+        external
+        view
+        override
+        returns (
+            uint256,
+            bool,
+            uint256,
+            uint256
+        )
+    {
+        uint256 balance = _nav();
+        return (balance, balance > 0, _apr(0), _apr(extraAmount));
+    }
+
+    function deposit() external override management {
+        //want is already here
+    }
+
+    function withdraw(uint256 amount) external override management returns (uint256) {
+        return _withdraw(amount);
+    }
+
+    function withdrawAll() external override management returns (bool) {
+        uint256 invested = _nav();
+        uint256 returned = _withdraw(invested);
+        return returned >= invested;
+    }
+
+    //emergency withdraw. sends balance plus amount to governance
+    function emergencyWithdraw(uint256 amount) external override onlyGovernance {
+        want.safeTransfer(vault.governance(), Math.min(amount, _nav()));
+    }
+
+    function _withdraw(uint256 amount) internal returns (uint256) {
+        uint256 total = _nav();
+        if (amount > total) {
+            //cant withdraw more than we own
+            amount = total;
+        }
+        if (amount > liquidity) {
+            //take all we can
+            amount = liquidity;
+        }
+        if (amount > 0) {
+            want.safeTransfer(address(strategy), amount);
+        }
+        return amount;
+    }
+
+    function protectedTokens() internal view override returns (address[] memory) {
+        address[] memory protected = new address[](1);
+        protected[0] = address(want);
+        return protected;
+    }
+
+    modifier keepers() {
+        require(
+            msg.sender == strategy ||
+                msg.sender == IBaseStrategy(strategy).keeper() ||
+                msg.sender == IBaseStrategy(strategy).strategist() ||
+                msg.sender == vault.governance(),
+            "!keepers"
+        );
+        _;
+    }
+}
@@ -0,0 +1,169 @@
+// SPDX-License-Identifier: GPL-3.0
+pragma solidity 0.6.12;
+pragma experimental ABIEncoderV2;
+
+import "@openzeppelin/contracts/token/ERC20/IERC20.sol";
+import "@openzeppelin/contracts/math/SafeMath.sol";
+import "@openzeppelin/contracts/math/Math.sol";
+import "@openzeppelin/contracts/token/ERC20/SafeERC20.sol";
+
+interface IScaledBalance {
+    function scaledBalanceOf(address user) external view returns (uint256);
+
+    function scaledTotalSupply() external view returns (uint256);
+}
+
+/********************
+ *   Stand in for the Aave V3 RewardsController on a local chain
+ *   Every reward of an asset is emitted per second over its scaled total supply until the end of the distribution.
+ *   The asset calls handleAction before a balance changes, like the aTokens do
+ *   Rewards are paid out of the controller's own balance, so tests mint the reward tokens to it first
+ *
+ ********************* */
+
+contract MockRewardsController {
+    using SafeERC20 for IERC20;
+    using SafeMath for uint256;
+
+    struct RewardData {
+        uint256 index;
+        uint256 emissionPerSecond;
+        uint256 lastUpdateTimestamp;
+        uint256 distributionEnd;
+    }
+
+    address[] internal rewardsList;
+    mapping(address => address[]) internal rewardsByAsset;
+    mapping(address => mapping(address => RewardData)) internal rewardData;
+    //user => asset => reward
+    mapping(address => mapping(address => mapping(address => uint256))) internal userIndex;
+    mapping(address => mapping(address => uint256)) internal accrued;
+
+    function configureReward(
+        address asset,
+        address reward,
+        uint256 emissionPerSecond,
+        uint256 distributionEnd
+    ) external {
+        RewardData storage data = rewardData[asset][reward];
+        if (data.lastUpdateTimestamp == 0) {
+            rewardsByAsset[asset].push(reward);
+            if (!_listed(reward)) {
+                rewardsList.push(reward);
+            }
+        } else {
+            data.index = _index(data, IScaledBalance(asset).scaledTotalSupply());
+        }
+        data.lastUpdateTimestamp = block.timestamp;
+        data.emissionPerSecond = emissionPerSecond;
+        data.distributionEnd = distributionEnd;
+    }
+
+    function _listed(address reward) internal view returns (bool) {
+        for (uint256 i = 0; i < rewardsList.length; i++) {
+            if (rewardsList[i] == reward) {
+                return true;
+            }
+        }
+        return false;
+    }
+
+    function getRewardsList() external view returns (address[] memory) {
+        return rewardsList;
+    }
+
+    function getRewardsByAsset(address asset) external view returns (address[] memory) {
+        return rewardsByAsset[asset];
+    }
+
+    function getDistributionEnd(address asset, address reward) external view returns (uint256) {
+        return rewardData[asset][reward].distributionEnd;
+    }
+
+    function getRewardsData(address asset, address reward)
+        external
+        view
+        returns (
+            uint256,
+            uint256,
+            uint256,
+            uint256
+        )
+    {
+        RewardData memory data = rewardData[asset][reward];
+        return (data.index, data.emissionPerSecond, data.lastUpdateTimestamp, data.distributionEnd);
+    }
+
+    function _index(RewardData memory data, uint256 totalSupply) internal view returns (uint256) {
+        uint256 until = Math.min(block.timestamp, data.distributionEnd);
+        if (until <= data.lastUpdateTimestamp || totalSupply == 0) {
+            return data.index;
+        }
+        return data.index.add(data.emissionPerSecond.mul(until - data.lastUpdateTimestamp).mul(1e18).div(totalSupply));
+    }
+
+    //accrues the rewards of user on asset up to now. balances are the ones before the change that is being handled
+    function _updateUser(
+        address user,
+        address asset,
+        uint256 totalSupply,
+        uint256 userBalance
+    ) internal {
+        address[] memory rewards = rewardsByAsset[asset];
+        for (uint256 i = 0; i < rewards.length; i++) {
+            RewardData storage data = rewardData[asset][rewards[i]];
+            uint256 index = _index(data, totalSupply);
+            data.index = index;
+            data.lastUpdateTimestamp = block.timestamp;
+
+            uint256 delta = index.sub(userIndex[user][asset][rewards[i]]);
+            accrued[user][rewards[i]] = accrued[user][rewards[i]].add(userBalance.mul(delta).div(1e18));
+            userIndex[user][asset][rewards[i]] = index;
+        }
+    }
+
+    function handleAction(
+        address user,
+        uint256 totalSupply,
+        uint256 userBalance
+    ) external {
+        _updateUser(user, msg.sender, totalSupply, userBalance);
+    }
+
+    function getAllUserRewards(address[] calldata assets, address user)
+        external
+        view
+        returns (address[] memory, uint256[] memory unclaimedAmounts)
+    {
+        unclaimedAmounts = new uint256[](rewardsList.length);
+        for (uint256 r = 0; r < rewardsList.length; r++) {
+            unclaimedAmounts[r] = accrued[user][rewardsList[r]];
+            for (uint256 i = 0; i < assets.length; i++) {
+                RewardData memory data = rewardData[assets[i]][rewardsList[r]];
+                if (data.lastUpdateTimestamp == 0) {
+                    continue;
+                }
+                uint256 index = _index(data, IScaledBalance(assets[i]).scaledTotalSupply());
+                uint256 delta = index.sub(userIndex[user][assets[i]][rewardsList[r]]);
+                unclaimedAmounts[r] = unclaimedAmounts[r].add(IScaledBalance(assets[i]).scaledBalanceOf(user).mul(delta).div(1e18));
+            }
+        }
+        return (rewardsList, unclaimedAmounts);
+    }
+
+    function claimAllRewardsToSelf(address[] calldata assets) external returns (address[] memory, uint256[] memory claimedAmounts) {
+        for (uint256 i = 0; i < assets.length; i++) {
+            IScaledBalance asset = IScaledBalance(assets[i]);
+            _updateUser(msg.sender, assets[i], asset.scaledTotalSupply(), asset.scaledBalanceOf(msg.sender));
+        }
+        claimedAmounts = new uint256[](rewardsList.length);
+        for (uint256 r = 0; r < rewardsList.length; r++) {
+            claimedAmounts[r] = accrued[msg.sender][rewardsList[r]];
+            if (claimedAmounts[r] > 0) {
+                accrued[msg.sender][rewardsList[r]] = 0;
+                IERC20(rewardsList[r]).safeTransfer(msg.sender, claimedAmounts[r]);
+            }
+        }
+        return (rewardsList, claimedAmounts);
+    }
+}
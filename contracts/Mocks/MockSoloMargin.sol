@@ -0,0 +1,206 @@
+// SPDX-License-Identifier: GPL-3.0
+pragma solidity 0.6.12;
+pragma experimental ABIEncoderV2;
+
+import "@openzeppelin/contracts/token/ERC20/IERC20.sol";
+import "@openzeppelin/contracts/math/SafeMath.sol";
+import "@openzeppelin/contracts/token/ERC20/SafeERC20.sol";
+
+import {Account, Actions, Interest, Types} from "../Interfaces/DyDx/ISoloMargin.sol";
+
+/********************
+ *   Stand in for dYdX SoloMargin on a local chain, for GenericDyDx
+ *   Only Deposit and Withdraw actions in Wei with a Delta reference, for the owner of the account
+ *   Balances are pars scaled by the market indices. The borrow rate is dYdX's DoubleExponentInterestSetter
+ *   polynomial of the utilization and all of the borrow interest goes to the suppliers. SoloMargin is its own
+ *   interest setter
+ *   The markets are kept in storage so they can be added after the code is copied to the hard coded address
+ *   The borrowers are not tracked, borrow just takes cash out of the market and adds to the borrow par
+ *
+ ********************* */
+
+contract MockSoloMargin {
+    using SafeERC20 for IERC20;
+    using SafeMath for uint256;
+
+    uint256 internal constant SECONDS_PER_YEAR = 365 days;
+    uint256 internal constant PERCENT = 100;
+    uint256 internal constant BYTE = 8;
+
+    struct Market {
+        address token;
+        Types.TotalPar totalPar;
+        Interest.Index index;
+        //yearly borrow rate at full utilization, scaled by 1e18
+        uint256 maxAPR;
+        //percentages of maxAPR for utilization^0, ^1, ^2, ^4... one byte each, lowest first
+        uint256 coefficients;
+    }
+
+    Market[] internal markets;
+    //owner => account number => market => supply par
+    mapping(address => mapping(uint256 => mapping(uint256 => uint256))) internal par;
+
+    function addMarket(
+        address token,
+        uint256 maxAPR,
+        uint256 coefficients
+    ) external returns (uint256) {
+        Market memory market;
+        market.token = token;
+        market.index = Interest.Index({borrow: 1e18, supply: 1e18, lastUpdate: uint32(block.timestamp)});
+        market.maxAPR = maxAPR;
+        market.coefficients = coefficients;
+        markets.push(market);
+        return markets.length - 1;
+    }
+
+    function getNumMarkets() external view returns (uint256) {
+        return markets.length;
+    }
+
+    function getMarketTokenAddress(uint256 marketId) external view returns (address) {
+        return markets[marketId].token;
+    }
+
+    function getMarketInterestSetter(uint256) external view returns (address) {
+        return address(this);
+    }
+
+    function getMarketTotalPar(uint256 marketId) external view returns (Types.TotalPar memory) {
+        return markets[marketId].totalPar;
+    }
+
+    function getInterestRate(
+        address token,
+        uint256 borrowWei,
+        uint256 supplyWei
+    ) public view returns (Interest.Rate memory) {
+        for (uint256 i = 0; i < markets.length; i++) {
+            if (markets[i].token == token) {
+                return Interest.Rate({value: _doubleExponentRate(markets[i].maxAPR, markets[i].coefficients, borrowWei, supplyWei)});
+            }
+        }
+        revert("unknown token");
+    }
+
+    //DoubleExponentInterestSetter.getInterestRate, per second and scaled by 1e18
+    function _doubleExponentRate(
+        uint256 maxAPR,
+        uint256 coefficients,
+        uint256 borrowWei,
+        uint256 supplyWei
+    ) internal pure returns (uint256) {
+        if (borrowWei == 0) {
+            return 0;
+        }
+        if (borrowWei >= supplyWei) {
+            return maxAPR / SECONDS_PER_YEAR;
+        }
+
+        uint256 result = uint8(coefficients) * 1e18;
+        coefficients >>= BYTE;
+        uint256 polynomial = borrowWei.mul(1e18).div(supplyWei);
+        while (true) {
+            uint256 coefficient = uint8(coefficients);
+            if (coefficient != 0) {
+                result = result.add(coefficient.mul(polynomial));
+                if (coefficient == coefficients) {
+                    break;
+                }
+            }
+            //the setter never gets here with well formed coefficients. stop instead of spinning
+            if (coefficients == 0) {
+                break;
+            }
+            polynomial = polynomial.mul(polynomial).div(1e18);
+            coefficients >>= BYTE;
+        }
+
+        return result.mul(maxAPR).div(SECONDS_PER_YEAR * 1e18 * PERCENT);
+    }
+
+    function getMarketCurrentIndex(uint256 marketId) public view returns (Interest.Index memory index) {
+        Market memory market = markets[marketId];
+        index = market.index;
+        uint256 timeElapsed = block.timestamp.sub(index.lastUpdate);
+        if (timeElapsed == 0) {
+            return index;
+        }
+
+        uint256 borrowWei = uint256(market.totalPar.borrow).mul(index.borrow).div(1e18);
+        uint256 supplyWei = uint256(market.totalPar.supply).mul(index.supply).div(1e18);
+        uint256 borrowInterest = getInterestRate(market.token, borrowWei, supplyWei).value.mul(timeElapsed);
+        uint256 supplyInterest = supplyWei == 0 ? 0 : borrowInterest.mul(borrowWei).div(supplyWei);
+
+        index.borrow = uint96(uint256(index.borrow).add(uint256(index.borrow).mul(borrowInterest).div(1e18)));
+        index.supply = uint96(uint256(index.supply).add(uint256(index.supply).mul(supplyInterest).div(1e18)));
+        index.lastUpdate = uint32(block.timestamp);
+    }
+
+    function getAccountBalances(Account.Info memory account)
+        external
+        view
+        returns (
+            address[] memory tokens,
+            Types.Par[] memory pars,
+            Types.Wei[] memory weis
+        )
+    {
+        tokens = new address[](markets.length);
+        pars = new Types.Par[](markets.length);
+        weis = new Types.Wei[](markets.length);
+        for (uint256 i = 0; i < markets.length; i++) {
+            uint256 accountPar = par[account.owner][account.number][i];
+            tokens[i] = markets[i].token;
+            pars[i] = Types.Par({sign: true, value: uint128(accountPar)});
+            weis[i] = Types.Wei({sign: true, value: accountPar.mul(getMarketCurrentIndex(i).supply).div(1e18)});
+        }
+    }
+
+    function operate(Account.Info[] memory accounts, Actions.ActionArgs[] memory actions) external {
+        for (uint256 i = 0; i < actions.length; i++) {
+            Actions.ActionArgs memory action = actions[i];
+            Account.Info memory account = accounts[action.accountId];
+            require(account.owner == msg.sender, "Unpermissioned operator");
+            require(
+                action.amount.denomination == Types.AssetDenomination.Wei && action.amount.ref == Types.AssetReference.Delta,
+                "only wei deltas"
+            );
+
+            uint256 marketId = action.primaryMarketId;
+            _accrue(marketId);
+            uint256 supplyIndex = markets[marketId].index.supply;
+            uint256 amount = action.amount.value;
+
+            if (action.actionType == Actions.ActionType.Deposit) {
+                require(action.amount.sign, "deposits are positive");
+                uint256 added = amount.mul(1e18).div(supplyIndex);
+                par[account.owner][account.number][marketId] = par[account.owner][account.number][marketId].add(added);
+                markets[marketId].totalPar.supply = uint128(uint256(markets[marketId].totalPar.supply).add(added));
+                IERC20(markets[marketId].token).safeTransferFrom(action.otherAddress, address(this), amount);
+            } else if (action.actionType == Actions.ActionType.Withdraw) {
+                require(!action.amount.sign, "withdrawals are negative");
+                //rounded up so nobody takes more than they own
+                uint256 removed = amount.mul(1e18).add(supplyIndex - 1).div(supplyIndex);
+                par[account.owner][account.number][marketId] = par[account.owner][account.number][marketId].sub(removed, "no borrowing");
+                markets[marketId].totalPar.supply = uint128(uint256(markets[marketId].totalPar.supply).sub(removed));
+                IERC20(markets[marketId].token).safeTransfer(action.otherAddress, amount);
+            } else {
+                revert("unsupported action");
+            }
+        }
+    }
+
+    //takes cash out of the market. there is no collateral, the debt only counts towards the borrow par
+    function borrow(uint256 marketId, uint256 amount) external {
+        _accrue(marketId);
+        uint256 added = amount.mul(1e18).div(markets[marketId].index.borrow);
+        markets[marketId].totalPar.borrow = uint128(uint256(markets[marketId].totalPar.borrow).add(added));
+        IERC20(markets[marketId].token).safeTransfer(msg.sender, amount);
+    }
+
+    function _accrue(uint256 marketId) internal {
+        markets[marketId].index = getMarketCurrentIndex(marketId);
+    }
+}
@@ -0,0 +1,41 @@
+// SPDX-License-Identifier: GPL-3.0
+pragma solidity 0.6.12;
+
+/********************
+ *   Stand in for the Iron Bank staking rewards factory read by GenericIronBank on a local chain
+ *   Maps an underlying to its iToken and an iToken to its staking rewards. No staking rewards are
+ *   listed unless a test sets them, so the plugin just holds the iTokens
+ *   The maps are kept in storage so they can be set after the code is copied to the hard coded address
+ *
+ ********************* */
+
+contract MockStakingRewardsFactory {
+    mapping(address => address) internal stakingTokens;
+    mapping(address => address) internal stakingRewards;
+    address[] internal allStakingRewards;
+
+    function setStakingToken(address _underlying, address _stakingToken) external {
+        stakingTokens[_underlying] = _stakingToken;
+    }
+
+    function setStakingRewards(address _stakingToken, address _stakingRewards) external {
+        stakingRewards[_stakingToken] = _stakingRewards;
+        allStakingRewards.push(_stakingRewards);
+    }
+
+    function getStakingRewardsCount() external view returns (uint256) {
+        return allStakingRewards.length;
+    }
+
+    function getAllStakingRewards() external view returns (address[] memory) {
+        return allStakingRewards;
+    }
+
+    function getStakingRewards(address _stakingToken) external view returns (address) {
+        return stakingRewards[_stakingToken];
+    }
+
+    function getStakingToken(address _underlying) external view returns (address) {
+        return stakingTokens[_underlying];
+    }
+}
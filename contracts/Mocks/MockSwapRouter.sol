@@ -0,0 +1,51 @@
+// SPDX-License-Identifier: GPL-3.0
+pragma solidity 0.6.12;
+
+import "@openzeppelin/contracts/token/ERC20/IERC20.sol";
+import "@openzeppelin/contracts/math/SafeMath.sol";
+import "@openzeppelin/contracts/token/ERC20/SafeERC20.sol";
+
+/********************
+ *   Fixed price swaps for the mock routers. There is no pool, the output is paid from the router's own balance
+ *   so tests mint the output token to the router first
+ *   price is the amount of tokenOut for 1e18 of tokenIn, both in wei. Unpriced pairs swap to nothing
+ *   The price is kept in storage so it can be set after the code is copied to a hard coded router address
+ *
+ ********************* */
+
+abstract contract MockSwapRouter {
+    using SafeERC20 for IERC20;
+    using SafeMath for uint256;
+
+    mapping(address => mapping(address => uint256)) public price;
+
+    function setPrice(
+        address tokenIn,
+        address tokenOut,
+        uint256 _price
+    ) external {
+        price[tokenIn][tokenOut] = _price;
+    }
+
+    function _quote(
+        address tokenIn,
+        address tokenOut,
+        uint256 amountIn
+    ) internal view returns (uint256) {
+        return amountIn.mul(price[tokenIn][tokenOut]).div(1e18);
+    }
+
+    //takes amountIn of tokenIn from the sender and pays amountOut of tokenOut to the recipient
+    function _swap(
+        address tokenIn,
+        address tokenOut,
+        uint256 amountIn,
+        uint256 amountOut,
+        uint256 amountOutMin,
+        address to
+    ) internal {
+        require(amountOut >= amountOutMin, "MockSwapRouter: INSUFFICIENT_OUTPUT_AMOUNT");
+        IERC20(tokenIn).safeTransferFrom(msg.sender, address(this), amountIn);
+        IERC20(tokenOut).safeTransfer(to, amountOut);
+    }
+}
@@ -0,0 +1,34 @@
+// SPDX-License-Identifier: GPL-3.0
+pragma solidity 0.6.12;
+
+import "./MockSwapRouter.sol";
+
+/********************
+ *   Stand in for a UniswapV2 router (and its forks) on a local chain
+ *   Only getAmountsOut and swapExactTokensForTokens, which is all the plugins and the strategy use
+ *   Every hop of the path swaps at the fixed price of MockSwapRouter
+ *
+ ********************* */
+
+contract MockUniswapV2Router is MockSwapRouter {
+    function getAmountsOut(uint256 amountIn, address[] memory path) public view returns (uint256[] memory amounts) {
+        require(path.length >= 2, "UniswapV2Library: INVALID_PATH");
+        amounts = new uint256[](path.length);
+        amounts[0] = amountIn;
+        for (uint256 i = 1; i < path.length; i++) {
+            amounts[i] = _quote(path[i - 1], path[i], amounts[i - 1]);
+        }
+    }
+
+    function swapExactTokensForTokens(
+        uint256 amountIn,
+        uint256 amountOutMin,
+        address[] calldata path,
+        address to,
+        uint256 deadline
+    ) external returns (uint256[] memory amounts) {
+        require(deadline >= block.timestamp, "UniswapV2Router: EXPIRED");
+        amounts = getAmountsOut(amountIn, path);
+        _swap(path[0], path[path.length - 1], amountIn, amounts[amounts.length - 1], amountOutMin, to);
+    }
+}
@@ -0,0 +1,46 @@
+// SPDX-License-Identifier: GPL-3.0
+pragma solidity 0.6.12;
+pragma experimental ABIEncoderV2;
+
+import "../Interfaces/UniswapInterfaces/V3/ISwapRouter.sol";
+import "./MockSwapRouter.sol";
+
+/********************
+ *   Stand in for the UniswapV3 SwapRouter on a local chain
+ *   Only exactInputSingle and exactInput. The fee tiers in the path are skipped, every hop swaps at the
+ *   fixed price of MockSwapRouter
+ *
+ ********************* */
+
+contract MockUniswapV3Router is MockSwapRouter {
+    //an encoded path is token (20 bytes) followed by fee (3 bytes) and token for every hop
+    uint256 private constant ADDR_SIZE = 20;
+    uint256 private constant NEXT_OFFSET = 23;
+
+    function exactInputSingle(ISwapRouter.ExactInputSingleParams calldata params) external payable returns (uint256 amountOut) {
+        require(params.deadline >= block.timestamp, "Transaction too old");
+        amountOut = _quote(params.tokenIn, params.tokenOut, params.amountIn);
+        _swap(params.tokenIn, params.tokenOut, params.amountIn, amountOut, params.amountOutMinimum, params.recipient);
+    }
+
+    function exactInput(ISwapRouter.ExactInputParams calldata params) external payable returns (uint256 amountOut) {
+        require(params.deadline >= block.timestamp, "Transaction too old");
+        bytes memory path = params.path;
+        require(path.length >= ADDR_SIZE + NEXT_OFFSET && (path.length - ADDR_SIZE) % NEXT_OFFSET == 0, "invalid path");
+
+        address tokenIn = _tokenAt(path, 0);
+        address tokenOut;
+        amountOut = params.amountIn;
+        for (uint256 offset = 0; offset + ADDR_SIZE < path.length; offset += NEXT_OFFSET) {
+            tokenOut = _tokenAt(path, offset + NEXT_OFFSET);
+            amountOut = _quote(_tokenAt(path, offset), tokenOut, amountOut);
+        }
+        _swap(tokenIn, tokenOut, params.amountIn, amountOut, params.amountOutMinimum, params.recipient);
+    }
+
+    function _tokenAt(bytes memory path, uint256 offset) internal pure returns (address token) {
+        assembly {
+            token := div(mload(add(add(path, 0x20), offset)), 0x1000000000000000000000000)
+        }
+    }
+}
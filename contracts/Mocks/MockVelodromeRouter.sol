@@ -0,0 +1,41 @@
+// SPDX-License-Identifier: GPL-3.0
+pragma solidity 0.6.12;
+pragma experimental ABIEncoderV2;
+
+import "./MockSwapRouter.sol";
+
+/********************
+ *   Stand in for the Velodrome router on a local chain
+ *   Same getAmountsOut and swapExactTokensForTokens as the IVeledrome interface of GenericIronBank
+ *   Stable and volatile routes swap at the same fixed price of MockSwapRouter
+ *
+ ********************* */
+
+contract MockVelodromeRouter is MockSwapRouter {
+    struct route {
+        address from;
+        address to;
+        bool stable;
+    }
+
+    function getAmountsOut(uint256 amountIn, route[] memory routes) public view returns (uint256[] memory amounts) {
+        require(routes.length >= 1, "Router: INVALID_PATH");
+        amounts = new uint256[](routes.length + 1);
+        amounts[0] = amountIn;
+        for (uint256 i = 0; i < routes.length; i++) {
+            amounts[i + 1] = _quote(routes[i].from, routes[i].to, amounts[i]);
+        }
+    }
+
+    function swapExactTokensForTokens(
+        uint256 amountIn,
+        uint256 amountOutMin,
+        route[] calldata routes,
+        address to,
+        uint256 deadline
+    ) external returns (uint256[] memory amounts) {
+        require(deadline >= block.timestamp, "Router: EXPIRED");
+        amounts = getAmountsOut(amountIn, routes);
+        _swap(routes[0].from, routes[routes.length - 1].to, amountIn, amounts[amounts.length - 1], amountOutMin, to);
+    }
+}
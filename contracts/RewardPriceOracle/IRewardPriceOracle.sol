@@ -0,0 +1,16 @@
+// SPDX-License-Identifier: GPL-3.0
+pragma solidity 0.6.12;
+
+interface IRewardPriceOracle {
+    function update(
+        address token,
+        uint256 amountIn,
+        uint256 amountOut
+    ) external;
+
+    function consult(
+        address reporter,
+        address token,
+        uint256 amount
+    ) external view returns (uint256);
+}
@@ -0,0 +1,90 @@
+// SPDX-License-Identifier: GPL-3.0
+pragma solidity 0.6.12;
+
+import "@openzeppelin/contracts/math/SafeMath.sol";
+
+import "./IRewardPriceOracle.sol";
+
+/********************
+ *   Time weighted reward prices for the lender apr views
+ *   A lender reports the router quote of its reward token when it harvests and reads back the average of the
+ *   quotes it reported, weighted by how long each one stood. Every lender only writes its own prices, so
+ *   one oracle serves all of them without any permissions. Prices are want per 1e18 reward token units
+ *   The average runs from an anchor that moves up to the last report once it is older than period. A new
+ *   quote only starts to count from the moment it is reported, a spiked one does not move the apr at once
+ *
+ ********************* */
+
+contract RewardPriceOracle is IRewardPriceOracle {
+    using SafeMath for uint256;
+
+    uint256 internal constant PRICE_SCALE = 1e18;
+
+    struct Observation {
+        uint256 price;
+        uint256 timestamp;
+        //sum of price * seconds up to timestamp
+        uint256 cumulative;
+        uint256 anchorCumulative;
+        uint256 anchorTimestamp;
+    }
+
+    uint256 public immutable period;
+
+    //reporter => reward token => observation
+    mapping(address => mapping(address => Observation)) public observations;
+
+    event PriceUpdated(address indexed reporter, address indexed token, uint256 price);
+
+    constructor(uint256 _period) public {
+        require(_period > 0, "!period");
+        period = _period;
+    }
+
+    //reports that amountIn of token is worth amountOut of the reporter's want right now
+    function update(
+        address _token,
+        uint256 _amountIn,
+        uint256 _amountOut
+    ) external override {
+        require(_amountIn > 0, "!amountIn");
+        uint256 price = _amountOut.mul(PRICE_SCALE).div(_amountIn);
+
+        Observation storage observation = observations[msg.sender][_token];
+        uint256 lastTimestamp = observation.timestamp;
+        if (lastTimestamp == 0) {
+            observation.anchorTimestamp = block.timestamp;
+        } else {
+            uint256 cumulative = observation.cumulative;
+            if (block.timestamp.sub(observation.anchorTimestamp) > period) {
+                observation.anchorCumulative = cumulative;
+                observation.anchorTimestamp = lastTimestamp;
+            }
+            observation.cumulative = cumulative.add(observation.price.mul(block.timestamp - lastTimestamp));
+        }
+        observation.price = price;
+        observation.timestamp = block.timestamp;
+
+        emit PriceUpdated(msg.sender, _token, price);
+    }
+
+    //amount of token in the reporter's want at the average price. 0 when the reporter never reported token
+    function consult(
+        address _reporter,
+        address _token,
+        uint256 _amount
+    ) external view override returns (uint256) {
+        return _amount.mul(twap(_reporter, _token)).div(PRICE_SCALE);
+    }
+
+    function twap(address _reporter, address _token) public view returns (uint256) {
+        Observation memory observation = observations[_reporter][_token];
+        uint256 elapsed = block.timestamp.sub(observation.anchorTimestamp);
+        if (observation.timestamp == 0 || elapsed == 0) {
+            return observation.price;
+        }
+
+        uint256 cumulative = observation.cumulative.add(observation.price.mul(block.timestamp - observation.timestamp));
+        return cumulative.sub(observation.anchorCumulative).div(elapsed);
+    }
+}
@@ -39,10 +39,36 @@ contract Strategy is BaseStrategy {
     uint256 public constant SECONDSPERYEAR = 31556952;
 
     IGenericLender[] public lenders;
+    //position in lenders plus one, 0 for addresses that are not lenders
+    mapping(address => uint256) internal lenderIndex;
     bool public externalOracle; // default is false
     address public wantToEthOracle;
 
+    //algorithms adjustPosition can use to allocate between lenders
+    uint256 public constant BUBBLE_SORT = 0;
+    uint256 public constant WATER_FILL = 1;
+    uint256 public constant PARTIAL_MOVE = 2;
+    uint256 public allocationMode; // default is BUBBLE_SORT
+    //number of chunks estimatedTotalAssets is split into by WATER_FILL. bounds the aprAfterDeposit calls
+    uint256 public waterFillChunks;
+    //number of bisection steps PARTIAL_MOVE takes. each costs two aprAfterDeposit calls
+    uint256 public partialMoveSteps;
+
+    //share of estimatedTotalAssets adjustPosition leaves loose, in basis points. withdrawals up to it are paid
+    //without calling a lender
+    uint256 public idleBufferBps;
+    uint256 internal constant BASIS_POINTS = 10_000;
+
+    //tendTrigger waits for an apr spread of at least minTendSpread and for tendCooldown seconds after the last rebalance
+    uint256 public minTendSpread;
+    uint256 public tendCooldown;
+    //time of the last adjustPosition that took funds out of a lender and the apr spread it moved on
+    uint256 public lastRebalance;
+    uint256 public lastRebalanceSpread;
+
     event Cloned(address indexed clone);
+    event LenderHarvested(address indexed lender);
+    event LenderHarvestFailed(address indexed lender);
 
     constructor(address _vault) public BaseStrategy(_vault) {
         debtThreshold = 100 * 1e18;
@@ -92,6 +118,30 @@ contract Strategy is BaseStrategy {
         wantToEthOracle = _oracle;
     }
 
+    //_size is the number of chunks for WATER_FILL and the number of bisection steps for PARTIAL_MOVE
+    function setAllocationMode(uint256 _mode, uint256 _size) external onlyAuthorized {
+        require(_mode <= PARTIAL_MOVE, "!mode");
+        require(_mode != WATER_FILL || (_size > 0 && _size <= 100), "!chunks");
+        require(_mode != PARTIAL_MOVE || (_size > 0 && _size <= 32), "!steps");
+        allocationMode = _mode;
+        //BUBBLE_SORT takes no size, and the size of the mode not chosen is kept for when it is chosen again
+        if (_mode == PARTIAL_MOVE) {
+            partialMoveSteps = _size;
+        } else if (_mode == WATER_FILL) {
+            waterFillChunks = _size;
+        }
+    }
+
+    function setTendLimits(uint256 _minTendSpread, uint256 _tendCooldown) external onlyAuthorized {
+        minTendSpread = _minTendSpread;
+        tendCooldown = _tendCooldown;
+    }
+
+    function setIdleBuffer(uint256 _idleBufferBps) external onlyAuthorized {
+        require(_idleBufferBps <= BASIS_POINTS, "!buffer");
+        idleBufferBps = _idleBufferBps;
+    }
+
     function name() external view override returns (string memory) {
         return "StrategyLenderYieldOptimiser";
     }
@@ -102,11 +152,10 @@ contract Strategy is BaseStrategy {
     function addLender(address a) public onlyGovernance {
         IGenericLender n = IGenericLender(a);
         require(n.strategy() == address(this), "Undocked Lender");
+        require(lenderIndex[a] == 0, "Already Added");
 
-        for (uint256 i = 0; i < lenders.length; i++) {
-            require(a != address(lenders[i]), "Already Added");
-        }
         lenders.push(n);
+        lenderIndex[a] = lenders.length;
     }
 
     //but strategist can remove for safety
@@ -120,31 +169,67 @@ contract Strategy is BaseStrategy {
 
     //force removes the lender even if it still has a balance
     function _removeLender(address a, bool force) internal {
-        for (uint256 i = 0; i < lenders.length; i++) {
-            if (a == address(lenders[i])) {
-                bool allWithdrawn = lenders[i].withdrawAll();
+        require(lenderIndex[a] != 0, "NOT LENDER");
+        uint256 i = lenderIndex[a] - 1;
 
-                if (!force) {
-                    require(allWithdrawn, "WITHDRAW FAILED");
-                }
+        bool allWithdrawn = lenders[i].withdrawAll();
 
-                //put the last index here
-                //remove last index
-                if (i != lenders.length - 1) {
-                    lenders[i] = lenders[lenders.length - 1];
-                }
+        if (!force) {
+            require(allWithdrawn, "WITHDRAW FAILED");
+        }
 
-                //pop shortens array by 1 thereby deleting the last index
-                lenders.pop();
+        //put the last index here
+        //remove last index
+        if (i != lenders.length - 1) {
+            lenders[i] = lenders[lenders.length - 1];
+            lenderIndex[address(lenders[i])] = i + 1;
+        }
+
+        //pop shortens array by 1 thereby deleting the last index
+        lenders.pop();
+        delete lenderIndex[a];
 
-                //if balance to spend we might as well put it into the best lender
-                if (want.balanceOf(address(this)) > 0) {
-                    adjustPosition(0);
+        //if balance to spend we might as well put it into the best lender
+        if (want.balanceOf(address(this)) > 0) {
+            adjustPosition(0);
+        }
+    }
+
+    //harvests every lender whose harvestTrigger is true in one transaction. the lenders sell their rewards and supply the proceeds
+    //lenders without a harvestTrigger, or whose trigger reverts, are skipped. a harvest that reverts (a failed swap) is
+    //reported with LenderHarvestFailed and does not stop the others
+    function harvestLenders(uint256 _callCost) external onlyKeepers returns (uint256 harvested) {
+        uint256 lendersLength = lenders.length;
+        for (uint256 i = 0; i < lendersLength; i++) {
+            address lender = address(lenders[i]);
+            if (_lenderHarvestDue(lender, _callCost)) {
+                try IHarvestableLender(lender).harvest() {
+                    emit LenderHarvested(lender);
+                    harvested++;
+                } catch {
+                    emit LenderHarvestFailed(lender);
                 }
-                return;
             }
         }
-        require(false, "NOT LENDER");
+    }
+
+    //true if harvestLenders would harvest any lender
+    function harvestLendersTrigger(uint256 _callCost) external view returns (bool) {
+        uint256 lendersLength = lenders.length;
+        for (uint256 i = 0; i < lendersLength; i++) {
+            if (_lenderHarvestDue(address(lenders[i]), _callCost)) {
+                return true;
+            }
+        }
+        return false;
+    }
+
+    function _lenderHarvestDue(address _lender, uint256 _callCost) internal view returns (bool) {
+        try IHarvestableLender(_lender).harvestTrigger(_callCost) returns (bool due) {
+            return due;
+        } catch {
+            return false;
+        }
     }
 
     //we could make this more gas efficient but it is only used by a view function
@@ -182,7 +267,22 @@ contract Strategy is BaseStrategy {
         return lenders.length;
     }
 
+    //want adjustPosition keeps loose for withdrawals
+    function idleBufferTarget() public view returns (uint256) {
+        if (idleBufferBps == 0) {
+            return 0;
+        }
+        return estimatedTotalAssets().mul(idleBufferBps).div(BASIS_POINTS);
+    }
+
+    //loose want above the idle buffer
+    function _lendable(uint256 _buffer) internal view returns (uint256) {
+        uint256 looseAssets = want.balanceOf(address(this));
+        return looseAssets > _buffer ? looseAssets - _buffer : 0;
+    }
+
     //the weighted apr of all lenders. sum(nav * apr)/totalNav
+    //loose want, the idle buffer included, counts as earning nothing
     function estimatedAPR() public view returns (uint256) {
         uint256 bal = estimatedTotalAssets();
         if (bal == 0) {
@@ -203,9 +303,11 @@ contract Strategy is BaseStrategy {
         uint256 highestAPR = 0;
         uint256 aprChoice = 0;
         uint256 assets = 0;
+        //the idle buffer share of the new debt stays loose
+        uint256 lent = change.sub(change.mul(idleBufferBps).div(BASIS_POINTS));
 
         for (uint256 i = 0; i < lenders.length; i++) {
-            uint256 apr = lenders[i].aprAfterDeposit(change);
+            uint256 apr = lenders[i].aprAfterDeposit(lent);
             if (apr > highestAPR) {
                 aprChoice = i;
                 highestAPR = apr;
@@ -213,7 +315,7 @@ contract Strategy is BaseStrategy {
             }
         }
 
-        uint256 weightedAPR = highestAPR.mul(assets.add(change));
+        uint256 weightedAPR = highestAPR.mul(assets.add(lent));
 
         for (uint256 i = 0; i < lenders.length; i++) {
             if (i != aprChoice) {
@@ -267,6 +369,22 @@ contract Strategy is BaseStrategy {
             uint256 _highest,
             uint256 _potential
         )
+    {
+        (_lowest, _lowestApr, _highest, _potential, ) = _estimateAdjustPosition();
+    }
+
+    //same as estimateAdjustPosition but also returns the nav of the lowest apr lender
+    //each lender is only asked once for a snapshot of nav, hasAssets, apr and aprAfterDeposit
+    function _estimateAdjustPosition()
+        internal
+        view
+        returns (
+            uint256 _lowest,
+            uint256 _lowestApr,
+            uint256 _highest,
+            uint256 _potential,
+            uint256 _lowestNav
+        )
     {
         //all loose assets are to be invested
         uint256 looseAssets = want.balanceOf(address(this));
@@ -275,36 +393,232 @@ contract Strategy is BaseStrategy {
         // get the lowest apr strat
         // cycle through and see who could take its funds plus want for the highest apr
         _lowestApr = uint256(-1);
-        _lowest = 0;
-        uint256 lowestNav = 0;
+        uint256 highestApr = 0;
+
         for (uint256 i = 0; i < lenders.length; i++) {
-            if (lenders[i].hasAssets()) {
-                uint256 apr = lenders[i].apr();
-                if (apr < _lowestApr) {
-                    _lowestApr = apr;
-                    _lowest = i;
-                    lowestNav = lenders[i].nav();
+            (uint256 nav, bool hasAssets, uint256 apr, uint256 aprAfterDeposit) = lenders[i].lenderSnapshot(looseAssets);
+
+            if (hasAssets && apr < _lowestApr) {
+                _lowestApr = apr;
+                _lowest = i;
+                _lowestNav = nav;
+            }
+
+            if (aprAfterDeposit > highestApr) {
+                highestApr = aprAfterDeposit;
+                _highest = i;
+            }
+        }
+
+        //if we can improve apr by withdrawing we do so
+        _potential = lenders[_highest].aprAfterDeposit(_lowestNav.add(looseAssets));
+    }
+
+    /*
+     * Near optimal split of all assets between the lenders for the WATER_FILL mode.
+     *   estimatedTotalAssets is cut into waterFillChunks chunks and each chunk goes to the lender
+     *   with the highest aprAfterDeposit for its planned allocation plus that chunk.
+     *   Below its current nav a lender's rate is estimated by _waterFillRate.
+     *   Costs one snapshot per lender plus one aprAfterDeposit per lender and per chunk
+     */
+    function estimateWaterFill()
+        public
+        view
+        returns (
+            uint256[] memory _targets,
+            uint256[] memory _navs,
+            uint256 _chunk
+        )
+    {
+        uint256 numLenders = lenders.length;
+        _targets = new uint256[](numLenders);
+        _navs = new uint256[](numLenders);
+        //nothing to plan, and no lender to give the chunks to
+        if (numLenders == 0) {
+            return (_targets, _navs, 0);
+        }
+        //rate of each lender after it receives its next chunk
+        uint256[] memory rates = new uint256[](numLenders);
+        //aprAfterDeposit(0) of each lender. the centre of the curve we reflect for targets below nav
+        uint256[] memory baseRates = new uint256[](numLenders);
+
+        uint256 total = want.balanceOf(address(this));
+        for (uint256 i = 0; i < numLenders; i++) {
+            (uint256 nav, , , uint256 currentRate) = lenders[i].lenderSnapshot(0);
+            _navs[i] = nav;
+            baseRates[i] = currentRate;
+            total = total.add(nav);
+        }
+
+        uint256 chunks = waterFillChunks;
+        _chunk = chunks == 0 ? 0 : total.div(chunks);
+        if (_chunk == 0) {
+            //too small to split, or WATER_FILL was never set and there is no chunk count
+            chunks = 1;
+            _chunk = total;
+        }
+
+        for (uint256 i = 0; i < numLenders; i++) {
+            rates[i] = _waterFillRate(i, _navs[i], baseRates[i], _chunk);
+        }
+
+        uint256 best = 0;
+        for (uint256 k = 0; k < chunks; k++) {
+            best = 0;
+            for (uint256 i = 1; i < numLenders; i++) {
+                if (rates[i] > rates[best]) {
+                    best = i;
                 }
             }
+
+            _targets[best] = _targets[best].add(_chunk);
+            rates[best] = _waterFillRate(best, _navs[best], baseRates[best], _targets[best].add(_chunk));
         }
 
-        uint256 toAdd = lowestNav.add(looseAssets);
+        //rounding left over goes to the lender that took the last chunk
+        _targets[best] = _targets[best].add(total.sub(_chunk.mul(chunks)));
+    }
 
-        uint256 highestApr = 0;
-        _highest = 0;
+    //estimated apr of lender i if it held target instead of nav. the interface can only price deposits
+    //so below nav the deposit curve is mirrored around the current rate: apr(nav - x) ~ 2 * apr(nav) - apr(nav + x)
+    function _waterFillRate(
+        uint256 i,
+        uint256 nav,
+        uint256 baseRate,
+        uint256 target
+    ) internal view returns (uint256) {
+        if (target >= nav) {
+            return lenders[i].aprAfterDeposit(target - nav);
+        }
+        uint256 rateUp = lenders[i].aprAfterDeposit(nav - target);
+        uint256 doubled = baseRate.mul(2);
+        return doubled > rateUp ? doubled - rateUp : 0;
+    }
 
-        for (uint256 i = 0; i < lenders.length; i++) {
-            uint256 apr;
-            apr = lenders[i].aprAfterDeposit(looseAssets);
+    /*
+     * Amount the PARTIAL_MOVE mode takes from the lowest apr lender for the lender that pays most for the loose assets.
+     *   The largest amount after which the receiver's aprAfterDeposit still meets the donor's apr after the withdrawal,
+     *   so the rates end up about equal instead of the whole position moving and the next tend moving it back.
+     *   The donor's rate after the withdrawal is estimated by _waterFillRate.
+     *   Bisection over [0, nav of the donor] in partialMoveSteps steps, two aprAfterDeposit calls each
+     */
+    function estimatePartialMove()
+        public
+        view
+        returns (
+            uint256 _from,
+            uint256 _to,
+            uint256 _amount
+        )
+    {
+        (uint256 lowest, uint256 lowestApr, uint256 highest, , uint256 lowestNav) = _estimateAdjustPosition();
+        return (lowest, highest, _partialMoveAmount(lowest, lowestApr, highest, lowestNav));
+    }
 
-            if (apr > highestApr) {
-                highestApr = apr;
-                _highest = i;
+    //estimatePartialMove on the _estimateAdjustPosition snapshot the caller already took, so _partialMove reads the lenders once
+    function _partialMoveAmount(
+        uint256 from,
+        uint256 fromApr,
+        uint256 to,
+        uint256 fromNav
+    ) internal view returns (uint256 _amount) {
+        if (from == to || fromNav == 0) {
+            return 0;
+        }
+
+        uint256 looseAssets = want.balanceOf(address(this));
+        //still worth it with everything moved. same as BUBBLE_SORT
+        if (_movePays(from, fromNav, fromApr, to, looseAssets, fromNav)) {
+            return fromNav;
+        }
+
+        uint256 upper = fromNav;
+        uint256 steps = partialMoveSteps;
+        for (uint256 i = 0; i < steps; i++) {
+            uint256 middle = _amount.add(upper) / 2;
+            if (_movePays(from, fromNav, fromApr, to, looseAssets, middle)) {
+                _amount = middle;
+            } else {
+                upper = middle;
             }
         }
+    }
 
-        //if we can improve apr by withdrawing we do so
-        _potential = lenders[_highest].aprAfterDeposit(toAdd);
+    //true if lender to still pays at least what lender from pays once amount has moved from one to the other
+    function _movePays(
+        uint256 from,
+        uint256 fromNav,
+        uint256 fromApr,
+        uint256 to,
+        uint256 looseAssets,
+        uint256 amount
+    ) internal view returns (bool) {
+        return lenders[to].aprAfterDeposit(looseAssets.add(amount)) >= _waterFillRate(from, fromNav, fromApr, fromNav - amount);
+    }
+
+    //moves the estimatePartialMove amount and the loose assets above _buffer. moves under withdrawalThreshold are skipped
+    function _partialMove(uint256 _buffer) internal {
+        (uint256 from, uint256 fromApr, uint256 to, uint256 potential, uint256 fromNav) = _estimateAdjustPosition();
+        uint256 amount = _partialMoveAmount(from, fromApr, to, fromNav);
+
+        if (amount > 0 && amount >= withdrawalThreshold) {
+            if (amount == fromNav) {
+                lenders[from].withdrawAll();
+            } else {
+                lenders[from].withdraw(amount);
+            }
+            //the spread tendTrigger sees
+            _recordRebalance(potential > fromApr ? potential - fromApr : 0);
+        }
+
+        uint256 bal = _lendable(_buffer);
+        if (bal > 0) {
+            want.safeTransfer(address(lenders[to]), bal);
+            lenders[to].deposit();
+        }
+    }
+
+    //moves assets to the estimateWaterFill targets. withdraws first then deposits what we have above _buffer
+    function _waterFill(uint256 _buffer) internal {
+        (uint256[] memory targets, uint256[] memory navs, uint256 chunk) = estimateWaterFill();
+
+        //lenders less than a chunk over their target are left alone. that is within the rounding of the plan
+        bool moved = false;
+        for (uint256 i = 0; i < targets.length; i++) {
+            if (navs[i] > targets[i] && navs[i] - targets[i] >= chunk) {
+                if (targets[i] == 0) {
+                    lenders[i].withdrawAll();
+                } else {
+                    lenders[i].withdraw(navs[i] - targets[i]);
+                }
+                moved = true;
+            }
+        }
+        //many lenders move at once so there is no single spread to record
+        if (moved) {
+            _recordRebalance(0);
+        }
+
+        uint256 looseAssets = _lendable(_buffer);
+        uint256 largest = 0;
+        for (uint256 i = 0; i < targets.length; i++) {
+            if (targets[i] > targets[largest]) {
+                largest = i;
+            }
+
+            if (targets[i] > navs[i] && looseAssets > 0) {
+                uint256 toDeposit = Math.min(targets[i] - navs[i], looseAssets);
+                looseAssets = looseAssets - toDeposit;
+                want.safeTransfer(address(lenders[i]), toDeposit);
+                lenders[i].deposit();
+            }
+        }
+
+        //anything not placed goes to the biggest position
+        if (looseAssets > 0) {
+            want.safeTransfer(address(lenders[largest]), looseAssets);
+            lenders[largest].deposit();
+        }
     }
 
     //gives estiomate of future APR with a change of debt limit. Useful for governance to decide debt limits
@@ -426,20 +740,43 @@ contract Strategy is BaseStrategy {
             return;
         }
 
-        (uint256 lowest, uint256 lowestApr, uint256 highest, uint256 potential) = estimateAdjustPosition();
+        //top the idle buffer back up when withdrawals drew it down. every mode only lends what is above it
+        uint256 buffer = idleBufferTarget();
+        uint256 looseAssets = want.balanceOf(address(this));
+        if (looseAssets < buffer) {
+            _withdrawSome(buffer - looseAssets);
+        }
+
+        if (allocationMode == WATER_FILL) {
+            _waterFill(buffer);
+            return;
+        }
+
+        if (allocationMode == PARTIAL_MOVE) {
+            _partialMove(buffer);
+            return;
+        }
+
+        (uint256 lowest, uint256 lowestApr, uint256 highest, uint256 potential, ) = _estimateAdjustPosition();
 
         if (potential > lowestApr) {
             //apr should go down after deposit so wont be withdrawing from self
             lenders[lowest].withdrawAll();
+            _recordRebalance(potential - lowestApr);
         }
 
-        uint256 bal = want.balanceOf(address(this));
+        uint256 bal = _lendable(buffer);
         if (bal > 0) {
             want.safeTransfer(address(lenders[highest]), bal);
             lenders[highest].deposit();
         }
     }
 
+    function _recordRebalance(uint256 _spread) internal {
+        lastRebalance = block.timestamp;
+        lastRebalanceSpread = _spread;
+    }
+
     struct lenderRatio {
         address lender;
         //share x 1000
@@ -457,15 +794,7 @@ contract Strategy is BaseStrategy {
         uint256 assets = want.balanceOf(address(this));
 
         for (uint256 i = 0; i < _newPositions.length; i++) {
-            bool found = false;
-
-            //might be annoying and expensive to do this second loop but worth it for safety
-            for (uint256 j = 0; j < lenders.length; j++) {
-                if (address(lenders[j]) == _newPositions[i].lender) {
-                    found = true;
-                }
-            }
-            require(found, "NOT LENDER");
+            require(lenderIndex[_newPositions[i].lender] != 0, "NOT LENDER");
 
             share = share.add(_newPositions[i].share);
             uint256 toSend = assets.mul(_newPositions[i].share).div(1000);
@@ -476,7 +805,52 @@ contract Strategy is BaseStrategy {
         require(share == 1000, "SHARE!=1000");
     }
 
-    //cycle through withdrawing from worst rate first
+    //same shares as manualAllocation, but only the difference moves. every lender is compared to its target share of
+    //the assets: the ones above it pay out the excess, then the ones below it are topped up from that
+    //lenders left out of _newPositions are emptied. excesses under withdrawalThreshold are left where they are
+    function manualRebalance(lenderRatio[] memory _newPositions) public onlyAuthorized {
+        uint256 lendersLength = lenders.length;
+        uint256[] memory targets = new uint256[](lendersLength);
+        uint256 share = 0;
+        for (uint256 i = 0; i < _newPositions.length; i++) {
+            uint256 index = lenderIndex[_newPositions[i].lender];
+            require(index != 0, "NOT LENDER");
+            targets[index - 1] = targets[index - 1].add(_newPositions[i].share);
+            share = share.add(_newPositions[i].share);
+        }
+        require(share == 1000, "SHARE!=1000");
+
+        uint256[] memory navs = new uint256[](lendersLength);
+        uint256 assets = want.balanceOf(address(this));
+        for (uint256 i = 0; i < lendersLength; i++) {
+            navs[i] = lenders[i].nav();
+            assets = assets.add(navs[i]);
+        }
+
+        //withdraw first so the deposits can be paid
+        for (uint256 i = 0; i < lendersLength; i++) {
+            targets[i] = assets.mul(targets[i]).div(1000);
+            if (targets[i] == 0 && navs[i] > 0) {
+                lenders[i].withdrawAll();
+            } else if (navs[i] > targets[i].add(withdrawalThreshold)) {
+                lenders[i].withdraw(navs[i] - targets[i]);
+            }
+        }
+
+        for (uint256 i = 0; i < lendersLength; i++) {
+            if (navs[i] < targets[i]) {
+                uint256 toSend = Math.min(targets[i] - navs[i], want.balanceOf(address(this)));
+                if (toSend > 0) {
+                    want.safeTransfer(address(lenders[i]), toSend);
+                    lenders[i].deposit();
+                }
+            }
+        }
+    }
+
+    //withdraw from worst rate first, asking every lender for no more than it can pay
+    //the lenders with liquidity are ranked by apr once. when a single lender can pay the whole amount, the worst rate
+    //of those pays it in one call. otherwise each pays what it has available, from the worst rate up
     function _withdrawSome(uint256 _amount) internal returns (uint256 amountWithdrawn) {
         if (lenders.length == 0) {
             return 0;
@@ -487,30 +861,71 @@ contract Strategy is BaseStrategy {
             return 0;
         }
 
+        (uint256[] memory order, uint256[] memory available, uint256 ranked) = _rankLiquidLenders();
+
         amountWithdrawn = 0;
-        //most situations this will only run once. Only big withdrawals will be a gas guzzler
-        uint256 j = 0;
-        while (amountWithdrawn < _amount) {
-            uint256 lowestApr = uint256(-1);
-            uint256 lowest = 0;
-            for (uint256 i = 0; i < lenders.length; i++) {
-                if (lenders[i].hasAssets()) {
-                    uint256 apr = lenders[i].apr();
-                    if (apr < lowestApr) {
-                        lowestApr = apr;
-                        lowest = i;
-                    }
+        for (uint256 j = 0; j < ranked; j++) {
+            if (available[j] >= _amount) {
+                amountWithdrawn = lenders[order[j]].withdraw(_amount);
+                if (amountWithdrawn >= _amount) {
+                    return amountWithdrawn;
                 }
+                //it paid all it had after all
+                available[j] = 0;
+                break;
             }
-            if (!lenders[lowest].hasAssets()) {
-                return amountWithdrawn;
+        }
+
+        for (uint256 j = 0; j < ranked && amountWithdrawn < _amount; j++) {
+            if (available[j] > 0) {
+                amountWithdrawn = amountWithdrawn.add(lenders[order[j]].withdraw(Math.min(available[j], _amount - amountWithdrawn)));
             }
-            amountWithdrawn = amountWithdrawn.add(lenders[lowest].withdraw(_amount - amountWithdrawn));
-            j++;
-            //dont want infinite loop
-            if (j >= 6) {
-                return amountWithdrawn;
+        }
+    }
+
+    //the lenders that can pay out and how much, sorted by apr with insertion sort. equal aprs keep the lender order
+    //a lender whose availableLiquidity or apr reverts is not ranked
+    function _rankLiquidLenders()
+        internal
+        view
+        returns (
+            uint256[] memory order,
+            uint256[] memory available,
+            uint256 ranked
+        )
+    {
+        uint256 lendersLength = lenders.length;
+        order = new uint256[](lendersLength);
+        available = new uint256[](lendersLength);
+        uint256[] memory aprs = new uint256[](lendersLength);
+        for (uint256 i = 0; i < lendersLength; i++) {
+            //a lender whose views revert is left out, it can not hold up withdrawals from the others
+            uint256 liquidity;
+            try lenders[i].availableLiquidity() returns (uint256 lenderLiquidity) {
+                liquidity = lenderLiquidity;
+            } catch {
+                continue;
+            }
+            if (liquidity == 0) {
+                continue;
+            }
+            uint256 apr;
+            try lenders[i].apr() returns (uint256 lenderApr) {
+                apr = lenderApr;
+            } catch {
+                continue;
             }
+            uint256 j = ranked;
+            while (j > 0 && aprs[j - 1] > apr) {
+                order[j] = order[j - 1];
+                available[j] = available[j - 1];
+                aprs[j] = aprs[j - 1];
+                j--;
+            }
+            order[j] = i;
+            available[j] = liquidity;
+            aprs[j] = apr;
+            ranked++;
         }
     }
 
@@ -519,6 +934,7 @@ contract Strategy is BaseStrategy {
      * up to `_amountNeeded`. Any excess should be re-invested here as well.
      */
     function liquidatePosition(uint256 _amountNeeded) internal override returns (uint256 _amountFreed, uint256 _loss) {
+        //the loose want, the idle buffer, pays first. only the rest is withdrawn from the lenders
         uint256 _balance = want.balanceOf(address(this));
 
         if (_balance >= _amountNeeded) {
@@ -561,22 +977,33 @@ contract Strategy is BaseStrategy {
 
         //now let's check if there is better apr somewhere else.
         //If there is and profit potential is worth changing then lets do it
-        (uint256 lowest, uint256 lowestApr, , uint256 potential) = estimateAdjustPosition();
+        (, uint256 lowestApr, , uint256 potential, uint256 nav) = _estimateAdjustPosition();
 
         //if protential > lowestApr it means we are changing horses
         if (potential > lowestApr) {
-            uint256 nav = lenders[lowest].nav();
+            uint256 spread = potential - lowestApr;
+            if (spread < minTendSpread || block.timestamp < lastRebalance.add(tendCooldown)) {
+                return false;
+            }
 
             //To calculate our potential profit increase we work out how much extra
             //we would make in a typical harvest interlude. That is maxReportingDelay
             //then we see if the extra profit is worth more than the gas cost * profitFactor
 
-            //safe math not needed here
             //apr is scaled by 1e18 so we downscale here
-            uint256 profitIncrease = (nav.mul(potential) - nav.mul(lowestApr)).div(1e18).mul(maxReportDelay).div(SECONDSPERYEAR);
+            uint256 profitIncrease = nav.mul(spread).div(1e18).mul(maxReportDelay).div(SECONDSPERYEAR);
 
             uint256 wantCallCost = ethToWant(callCost);
 
+            //hysteresis. rates that moved enough for a rebalance within the last interlude are likely to move this back
+            //before it pays off, so a recent rebalance has to be beaten on spread and the profit has to pay for both tends
+            if (block.timestamp < lastRebalance.add(maxReportDelay)) {
+                if (spread < lastRebalanceSpread) {
+                    return false;
+                }
+                wantCallCost = wantCallCost.mul(2);
+            }
+
             return (wantCallCost.mul(profitFactor) < profitIncrease);
         }
     }
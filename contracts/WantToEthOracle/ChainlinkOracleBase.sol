@@ -0,0 +1,116 @@
+// SPDX-License-Identifier: GPL-3.0
+pragma solidity 0.6.12;
+
+import "@openzeppelin/contracts/math/SafeMath.sol";
+import "@openzeppelin/contracts/token/ERC20/ERC20.sol";
+
+import "../Interfaces/Chainlink/AggregatorV3Interface.sol";
+import "./IWantToEth.sol";
+
+/********************
+ *   Base of the chainlink want to eth oracles. eth is the native token of the chain, FTM on fantom
+ *   The plugin gives the price of want in eth as wantPrice / ethPrice, both on the same scale
+ *   A stale, zero or negative answer, a feed that reverts or a sequencer that is down or just back up
+ *   all make the price invalid. The fallback oracle is used then, without one the call reverts
+ *   Everything is immutable so the price costs the feed reads and nothing else, the triggers poll it
+ *
+ ********************* */
+
+abstract contract ChainlinkOracleBase is IWantToEth {
+    using SafeMath for uint256;
+
+    //the price is not trusted for this long after an L2 sequencer comes back up
+    uint256 public constant SEQUENCER_GRACE_PERIOD = 3600;
+
+    //L2 sequencer uptime feed, 0 on mainnet and fantom
+    address public immutable sequencerFeed;
+    IWantToEth public immutable fallbackOracle;
+    uint256 internal immutable wantScale;
+
+    constructor(
+        address _want,
+        address _sequencerFeed,
+        address _fallbackOracle
+    ) public {
+        sequencerFeed = _sequencerFeed;
+        fallbackOracle = IWantToEth(_fallbackOracle);
+        wantScale = 10**uint256(ERC20(_want).decimals());
+    }
+
+    function wantToEth(uint256 _amount) external view override returns (uint256) {
+        (uint256 wantPrice, uint256 ethPrice, bool valid) = _validPrices();
+        if (!valid) {
+            return _fallback().wantToEth(_amount);
+        }
+        return _amount.mul(wantPrice).mul(1e18).div(ethPrice.mul(wantScale));
+    }
+
+    function ethToWant(uint256 _amount) external view override returns (uint256) {
+        (uint256 wantPrice, uint256 ethPrice, bool valid) = _validPrices();
+        if (!valid) {
+            return _fallback().ethToWant(_amount);
+        }
+        return _amount.mul(ethPrice).mul(wantScale).div(wantPrice.mul(1e18));
+    }
+
+    //true when the feeds can be used right now
+    function isValid() external view returns (bool valid) {
+        (, , valid) = _validPrices();
+    }
+
+    function _prices()
+        internal
+        view
+        virtual
+        returns (
+            uint256 wantPrice,
+            uint256 ethPrice,
+            bool valid
+        );
+
+    function _validPrices()
+        internal
+        view
+        returns (
+            uint256 wantPrice,
+            uint256 ethPrice,
+            bool valid
+        )
+    {
+        if (!_sequencerUp()) {
+            return (0, 0, false);
+        }
+        return _prices();
+    }
+
+    //the answer of _feed if it is positive and was updated within _maxAge
+    function _latestAnswer(AggregatorV3Interface _feed, uint256 _maxAge) internal view returns (uint256, bool) {
+        try _feed.latestRoundData() returns (uint80, uint256 answer, uint256, uint256 updatedAt, uint80) {
+            if (int256(answer) <= 0 || updatedAt > block.timestamp || block.timestamp - updatedAt > _maxAge) {
+                return (0, false);
+            }
+            return (answer, true);
+        } catch {
+            return (0, false);
+        }
+    }
+
+    function _sequencerUp() internal view returns (bool) {
+        address _sequencerFeed = sequencerFeed;
+        if (_sequencerFeed == address(0)) {
+            return true;
+        }
+
+        //answer is 0 while the sequencer is up, startedAt is when it last changed
+        try AggregatorV3Interface(_sequencerFeed).latestRoundData() returns (uint80, uint256 answer, uint256 startedAt, uint256, uint80) {
+            return answer == 0 && block.timestamp >= startedAt.add(SEQUENCER_GRACE_PERIOD);
+        } catch {
+            return false;
+        }
+    }
+
+    function _fallback() internal view returns (IWantToEth oracle) {
+        oracle = fallbackOracle;
+        require(address(oracle) != address(0), "!price");
+    }
+}
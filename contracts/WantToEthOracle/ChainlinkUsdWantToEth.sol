@@ -0,0 +1,58 @@
+// SPDX-License-Identifier: GPL-3.0
+pragma solidity 0.6.12;
+
+import "./ChainlinkOracleBase.sol";
+
+/********************
+ *   Prices want with a want / usd feed and an eth / usd feed, for the wants without a feed in eth
+ *   Most want / eth pairs only exist on mainnet, usd feeds are on every chain. On fantom the eth feed is FTM / USD
+ *   Each feed has its own max age since their heartbeats differ
+ *
+ ********************* */
+
+contract ChainlinkUsdWantToEth is ChainlinkOracleBase {
+    using SafeMath for uint256;
+
+    AggregatorV3Interface public immutable wantUsdFeed;
+    AggregatorV3Interface public immutable ethUsdFeed;
+    uint256 public immutable wantMaxAge;
+    uint256 public immutable ethMaxAge;
+    uint256 internal immutable wantFeedScale;
+    uint256 internal immutable ethFeedScale;
+
+    constructor(
+        address _want,
+        address _wantUsdFeed,
+        address _ethUsdFeed,
+        uint256 _wantMaxAge,
+        uint256 _ethMaxAge,
+        address _sequencerFeed,
+        address _fallbackOracle
+    ) public ChainlinkOracleBase(_want, _sequencerFeed, _fallbackOracle) {
+        wantUsdFeed = AggregatorV3Interface(_wantUsdFeed);
+        ethUsdFeed = AggregatorV3Interface(_ethUsdFeed);
+        wantMaxAge = _wantMaxAge;
+        ethMaxAge = _ethMaxAge;
+        wantFeedScale = 10**uint256(AggregatorV3Interface(_wantUsdFeed).decimals());
+        ethFeedScale = 10**uint256(AggregatorV3Interface(_ethUsdFeed).decimals());
+    }
+
+    //both prices in usd, each one scaled by the decimals of the other feed
+    function _prices()
+        internal
+        view
+        override
+        returns (
+            uint256 wantPrice,
+            uint256 ethPrice,
+            bool valid
+        )
+    {
+        (uint256 wantUsd, bool wantValid) = _latestAnswer(wantUsdFeed, wantMaxAge);
+        (uint256 ethUsd, bool ethValid) = _latestAnswer(ethUsdFeed, ethMaxAge);
+        if (!wantValid || !ethValid) {
+            return (0, 0, false);
+        }
+        return (wantUsd.mul(ethFeedScale), ethUsd.mul(wantFeedScale), true);
+    }
+}
@@ -0,0 +1,41 @@
+// SPDX-License-Identifier: GPL-3.0
+pragma solidity 0.6.12;
+
+import "./ChainlinkOracleBase.sol";
+
+/********************
+ *   Prices want with a single chainlink want / eth feed, e.g. USDC / ETH on mainnet
+ *
+ ********************* */
+
+contract ChainlinkWantToEth is ChainlinkOracleBase {
+    AggregatorV3Interface public immutable wantEthFeed;
+    uint256 public immutable maxAge;
+    uint256 internal immutable feedScale;
+
+    constructor(
+        address _want,
+        address _wantEthFeed,
+        uint256 _maxAge,
+        address _sequencerFeed,
+        address _fallbackOracle
+    ) public ChainlinkOracleBase(_want, _sequencerFeed, _fallbackOracle) {
+        wantEthFeed = AggregatorV3Interface(_wantEthFeed);
+        maxAge = _maxAge;
+        feedScale = 10**uint256(AggregatorV3Interface(_wantEthFeed).decimals());
+    }
+
+    function _prices()
+        internal
+        view
+        override
+        returns (
+            uint256 wantPrice,
+            uint256 ethPrice,
+            bool valid
+        )
+    {
+        (wantPrice, valid) = _latestAnswer(wantEthFeed, maxAge);
+        ethPrice = feedScale;
+    }
+}
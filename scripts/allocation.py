@@ -0,0 +1,331 @@
+"""
+Reference implementations of the allocation algorithms in Strategy.adjustPosition.
+
+Everything is integer maths that mirrors the solidity, so results can be compared one
+to one with the chain. The algorithms work on any lender object with the same views as
+IGenericLender (nav, apr, has_assets, apr_after_deposit, snapshot) plus deposit and
+withdraw for the simulations.
+
+    brownie run allocation --network mainnet-fork
+
+compares the on chain water fill plan of the strategy in $STRATEGY against this
+reference and against the bubble sort.
+"""
+import os
+
+MAX_UINT = 2 ** 256 - 1
+
+BUBBLE_SORT = 0
+WATER_FILL = 1
+PARTIAL_MOVE = 2
+
+
+class PoolLender:
+    """
+    Same model as contracts/Mocks/MockLender.sol: a fixed yearly interest shared by all
+    suppliers. apr = interest_per_year / (external_supply + nav). liquidity caps a withdrawal
+    """
+
+    def __init__(self, name, interest_per_year, external_supply, nav=0, liquidity=2 ** 256 - 1):
+        self.name = name
+        self.interest_per_year = interest_per_year
+        self.external_supply = external_supply
+        self.nav = nav
+        self.liquidity = liquidity
+
+    def _apr(self, extra):
+        supply = self.external_supply + self.nav + extra
+        if supply == 0:
+            return 0
+        return self.interest_per_year * 10 ** 18 // supply
+
+    def apr(self):
+        return self._apr(0)
+
+    def apr_after_deposit(self, amount):
+        return self._apr(amount)
+
+    def weighted_apr(self):
+        return self.apr() * self.nav
+
+    def has_assets(self):
+        return self.nav > 0
+
+    def snapshot(self, extra):
+        return self.nav, self.has_assets(), self._apr(0), self._apr(extra)
+
+    def available_liquidity(self):
+        return min(self.nav, self.liquidity)
+
+    def deposit(self, amount):
+        self.nav += amount
+
+    def withdraw(self, amount):
+        amount = min(amount, self.nav, self.liquidity)
+        self.nav -= amount
+        return amount
+
+    def withdraw_all(self):
+        return self.withdraw(self.nav)
+
+
+class ChainLender:
+    """Read only view of a deployed plugin. Only usable for the estimate functions"""
+
+    def __init__(self, plugin):
+        self.plugin = plugin
+        self.name = plugin.lenderName()
+        self.nav = plugin.nav()
+
+    def apr(self):
+        return self.plugin.apr()
+
+    def apr_after_deposit(self, amount):
+        return self.plugin.aprAfterDeposit(amount)
+
+    def has_assets(self):
+        return self.plugin.hasAssets()
+
+    def snapshot(self, extra):
+        return tuple(self.plugin.lenderSnapshot(extra))
+
+
+def estimate_adjust_position(lenders, loose):
+    """Strategy._estimateAdjustPosition. Returns (lowest, lowestApr, highest, potential)"""
+    lowest_apr = MAX_UINT
+    lowest = 0
+    lowest_nav = 0
+    highest_apr = 0
+    highest = 0
+    for i, lender in enumerate(lenders):
+        nav, has_assets, apr, apr_after_deposit = lender.snapshot(loose)
+        if has_assets and apr < lowest_apr:
+            lowest_apr = apr
+            lowest = i
+            lowest_nav = nav
+        if apr_after_deposit > highest_apr:
+            highest_apr = apr_after_deposit
+            highest = i
+
+    potential = lenders[highest].apr_after_deposit(lowest_nav + loose)
+    return lowest, lowest_apr, highest, potential
+
+
+def bubble_sort(lenders, loose, keep=0):
+    """
+    One adjustPosition in BUBBLE_SORT mode. Mutates the lenders and returns the
+    amount of want that was moved out of a lender. Up to `keep` stays loose, the idle buffer
+    """
+    lowest, lowest_apr, highest, potential = estimate_adjust_position(lenders, loose)
+    moved = 0
+    if potential > lowest_apr:
+        moved = lenders[lowest].withdraw_all()
+        loose += moved
+    if loose > keep:
+        lenders[highest].deposit(loose - keep)
+    return moved
+
+
+def water_fill_rate(lender, nav, base_rate, target):
+    """Strategy._waterFillRate. Below nav the deposit curve is mirrored around base_rate"""
+    if target >= nav:
+        return lender.apr_after_deposit(target - nav)
+    rate_up = lender.apr_after_deposit(nav - target)
+    return max(2 * base_rate - rate_up, 0)
+
+
+def estimate_water_fill(lenders, loose, chunks):
+    """Strategy.estimateWaterFill. Returns (targets, navs, chunk)"""
+    n = len(lenders)
+    targets = [0] * n
+    navs = [0] * n
+    if n == 0:
+        # nothing to plan, and no lender to give the chunks to
+        return targets, navs, 0
+    base_rates = [0] * n
+    rates = [0] * n
+
+    total = loose
+    for i, lender in enumerate(lenders):
+        nav, _, _, current_rate = lender.snapshot(0)
+        navs[i] = nav
+        base_rates[i] = current_rate
+        total += nav
+
+    chunk = total // chunks if chunks else 0
+    if chunk == 0:
+        # too small to split, or WATER_FILL was never set and there is no chunk count
+        chunks = 1
+        chunk = total
+
+    for i, lender in enumerate(lenders):
+        rates[i] = water_fill_rate(lender, navs[i], base_rates[i], chunk)
+
+    best = 0
+    for _ in range(chunks):
+        best = 0
+        for i in range(1, n):
+            if rates[i] > rates[best]:
+                best = i
+
+        targets[best] += chunk
+        rates[best] = water_fill_rate(lenders[best], navs[best], base_rates[best], targets[best] + chunk)
+
+    targets[best] += total - chunk * chunks
+    return targets, navs, chunk
+
+
+def water_fill(lenders, loose, chunks, keep=0):
+    """
+    One adjustPosition in WATER_FILL mode. Mutates the lenders and returns the
+    amount of want that was moved out of a lender. Up to `keep` stays loose, the idle buffer
+    """
+    # like adjustPosition, everything stays loose without lenders
+    if not lenders:
+        return 0
+    targets, navs, chunk = estimate_water_fill(lenders, loose, chunks)
+
+    moved = 0
+    for i, lender in enumerate(lenders):
+        if navs[i] > targets[i] and navs[i] - targets[i] >= chunk:
+            if targets[i] == 0:
+                withdrawn = lender.withdraw_all()
+            else:
+                withdrawn = lender.withdraw(navs[i] - targets[i])
+            moved += withdrawn
+            loose += withdrawn
+
+    loose = max(loose - keep, 0)
+    largest = 0
+    for i, lender in enumerate(lenders):
+        if targets[i] > targets[largest]:
+            largest = i
+        if targets[i] > navs[i] and loose > 0:
+            to_deposit = min(targets[i] - navs[i], loose)
+            loose -= to_deposit
+            lender.deposit(to_deposit)
+
+    if loose > 0:
+        lenders[largest].deposit(loose)
+    return moved
+
+
+def estimate_partial_move(lenders, loose, steps):
+    """Strategy.estimatePartialMove. Returns (from, to, amount)"""
+    lowest, lowest_apr, highest, _ = estimate_adjust_position(lenders, loose)
+    # no lender with assets leaves lowest_apr at MAX_UINT and the nav at 0
+    lowest_nav = lenders[lowest].nav if lowest_apr != MAX_UINT else 0
+    if lowest == highest or lowest_nav == 0:
+        return lowest, highest, 0
+
+    def pays(amount):
+        donor_rate = water_fill_rate(lenders[lowest], lowest_nav, lowest_apr, lowest_nav - amount)
+        return lenders[highest].apr_after_deposit(loose + amount) >= donor_rate
+
+    if pays(lowest_nav):
+        return lowest, highest, lowest_nav
+
+    amount = 0
+    upper = lowest_nav
+    for _ in range(steps):
+        middle = (amount + upper) // 2
+        if pays(middle):
+            amount = middle
+        else:
+            upper = middle
+    return lowest, highest, amount
+
+
+def partial_move(lenders, loose, steps, threshold=0, keep=0):
+    """
+    One adjustPosition in PARTIAL_MOVE mode. Mutates the lenders and returns the
+    amount of want that was moved out of a lender. Up to `keep` stays loose, the idle buffer
+    """
+    source, target, amount = estimate_partial_move(lenders, loose, steps)
+    moved = 0
+    if amount > 0 and amount >= threshold:
+        if amount == lenders[source].nav:
+            moved = lenders[source].withdraw_all()
+        else:
+            moved = lenders[source].withdraw(amount)
+        loose += moved
+    if loose > keep:
+        lenders[target].deposit(loose - keep)
+    return moved
+
+
+def weighted_apr(lenders, loose=0):
+    """Strategy.estimatedAPR: sum(nav * apr) / total assets"""
+    total = loose + sum(lender.nav for lender in lenders)
+    if total == 0:
+        return 0
+    return sum(lender.nav * lender.apr() for lender in lenders) // total
+
+
+def converge(lenders, loose, mode, chunks=20, max_steps=50, bisections=20):
+    """
+    Runs adjustPosition until it stops moving funds. Returns the number of
+    adjustPosition calls that moved funds, the total want moved and the final apr.
+    chunks is waterFillChunks and bisections partialMoveSteps
+    """
+    steps = 0
+    moved = 0
+    for _ in range(max_steps):
+        before = [lender.nav for lender in lenders]
+        if mode == WATER_FILL:
+            moved += water_fill(lenders, loose, chunks)
+        elif mode == PARTIAL_MOVE:
+            moved += partial_move(lenders, loose, bisections)
+        else:
+            moved += bubble_sort(lenders, loose)
+        loose = 0
+        if [lender.nav for lender in lenders] == before:
+            break
+        steps += 1
+    return {"steps": steps, "moved": moved, "apr": weighted_apr(lenders)}
+
+
+def compare(make_lenders, loose, chunks=20, max_steps=50, bisections=20):
+    """
+    Runs every algorithm from the same starting point. make_lenders must return a
+    fresh list of lenders on every call
+    """
+    return {
+        "bubble_sort": converge(make_lenders(), loose, BUBBLE_SORT, chunks, max_steps),
+        "water_fill": converge(make_lenders(), loose, WATER_FILL, chunks, max_steps),
+        "partial_move": converge(make_lenders(), loose, PARTIAL_MOVE, chunks, max_steps, bisections),
+    }
+
+
+def main():
+    from brownie import Strategy, interface
+
+    strategy = Strategy.at(os.environ["STRATEGY"])
+    want = interface.ERC20(strategy.want())
+    decimals = want.decimals()
+    loose = want.balanceOf(strategy)
+    lenders = [ChainLender(interface.IGenericLender(strategy.lenders(i))) for i in range(strategy.numLenders())]
+
+    chunks = strategy.waterFillChunks() or 20
+    targets, navs, chunk = estimate_water_fill(lenders, loose, chunks)
+    print(f"\n----water fill plan for {strategy.address}. {chunks} chunks of {chunk / 10 ** decimals:.2f}----")
+    for lender, nav, target in zip(lenders, navs, targets):
+        print(f"{lender.name}: {nav / 10 ** decimals:.2f} -> {target / 10 ** decimals:.2f}")
+
+    if strategy.waterFillChunks() > 0:
+        on_chain = strategy.estimateWaterFill()
+        print("Matches strategy.estimateWaterFill():", list(on_chain[0]) == targets)
+
+    lowest, lowestApr, highest, potential = estimate_adjust_position(lenders, loose)
+    print("\n----bubble sort step----")
+    if potential > lowestApr:
+        print(f"moves {lenders[lowest].name} ({lowestApr / 1e16:.3f}%) to {lenders[highest].name} ({potential / 1e16:.3f}%)")
+    else:
+        print(f"deposits loose want into {lenders[highest].name}")
+
+    source, target, amount = estimate_partial_move(lenders, loose, strategy.partialMoveSteps() or 20)
+    print("\n----partial move step----")
+    if amount > 0:
+        print(f"moves {amount / 10 ** decimals:.2f} of {lenders[source].name} to {lenders[target].name}")
+    else:
+        print(f"deposits loose want into {lenders[target].name}")
@@ -0,0 +1,190 @@
+"""
+Gas of the strategy paths that loop over the lenders, with 1 to 10 MockLender plugins.
+
+Runs on a plain local chain, no fork needed:
+
+    brownie run benchmark --network development
+
+For every number of lenders a fresh vault and strategy are deployed and the gas of harvest,
+tend, manualAllocation, a 10% manualRebalance, a vault withdrawal that goes through _withdrawSome, estimatedAPR and
+lendStatuses is recorded. The results are written to $GAS_OUTPUT (gas-benchmark.json). If
+$GAS_BASELINE points to an earlier output, every measurement more than $GAS_THRESHOLD percent
+(default 5) above it is reported and the script fails.
+
+Large exits are also checked for success: with every other lender only able to pay out half of
+its assets, vault withdrawals of up to 70% have to be paid in full, since the strategy holds
+enough liquidity for them. The script fails if any of them comes back short.
+
+lender_gas measures a plugin built on GenericLenderCloneBase: the gas of its deployment and of
+the views the strategy calls on it. tests/Local compares a lender deployed with the constructor
+to one of its clones with it.
+"""
+import json
+import os
+
+E = 10 ** 18
+DEPOSIT = 1_000_000 * E
+MAX_UINT = 2 ** 256 - 1
+
+OPERATIONS = ["harvest", "tend", "manualAllocation", "manualRebalance", "withdraw", "estimatedAPR", "lendStatuses"]
+# share of the remaining vault shares each withdrawal of the success check takes, in percent
+WITHDRAWALS = [30, 50, 70, 70]
+# lender views the strategy calls in its loops
+LENDER_CALLS = ["nav", "apr", "weightedApr", "hasAssets", "availableLiquidity"]
+
+
+def deploy(n, Vault, Strategy, MockLender, MockERC20, EthToEthOracle, gov, user):
+    # the same setup as tests/Mock/conftest.py. apr of lender i is (2 + i)% on 10m of external supply
+    want = gov.deploy(MockERC20, "Mock USD", "mUSD", 18)
+    vault = Vault.deploy({"from": gov})
+    vault.initialize(want, gov, gov, "", "", {"from": gov})
+    vault.setDepositLimit(MAX_UINT, {"from": gov})
+    vault.setManagementFee(0, {"from": gov})
+
+    strategy = gov.deploy(Strategy, vault)
+    strategy.setPriceOracle(gov.deploy(EthToEthOracle), {"from": gov})
+    strategy.setWithdrawalThreshold(0, {"from": gov})
+    vault.addStrategy(strategy, 10_000, 0, MAX_UINT, 1_000, {"from": gov})
+
+    lenders = []
+    for i in range(n):
+        plugin = gov.deploy(MockLender, strategy, f"Mock{i}", 10 * DEPOSIT * (2 + i) // 100, 10 * DEPOSIT)
+        strategy.addLender(plugin, {"from": gov})
+        lenders.append(plugin)
+
+    want.mint(user, 10 * DEPOSIT, {"from": user})
+    want.approve(vault, MAX_UINT, {"from": user})
+    vault.deposit(DEPOSIT, {"from": user})
+    return want, vault, strategy, lenders
+
+
+def equal_shares(lenders):
+    share = 1000 // len(lenders)
+    positions = [[p.address, share] for p in lenders]
+    positions[-1][1] += 1000 - share * len(lenders)
+    return positions
+
+
+def spread(strategy, lenders, gov):
+    # an equal share in every lender, the worst case for the loops
+    return strategy.manualAllocation(equal_shares(lenders), {"from": gov})
+
+
+def shift(strategy, lenders, gov):
+    # 10% of the assets from the first lender to the last
+    positions = equal_shares(lenders)
+    moved = min(100, positions[0][1]) if len(lenders) > 1 else 0
+    positions[0][1] -= moved
+    positions[-1][1] += moved
+    return strategy.manualRebalance(positions, {"from": gov})
+
+
+def measure(n, Vault, Strategy, MockLender, MockERC20, EthToEthOracle, gov, user):
+    """gas of every operation with n lenders"""
+    want, vault, strategy, lenders = deploy(n, Vault, Strategy, MockLender, MockERC20, EthToEthOracle, gov, user)
+    gas = {}
+
+    strategy.harvest({"from": gov})
+    gas["manualAllocation"] = spread(strategy, lenders, gov).gas_used
+    gas["manualRebalance"] = shift(strategy, lenders, gov).gas_used
+    gas["estimatedAPR"] = strategy.estimatedAPR.estimate_gas()
+    gas["lendStatuses"] = strategy.lendStatuses.estimate_gas()
+
+    # 1% of profit in the first lender
+    want.mint(lenders[0], DEPOSIT // 100, {"from": user})
+    gas["harvest"] = strategy.harvest({"from": gov}).gas_used
+
+    spread(strategy, lenders, gov)
+    gas["tend"] = strategy.tend({"from": gov}).gas_used
+
+    # takes from most of the lenders
+    spread(strategy, lenders, gov)
+    gas["withdraw"] = vault.withdraw(vault.balanceOf(user) * 8 // 10, {"from": user}).gas_used
+
+    return {op: gas[op] for op in OPERATIONS}
+
+
+def run(Vault, Strategy, MockLender, MockERC20, EthToEthOracle, gov, user, counts=range(1, 11)):
+    return {str(n): measure(n, Vault, Strategy, MockLender, MockERC20, EthToEthOracle, gov, user) for n in counts}
+
+
+def withdrawal_success(n, Vault, Strategy, MockLender, MockERC20, EthToEthOracle, gov, user):
+    """percentage of WITHDRAWALS paid in full with n lenders, every other one only able to pay half its assets"""
+    want, vault, strategy, lenders = deploy(n, Vault, Strategy, MockLender, MockERC20, EthToEthOracle, gov, user)
+    strategy.harvest({"from": gov})
+
+    paid = 0
+    for percent in WITHDRAWALS:
+        for p in lenders:
+            p.setLiquidity(MAX_UINT, {"from": gov})
+        spread(strategy, lenders, gov)
+        for p in lenders[1::2]:
+            p.setLiquidity(p.nav() // 2, {"from": gov})
+
+        shares = vault.balanceOf(user) * percent // 100
+        expected = shares * vault.pricePerShare() // E
+        before = want.balanceOf(user)
+        vault.withdraw(shares, {"from": user})
+        paid += want.balanceOf(user) - before >= expected
+    return 100 * paid // len(WITHDRAWALS)
+
+
+def success(Vault, Strategy, MockLender, MockERC20, EthToEthOracle, gov, user, counts=range(1, 11)):
+    return {str(n): withdrawal_success(n, Vault, Strategy, MockLender, MockERC20, EthToEthOracle, gov, user) for n in counts}
+
+
+def lender_gas(lender, deploy_tx):
+    """gas of the transaction that deployed or cloned lender and of each of the LENDER_CALLS on it"""
+    gas = {"deploy": deploy_tx.gas_used}
+    for name in LENDER_CALLS:
+        gas[name] = getattr(lender, name).estimate_gas()
+    return gas
+
+
+def regressions(results, baseline, threshold=5):
+    """(lenders, operation, baseline gas, gas) of every measurement more than threshold% over the baseline"""
+    found = []
+    for n, ops in results.items():
+        for op, used in ops.items():
+            before = baseline.get(n, {}).get(op)
+            if before is not None and used * 100 > before * (100 + threshold):
+                found.append((n, op, before, used))
+    return found
+
+
+def main():
+    from brownie import EthToEthOracle, MockERC20, MockLender, Strategy, accounts, config, project
+
+    Vault = project.load(config["dependencies"][0]).Vault
+    results = run(Vault, Strategy, MockLender, MockERC20, EthToEthOracle, accounts[0], accounts[1])
+
+    print(f"\n{'lenders':>7} " + " ".join(f"{op:>16}" for op in OPERATIONS))
+    for n, ops in results.items():
+        print(f"{n:>7} " + " ".join(f"{ops[op]:>16}" for op in OPERATIONS))
+    first, last = results["1"], results[str(len(results))]
+    print(f"{'/lender':>7} " + " ".join(f"{(last[op] - first[op]) // max(len(results) - 1, 1):>16}" for op in OPERATIONS))
+
+    rates = success(Vault, Strategy, MockLender, MockERC20, EthToEthOracle, accounts[0], accounts[1])
+    print(f"\n{'lenders':>7} {'withdrawals paid in full':>26}")
+    for n, rate in rates.items():
+        print(f"{n:>7} {rate:>25}%")
+
+    output = os.environ.get("GAS_OUTPUT", "gas-benchmark.json")
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nwritten to {output}")
+
+    if "GAS_BASELINE" in os.environ:
+        with open(os.environ["GAS_BASELINE"]) as f:
+            baseline = json.load(f)
+        threshold = float(os.environ.get("GAS_THRESHOLD", 5))
+        found = regressions(results, baseline, threshold)
+        for n, op, before, used in found:
+            print(f"REGRESSION {op} with {n} lenders: {before} -> {used} (+{(used - before) * 100 / before:.1f}%)")
+        if found:
+            raise SystemExit(f"{len(found)} gas regressions over {threshold}%")
+        print(f"no regressions over {threshold}% against {os.environ['GAS_BASELINE']}")
+
+    short = [n for n, rate in rates.items() if rate < 100]
+    if short:
+        raise SystemExit(f"withdrawals came back short with {', '.join(short)} lenders")
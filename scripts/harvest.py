@@ -18,7 +18,7 @@ dev = acct
 #rewards = "0x89716Ad7EDC3be3B35695789C475F3e7A3Deb12a"
 #registry = Contract("0x727fe1759430df13655ddb0731dE0D0FDE929b04")
 #vault = Vault.at("0x27cbf0fddb356a2d1EBdef604Cfa90F8f300d34E")
-strategy = OptStrategy.at("0x2e98053f4A1b2595bfaA4d0Ad0a450F8DEb8BBCC") #None
+strategy = OptStrategy.at("0x2e98053f4A1b2595bfaA4d0Ad0a450F8DEb8BBCC")
 
 param = { "from": acct}
 
@@ -39,7 +39,26 @@ def harvest_plugin():
 
     print(f"Harvested plug in")
 
-def main():
+
+# rough gas a plugin harvest takes, the plugins weigh their rewards against it
+PLUGIN_HARVEST_GAS = 1_000_000
+
+# only for a strategy deployed with harvestLenders, the OptStrategy above predates it
+def harvest_plugins(strategy_address):
+
+    print("Harvesting the plugins that are due...")
+    lender_strategy = OptStrategy.at(strategy_address)
+    call_cost = PLUGIN_HARVEST_GAS * web3.eth.gas_price
+    if not lender_strategy.harvestLendersTrigger(call_cost):
+        print("No plugin is due")
+        return
+
+    tx = lender_strategy.harvestLenders(call_cost, param)
+
+    print(f"Harvested {tx.return_value} plug ins")
+
+# brownie run harvest main [strategy]: with a strategy address its due plugins are harvested through harvestLenders
+def main(strategy_address=None):
     #print(project.load(yearnDep))
     #global dev
     #dev = accounts.load(click.prompt("Account", type=click.Choice(accounts.load())))
@@ -47,5 +66,8 @@ def main():
 
     print("Cloning Vault")
     #clone_vault()
-    harvest_plugin()
+    if strategy_address is None:
+        harvest_plugin()
+    else:
+        harvest_plugins(strategy_address)
     harvest_lender()
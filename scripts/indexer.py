@@ -0,0 +1,317 @@
+"""
+Incremental index of the vault, strategy and lender plugin events in a local sqlite file.
+
+Fleet-wide questions (profit of every strategy, realized aprs, which lenders got harvested when)
+are answered from disk instead of asking the chain through brownie every time. The index is
+append-only: eth_getLogs is asked for the blocks past the checkpoint, `step` blocks at a time, and
+each range is written in one transaction together with the new checkpoint. A run that stops
+halfway picks up where it left off and never stores a range twice.
+
+    StrategyReported   a tracked vault's report of one of its strategies
+    Harvested          strategy harvest
+    LenderHarvested    strategy harvesting one of its lenders (harvestLenders)
+    Cloned             strategy or lender clone
+
+Only the given vaults, strategies and lenders are scanned at first. A strategy reporting to a
+tracked vault and the clones of tracked strategies and lenders are tracked from that block on,
+their earlier events in the same range are picked up with one more eth_getLogs. Every address
+keeps the block it is tracked from and the last block it was scanned up to. One tracked after
+the checkpoint (a new INDEX_STRATEGIES entry) is scanned from its deployment block up to the
+checkpoint before the index moves on, so its history is not missing.
+
+    INDEX_VAULTS=0x... INDEX_STRATEGIES=0x...,0x... python -m scripts.indexer
+
+INDEX_RPC is the node (http://127.0.0.1:8545), INDEX_DB the sqlite file (index.sqlite) and
+INDEX_CONFIRMATIONS how many blocks to stay behind the head (12).
+"""
+import json
+import os
+import sqlite3
+import urllib.request
+from typing import Callable, Dict, List, NamedTuple
+
+from eth_utils import event_signature_to_log_topic, to_checksum_address
+
+SECONDS_PER_YEAR = 365 * 86400
+
+
+class Event(NamedTuple):
+    table: str
+    signature: str
+    # names of the indexed arguments, then of the data words. every argument is one word
+    indexed: tuple
+    data: tuple
+
+    @property
+    def topic(self):
+        return "0x" + event_signature_to_log_topic(self.signature).hex()
+
+
+ADDRESS_ARGS = {"strategy", "clone", "lender"}
+
+EVENTS = [
+    Event(
+        "reports",
+        "StrategyReported(address,uint256,uint256,uint256,uint256,uint256,uint256,uint256,uint256)",
+        ("strategy",),
+        ("gain", "loss", "debt_paid", "total_gain", "total_loss", "total_debt", "debt_added", "debt_ratio"),
+    ),
+    Event("harvests", "Harvested(uint256,uint256,uint256,uint256)", (), ("profit", "loss", "debt_payment", "debt_outstanding")),
+    Event("lender_harvests", "LenderHarvested(address)", ("lender",), ()),
+    Event("clones", "Cloned(address)", ("clone",), ()),
+]
+BY_TOPIC = {event.topic: event for event in EVENTS}
+
+
+class RpcError(Exception):
+    pass
+
+
+def rpc(url):
+    """A call(method, params) for the JSON-RPC node at url"""
+
+    def call(method, params):
+        payload = {"jsonrpc": "2.0", "id": 1, "method": method, "params": params}
+        request = urllib.request.Request(url, json.dumps(payload).encode(), {"Content-Type": "application/json"})
+        with urllib.request.urlopen(request, timeout=60) as response:
+            answer = json.loads(response.read())
+        if "error" in answer:
+            raise RpcError(answer["error"].get("message", answer["error"]))
+        return answer["result"]
+
+    return call
+
+
+def decode(log):
+    """(event, row) of a raw log, None for a log that is not indexed"""
+    event = BY_TOPIC.get(log["topics"][0]) if log["topics"] else None
+    if event is None or len(log["topics"]) != len(event.indexed) + 1:
+        return None
+
+    data = log["data"][2:]
+    words = [data[i * 64 : (i + 1) * 64] for i in range(len(event.data))]
+    row = {
+        "block": int(log["blockNumber"], 16),
+        "log_index": int(log["logIndex"], 16),
+        "tx": log["transactionHash"],
+        "address": to_checksum_address(log["address"]),
+    }
+    for name, topic in zip(event.indexed, log["topics"][1:]):
+        row[name] = to_checksum_address("0x" + topic[-40:]) if name in ADDRESS_ARGS else str(int(topic, 16))
+    for name, word in zip(event.data, words):
+        # uint256 does not fit a sqlite integer, amounts are stored as decimal text
+        row[name] = str(int(word, 16))
+    return event, row
+
+
+class Store:
+    """The sqlite file: a table per event, the block timestamps, the tracked addresses and the checkpoint"""
+
+    def __init__(self, path):
+        self.db = sqlite3.connect(path)
+        for event in EVENTS:
+            columns = ", ".join(f"{name} TEXT" for name in event.indexed + event.data)
+            columns = f"block INTEGER, log_index INTEGER, tx TEXT, address TEXT{', ' if columns else ''}{columns}"
+            self.db.execute(f"CREATE TABLE IF NOT EXISTS {event.table} ({columns}, PRIMARY KEY (block, log_index))")
+        self.db.execute("CREATE TABLE IF NOT EXISTS blocks (number INTEGER PRIMARY KEY, timestamp INTEGER)")
+        self.db.execute("CREATE TABLE IF NOT EXISTS addresses (address TEXT PRIMARY KEY, first_block INTEGER, scanned INTEGER)")
+        self.db.execute("CREATE TABLE IF NOT EXISTS checkpoint (id INTEGER PRIMARY KEY CHECK (id = 0), block INTEGER)")
+        if "scanned" not in [column[1] for column in self.db.execute("PRAGMA table_info(addresses)")]:
+            # an index from before the column, everything in it was scanned up to the checkpoint
+            self.db.execute("ALTER TABLE addresses ADD COLUMN scanned INTEGER")
+            self.db.execute("UPDATE addresses SET scanned = (SELECT block FROM checkpoint)")
+        self.db.commit()
+
+    @property
+    def checkpoint(self):
+        """last block indexed, None before the first run"""
+        row = self.db.execute("SELECT block FROM checkpoint").fetchone()
+        return None if row is None else row[0]
+
+    def addresses(self):
+        return {address: block for address, block in self.db.execute("SELECT address, first_block FROM addresses")}
+
+    def behind(self):
+        """{address: next block to scan} of the addresses not scanned up to the checkpoint yet"""
+        query = """
+            SELECT address, COALESCE(scanned + 1, first_block) AS next FROM addresses, checkpoint
+            WHERE next <= checkpoint.block
+        """
+        return dict(self.db.execute(query))
+
+    def track(self, addresses, block):
+        self.db.executemany(
+            "INSERT OR IGNORE INTO addresses VALUES (?, ?, NULL)", [(to_checksum_address(a), block) for a in addresses]
+        )
+        self.db.commit()
+
+    def append(self, rows, timestamps, addresses, scanned, end, checkpoint):
+        """writes one indexed range in a single transaction: its events, the addresses found in it, the
+        addresses scanned up to end and the checkpoint"""
+        with self.db:
+            for event, row in rows:
+                names = list(row)
+                self.db.execute(
+                    f"INSERT OR IGNORE INTO {event.table} ({', '.join(names)}) VALUES ({', '.join('?' * len(names))})",
+                    [row[name] for name in names],
+                )
+            self.db.executemany("INSERT OR IGNORE INTO blocks VALUES (?, ?)", timestamps.items())
+            self.db.executemany("INSERT OR IGNORE INTO addresses VALUES (?, ?, NULL)", addresses.items())
+            self.db.executemany(
+                "UPDATE addresses SET scanned = MAX(COALESCE(scanned, -1), ?) WHERE address = ?",
+                [(end, address) for address in list(scanned) + list(addresses)],
+            )
+            self.db.execute("INSERT OR REPLACE INTO checkpoint VALUES (0, ?)", (checkpoint,))
+
+    def close(self):
+        self.db.close()
+
+
+class Indexer:
+    """Indexes the events of the tracked addresses from the checkpoint up to a block"""
+
+    def __init__(self, call: Callable, store: Store, step=2_000, confirmations=0):
+        self.call = call
+        self.store = store
+        self.step = step
+        self.confirmations = confirmations
+
+    def run(self, start=0, end=None):
+        """indexes up to end (the head less the confirmations by default), returns the last block indexed"""
+        head = int(self.call("eth_blockNumber", []), 16) - self.confirmations
+        end = head if end is None else min(end, head)
+        self.backfill()
+        checkpoint = self.store.checkpoint
+        block = start if checkpoint is None else checkpoint + 1
+
+        while block <= end:
+            last = min(block + self.step - 1, end)
+            self.index_range(block, last)
+            block = last + 1
+        return self.store.checkpoint
+
+    def track(self, addresses, start=0):
+        """tracks addresses from their deployment block, from start when it can not be found"""
+        head = int(self.call("eth_blockNumber", []), 16)
+        tracked = self.store.addresses()
+        for address in addresses:
+            if to_checksum_address(address) not in tracked:
+                deployed = self.deployment_block(address, head)
+                self.store.track([address], start if deployed is None else deployed)
+
+    def deployment_block(self, address, head):
+        """first block address has code at, None when it has none at head"""
+        if self._code(address, head) == "0x":
+            return None
+        low, high = 0, head
+        while low < high:
+            middle = (low + high) // 2
+            if self._code(address, middle) == "0x":
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def backfill(self):
+        """scans the addresses tracked since the checkpoint up to it, `step` blocks at a time"""
+        behind = self.store.behind()
+        while behind:
+            start = min(behind.values())
+            end = min(start + self.step - 1, self.store.checkpoint)
+            self.index_range(start, end, [address for address, block in behind.items() if block <= end])
+            behind = self.store.behind()
+
+    def index_range(self, start, end, addresses=None):
+        """indexes the events of addresses (every tracked one) from start to end. only a range of every
+        tracked address moves the checkpoint"""
+        tracked = self.store.addresses()
+        scanned = list(tracked) if addresses is None else addresses
+        found = {}
+        logs = self._logs(scanned, start, end)
+        new = self._discover(logs, tracked, found)
+        while new:
+            # the events of a new address from the block it was found at, on to the end of the range
+            logs += self._logs(list(new), min(new.values()), end)
+            new = self._discover(logs, tracked, found)
+
+        rows = sorted(filter(None, map(decode, logs)), key=lambda item: (item[1]["block"], item[1]["log_index"]))
+        timestamps = {number: self._timestamp(number) for number in sorted({row["block"] for _, row in rows})}
+        self.store.append(rows, timestamps, found, scanned, end, end if addresses is None else self.store.checkpoint)
+
+    def _discover(self, logs, tracked, found):
+        """addresses the logs add to the tracked ones"""
+        new = {}
+        for item in filter(None, map(decode, logs)):
+            event, row = item
+            if event.table == "clones":
+                address = row["clone"]
+            elif event.table == "reports":
+                address = row["strategy"]
+            else:
+                continue
+            if address not in tracked and address not in found:
+                new[address] = min(new.get(address, row["block"]), row["block"])
+        found.update(new)
+        return new
+
+    def _logs(self, addresses, start, end):
+        if not addresses:
+            return []
+        try:
+            return self.call(
+                "eth_getLogs",
+                [{"address": addresses, "fromBlock": hex(start), "toBlock": hex(end), "topics": [[e.topic for e in EVENTS]]}],
+            )
+        except RpcError:
+            # too many results for the node. halve the range until it answers
+            if start == end:
+                raise
+            middle = (start + end) // 2
+            return self._logs(addresses, start, middle) + self._logs(addresses, middle + 1, end)
+
+    def _code(self, address, number):
+        return self.call("eth_getCode", [address, hex(number)])
+
+    def _timestamp(self, number):
+        return int(self.call("eth_getBlockByNumber", [hex(number), False])["timestamp"], 16)
+
+
+def profits(store: Store) -> Dict[str, float]:
+    """gain less loss every strategy reported, in want"""
+    query = "SELECT strategy, SUM(CAST(gain AS REAL)) - SUM(CAST(loss AS REAL)) FROM reports GROUP BY strategy"
+    return dict(store.db.execute(query))
+
+
+def aprs(store: Store, strategy) -> List[tuple]:
+    """(block, apr) of every report of strategy after its first, on the debt it had since the report before"""
+    query = """
+        SELECT block, (CAST(gain AS REAL) - CAST(loss AS REAL)) / previous_debt * ? / (timestamp - previous_timestamp)
+        FROM (
+            SELECT r.block, r.log_index, r.gain, r.loss, b.timestamp,
+                LAG(CAST(r.total_debt AS REAL)) OVER w AS previous_debt,
+                LAG(b.timestamp) OVER w AS previous_timestamp
+            FROM reports r JOIN blocks b ON b.number = r.block
+            WHERE r.strategy = ?
+            WINDOW w AS (ORDER BY r.block, r.log_index)
+        )
+        WHERE previous_debt > 0 AND timestamp > previous_timestamp
+        ORDER BY block, log_index
+    """
+    return list(store.db.execute(query, (SECONDS_PER_YEAR, to_checksum_address(strategy))))
+
+
+def main():
+    call = rpc(os.environ.get("INDEX_RPC", "http://127.0.0.1:8545"))
+    store = Store(os.environ.get("INDEX_DB", "index.sqlite"))
+    addresses = [a for name in ["INDEX_VAULTS", "INDEX_STRATEGIES", "INDEX_LENDERS"] for a in os.environ.get(name, "").split(",") if a]
+    indexer = Indexer(call, store, step=int(os.environ.get("INDEX_STEP", 2_000)), confirmations=int(os.environ.get("INDEX_CONFIRMATIONS", 12)))
+    indexer.track(addresses, int(os.environ.get("INDEX_START", 0)))
+    last = indexer.run(start=int(os.environ.get("INDEX_START", 0)))
+    print(f"indexed up to block {last}, {len(store.addresses())} addresses tracked")
+    for strategy, profit in sorted(profits(store).items(), key=lambda item: -item[1]):
+        print(f"{strategy} {profit:.6g}")
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+"""
+Keeper for many Strategy/OptStrategy/FtmStrategy instances and their lender plugins.
+
+Every strategy is checked on its own cadence. A check reads harvestTrigger, tendTrigger and
+lendStatuses of the strategy and then harvestTrigger(callCost) of each of its plugins, all
+concurrently, and queues whatever is due. A plugin harvest is queued before the strategy
+harvest so its proceeds are in the report. One send loop per account hands out the nonces,
+so transactions go out back to back without waiting for the previous one to be mined.
+
+    KEEPER_CONFIG=keeper.yml brownie run keeper --network optimism-main
+
+with one section per network:
+
+    optimism-main:
+      account: keeper       # brownie account id
+      callGas: 1000000      # gas a call is priced at for the triggers
+      strategies:
+        - address: "0x2e98053f4A1b2595bfaA4d0Ad0a450F8DEb8BBCC"
+          cadence: 3600     # seconds between checks
+
+brownie is connected to one network at a time, so run one process per chain. Keeper itself
+only needs an eth_call and a sender, several of them can share an event loop.
+"""
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple, Optional
+
+from eth_utils import to_checksum_address
+
+from .snapshot import LEND_STATUSES, Call, web3_call
+
+
+class Job:
+    """A strategy checked every `cadence` seconds"""
+
+    def __init__(self, strategy, cadence=3600):
+        self.strategy = to_checksum_address(str(strategy))
+        self.cadence = cadence
+        self.next_check = 0
+
+
+class Action(NamedTuple):
+    target: str
+    signature: str
+
+
+class Result(NamedTuple):
+    action: Action
+    tx: object
+    success: bool
+    error: Optional[str]
+
+
+class BrownieSender:
+    """Sends from a brownie account with the nonce it is given, without waiting for the receipt"""
+
+    def __init__(self, account, gas_price=None):
+        self.account = account
+        self.gas_price = gas_price
+
+    def nonce(self):
+        from brownie import web3
+
+        return web3.eth.get_transaction_count(self.account.address, "pending")
+
+    def send(self, to, data, nonce):
+        return self.account.transfer(to, 0, data=data, nonce=nonce, gas_price=self.gas_price, required_confs=0, silent=True)
+
+    def wait(self, tx):
+        tx.wait(1)
+        return tx.status == 1
+
+
+class Keeper:
+    def __init__(self, eth_call, sender, jobs, call_cost, workers=16):
+        self.eth_call = eth_call
+        self.sender = sender
+        self.jobs = jobs
+        # in wei, or a function returning it so it follows the gas price
+        self.call_cost = call_cost
+        self.executor = ThreadPoolExecutor(workers)
+        self.results = []
+        self.pending = {}
+        self.nonce = None
+        self.queue = None
+        self.loop = None
+
+    async def _run(self, fn, *args):
+        return await asyncio.get_event_loop().run_in_executor(self.executor, fn, *args)
+
+    async def _read(self, call):
+        try:
+            return call.decode(await self._run(self.eth_call, call.target, call.encode(), "latest"))
+        except ValueError:
+            # reverted. a plugin without harvestTrigger for example
+            return None
+
+    async def check(self, job):
+        """reads every trigger of the job's strategy and its plugins and queues the calls that are due"""
+        call_cost = self.call_cost() if callable(self.call_cost) else self.call_cost
+        harvest, tend, statuses = await asyncio.gather(
+            self._read(Call(job.strategy, "harvestTrigger(uint256)", (call_cost,), "bool")),
+            self._read(Call(job.strategy, "tendTrigger(uint256)", (call_cost,), "bool")),
+            self._read(Call(job.strategy, "lendStatuses()", (), LEND_STATUSES)),
+        )
+        plugins = [to_checksum_address(status[3]) for status in statuses or []]
+        triggers = await asyncio.gather(*[self._read(Call(p, "harvestTrigger(uint256)", (call_cost,), "bool")) for p in plugins])
+
+        actions = [Action(plugin, "harvest()") for plugin, due in zip(plugins, triggers) if due]
+        # tendTrigger is false when harvestTrigger is true
+        if harvest:
+            actions.append(Action(job.strategy, "harvest()"))
+        elif tend:
+            actions.append(Action(job.strategy, "tend()"))
+        return [self.submit(action) for action in actions]
+
+    def submit(self, action):
+        """queues a transaction unless the same one is still pending. returns a future of its Result"""
+        if action in self.pending:
+            return self.pending[action]
+        loop = asyncio.get_event_loop()
+        if self.loop is not loop:
+            # first transaction in this event loop. the account may have sent others since the last one
+            self.loop, self.queue, self.nonce = loop, asyncio.Queue(), None
+            loop.create_task(self._send_loop())
+        future = loop.create_future()
+        self.pending[action] = future
+        self.queue.put_nowait(action)
+        return future
+
+    async def _send_loop(self):
+        while True:
+            action = await self.queue.get()
+            if self.nonce is None:
+                self.nonce = await self._run(self.sender.nonce)
+            data = Call(action.target, action.signature, (), "").encode()
+            try:
+                tx = await self._run(self.sender.send, action.target, data, self.nonce)
+            except Exception as e:
+                # not sent, or not sure it was. ask the chain for the nonce next time
+                self.nonce = None
+                self._done(Result(action, None, False, str(e)))
+                continue
+            self.nonce += 1
+            asyncio.ensure_future(self._confirm(action, tx))
+
+    async def _confirm(self, action, tx):
+        success = await self._run(self.sender.wait, tx)
+        self._done(Result(action, tx, success, None if success else "reverted"))
+
+    def _done(self, result):
+        self.results.append(result)
+        self.pending.pop(result.action).set_result(result)
+
+    async def step(self, now):
+        """checks every job due at `now`. returns the futures of the transactions it queued"""
+        due = [job for job in self.jobs if job.next_check <= now]
+        for job in due:
+            job.next_check = now + job.cadence
+        queued = await asyncio.gather(*[self.check(job) for job in due], return_exceptions=True)
+        futures = []
+        for job, result in zip(due, queued):
+            if isinstance(result, Exception):
+                print(f"{job.strategy}: check failed: {result!r}")
+            else:
+                futures += result
+        return futures
+
+    async def flush(self):
+        """waits until every queued transaction is mined"""
+        await asyncio.gather(*self.pending.values())
+
+    async def run(self, duration=None, clock=time.time):
+        if not self.jobs:
+            return
+        start = clock()
+        while duration is None or clock() < start + duration:
+            await self.step(clock())
+            wake = min(job.next_check for job in self.jobs)
+            if duration is not None:
+                wake = min(wake, start + duration)
+            await asyncio.sleep(max(wake - clock(), 0))
+        await self.flush()
+
+
+def main():
+    import yaml
+    from brownie import accounts, network, web3
+
+    with open(os.environ.get("KEEPER_CONFIG", "keeper.yml")) as f:
+        config = yaml.safe_load(f)[network.show_active()]
+
+    account = accounts.load(config["account"])
+    call_gas = config.get("callGas", 1_000_000)
+    jobs = [Job(s["address"], s.get("cadence", 3600)) for s in config.get("strategies") or []]
+    if not jobs:
+        print(f"No strategies to keep on {network.show_active()}")
+        return
+    keeper = Keeper(web3_call(web3), BrownieSender(account), jobs, lambda: web3.eth.gas_price * call_gas)
+
+    async def report():
+        reported = 0
+        while True:
+            for result in keeper.results[reported:]:
+                status = "ok" if result.success else f"failed ({result.error})"
+                print(f"{result.action.signature} on {result.action.target}: {status}")
+            reported = len(keeper.results)
+            await asyncio.sleep(1)
+
+    print(f"Keeping {len(jobs)} strategies on {network.show_active()} from {account.address}")
+    loop = asyncio.get_event_loop()
+    loop.create_task(report())
+    loop.run_until_complete(keeper.run())
@@ -0,0 +1,197 @@
+"""
+Runs the brownie test tree in parallel, one local chain per worker.
+
+The test directories need different forks, so modules are grouped by the network their
+directory runs on (NETWORKS) and every directory becomes a shard, split further when it has more
+than SHARD_MODULES modules. Each shard is a `brownie test` of its own, on a chain launched on its
+own port, so up to TEST_JOBS chains run side by side. Afterwards the junit reports of the shards
+are merged into one and so are their gas profiles.
+
+    TEST_JOBS=15 python -m scripts.shards tests/USDC tests/Mock tests/Opt
+
+The paths default to tests/. Reports and a log per shard go to TEST_REPORTS (reports/shards).
+Every fork a shard launches fetches its state from the upstream node again, so point the forks at
+a pinned scripts.fork_cache proxy to share those reads between shards and runs.
+"""
+import json
+import os
+import subprocess
+import sys
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from queue import Queue
+from typing import List, NamedTuple
+
+# network a test directory runs on, the longest matching prefix wins
+NETWORKS = {
+    "tests": "mainnet-fork",
+    "tests/Opt": "optimism-main-fork",
+    "tests/FTM": "ftm-main-fork",
+    "tests/AaveV3/V3": "ftm-main-fork",
+    "tests/AaveV3/V3Rewards": "avax-main-fork",
+    "tests/Mock": "development",
+    "tests/Local": "development",
+    "tests/Simulator": "development",
+    "tests/ForkCache": "development",
+    "tests/Indexer": "development",
+    "tests/Shards": "development",
+}
+BASE_PORT = 8600
+
+
+class Shard(NamedTuple):
+    network: str
+    modules: List[str]
+
+
+def network_for(module):
+    parts = Path(module).as_posix().split("/")
+    for i in range(len(parts), 0, -1):
+        prefix = "/".join(parts[:i])
+        if prefix in NETWORKS:
+            return NETWORKS[prefix]
+    return NETWORKS["tests"]
+
+
+def discover(paths):
+    """test modules under paths, in path order"""
+    modules = []
+    for path in map(Path, paths):
+        found = [path] if path.is_file() else sorted(path.rglob("test_*.py"))
+        modules += [m.as_posix() for m in found if m.as_posix() not in modules]
+    return modules
+
+
+def shard(modules, max_modules=4):
+    """a shard per directory and network, in chunks of max_modules, the largest first"""
+    directories = {}
+    for module in modules:
+        directories.setdefault((network_for(module), Path(module).parent.as_posix()), []).append(module)
+
+    shards = []
+    for (network, _), found in directories.items():
+        for i in range(0, len(found), max_modules):
+            shards.append(Shard(network, found[i : i + max_modules]))
+    return sorted(shards, key=lambda s: -len(s.modules))
+
+
+def merge_gas(profiles):
+    """gas profiles of several sessions as one, {contract: {function: {avg, high, low, count}}}"""
+    merged = {}
+    for profile in profiles:
+        for contract, functions in profile.items():
+            for fn, gas in functions.items():
+                if fn not in merged.setdefault(contract, {}):
+                    merged[contract][fn] = dict(gas)
+                    continue
+                total = merged[contract][fn]
+                count = total["count"] + gas["count"]
+                total["avg"] = (total["avg"] * total["count"] + gas["avg"] * gas["count"]) // count
+                total["high"] = max(total["high"], gas["high"])
+                total["low"] = min(total["low"], gas["low"])
+                total["count"] = count
+    return merged
+
+
+def merge_junit(reports, output):
+    """the test suites of several junit reports in one <testsuites>, returns its totals"""
+    merged = ET.Element("testsuites")
+    totals = {"tests": 0, "failures": 0, "errors": 0, "skipped": 0}
+    for report in reports:
+        root = ET.parse(report).getroot()
+        for suite in [root] if root.tag == "testsuite" else root.findall("testsuite"):
+            merged.append(suite)
+            for key in totals:
+                totals[key] += int(suite.get(key, 0))
+    for key, value in totals.items():
+        merged.set(key, str(value))
+    ET.ElementTree(merged).write(output, encoding="utf-8", xml_declaration=True)
+    return totals
+
+
+def run_shard(index, shard, port, reports):
+    """runs one shard in a worker process, returns its exit code"""
+    spec = {
+        "network": shard.network,
+        "port": port,
+        "modules": shard.modules,
+        "junit": str(reports / f"shard-{index}.xml"),
+        "gas": str(reports / f"shard-{index}.gas.json"),
+    }
+    with open(reports / f"shard-{index}.log", "w") as log:
+        return subprocess.run(
+            [sys.executable, "-m", "scripts.shards", "--worker", json.dumps(spec)], stdout=log, stderr=subprocess.STDOUT
+        ).returncode
+
+
+def worker(spec):
+    """`brownie test` of a shard, with the chain of its network launched on the port of the worker"""
+    from brownie import history
+    from brownie._cli.__main__ import main as brownie
+    from brownie._config import CONFIG
+
+    CONFIG.networks[spec["network"]].setdefault("cmd_settings", {})["port"] = spec["port"]
+    sys.argv = ["brownie", "test", *spec["modules"], "--network", spec["network"], "--gas", "--junitxml", spec["junit"]]
+    try:
+        brownie()
+    finally:
+        with open(spec["gas"], "w") as f:
+            json.dump(history.gas_profile, f)
+
+
+def run(paths, jobs, reports, max_modules=4):
+    """runs the modules under paths in shards on `jobs` chains, returns [(shard, exit code, seconds)]"""
+    reports.mkdir(parents=True, exist_ok=True)
+    for stale in reports.glob("shard-*"):
+        stale.unlink()
+    shards = shard(discover(paths), max_modules)
+    ports = Queue()
+    for i in range(jobs):
+        ports.put(BASE_PORT + i)
+
+    def execute(item):
+        index, s = item
+        port = ports.get()
+        start = time.time()
+        try:
+            code = run_shard(index, s, port, reports)
+        finally:
+            ports.put(port)
+        print(f"shard {index} {s.network} {' '.join(s.modules)}: {'ok' if code == 0 else f'exit {code}'} in {time.time() - start:.0f}s")
+        return s, code, time.time() - start
+
+    with ThreadPoolExecutor(jobs) as pool:
+        return list(pool.map(execute, enumerate(shards)))
+
+
+def main():
+    paths = sys.argv[1:] or ["tests"]
+    reports = Path(os.environ.get("TEST_REPORTS", "reports/shards"))
+    jobs = int(os.environ.get("TEST_JOBS", os.cpu_count()))
+    results = run(paths, jobs, reports, int(os.environ.get("SHARD_MODULES", 4)))
+
+    junit = sorted(str(p) for p in reports.glob("shard-*.xml"))
+    totals = merge_junit(junit, reports / "junit.xml")
+    profiles = []
+    for path in reports.glob("shard-*.gas.json"):
+        with open(path) as f:
+            profiles.append(json.load(f))
+    with open(reports / "gas.json", "w") as f:
+        json.dump(merge_gas(profiles), f, indent=2)
+
+    failed = [s for s, code, _ in results if code != 0]
+    print(
+        f"\n{len(results)} shards, {totals['tests']} tests, {totals['failures']} failures, "
+        f"{totals['errors']} errors, {totals['skipped']} skipped. reports in {reports}"
+    )
+    if failed:
+        raise SystemExit(f"{len(failed)} shards failed")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--worker"]:
+        worker(json.loads(sys.argv[2]))
+    else:
+        main()
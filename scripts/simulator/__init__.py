@@ -0,0 +1,13 @@
+from .engine import grid, simulate
+from .lenders import AaveLender, AaveV3Lender, AlphaHomoLender, CompoundLender, CompoundV3Lender, DyDxLender, LenderModel
+from .rates import (
+    AaveV2RateStrategy,
+    AaveV3RateStrategy,
+    CometRates,
+    DoubleExponentInterestSetter,
+    JumpRateModel,
+    TripleSlopeModel,
+    UniswapV2Path,
+)
+from .strategy import StrategyModel
+from .vault import VaultModel
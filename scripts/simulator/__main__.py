@@ -0,0 +1,3 @@
+from .scenarios import main
+
+main()
@@ -0,0 +1,219 @@
+"""
+Backtest of the allocation policies over recorded market inputs.
+
+A recording is one snapshot per step of what the lender apr views read: cash, borrows,
+reserves and reserve factor of the cTokens, supply and borrow of a Comet (its utilization)
+and the reward speeds. Every step the simulator's keeper loop runs on the lender models as
+usual, then the recorded state of each market is put back before the triggers look at it,
+so the strategy's own deposits and withdrawals move the rates on top of the recorded market
+but never drift it away from history. Snapshots hold the markets without the strategy in
+them; the strategy's balance is added back to the pool fields it is part of.
+
+    BACKTEST_INPUT=usdc.jsonl python -m scripts.simulator.backtest
+
+A recording is a JSON line per snapshot: {"timestamp": ..., "flow": ..., "lenders": {name: {field: value}}}.
+flow is an optional vault deposit (> 0) or withdrawal (< 0) at that snapshot. A withdrawal
+goes through StrategyModel._withdraw_some, the ranked walk of Strategy._withdrawSome, so it
+comes out of the lenders the contract would take it from. Without an input a year of hourly
+snapshots of six synthetic USDC markets is generated.
+"""
+import json
+import os
+import random
+import time
+from bisect import bisect_right
+from typing import Dict, List, NamedTuple
+
+from scripts.allocation import BUBBLE_SORT, PARTIAL_MOVE, WATER_FILL
+
+from .engine import grid
+from .lenders import AaveLender, AaveV3Lender, AlphaHomoLender, CompoundLender, CompoundV3Lender, DyDxLender
+from .rates import RAY, WAD, AaveV3RateStrategy, JumpRateModel
+from .scenarios import USDC, usdc_lenders
+from .strategy import StrategyModel
+from .vault import VaultModel
+
+# the recorded fields of each lender model
+REPLAYED = {
+    CompoundLender: ("cash", "borrows", "reserves", "reserve_factor", "reward_rate", "reward_staked"),
+    CompoundV3Lender: ("total_supply", "total_borrow", "base_tracking_supply_speed", "reward_price"),
+    AaveLender: ("cash", "total_variable_debt", "total_stable_debt", "average_stable_borrow_rate", "reserve_factor", "market_borrow_rate", "emissions_per_second"),
+    AaveV3Lender: ("cash", "total_variable_debt", "total_stable_debt", "average_stable_borrow_rate", "unbacked", "reserve_factor", "emissions_per_second"),
+    DyDxLender: ("supply", "borrow"),
+    AlphaHomoLender: ("floating", "glb_debt", "total_eth"),
+}
+# pool fields the strategy's own balance is part of
+WITH_NAV = {"cash", "total_supply", "supply", "floating", "total_eth"}
+
+POLICIES = {"bubble sort": BUBBLE_SORT, "water fill": WATER_FILL, "partial move": PARTIAL_MOVE}
+
+
+class Snapshot(NamedTuple):
+    timestamp: int
+    lenders: Dict[str, Dict[str, int]]
+    flow: int = 0
+
+
+def replayed_fields(lender):
+    for cls in type(lender).__mro__:
+        if cls in REPLAYED:
+            return REPLAYED[cls]
+    raise ValueError(f"{lender.name} is not a replayable lender")
+
+
+def snapshot_of(lenders, timestamp, flow=0):
+    """the state of lender models as a Snapshot, the strategy's balance taken out"""
+    state = {}
+    for lender in lenders:
+        fields = {name: getattr(lender, name) for name in replayed_fields(lender)}
+        for name in WITH_NAV & set(fields):
+            fields[name] -= lender.nav
+        state[lender.name] = fields
+    return Snapshot(timestamp, state, flow)
+
+
+def load(path) -> List[Snapshot]:
+    with open(path) as f:
+        return [Snapshot(row["timestamp"], row["lenders"], row.get("flow", 0)) for row in map(json.loads, f) if row]
+
+
+def dump(snapshots, path):
+    with open(path, "w") as f:
+        for snapshot in snapshots:
+            f.write(json.dumps(snapshot._asdict()) + "\n")
+
+
+def replay(snapshots):
+    """
+    Scenario hook for simulate that puts the market of the last snapshot at or before now back
+    into the lenders and applies its flow, once per snapshot
+    """
+    timestamps = [snapshot.timestamp for snapshot in snapshots]
+    fields = {}
+    applied = [-1]
+
+    def scenario(now, strategy, vault):
+        i = bisect_right(timestamps, now) - 1
+        if i < 0 or i == applied[0]:
+            return
+        applied[0] = i
+        snapshot = snapshots[i]
+
+        for lender in strategy.lenders:
+            recorded = snapshot.lenders.get(lender.name)
+            if recorded is None:
+                continue
+            if lender.name not in fields:
+                fields[lender.name] = set(replayed_fields(lender))
+            for name, value in recorded.items():
+                if name not in fields[lender.name]:
+                    raise ValueError(f"{lender.name} does not replay {name}")
+                setattr(lender, name, value + lender.nav if name in WITH_NAV else value)
+            lender.timestamp = now
+
+        if snapshot.flow > 0:
+            vault.deposit(snapshot.flow)
+        elif snapshot.flow < 0:
+            vault.withdraw(min(-snapshot.flow, vault.total_assets()))
+
+    return scenario
+
+
+def backtest(snapshots, lenders, params, deposit, eth_to_want=lambda amount: amount, **kwargs):
+    """
+    Runs every combination of params (StrategyModel attribute name to list of values, like grid)
+    over the snapshots, which must be evenly spaced. lenders() returns fresh lender models named
+    like the recorded ones. kwargs go to simulate. Returns grid's (combination, result) list,
+    best net_apr first
+    """
+    start = snapshots[0].timestamp
+    step = snapshots[1].timestamp - start if len(snapshots) > 1 else 3600
+
+    def build():
+        # the sizes setAllocationMode is usually given, a combination can override them
+        strategy = StrategyModel(lenders(), withdrawal_threshold=0, water_fill_chunks=20, partial_move_steps=16, eth_to_want=eth_to_want)
+        vault = VaultModel()
+        vault.add_strategy(strategy, start)
+        replay(snapshots[:1])(start, strategy, vault)
+        vault.deposit(deposit)
+        strategy.harvest(start)
+        return strategy, vault
+
+    return grid(
+        build,
+        params,
+        scenario=lambda: replay(snapshots),
+        duration=snapshots[-1].timestamp - start,
+        step=step,
+        start=start,
+        **kwargs,
+    )
+
+
+def six_lenders():
+    compound, comet, aave, dydx = usdc_lenders()
+    cream = CompoundLender(
+        "GenericCream",
+        JumpRateModel.from_yearly(0, 7 * WAD // 100, 3 * WAD, kink=80 * WAD // 100),
+        cash=20_000_000 * USDC,
+        borrows=60_000_000 * USDC,
+        reserves=1_000_000 * USDC,
+        reserve_factor=15 * WAD // 100,
+    )
+    aave_op = AaveV3Lender(
+        "GenericAaveV3 OP",
+        AaveV3RateStrategy(90 * RAY // 100, 0, 4 * RAY // 100, 60 * RAY // 100),
+        cash=30_000_000 * USDC,
+        total_variable_debt=50_000_000 * USDC,
+        reserve_factor=1_000,
+        # 0.01 USDC of OP a second
+        emissions_per_second=10_000,
+    )
+    return [compound, comet, aave, dydx, cream, aave_op]
+
+
+def synthetic(lenders, duration=365 * 86400, step=3600, seed=0):
+    """hourly snapshots of markets whose borrowers come and go around where they started"""
+    rng = random.Random(seed)
+    targets = {lender.name: lender._liquidity() for lender in lenders}
+    snapshots = []
+    for timestamp in range(0, duration + 1, step):
+        for lender in lenders:
+            lender.accrue(step)
+            liquidity = lender._liquidity()
+            target = targets[lender.name]
+            lender.external_borrow((liquidity - target) // 5 + target * rng.randint(-300, 300) // 10_000)
+        snapshots.append(snapshot_of(lenders, timestamp))
+    return snapshots
+
+
+def main():
+    path = os.environ.get("BACKTEST_INPUT")
+    snapshots = load(path) if path else synthetic(six_lenders())
+    deposit = int(os.environ.get("BACKTEST_DEPOSIT", 20_000_000 * USDC))
+    params = {"allocation_mode": list(POLICIES.values()), "profit_factor": [10, 100, 1_000]}
+
+    started = time.perf_counter()
+    results = backtest(
+        snapshots,
+        six_lenders,
+        params,
+        deposit,
+        eth_to_want=lambda amount: amount * 2_000 * USDC // WAD,
+        gas_price=20 * 10 ** 9,
+    )
+    elapsed = time.perf_counter() - started
+    names = {mode: name for name, mode in POLICIES.items()}
+
+    days = (snapshots[-1].timestamp - snapshots[0].timestamp) / 86400
+    print(f"\n{len(results)} runs over {len(snapshots)} snapshots ({days:.0f} days) in {elapsed:.2f}s\n")
+    print(f"{'policy':>12} {'profitFactor':>12} {'earned $':>12} {'gas $':>8} {'rebalances':>10} {'net apr':>8}")
+    for combination, r in results:
+        print(
+            f"{names[combination['allocation_mode']]:>12} {combination['profit_factor']:>12} {r['earned'] / USDC:>12.0f} "
+            f"{r['gas_cost'] / USDC:>8.0f} {r['rebalances']:>10} {r['net_apr'] / 1e16:>7.3f}%"
+        )
+
+
+if __name__ == "__main__":
+    main()
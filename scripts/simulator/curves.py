@@ -0,0 +1,321 @@
+"""
+Vectorised versions of the curves in rates.py and of the lenders' aprAfterDeposit.
+
+Every function takes numpy arrays (or scalars) and broadcasts them, so a whole
+aprAfterDeposit curve is one call instead of one eth_call per point:
+
+    amounts = curves.amounts(np.linspace(0, 10_000_000, 10_000) * 10 ** 6)
+    aprs = curves.apr_after_deposit(lender, amounts)
+
+exact=True keeps every value a python int (numpy object arrays) and gives the same
+result as the solidity integer maths bit for bit. exact=False uses float64 and is
+about a hundred times faster; use it for plotting and searching, then confirm the
+chosen points exactly.
+"""
+import numpy as np
+
+from .lenders import AaveLender, AaveV3Lender, AlphaHomoLender, CompoundLender, CompoundV3Lender, DyDxLender
+from .rates import HALF_PERCENTAGE_FACTOR, HALF_RAY, PERCENTAGE_FACTOR, RAY, WAD, DoubleExponentInterestSetter, TripleSlopeModel
+
+
+def amounts(values, exact=True):
+    """array of amounts in the representation the curves expect"""
+    if exact:
+        return np.array([int(v) for v in np.ravel(values)], dtype=object).reshape(np.shape(values))
+    return np.asarray(values, dtype=np.float64)
+
+
+def _where(condition, a, b):
+    # np.where on python ints alone would squeeze them into int64
+    if np.ndim(condition) == 0 and np.ndim(a) == 0 and np.ndim(b) == 0:
+        return a if condition else b
+    return np.where(condition, a, b)
+
+
+def _nonzero(a):
+    # the solidity either branches around a zero divisor or reverts. either way the value is not used
+    return _where(a == 0, 1, a)
+
+
+def ray_mul(a, b):
+    return (a * b + HALF_RAY) // RAY
+
+
+def ray_div(a, b):
+    return (a * RAY + b // 2) // _nonzero(b)
+
+
+def percent_mul(value, percentage):
+    return (value * percentage + HALF_PERCENTAGE_FACTOR) // PERCENTAGE_FACTOR
+
+
+# Compound, Cream, Scream and IronBank
+def utilization_rate(cash, borrows, reserves):
+    return _where(borrows == 0, 0, borrows * WAD // _nonzero(cash + borrows - reserves))
+
+
+def jump_rate_borrow_rate(model, cash, borrows, reserves):
+    util = utilization_rate(cash, borrows, reserves)
+    normal_rate = model.kink * model.multiplier_per_block // WAD + model.base_rate_per_block
+    return _where(
+        util <= model.kink,
+        util * model.multiplier_per_block // WAD + model.base_rate_per_block,
+        (util - model.kink) * model.jump_multiplier_per_block // WAD + normal_rate,
+    )
+
+
+def jump_rate_supply_rate(model, cash, borrows, reserves, reserve_factor):
+    rate_to_pool = jump_rate_borrow_rate(model, cash, borrows, reserves) * (WAD - reserve_factor) // WAD
+    return utilization_rate(cash, borrows, reserves) * rate_to_pool // WAD
+
+
+# Compound V3
+def comet_utilization(total_borrow, total_supply):
+    return _where(total_supply == 0, 0, total_borrow * WAD // _nonzero(total_supply))
+
+
+def _comet_curve(utilization, kink, base, slope_low, slope_high):
+    return _where(
+        utilization <= kink,
+        base + slope_low * utilization // WAD,
+        base + slope_low * kink // WAD + slope_high * (utilization - kink) // WAD,
+    )
+
+
+def comet_supply_rate(rates, utilization):
+    return _comet_curve(utilization, rates.supply_kink, rates.supply_base, rates.supply_slope_low, rates.supply_slope_high)
+
+
+def comet_borrow_rate(rates, utilization):
+    return _comet_curve(utilization, rates.borrow_kink, rates.borrow_base, rates.borrow_slope_low, rates.borrow_slope_high)
+
+
+# Aave
+def overall_borrow_rate(total_stable_debt, total_variable_debt, current_variable_borrow_rate, average_stable_borrow_rate):
+    total_debt = total_stable_debt + total_variable_debt
+    weighted_variable_rate = ray_mul(total_variable_debt * 10 ** 9, current_variable_borrow_rate)
+    weighted_stable_rate = ray_mul(total_stable_debt * 10 ** 9, average_stable_borrow_rate)
+    return _where(total_debt == 0, 0, ray_div(weighted_variable_rate + weighted_stable_rate, total_debt * 10 ** 9))
+
+
+def aave_v3_rates(
+    strategy,
+    available_liquidity,
+    total_stable_debt,
+    total_variable_debt,
+    average_stable_borrow_rate,
+    reserve_factor,
+    unbacked=0,
+    liquidity_added=0,
+    liquidity_taken=0,
+):
+    """AaveV3RateStrategy.calculate_interest_rates. Returns (liquidityRate, stableBorrowRate, variableBorrowRate)"""
+    total_debt = total_stable_debt + total_variable_debt
+    has_debt = total_debt != 0
+    available_liquidity_plus_debt = available_liquidity + liquidity_added - liquidity_taken + total_debt
+    stable_to_total_debt_ratio = _where(has_debt, ray_div(total_stable_debt, total_debt), 0)
+    borrow_usage_ratio = _where(has_debt, ray_div(total_debt, available_liquidity_plus_debt), 0)
+    supply_usage_ratio = _where(has_debt, ray_div(total_debt, available_liquidity_plus_debt + unbacked), 0)
+
+    optimal = strategy.optimal_usage_ratio
+    over = borrow_usage_ratio > optimal
+    excess = ray_div(_where(over, borrow_usage_ratio - optimal, 0), strategy.max_excess_usage_ratio)
+
+    stable_rate = strategy.variable_rate_slope1 + strategy.base_stable_rate_offset + _where(
+        over,
+        strategy.stable_rate_slope1 + ray_mul(strategy.stable_rate_slope2, excess),
+        ray_div(ray_mul(strategy.stable_rate_slope1, borrow_usage_ratio), optimal),
+    )
+    variable_rate = strategy.base_variable_borrow_rate + _where(
+        over,
+        strategy.variable_rate_slope1 + ray_mul(strategy.variable_rate_slope2, excess),
+        ray_div(ray_mul(strategy.variable_rate_slope1, borrow_usage_ratio), optimal),
+    )
+
+    optimal_stable = strategy.optimal_stable_to_total_debt_ratio
+    over_stable = stable_to_total_debt_ratio > optimal_stable
+    excess_stable = ray_div(
+        _where(over_stable, stable_to_total_debt_ratio - optimal_stable, 0), strategy.max_excess_stable_to_total_debt_ratio
+    )
+    stable_rate = stable_rate + _where(over_stable, ray_mul(strategy.stable_rate_excess_offset, excess_stable), 0)
+
+    overall = overall_borrow_rate(total_stable_debt, total_variable_debt, variable_rate, average_stable_borrow_rate)
+    liquidity_rate = percent_mul(ray_mul(overall, supply_usage_ratio), PERCENTAGE_FACTOR - reserve_factor)
+    return liquidity_rate, stable_rate, variable_rate
+
+
+def aave_v2_rates(
+    strategy,
+    available_liquidity,
+    total_stable_debt,
+    total_variable_debt,
+    average_stable_borrow_rate,
+    reserve_factor,
+    market_borrow_rate=0,
+):
+    """AaveV2RateStrategy.calculate_interest_rates. Returns (liquidityRate, stableBorrowRate, variableBorrowRate)"""
+    total_debt = total_stable_debt + total_variable_debt
+    utilization = _where(total_debt == 0, 0, ray_div(total_debt, available_liquidity + total_debt))
+
+    optimal = strategy.optimal_utilization_rate
+    over = utilization > optimal
+    excess = ray_div(_where(over, utilization - optimal, 0), strategy.excess_utilization_rate)
+
+    stable_rate = market_borrow_rate + _where(
+        over,
+        strategy.stable_rate_slope1 + ray_mul(strategy.stable_rate_slope2, excess),
+        ray_mul(strategy.stable_rate_slope1, ray_div(utilization, optimal)),
+    )
+    variable_rate = strategy.base_variable_borrow_rate + _where(
+        over,
+        strategy.variable_rate_slope1 + ray_mul(strategy.variable_rate_slope2, excess),
+        ray_div(ray_mul(utilization, strategy.variable_rate_slope1), optimal),
+    )
+
+    overall = overall_borrow_rate(total_stable_debt, total_variable_debt, variable_rate, average_stable_borrow_rate)
+    liquidity_rate = percent_mul(ray_mul(overall, utilization), PERCENTAGE_FACTOR - reserve_factor)
+    return liquidity_rate, stable_rate, variable_rate
+
+
+# DyDx
+def dydx_interest_rate(setter, borrow_wei, supply_wei):
+    """DoubleExponentInterestSetter.get_interest_rate"""
+    year = DoubleExponentInterestSetter.SECONDS_IN_A_YEAR
+    coefficients = setter.coefficients
+    result = (coefficients & 0xFF) * WAD
+    coefficients >>= 8
+    polynomial = WAD * borrow_wei // _nonzero(supply_wei)
+    # the coefficients are constants so the loop of the setter unrolls the same way for every point
+    while True:
+        coefficient = coefficients & 0xFF
+        if coefficient != 0:
+            result = result + coefficient * polynomial
+            if coefficient == coefficients:
+                break
+        if coefficients == 0:
+            break
+        polynomial = polynomial * polynomial // WAD
+        coefficients >>= 8
+
+    rate = result * setter.max_apr // (year * WAD * DoubleExponentInterestSetter.PERCENT)
+    rate = _where(borrow_wei >= supply_wei, setter.max_apr // year, rate)
+    return _where(borrow_wei == 0, 0, rate)
+
+
+# Alpha Homora
+def triple_slope_interest_rate(debt, floating):
+    """TripleSlopeModel.get_interest_rate"""
+    year = TripleSlopeModel.SECONDS_IN_A_YEAR
+    total = debt + floating
+    utilization = _where(total == 0, 0, debt * 100 * WAD // _nonzero(total))
+    return np.select(
+        [utilization < 80 * WAD, utilization < 90 * WAD, utilization < 100 * WAD],
+        [
+            utilization * 10 ** 17 // (80 * WAD) // year,
+            10 ** 17 // year + 0 * utilization,
+            (10 ** 17 + (utilization - 90 * WAD) * 4 * 10 ** 17 // (10 * WAD)) // year,
+        ],
+        5 * 10 ** 17 // year + 0 * utilization,
+    )
+
+
+# lenders
+def _compound_apr(lender, extra, timestamps):
+    rate = jump_rate_supply_rate(lender.model, lender.cash + extra, lender.borrows, lender.reserves, lender.reserve_factor)
+    if lender.reward_to_want is not None:
+        total_staked = lender.reward_staked + extra
+        share = _where(total_staked > 0, lender.reward_rate * WAD // _nonzero(total_staked), 0)
+        reward = lender.reward_to_want(share) * 9 // 10
+        if lender.period_finish is not None:
+            reward = _where(lender.period_finish < timestamps, 0, reward)
+        rate = rate + reward
+    return rate * lender.blocks_per_year
+
+
+def _comet_apr(lender, extra, timestamps):
+    supply = lender.total_supply + extra
+    apr = comet_supply_rate(lender.rates, comet_utilization(lender.total_borrow, supply)) * lender.COMET_SECONDS_PER_YEAR
+    reward_per_day = lender.base_tracking_supply_speed * lender.SECONDS_PER_DAY * lender.base_index_scale // lender.base_scale
+    if reward_per_day == 0:
+        return apr
+    reward = lender.reward_price * reward_per_day // _nonzero(supply * lender.want_price) * lender.DAYS_PER_YEAR
+    return apr + reward
+
+
+def _incentives_rate(lender, total_liquidity, timestamps):
+    if lender.emissions_per_second == 0:
+        return 0
+    rate = lender.emissions_per_second * lender.SECONDS_IN_YEAR * WAD // _nonzero(total_liquidity) * 9_500 // 10_000
+    if lender.distribution_end is not None:
+        rate = _where(timestamps >= lender.distribution_end, 0, rate)
+    return rate
+
+
+def _aave_v3_apr(lender, extra, timestamps):
+    liquidity_rate, _, _ = aave_v3_rates(
+        lender.strategy,
+        lender.cash,
+        lender.total_stable_debt,
+        lender.total_variable_debt,
+        lender.average_stable_borrow_rate,
+        lender.reserve_factor,
+        lender.unbacked,
+        extra,
+    )
+    return liquidity_rate // 10 ** 9 + _incentives_rate(lender, lender.total_liquidity() + extra, timestamps)
+
+
+def _aave_v2_apr(lender, extra, timestamps):
+    liquidity_rate, _, _ = aave_v2_rates(
+        lender.strategy,
+        lender.cash + extra,
+        lender.total_stable_debt,
+        lender.total_variable_debt,
+        lender.average_stable_borrow_rate,
+        lender.reserve_factor,
+        lender.market_borrow_rate,
+    )
+    return liquidity_rate // 10 ** 9 + _incentives_rate(lender, lender.total_liquidity() + extra, timestamps)
+
+
+def _dydx_apr(lender, extra, timestamps):
+    supply = lender.supply + extra
+    borrow_rate = dydx_interest_rate(lender.setter, lender.borrow, supply)
+    return _where(supply == 0, 0, borrow_rate * lender.borrow // _nonzero(supply) * lender.SECOND_PER_YEAR)
+
+
+def _alpha_homo_apr(lender, extra, timestamps):
+    if not isinstance(lender.config, TripleSlopeModel):
+        raise TypeError(f"no vectorised curve for {type(lender.config).__name__}")
+    rate_per_sec = triple_slope_interest_rate(lender.glb_debt, lender.floating + extra)
+    utilisation = WAD * lender.glb_debt // (lender.total_eth + extra)
+    return rate_per_sec * 9 // 10 * utilisation // WAD * lender.SECONDS_PER_YEAR
+
+
+# subclasses first
+_APRS = [
+    (AaveLender, _aave_v2_apr),
+    (AaveV3Lender, _aave_v3_apr),
+    (CompoundLender, _compound_apr),
+    (CompoundV3Lender, _comet_apr),
+    (DyDxLender, _dydx_apr),
+    (AlphaHomoLender, _alpha_homo_apr),
+]
+
+
+def apr_after_deposit(lender, extra, timestamps=None, exact=True):
+    """
+    lender.apr_after_deposit for every amount in extra, at the given timestamps (broadcast
+    against extra, default lender.timestamp). Timestamps only matter for reward periods
+    """
+    extra = amounts(extra, exact)
+    if timestamps is None:
+        timestamps = lender.timestamp
+    timestamps = amounts(timestamps, exact)
+    extra, timestamps = np.broadcast_arrays(extra, timestamps)
+
+    for cls, apr in _APRS:
+        if isinstance(lender, cls):
+            result = apr(lender, extra, timestamps)
+            return np.broadcast_to(result, extra.shape) if np.ndim(result) < extra.ndim else result
+    raise TypeError(f"no vectorised curve for {type(lender).__name__}")
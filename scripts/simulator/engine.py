@@ -0,0 +1,104 @@
+"""
+Keeper loop over a StrategyModel and a VaultModel.
+
+Every step the lenders accrue, the scenario hook runs, then the keeper does what a
+keeper bot does: harvest when harvestTrigger says so, otherwise tend when
+tendTrigger says so. Gas is priced with the same call cost that is passed to the
+triggers so the parameters can be judged on net yield.
+"""
+import itertools
+
+WAD = 10 ** 18
+
+
+def call_cost(strategy, gas, gas_price):
+    """wei the keeper pays for a call. gas is (fixed, per lender)"""
+    return (gas[0] + gas[1] * len(strategy.lenders)) * gas_price
+
+
+def simulate(
+    strategy,
+    vault,
+    duration,
+    step=3600,
+    gas_price=30 * 10 ** 9,
+    harvest_gas=(400_000, 150_000),
+    tend_gas=(250_000, 120_000),
+    scenario=None,
+    start=0,
+):
+    """
+    Runs the keeper for duration seconds in steps of step seconds. scenario(now, strategy, vault)
+    is called every step before the triggers and can deposit, withdraw or change pool state.
+    Returns the counters of the run
+    """
+    result = {
+        "harvests": 0,
+        "tends": 0,
+        "gas_cost": 0,
+        "moved": 0,
+        "rebalances": 0,
+        "profit": 0,
+        "loss": 0,
+        "steps": 0,
+    }
+    start_assets = vault.idle + strategy.estimated_total_assets()
+    start_flows = vault.deposited - vault.withdrawn
+
+    now = start
+    end = start + duration
+    while now < end:
+        now += step
+        for lender in strategy.lenders:
+            lender.accrue(step)
+        if scenario is not None:
+            scenario(now, strategy, vault)
+
+        harvest_cost = call_cost(strategy, harvest_gas, gas_price)
+        if strategy.harvest_trigger(harvest_cost, now):
+            report = strategy.harvest(now)
+            result["harvests"] += 1
+            result["gas_cost"] += strategy.eth_to_want(harvest_cost)
+            result["profit"] += report["profit"]
+            result["loss"] += report["loss"]
+            result["moved"] += report["moved"]
+        else:
+            tend_cost = call_cost(strategy, tend_gas, gas_price)
+            if strategy.tend_trigger(tend_cost, now):
+                result["moved"] += strategy.tend(now)
+                result["tends"] += 1
+                result["gas_cost"] += strategy.eth_to_want(tend_cost)
+        if strategy.last_rebalance == now:
+            result["rebalances"] += 1
+        result["steps"] += 1
+
+    result["apr"] = strategy.estimated_apr()
+    result["total_assets"] = vault.idle + strategy.estimated_total_assets()
+    result["fees"] = vault.fees_paid
+    # yearly yield of the starting assets after gas and user flows, in 1e18 like the on chain aprs
+    flows = vault.deposited - vault.withdrawn - start_flows
+    result["earned"] = result["total_assets"] - start_assets - flows
+    net = result["earned"] - result["gas_cost"]
+    result["net_apr"] = net * WAD * 31556952 // (duration * start_assets) if start_assets > 0 else 0
+    return result
+
+
+def grid(build, params, scenario=None, **kwargs):
+    """
+    Runs simulate for every combination of params, a dict of StrategyModel attribute
+    name to list of values. build() must return a fresh (strategy, vault) and scenario()
+    a fresh scenario hook on each call so that every combination sees the same market.
+    Returns a list of (combination, result) sorted by net_apr, best first
+    """
+    names = list(params)
+    results = []
+    for values in itertools.product(*(params[name] for name in names)):
+        strategy, vault = build()
+        combination = dict(zip(names, values))
+        for name, value in combination.items():
+            setattr(strategy, name, value)
+        hook = scenario() if scenario is not None else None
+        results.append((combination, simulate(strategy, vault, scenario=hook, **kwargs)))
+
+    results.sort(key=lambda r: r[1]["net_apr"], reverse=True)
+    return results
@@ -0,0 +1,466 @@
+"""
+Lender models. Each one holds the state of the pool a plugin lends to plus the
+strategy's balance in it, and answers the IGenericLender views the way the plugin
+does (nav, apr, aprAfterDeposit, hasAssets, lenderSnapshot, weightedApr,
+availableLiquidity).
+
+The models are duck typed like scripts.allocation.PoolLender so the allocation
+algorithms in scripts/allocation.py run on them unchanged.
+
+accrue(seconds) moves time on: the pool's borrows grow at the borrow rate and the
+strategy's balance grows at the apr the plugin reports. Reward aprs (Comet tracking
+rewards, Aave incentives, IronBank staking rewards) are compounded into the balance
+as if they were sold on every accrue. timestamp is the seconds accrued so far and
+is compared against reward period ends.
+"""
+from .rates import WAD, RAY, CometRates, TripleSlopeModel
+
+SECONDS_PER_YEAR = 31556952
+
+
+class LenderModel:
+    """Base class. Subclasses implement _apr(extra), _liquidity() and the pool hooks"""
+
+    def __init__(self, name, nav=0):
+        self.name = name
+        self.nav = nav
+        self.timestamp = 0
+
+    # IGenericLender views
+    def _apr(self, extra):
+        raise NotImplementedError
+
+    def apr(self):
+        return self._apr(0)
+
+    def apr_after_deposit(self, amount):
+        return self._apr(amount)
+
+    def weighted_apr(self):
+        return self.apr() * self.nav
+
+    def has_assets(self):
+        return self.nav > 0
+
+    def snapshot(self, extra):
+        return self.nav, self.has_assets(), self._apr(0), self._apr(extra)
+
+    def available_liquidity(self):
+        """nav capped by the want the pool can pay out, like the plugins' availableLiquidity"""
+        return min(self.nav, self._liquidity())
+
+    # pool hooks
+    def _liquidity(self):
+        """want the pool can pay out right now"""
+        raise NotImplementedError
+
+    def _on_deposit(self, amount):
+        raise NotImplementedError
+
+    def _on_withdraw(self, amount):
+        raise NotImplementedError
+
+    def _accrue_pool(self, seconds):
+        pass
+
+    def external_borrow(self, amount):
+        """other users borrow (amount > 0) or repay (amount < 0). capped by liquidity and debt. returns the change"""
+        raise NotImplementedError
+
+    def _on_interest(self, amount):
+        """our interest was added to nav. pools that track total supply add it there too"""
+        pass
+
+    # state changing
+    def deposit(self, amount):
+        self.nav += amount
+        self._on_deposit(amount)
+
+    def withdraw(self, amount):
+        """withdraws up to amount, capped by our balance and the pool's liquidity like the plugins' _withdraw"""
+        amount = min(amount, self.nav, self._liquidity())
+        self.nav -= amount
+        self._on_withdraw(amount)
+        return amount
+
+    def withdraw_all(self):
+        """returns the amount withdrawn like scripts.allocation.PoolLender, not the plugin's bool"""
+        return self.withdraw(self.nav)
+
+    def accrue(self, seconds):
+        earned = self.nav * self.apr() * seconds // (WAD * SECONDS_PER_YEAR)
+        self._accrue_pool(seconds)
+        self.nav += earned
+        self._on_interest(earned)
+        self.timestamp += seconds
+        return earned
+
+
+class CompoundLender(LenderModel):
+    """
+    GenericCompound and the Cream/Scream/IronBank forks: a cToken with an
+    InterestRateModel. apr = (getSupplyRate(cash + extra, borrows, reserves, reserveFactor)
+    + compBlockShareInWant(extra)) * blocksPerYear
+
+    The reward share is only there for IronBank and Scream: reward_rate tokens a second
+    shared by reward_staked want, priced by reward_to_want until period_finish
+    """
+
+    def __init__(
+        self,
+        name,
+        model,
+        cash,
+        borrows,
+        reserves=0,
+        reserve_factor=0,
+        nav=0,
+        blocks_per_year=2_300_000,
+        reward_rate=0,
+        reward_staked=0,
+        reward_to_want=None,
+        period_finish=None,
+    ):
+        super().__init__(name, nav)
+        self.model = model
+        self.cash = cash + nav
+        self.borrows = borrows
+        self.reserves = reserves
+        self.reserve_factor = reserve_factor
+        self.blocks_per_year = blocks_per_year
+        self.reward_rate = reward_rate
+        self.reward_staked = reward_staked
+        self.reward_to_want = reward_to_want
+        self.period_finish = period_finish
+
+    def comp_block_share_in_want(self, change):
+        if self.reward_to_want is None:
+            return 0
+        if self.period_finish is not None and self.period_finish < self.timestamp:
+            return 0
+        total_staked = self.reward_staked + change
+        block_share_supply = self.reward_rate * WAD // total_staked if total_staked > 0 else 0
+        return self.reward_to_want(block_share_supply) * 9 // 10
+
+    def _apr(self, extra):
+        rate = self.model.get_supply_rate(self.cash + extra, self.borrows, self.reserves, self.reserve_factor)
+        return (rate + self.comp_block_share_in_want(extra)) * self.blocks_per_year
+
+    def _liquidity(self):
+        return self.cash
+
+    def _on_deposit(self, amount):
+        self.cash += amount
+
+    def _on_withdraw(self, amount):
+        self.cash -= amount
+
+    def _accrue_pool(self, seconds):
+        blocks = seconds * self.blocks_per_year // SECONDS_PER_YEAR
+        interest = self.borrows * self.model.get_borrow_rate(self.cash, self.borrows, self.reserves) * blocks // WAD
+        self.reserves += interest * self.reserve_factor // WAD
+        self.borrows += interest
+
+    def external_borrow(self, amount):
+        amount = max(min(amount, self.cash), -self.borrows)
+        self.cash -= amount
+        self.borrows += amount
+        return amount
+
+
+class CompoundV3Lender(LenderModel):
+    """
+    GenericCompoundV3: a Comet market. apr = getSupplyRate(borrow / (supply + extra)) * SECONDS_PER_YEAR
+    plus getRewardAprForSupplyBase. Prices are comet.getPrice values (8 decimals)
+    """
+
+    SECONDS_PER_DAY = 60 * 60 * 24
+    DAYS_PER_YEAR = 365
+    COMET_SECONDS_PER_YEAR = 365 * SECONDS_PER_DAY
+
+    def __init__(
+        self,
+        name,
+        rates,
+        total_supply,
+        total_borrow,
+        nav=0,
+        base_tracking_supply_speed=0,
+        base_scale=10 ** 6,
+        base_index_scale=10 ** 15,
+        reward_price=0,
+        want_price=10 ** 8,
+    ):
+        super().__init__(name, nav)
+        self.rates = rates
+        self.total_supply = total_supply + nav
+        self.total_borrow = total_borrow
+        self.base_tracking_supply_speed = base_tracking_supply_speed
+        self.base_scale = base_scale
+        self.base_index_scale = base_index_scale
+        self.reward_price = reward_price
+        self.want_price = want_price
+
+    def _supply_apr(self, supply):
+        utilization = CometRates.utilization(self.total_borrow, supply)
+        return self.rates.get_supply_rate(utilization) * self.COMET_SECONDS_PER_YEAR
+
+    def _reward_apr(self, supply):
+        reward_per_day = self.base_tracking_supply_speed * self.SECONDS_PER_DAY * self.base_index_scale // self.base_scale
+        if reward_per_day == 0:
+            return 0
+        return self.reward_price * reward_per_day // (supply * self.want_price) * self.DAYS_PER_YEAR
+
+    def _apr(self, extra):
+        supply = self.total_supply + extra
+        return self._supply_apr(supply) + self._reward_apr(supply)
+
+    def _liquidity(self):
+        return max(self.total_supply - self.total_borrow, 0)
+
+    def _on_deposit(self, amount):
+        self.total_supply += amount
+
+    def _on_withdraw(self, amount):
+        self.total_supply -= amount
+
+    def _accrue_pool(self, seconds):
+        utilization = CometRates.utilization(self.total_borrow, self.total_supply)
+        borrow_rate = self.rates.get_borrow_rate(utilization)
+        supply_rate = self.rates.get_supply_rate(utilization)
+        others = self.total_supply - self.nav
+        self.total_borrow += self.total_borrow * borrow_rate * seconds // WAD
+        # everyone else earns the supply rate too. our share is added by accrue
+        self.total_supply += others * supply_rate * seconds // WAD
+
+    def _on_interest(self, amount):
+        self.total_supply += amount
+
+    def external_borrow(self, amount):
+        amount = max(min(amount, self._liquidity()), -self.total_borrow)
+        self.total_borrow += amount
+        return amount
+
+
+class AaveV3Lender(LenderModel):
+    """
+    GenericAaveV3: a reserve with a DefaultReserveInterestRateStrategy.
+    apr = liquidityRate / 1e9 plus the incentives rate (95% of emissions over total liquidity).
+    emissions_per_second is the sum of all reward emissions already priced in want. cash is
+    the want held by the aToken, the reserve's availableLiquidity
+    """
+
+    SECONDS_IN_YEAR = 365 * 24 * 60 * 60
+
+    def __init__(
+        self,
+        name,
+        strategy,
+        cash,
+        total_variable_debt,
+        reserve_factor,
+        nav=0,
+        total_stable_debt=0,
+        average_stable_borrow_rate=0,
+        unbacked=0,
+        emissions_per_second=0,
+        distribution_end=None,
+    ):
+        super().__init__(name, nav)
+        self.strategy = strategy
+        self.cash = cash + nav
+        self.total_variable_debt = total_variable_debt
+        self.total_stable_debt = total_stable_debt
+        self.average_stable_borrow_rate = average_stable_borrow_rate
+        self.unbacked = unbacked
+        self.reserve_factor = reserve_factor
+        self.emissions_per_second = emissions_per_second
+        self.distribution_end = distribution_end
+
+    def _rates(self, extra):
+        return self.strategy.calculate_interest_rates(
+            self.cash,
+            self.total_stable_debt,
+            self.total_variable_debt,
+            self.average_stable_borrow_rate,
+            self.reserve_factor,
+            self.unbacked,
+            extra,
+        )
+
+    def total_liquidity(self):
+        return self.cash + self.unbacked + self.total_stable_debt + self.total_variable_debt
+
+    def _incentives_rate(self, total_liquidity):
+        if self.emissions_per_second == 0:
+            return 0
+        if self.distribution_end is not None and self.timestamp >= self.distribution_end:
+            return 0
+        rate = self.emissions_per_second * self.SECONDS_IN_YEAR * WAD // total_liquidity
+        return rate * 9_500 // 10_000
+
+    def _apr(self, extra):
+        liquidity_rate, _, _ = self._rates(extra)
+        return liquidity_rate // 10 ** 9 + self._incentives_rate(self.total_liquidity() + extra)
+
+    def _liquidity(self):
+        return self.cash
+
+    def _on_deposit(self, amount):
+        self.cash += amount
+
+    def _on_withdraw(self, amount):
+        self.cash -= amount
+
+    def _accrue_pool(self, seconds):
+        _, stable_rate, variable_rate = self._rates(0)
+        self.total_variable_debt += self.total_variable_debt * variable_rate * seconds // (RAY * SECONDS_PER_YEAR)
+        self.total_stable_debt += self.total_stable_debt * self.average_stable_borrow_rate * seconds // (RAY * SECONDS_PER_YEAR)
+
+    def external_borrow(self, amount):
+        amount = max(min(amount, self.cash), -self.total_variable_debt)
+        self.cash -= amount
+        self.total_variable_debt += amount
+        return amount
+
+
+class AaveLender(AaveV3Lender):
+    """
+    GenericAave on Aave V2. Same reserve as AaveV3Lender but priced by the V2 strategy:
+    the deposit is added to the available liquidity and there is no unbacked supply
+    """
+
+    def __init__(
+        self,
+        name,
+        strategy,
+        cash,
+        total_variable_debt,
+        reserve_factor,
+        nav=0,
+        total_stable_debt=0,
+        average_stable_borrow_rate=0,
+        market_borrow_rate=0,
+        emissions_per_second=0,
+        distribution_end=None,
+    ):
+        super().__init__(
+            name,
+            strategy,
+            cash,
+            total_variable_debt,
+            reserve_factor,
+            nav,
+            total_stable_debt,
+            average_stable_borrow_rate,
+            0,
+            emissions_per_second,
+            distribution_end,
+        )
+        self.market_borrow_rate = market_borrow_rate
+
+    def _rates(self, extra):
+        return self.strategy.calculate_interest_rates(
+            self.cash + extra,
+            self.total_stable_debt,
+            self.total_variable_debt,
+            self.average_stable_borrow_rate,
+            self.reserve_factor,
+            self.market_borrow_rate,
+        )
+
+
+class DyDxLender(LenderModel):
+    """
+    GenericDyDx: a SoloMargin market. borrow and supply are par * index.
+    apr = getInterestRate(borrow, supply + extra) * borrow / (supply + extra) * secondPerYear
+    """
+
+    SECOND_PER_YEAR = 31_153_900
+
+    def __init__(self, name, setter, supply, borrow, nav=0):
+        super().__init__(name, nav)
+        self.setter = setter
+        self.supply = supply + nav
+        self.borrow = borrow
+
+    def _apr(self, extra):
+        supply = self.supply + extra
+        if supply == 0:
+            return 0
+        borrow_rate = self.setter.get_interest_rate(self.borrow, supply)
+        return borrow_rate * self.borrow // supply * self.SECOND_PER_YEAR
+
+    def _liquidity(self):
+        return max(self.supply - self.borrow, 0)
+
+    def _on_deposit(self, amount):
+        self.supply += amount
+
+    def _on_withdraw(self, amount):
+        self.supply -= amount
+
+    def _accrue_pool(self, seconds):
+        borrow_rate = self.setter.get_interest_rate(self.borrow, self.supply)
+        others = self.supply - self.nav
+        if self.supply > 0:
+            self.supply += others * borrow_rate * self.borrow // self.supply * seconds // WAD
+        self.borrow += self.borrow * borrow_rate * seconds // WAD
+
+    def _on_interest(self, amount):
+        self.supply += amount
+
+    def external_borrow(self, amount):
+        amount = max(min(amount, self._liquidity()), -self.borrow)
+        self.borrow += amount
+        return amount
+
+
+class AlphaHomoLender(LenderModel):
+    """
+    AlphaHomo: ETH in the Alpha Homora v1 bank. floating is the bank's ETH balance,
+    total_eth its totalETH(). apr = getInterestRate(debt, floating + extra) * 0.9
+    * debt / (total_eth + extra) * secondsPerYear
+    """
+
+    SECONDS_PER_YEAR = 31556952
+
+    def __init__(self, name, floating, glb_debt, total_eth, nav=0, config=None):
+        super().__init__(name, nav)
+        self.config = TripleSlopeModel() if config is None else config
+        self.floating = floating + nav
+        self.glb_debt = glb_debt
+        self.total_eth = total_eth + nav
+
+    def _apr(self, extra):
+        rate_per_sec = self.config.get_interest_rate(self.glb_debt, self.floating + extra)
+        utilisation = WAD * self.glb_debt // (self.total_eth + extra)
+        return rate_per_sec * 9 // 10 * utilisation // WAD * self.SECONDS_PER_YEAR
+
+    def _liquidity(self):
+        return self.floating
+
+    def _on_deposit(self, amount):
+        self.floating += amount
+        self.total_eth += amount
+
+    def _on_withdraw(self, amount):
+        self.floating -= amount
+        self.total_eth -= amount
+
+    def _on_interest(self, amount):
+        self.total_eth += amount
+
+    def _accrue_pool(self, seconds):
+        interest = self.glb_debt * self.config.get_interest_rate(self.glb_debt, self.floating) * seconds // WAD
+        others = self.total_eth - self.nav
+        self.glb_debt += interest
+        # 10% of the interest is kept as reserves, the rest is shared by the suppliers
+        if self.total_eth > 0:
+            self.total_eth += interest * 9 // 10 * others // self.total_eth
+
+    def external_borrow(self, amount):
+        amount = max(min(amount, self.floating), -self.glb_debt)
+        self.floating -= amount
+        self.glb_debt += amount
+        return amount
@@ -0,0 +1,341 @@
+"""
+Interest rate curves of the protocols the lender plugins query.
+
+Each class mirrors the on chain integer maths of one rate contract so a plugin's
+apr and aprAfterDeposit can be reproduced without a chain:
+
+    JumpRateModel                  Compound / Cream / Scream / IronBank InterestRateModel (per block)
+    CometRates                     Compound V3 Comet getSupplyRate / getBorrowRate (per second)
+    AaveV2RateStrategy             Aave V2 DefaultReserveInterestRateStrategy (ray)
+    AaveV3RateStrategy             Aave V3 DefaultReserveInterestRateStrategy (ray)
+    DoubleExponentInterestSetter   DyDx SoloMargin interest setter (per second)
+    TripleSlopeModel               Alpha Homora BankConfig (per second)
+
+UniswapV2Path prices reward tokens in want like the plugins' getAmountsOut checks.
+"""
+
+WAD = 10 ** 18
+RAY = 10 ** 27
+HALF_RAY = RAY // 2
+PERCENTAGE_FACTOR = 10 ** 4
+HALF_PERCENTAGE_FACTOR = PERCENTAGE_FACTOR // 2
+
+
+def ray_mul(a, b):
+    return (a * b + HALF_RAY) // RAY
+
+
+def ray_div(a, b):
+    return (a * RAY + b // 2) // b
+
+
+def wad_to_ray(a):
+    return a * 10 ** 9
+
+
+def percent_mul(value, percentage):
+    return (value * percentage + HALF_PERCENTAGE_FACTOR) // PERCENTAGE_FACTOR
+
+
+class JumpRateModel:
+    """
+    JumpRateModelV2. All rates are per block and scaled by 1e18. A model without a
+    kink (WhitePaperInterestRateModel) is kink=WAD and jump_multiplier_per_block=0
+    """
+
+    def __init__(self, base_rate_per_block, multiplier_per_block, jump_multiplier_per_block=0, kink=WAD):
+        self.base_rate_per_block = base_rate_per_block
+        self.multiplier_per_block = multiplier_per_block
+        self.jump_multiplier_per_block = jump_multiplier_per_block
+        self.kink = kink
+
+    @classmethod
+    def from_yearly(cls, base_rate_per_year, multiplier_per_year, jump_multiplier_per_year=0, kink=WAD, blocks_per_year=2_102_400):
+        # same conversion as the model constructors. multiplier is scaled up by the kink like updateJumpRateModelInternal
+        return cls(
+            base_rate_per_year // blocks_per_year,
+            multiplier_per_year * WAD // (blocks_per_year * kink),
+            jump_multiplier_per_year // blocks_per_year,
+            kink,
+        )
+
+    @staticmethod
+    def utilization_rate(cash, borrows, reserves):
+        if borrows == 0:
+            return 0
+        return borrows * WAD // (cash + borrows - reserves)
+
+    def get_borrow_rate(self, cash, borrows, reserves):
+        util = self.utilization_rate(cash, borrows, reserves)
+        if util <= self.kink:
+            return util * self.multiplier_per_block // WAD + self.base_rate_per_block
+        normal_rate = self.kink * self.multiplier_per_block // WAD + self.base_rate_per_block
+        excess_util = util - self.kink
+        return excess_util * self.jump_multiplier_per_block // WAD + normal_rate
+
+    def get_supply_rate(self, cash, borrows, reserves, reserve_factor):
+        one_minus_reserve_factor = WAD - reserve_factor
+        borrow_rate = self.get_borrow_rate(cash, borrows, reserves)
+        rate_to_pool = borrow_rate * one_minus_reserve_factor // WAD
+        return self.utilization_rate(cash, borrows, reserves) * rate_to_pool // WAD
+
+
+class CometRates:
+    """Comet supply and borrow curves. Rates are per second and scaled by 1e18"""
+
+    def __init__(
+        self,
+        supply_kink,
+        supply_base,
+        supply_slope_low,
+        supply_slope_high,
+        borrow_kink=None,
+        borrow_base=0,
+        borrow_slope_low=0,
+        borrow_slope_high=0,
+    ):
+        self.supply_kink = supply_kink
+        self.supply_base = supply_base
+        self.supply_slope_low = supply_slope_low
+        self.supply_slope_high = supply_slope_high
+        self.borrow_kink = supply_kink if borrow_kink is None else borrow_kink
+        self.borrow_base = borrow_base
+        self.borrow_slope_low = borrow_slope_low
+        self.borrow_slope_high = borrow_slope_high
+
+    @staticmethod
+    def utilization(total_borrow, total_supply):
+        if total_supply == 0:
+            return 0
+        return total_borrow * WAD // total_supply
+
+    @staticmethod
+    def _curve(utilization, kink, base, slope_low, slope_high):
+        if utilization <= kink:
+            return base + slope_low * utilization // WAD
+        return base + slope_low * kink // WAD + slope_high * (utilization - kink) // WAD
+
+    def get_supply_rate(self, utilization):
+        return self._curve(utilization, self.supply_kink, self.supply_base, self.supply_slope_low, self.supply_slope_high)
+
+    def get_borrow_rate(self, utilization):
+        return self._curve(utilization, self.borrow_kink, self.borrow_base, self.borrow_slope_low, self.borrow_slope_high)
+
+
+class AaveV3RateStrategy:
+    """
+    DefaultReserveInterestRateStrategy of Aave V3. Ratios and rates are in ray,
+    reserve_factor is in basis points like getReserveConfigurationData
+    """
+
+    def __init__(
+        self,
+        optimal_usage_ratio,
+        base_variable_borrow_rate,
+        variable_rate_slope1,
+        variable_rate_slope2,
+        stable_rate_slope1=0,
+        stable_rate_slope2=0,
+        base_stable_rate_offset=0,
+        stable_rate_excess_offset=0,
+        optimal_stable_to_total_debt_ratio=0,
+    ):
+        self.optimal_usage_ratio = optimal_usage_ratio
+        self.max_excess_usage_ratio = RAY - optimal_usage_ratio
+        self.base_variable_borrow_rate = base_variable_borrow_rate
+        self.variable_rate_slope1 = variable_rate_slope1
+        self.variable_rate_slope2 = variable_rate_slope2
+        self.stable_rate_slope1 = stable_rate_slope1
+        self.stable_rate_slope2 = stable_rate_slope2
+        self.base_stable_rate_offset = base_stable_rate_offset
+        self.stable_rate_excess_offset = stable_rate_excess_offset
+        self.optimal_stable_to_total_debt_ratio = optimal_stable_to_total_debt_ratio
+        self.max_excess_stable_to_total_debt_ratio = RAY - optimal_stable_to_total_debt_ratio
+
+    @staticmethod
+    def overall_borrow_rate(total_stable_debt, total_variable_debt, current_variable_borrow_rate, average_stable_borrow_rate):
+        total_debt = total_stable_debt + total_variable_debt
+        if total_debt == 0:
+            return 0
+        weighted_variable_rate = ray_mul(wad_to_ray(total_variable_debt), current_variable_borrow_rate)
+        weighted_stable_rate = ray_mul(wad_to_ray(total_stable_debt), average_stable_borrow_rate)
+        return ray_div(weighted_variable_rate + weighted_stable_rate, wad_to_ray(total_debt))
+
+    def calculate_interest_rates(
+        self,
+        available_liquidity,
+        total_stable_debt,
+        total_variable_debt,
+        average_stable_borrow_rate,
+        reserve_factor,
+        unbacked=0,
+        liquidity_added=0,
+        liquidity_taken=0,
+    ):
+        """
+        Returns (liquidityRate, stableBorrowRate, variableBorrowRate) in ray.
+        available_liquidity is the want balance of the aToken before liquidity_added
+        """
+        total_debt = total_stable_debt + total_variable_debt
+        current_variable_borrow_rate = self.base_variable_borrow_rate
+        current_stable_borrow_rate = self.variable_rate_slope1 + self.base_stable_rate_offset
+        borrow_usage_ratio = 0
+        supply_usage_ratio = 0
+        stable_to_total_debt_ratio = 0
+
+        if total_debt != 0:
+            stable_to_total_debt_ratio = ray_div(total_stable_debt, total_debt)
+            available_liquidity_plus_debt = available_liquidity + liquidity_added - liquidity_taken + total_debt
+            borrow_usage_ratio = ray_div(total_debt, available_liquidity_plus_debt)
+            supply_usage_ratio = ray_div(total_debt, available_liquidity_plus_debt + unbacked)
+
+        if borrow_usage_ratio > self.optimal_usage_ratio:
+            excess_borrow_usage_ratio = ray_div(borrow_usage_ratio - self.optimal_usage_ratio, self.max_excess_usage_ratio)
+            current_stable_borrow_rate += self.stable_rate_slope1 + ray_mul(self.stable_rate_slope2, excess_borrow_usage_ratio)
+            current_variable_borrow_rate += self.variable_rate_slope1 + ray_mul(self.variable_rate_slope2, excess_borrow_usage_ratio)
+        else:
+            current_stable_borrow_rate += ray_div(ray_mul(self.stable_rate_slope1, borrow_usage_ratio), self.optimal_usage_ratio)
+            current_variable_borrow_rate += ray_div(ray_mul(self.variable_rate_slope1, borrow_usage_ratio), self.optimal_usage_ratio)
+
+        if stable_to_total_debt_ratio > self.optimal_stable_to_total_debt_ratio:
+            excess_stable_debt_ratio = ray_div(
+                stable_to_total_debt_ratio - self.optimal_stable_to_total_debt_ratio, self.max_excess_stable_to_total_debt_ratio
+            )
+            current_stable_borrow_rate += ray_mul(self.stable_rate_excess_offset, excess_stable_debt_ratio)
+
+        overall = self.overall_borrow_rate(total_stable_debt, total_variable_debt, current_variable_borrow_rate, average_stable_borrow_rate)
+        current_liquidity_rate = percent_mul(ray_mul(overall, supply_usage_ratio), PERCENTAGE_FACTOR - reserve_factor)
+        return current_liquidity_rate, current_stable_borrow_rate, current_variable_borrow_rate
+
+
+class DoubleExponentInterestSetter:
+    """
+    DyDx interest setter. max_apr is scaled by 1e18 and coefficients is the packed
+    byte array (lowest byte first) of percentages for utilization^1, ^2, ^4...
+    Returns the borrow rate per second scaled by 1e18
+    """
+
+    PERCENT = 100
+    SECONDS_IN_A_YEAR = 60 * 60 * 24 * 365
+    BYTE = 8
+
+    def __init__(self, max_apr, coefficients):
+        self.max_apr = max_apr
+        self.coefficients = coefficients
+
+    @classmethod
+    def from_list(cls, max_apr, coefficients):
+        packed = 0
+        for i, coefficient in enumerate(coefficients):
+            packed |= coefficient << (cls.BYTE * i)
+        return cls(max_apr, packed)
+
+    def get_interest_rate(self, borrow_wei, supply_wei):
+        if borrow_wei == 0:
+            return 0
+        if borrow_wei >= supply_wei:
+            return self.max_apr // self.SECONDS_IN_A_YEAR
+
+        coefficients = self.coefficients
+        result = (coefficients & 0xFF) * WAD
+        coefficients >>= self.BYTE
+        polynomial = WAD * borrow_wei // supply_wei
+        while True:
+            coefficient = coefficients & 0xFF
+            if coefficient != 0:
+                result += coefficient * polynomial
+                if coefficient == coefficients:
+                    break
+            if coefficients == 0:
+                # the solidity loop never gets here with well formed coefficients. stop instead of spinning
+                break
+            polynomial = polynomial * polynomial // WAD
+            coefficients >>= self.BYTE
+
+        return result * self.max_apr // (self.SECONDS_IN_A_YEAR * WAD * self.PERCENT)
+
+
+class AaveV2RateStrategy:
+    """
+    DefaultReserveInterestRateStrategy of Aave V2. Same units as AaveV3RateStrategy. The stable
+    rate starts from the lending rate oracle's market_borrow_rate instead of an offset
+    """
+
+    def __init__(
+        self,
+        optimal_utilization_rate,
+        base_variable_borrow_rate,
+        variable_rate_slope1,
+        variable_rate_slope2,
+        stable_rate_slope1=0,
+        stable_rate_slope2=0,
+    ):
+        self.optimal_utilization_rate = optimal_utilization_rate
+        self.excess_utilization_rate = RAY - optimal_utilization_rate
+        self.base_variable_borrow_rate = base_variable_borrow_rate
+        self.variable_rate_slope1 = variable_rate_slope1
+        self.variable_rate_slope2 = variable_rate_slope2
+        self.stable_rate_slope1 = stable_rate_slope1
+        self.stable_rate_slope2 = stable_rate_slope2
+
+    def calculate_interest_rates(
+        self,
+        available_liquidity,
+        total_stable_debt,
+        total_variable_debt,
+        average_stable_borrow_rate,
+        reserve_factor,
+        market_borrow_rate=0,
+    ):
+        """Returns (liquidityRate, stableBorrowRate, variableBorrowRate) in ray"""
+        total_debt = total_stable_debt + total_variable_debt
+        utilization_rate = 0 if total_debt == 0 else ray_div(total_debt, available_liquidity + total_debt)
+
+        if utilization_rate > self.optimal_utilization_rate:
+            excess_utilization_rate_ratio = ray_div(utilization_rate - self.optimal_utilization_rate, self.excess_utilization_rate)
+            stable_rate = market_borrow_rate + self.stable_rate_slope1 + ray_mul(self.stable_rate_slope2, excess_utilization_rate_ratio)
+            variable_rate = (
+                self.base_variable_borrow_rate + self.variable_rate_slope1 + ray_mul(self.variable_rate_slope2, excess_utilization_rate_ratio)
+            )
+        else:
+            stable_rate = market_borrow_rate + ray_mul(self.stable_rate_slope1, ray_div(utilization_rate, self.optimal_utilization_rate))
+            variable_rate = self.base_variable_borrow_rate + ray_div(
+                ray_mul(utilization_rate, self.variable_rate_slope1), self.optimal_utilization_rate
+            )
+
+        overall = AaveV3RateStrategy.overall_borrow_rate(total_stable_debt, total_variable_debt, variable_rate, average_stable_borrow_rate)
+        liquidity_rate = percent_mul(ray_mul(overall, utilization_rate), PERCENTAGE_FACTOR - reserve_factor)
+        return liquidity_rate, stable_rate, variable_rate
+
+
+class TripleSlopeModel:
+    """Alpha Homora v1 BankConfig.getInterestRate. Returns the borrow rate per second scaled by 1e18"""
+
+    SECONDS_IN_A_YEAR = 365 * 24 * 60 * 60
+
+    def get_interest_rate(self, debt, floating):
+        total = debt + floating
+        utilization = 0 if total == 0 else debt * 100 * WAD // total
+        if utilization < 80 * WAD:
+            return utilization * 10 ** 17 // (80 * WAD) // self.SECONDS_IN_A_YEAR
+        if utilization < 90 * WAD:
+            return 10 ** 17 // self.SECONDS_IN_A_YEAR
+        if utilization < 100 * WAD:
+            return (10 ** 17 + (utilization - 90 * WAD) * 4 * 10 ** 17 // (10 * WAD)) // self.SECONDS_IN_A_YEAR
+        return 5 * 10 ** 17 // self.SECONDS_IN_A_YEAR
+
+
+class UniswapV2Path:
+    """
+    getAmountsOut over fixed pair reserves, [(reserve_in, reserve_out), ...] hop by hop.
+    Works on ints and on numpy arrays alike; this is how the plugins price reward tokens
+    """
+
+    def __init__(self, reserves):
+        self.reserves = reserves
+
+    def __call__(self, amount):
+        for reserve_in, reserve_out in self.reserves:
+            amount_in_with_fee = amount * 997
+            amount = amount_in_with_fee * reserve_out // (reserve_in * 1000 + amount_in_with_fee)
+        return amount
@@ -0,0 +1,118 @@
+"""
+A USDC market with one lender of each modelled type and a parameter sweep over it.
+
+    python -m scripts.simulator
+
+The pool sizes and curves are round numbers in the range of the mainnet markets,
+not a snapshot of them.
+"""
+import random
+import time
+
+from .engine import grid
+from .lenders import AaveV3Lender, CompoundLender, CompoundV3Lender, DyDxLender
+from .rates import RAY, WAD, AaveV3RateStrategy, CometRates, DoubleExponentInterestSetter, JumpRateModel
+from .strategy import StrategyModel
+from .vault import VaultModel
+
+USDC = 10 ** 6
+COMET_YEAR = 365 * 24 * 60 * 60
+
+
+def usdc_lenders():
+    compound = CompoundLender(
+        "GenericCompound",
+        JumpRateModel.from_yearly(0, 4 * WAD // 100, 109 * WAD // 100, kink=80 * WAD // 100),
+        cash=300_000_000 * USDC,
+        borrows=700_000_000 * USDC,
+        reserves=10_000_000 * USDC,
+        reserve_factor=75 * WAD // 1000,
+    )
+    comet = CompoundV3Lender(
+        "GenericCompoundV3",
+        CometRates(
+            supply_kink=93 * WAD // 100,
+            supply_base=0,
+            supply_slope_low=36 * WAD // 1000 // COMET_YEAR,
+            supply_slope_high=2 * WAD // COMET_YEAR,
+            borrow_base=1 * WAD // 100 // COMET_YEAR,
+            borrow_slope_low=40 * WAD // 1000 // COMET_YEAR,
+            borrow_slope_high=2 * WAD // COMET_YEAR,
+        ),
+        total_supply=500_000_000 * USDC,
+        total_borrow=400_000_000 * USDC,
+        base_tracking_supply_speed=3 * 10 ** 12,
+        reward_price=50 * 10 ** 8,
+    )
+    aave = AaveV3Lender(
+        "GenericAaveV3",
+        AaveV3RateStrategy(90 * RAY // 100, 0, 4 * RAY // 100, 60 * RAY // 100),
+        cash=200_000_000 * USDC,
+        total_variable_debt=600_000_000 * USDC,
+        reserve_factor=1_000,
+    )
+    dydx = DyDxLender(
+        "GenericDyDx",
+        DoubleExponentInterestSetter.from_list(WAD, [0, 10, 10, 0, 0, 0, 0, 80]),
+        supply=100_000_000 * USDC,
+        borrow=60_000_000 * USDC,
+    )
+    return [compound, comet, aave, dydx]
+
+
+def build(deposit=10_000_000 * USDC, eth_price=2_000):
+    strategy = StrategyModel(
+        usdc_lenders(),
+        withdrawal_threshold=0,
+        eth_to_want=lambda amount: amount * eth_price * USDC // WAD,
+    )
+    vault = VaultModel()
+    vault.add_strategy(strategy)
+    vault.deposit(deposit)
+    strategy.harvest(0)
+    return strategy, vault
+
+
+def random_flows(seed=0, every=86400, size=200):
+    """deposits and withdrawals of up to size / 10_000 of the vault once every `every` seconds"""
+    rng = random.Random(seed)
+    # borrowers come and go but each pool's liquidity drifts back to where it started
+    targets = {}
+
+    def scenario(now, strategy, vault):
+        if now % every:
+            return
+        amount = vault.total_assets() * rng.randint(0, size) // 10_000
+        if rng.random() < 0.5:
+            vault.deposit(amount)
+        else:
+            vault.withdraw(amount)
+
+        for lender in strategy.lenders:
+            liquidity = lender._liquidity()
+            target = targets.setdefault(lender.name, liquidity)
+            lender.external_borrow((liquidity - target) // 5 + target * rng.randint(-1_000, 1_000) // 10_000)
+
+    return scenario
+
+
+def main():
+    params = {
+        "profit_factor": [1, 10, 100, 1_000],
+        "max_report_delay": [6 * 3600, 86400, 7 * 86400],
+        "withdrawal_threshold": [0, 10_000 * USDC],
+    }
+    duration = 90 * 86400
+    started = time.perf_counter()
+    results = grid(build, params, scenario=random_flows, duration=duration, step=3600)
+    elapsed = time.perf_counter() - started
+    steps = sum(r["steps"] for _, r in results)
+
+    print(f"\n{len(results)} runs of {duration // 86400} days. {steps} keeper steps in {elapsed:.2f}s ({steps / elapsed:.0f}/s)\n")
+    print(f"{'profitFactor':>12} {'maxReportDelay':>14} {'threshold':>10} {'harvests':>8} {'tends':>6} {'gas $':>10} {'net apr':>8}")
+    for combination, r in results:
+        print(
+            f"{combination['profit_factor']:>12} {combination['max_report_delay']:>14} "
+            f"{combination['withdrawal_threshold'] // USDC:>10} {r['harvests']:>8} {r['tends']:>6} "
+            f"{r['gas_cost'] / USDC:>10.0f} {r['net_apr'] / 1e16:>7.3f}%"
+        )
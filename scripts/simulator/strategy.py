@@ -0,0 +1,301 @@
+"""
+Python port of contracts/Strategy.sol and the parts of BaseStrategy 0.4.3 it relies
+on. Want held by the strategy itself is `loose`; lenders are lender models.
+
+Every method keeps the name and integer maths of the solidity it mirrors so a
+difference between the two is a bug in one of them.
+"""
+from scripts.allocation import (
+    BUBBLE_SORT,
+    PARTIAL_MOVE,
+    WATER_FILL,
+    bubble_sort,
+    estimate_adjust_position,
+    estimate_partial_move,
+    partial_move,
+    water_fill,
+)
+
+MAX_UINT = 2 ** 256 - 1
+SECONDSPERYEAR = 31556952
+BASIS_POINTS = 10_000
+
+
+class StrategyModel:
+    def __init__(
+        self,
+        lenders,
+        withdrawal_threshold=10 ** 16,
+        profit_factor=100,
+        debt_threshold=100 * 10 ** 18,
+        min_report_delay=0,
+        max_report_delay=86400,
+        allocation_mode=BUBBLE_SORT,
+        water_fill_chunks=0,
+        partial_move_steps=0,
+        min_tend_spread=0,
+        tend_cooldown=0,
+        idle_buffer_bps=0,
+        eth_to_want=lambda amount: amount,
+    ):
+        self.lenders = list(lenders)
+        self.loose = 0
+        self.vault = None
+        self.withdrawal_threshold = withdrawal_threshold
+        self.profit_factor = profit_factor
+        self.debt_threshold = debt_threshold
+        self.min_report_delay = min_report_delay
+        self.max_report_delay = max_report_delay
+        self.allocation_mode = allocation_mode
+        self.water_fill_chunks = water_fill_chunks
+        self.partial_move_steps = partial_move_steps
+        self.min_tend_spread = min_tend_spread
+        self.tend_cooldown = tend_cooldown
+        # None before the first rebalance. on chain that is timestamp 0, long before any simulated time
+        self.last_rebalance = None
+        self.last_rebalance_spread = 0
+        self.idle_buffer_bps = idle_buffer_bps
+        self.eth_to_want = eth_to_want
+        self.emergency_exit = False
+
+    # views
+    def lent_total_assets(self):
+        return sum(lender.nav for lender in self.lenders)
+
+    def estimated_total_assets(self):
+        return self.lent_total_assets() + self.loose
+
+    def idle_buffer_target(self):
+        if self.idle_buffer_bps == 0:
+            return 0
+        return self.estimated_total_assets() * self.idle_buffer_bps // BASIS_POINTS
+
+    def estimated_apr(self):
+        bal = self.estimated_total_assets()
+        if bal == 0:
+            return 0
+        return sum(lender.weighted_apr() for lender in self.lenders) // bal
+
+    def _estimate_debt_limit_increase(self, change):
+        highest_apr = 0
+        apr_choice = 0
+        assets = 0
+        # the idle buffer share of the new debt stays loose
+        lent = change - change * self.idle_buffer_bps // BASIS_POINTS
+        for i, lender in enumerate(self.lenders):
+            apr = lender.apr_after_deposit(lent)
+            if apr > highest_apr:
+                apr_choice = i
+                highest_apr = apr
+                assets = lender.nav
+
+        weighted = highest_apr * (assets + lent)
+        for i, lender in enumerate(self.lenders):
+            if i != apr_choice:
+                weighted += lender.weighted_apr()
+
+        return weighted // (self.estimated_total_assets() + change)
+
+    def _estimate_debt_limit_decrease(self, change):
+        lowest_apr = MAX_UINT
+        apr_choice = 0
+        for i, lender in enumerate(self.lenders):
+            apr = lender.apr_after_deposit(change)
+            if apr < lowest_apr:
+                apr_choice = i
+                lowest_apr = apr
+
+        weighted = 0
+        for i, lender in enumerate(self.lenders):
+            if i != apr_choice:
+                weighted += lender.weighted_apr()
+            else:
+                # simplistic. not accurate
+                change = min(change, lender.nav)
+                weighted += lowest_apr * change
+
+        return weighted // (self.estimated_total_assets() + change)
+
+    def estimated_future_apr(self, new_debt_limit):
+        old_debt_limit = self.vault.total_debt
+        if old_debt_limit < new_debt_limit:
+            return self._estimate_debt_limit_increase(new_debt_limit - old_debt_limit)
+        return self._estimate_debt_limit_decrease(old_debt_limit - new_debt_limit)
+
+    # harvest and tend
+    def prepare_return(self, debt_outstanding):
+        profit = 0
+        loss = 0
+        debt_payment = debt_outstanding
+
+        lent_assets = self.lent_total_assets()
+        loose_assets = self.loose
+        total = loose_assets + lent_assets
+
+        if lent_assets == 0:
+            return profit, loss, min(debt_payment, loose_assets)
+
+        debt = self.vault.total_debt
+        if total > debt:
+            profit = total - debt
+            amount_to_free = profit + debt_payment
+            if amount_to_free > 0 and loose_assets < amount_to_free:
+                self._withdraw_some(amount_to_free - loose_assets)
+                new_loose = self.loose
+                if new_loose < amount_to_free:
+                    if profit > new_loose:
+                        profit = new_loose
+                        debt_payment = 0
+                    else:
+                        debt_payment = min(new_loose - profit, debt_payment)
+        else:
+            loss = debt - total
+            amount_to_free = loss + debt_payment
+            if amount_to_free > 0 and loose_assets < amount_to_free:
+                self._withdraw_some(amount_to_free - loose_assets)
+                new_loose = self.loose
+                if new_loose < amount_to_free:
+                    if loss > new_loose:
+                        loss = new_loose
+                        debt_payment = 0
+                    else:
+                        debt_payment = min(new_loose - loss, debt_payment)
+
+        return profit, loss, debt_payment
+
+    def adjust_position(self, debt_outstanding, now):
+        """returns the want moved out of lenders by the rebalance"""
+        if self.emergency_exit or len(self.lenders) == 0:
+            return 0
+
+        buffer = self.idle_buffer_target()
+        if self.loose < buffer:
+            self._withdraw_some(buffer - self.loose)
+
+        loose, self.loose = self.loose, 0
+        if self.allocation_mode == WATER_FILL:
+            moved = water_fill(self.lenders, loose, self.water_fill_chunks, buffer)
+            if moved > 0:
+                self._record_rebalance(now, 0)
+        else:
+            _, lowest_apr, _, potential = estimate_adjust_position(self.lenders, loose)
+            if self.allocation_mode == PARTIAL_MOVE:
+                _, _, amount = estimate_partial_move(self.lenders, loose, self.partial_move_steps)
+                if amount > 0 and amount >= self.withdrawal_threshold:
+                    self._record_rebalance(now, max(potential - lowest_apr, 0))
+                moved = partial_move(self.lenders, loose, self.partial_move_steps, self.withdrawal_threshold, buffer)
+            else:
+                if potential > lowest_apr:
+                    self._record_rebalance(now, potential - lowest_apr)
+                moved = bubble_sort(self.lenders, loose, buffer)
+
+        # every mode lends what is above the buffer
+        self.loose = min(loose + moved, buffer)
+        return moved
+
+    def _record_rebalance(self, now, spread):
+        self.last_rebalance = now
+        self.last_rebalance_spread = spread
+
+    def _withdraw_some(self, amount):
+        if len(self.lenders) == 0:
+            return 0
+        # dont withdraw dust
+        if amount < self.withdrawal_threshold:
+            return 0
+
+        # _rankLiquidLenders: the lenders that can pay out and how much, by apr, equal aprs keep the lender order
+        liquid = [(lender, lender.available_liquidity()) for lender in self.lenders]
+        ranked = sorted(((lender, liquidity) for lender, liquidity in liquid if liquidity > 0), key=lambda item: item[0].apr())
+        available = [liquidity for _, liquidity in ranked]
+
+        # the worst rate that can pay it all does it in one call
+        withdrawn = 0
+        for j, (lender, _) in enumerate(ranked):
+            if available[j] >= amount:
+                withdrawn = lender.withdraw(amount)
+                if withdrawn >= amount:
+                    self.loose += withdrawn
+                    return withdrawn
+                # it paid all it had after all
+                available[j] = 0
+                break
+
+        # otherwise each pays what it has available, from the worst rate up
+        for j, (lender, _) in enumerate(ranked):
+            if withdrawn >= amount:
+                break
+            if available[j] > 0:
+                withdrawn += lender.withdraw(min(available[j], amount - withdrawn))
+
+        self.loose += withdrawn
+        return withdrawn
+
+    def liquidate_position(self, amount_needed):
+        if self.loose >= amount_needed:
+            return amount_needed, 0
+        self._withdraw_some(amount_needed - self.loose)
+        return min(self.loose, amount_needed), 0
+
+    def withdraw(self, amount_needed):
+        """BaseStrategy.withdraw, called by the vault. Returns (freed, loss) after sending freed to the vault"""
+        freed, loss = self.liquidate_position(amount_needed)
+        self.loose -= freed
+        return freed, loss
+
+    def harvest(self, now):
+        debt_outstanding = self.vault.debt_outstanding()
+        profit, loss, debt_payment = self.prepare_return(debt_outstanding)
+        debt_outstanding = self.vault.report(profit, loss, debt_payment, now)
+        moved = self.adjust_position(debt_outstanding, now)
+        return {"profit": profit, "loss": loss, "debt_payment": debt_payment, "moved": moved}
+
+    def tend(self, now):
+        return self.adjust_position(self.vault.debt_outstanding(), now)
+
+    # triggers
+    def harvest_trigger(self, call_cost, now):
+        call_cost = self.eth_to_want(call_cost)
+        vault = self.vault
+        if vault is None or vault.strategy is not self:
+            return False
+        since = now - vault.last_report
+        if since < self.min_report_delay:
+            return False
+        if since >= self.max_report_delay:
+            return True
+
+        if vault.debt_outstanding() > self.debt_threshold:
+            return True
+
+        total = self.estimated_total_assets()
+        if total + self.debt_threshold < vault.total_debt:
+            return True
+
+        profit = total - vault.total_debt if total > vault.total_debt else 0
+        credit = vault.credit_available()
+        return self.profit_factor * call_cost < credit + profit
+
+    def tend_trigger(self, call_cost, now):
+        if self.harvest_trigger(call_cost, now):
+            return False
+        if len(self.lenders) == 0:
+            return False
+
+        lowest, lowest_apr, _, potential = estimate_adjust_position(self.lenders, self.loose)
+        if potential > lowest_apr:
+            spread = potential - lowest_apr
+            since = MAX_UINT if self.last_rebalance is None else now - self.last_rebalance
+            if spread < self.min_tend_spread or since < self.tend_cooldown:
+                return False
+
+            nav = self.lenders[lowest].nav
+            profit_increase = nav * spread // 10 ** 18 * self.max_report_delay // SECONDSPERYEAR
+            want_call_cost = self.eth_to_want(call_cost)
+            # a rebalance within the last interlude is likely to be moved back
+            if since < self.max_report_delay:
+                if spread < self.last_rebalance_spread:
+                    return False
+                want_call_cost *= 2
+            return want_call_cost * self.profit_factor < profit_increase
+        return False
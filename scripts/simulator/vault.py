@@ -0,0 +1,133 @@
+"""
+The parts of a yearn 0.4.3 Vault a single strategy talks to: debtOutstanding,
+creditAvailable, report and withdraw. Fees are minted as shares on chain so they
+do not move want; they are only tallied in fees_paid.
+"""
+
+MAX_BPS = 10_000
+SECS_PER_YEAR = 31_556_952
+
+
+class VaultModel:
+    def __init__(
+        self,
+        idle=0,
+        debt_ratio=MAX_BPS,
+        min_debt_per_harvest=0,
+        max_debt_per_harvest=2 ** 256 - 1,
+        performance_fee=1_000,
+        strategist_fee=1_000,
+        management_fee=200,
+    ):
+        self.idle = idle
+        self.debt_ratio = debt_ratio
+        self.min_debt_per_harvest = min_debt_per_harvest
+        self.max_debt_per_harvest = max_debt_per_harvest
+        self.performance_fee = performance_fee
+        self.strategist_fee = strategist_fee
+        self.management_fee = management_fee
+        self.total_debt = 0
+        self.total_gain = 0
+        self.total_loss = 0
+        self.last_report = 0
+        self.activation = 0
+        self.emergency_shutdown = False
+        self.fees_paid = 0
+        self.deposited = 0
+        self.withdrawn = 0
+        self.strategy = None
+
+    def add_strategy(self, strategy, now=0):
+        self.strategy = strategy
+        strategy.vault = self
+        self.activation = now
+        self.last_report = now
+
+    def total_assets(self):
+        return self.idle + self.total_debt
+
+    def deposit(self, amount):
+        self.idle += amount
+        self.deposited += amount
+
+    def debt_outstanding(self):
+        if self.emergency_shutdown:
+            return self.total_debt
+        debt_limit = self.debt_ratio * self.total_assets() // MAX_BPS
+        if self.total_debt <= debt_limit:
+            return 0
+        return self.total_debt - debt_limit
+
+    def credit_available(self):
+        if self.emergency_shutdown:
+            return 0
+        debt_limit = self.debt_ratio * self.total_assets() // MAX_BPS
+        if debt_limit <= self.total_debt:
+            return 0
+        available = min(debt_limit - self.total_debt, self.idle)
+        if available < self.min_debt_per_harvest:
+            return 0
+        return min(available, self.max_debt_per_harvest)
+
+    def _report_loss(self, loss):
+        total_assets = self.total_assets()
+        if self.total_debt > 0 and total_assets > 0:
+            ratio_change = min(loss * self.debt_ratio // self.total_debt, self.debt_ratio)
+            self.debt_ratio -= ratio_change
+        self.total_loss += loss
+        self.total_debt -= loss
+
+    def _assess_fees(self, gain, now):
+        duration = now - self.last_report
+        if duration == 0:
+            return
+        management = self.total_debt * duration * self.management_fee // MAX_BPS // SECS_PER_YEAR
+        performance = gain * (self.performance_fee + self.strategist_fee) // MAX_BPS
+        self.fees_paid += min(management + performance, gain)
+
+    def report(self, gain, loss, debt_payment, now):
+        """Vault.report. Moves want between the vault and strategy.loose and returns the debt still outstanding"""
+        strategy = self.strategy
+        assert strategy.loose >= gain + debt_payment, "insufficient want"
+
+        if loss > 0:
+            self._report_loss(loss)
+        self._assess_fees(gain, now)
+        self.total_gain += gain
+
+        credit = self.credit_available()
+        debt = self.debt_outstanding()
+        debt_payment = min(debt_payment, debt)
+        if debt_payment > 0:
+            self.total_debt -= debt_payment
+            debt -= debt_payment
+        if credit > 0:
+            self.total_debt += credit
+
+        total_avail = gain + debt_payment
+        if total_avail < credit:
+            self.idle -= credit - total_avail
+            strategy.loose += credit - total_avail
+        elif total_avail > credit:
+            self.idle += total_avail - credit
+            strategy.loose -= total_avail - credit
+
+        self.last_report = now
+        if self.emergency_shutdown:
+            return self.total_assets()
+        return debt
+
+    def withdraw(self, value):
+        """Vault.withdraw in want. Pulls from the strategy when idle is short. Returns the want paid out"""
+        if value > self.idle and self.strategy is not None:
+            amount_needed = min(value - self.idle, self.total_debt)
+            freed, loss = self.strategy.withdraw(amount_needed)
+            self.idle += freed
+            self.total_debt -= freed
+            if loss > 0:
+                value -= loss
+                self._report_loss(loss)
+        value = min(value, self.idle)
+        self.idle -= value
+        self.withdrawn += value
+        return value
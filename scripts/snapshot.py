@@ -0,0 +1,223 @@
+"""
+Health snapshot of many strategies and their lender plugins in a handful of eth_calls.
+
+Everything tests/useful_methods.genericStateOfStrat prints, plus the plugin views the keepers
+look at, goes through tryAggregate of a Multicall2/Multicall3 contract in two rounds:
+
+    1. vault() and lendStatuses() of every strategy. lendStatuses gives the plugin addresses
+    2. every other view of the strategies, their plugins and their vaults
+
+Rounds larger than `batch_size` calls are split, so 30 strategies with 4 plugins each take 3
+eth_calls instead of several hundred. Pass a block number to read every batch at the same block.
+A call that reverts (a plugin without harvestTrigger for example) decodes to None instead of
+failing the snapshot.
+
+    STRATEGIES=0x...,0x... brownie run snapshot --network mainnet
+"""
+import os
+from typing import List, NamedTuple, Optional, Union
+
+from eth_abi.exceptions import DecodingError
+from eth_utils import function_signature_to_4byte_selector, to_checksum_address
+
+try:
+    from eth_abi import decode, encode
+except ImportError:  # eth-abi < 4
+    from eth_abi import decode_abi as decode, encode_abi as encode
+
+# Multicall3, same address on mainnet, optimism and fantom
+MULTICALL = "0xcA11bde05977b3631167028862bE2a173976CA11"
+
+# 1m gas at 30 gwei, like genericStateOfStrat
+CALL_COST = 1_000_000 * 30 * 10 ** 9
+
+
+class Call(NamedTuple):
+    target: str
+    signature: str
+    args: tuple
+    returns: str
+
+    def encode(self):
+        types = self.signature[self.signature.index("(") + 1 : -1]
+        selector = function_signature_to_4byte_selector(self.signature)
+        return selector + encode([t for t in types.split(",") if t], list(self.args))
+
+    def decode(self, data):
+        try:
+            return decode([self.returns], bytes(data))[0]
+        except DecodingError:
+            # a call to an address without code succeeds with no data
+            return None
+
+
+TRY_AGGREGATE = function_signature_to_4byte_selector("tryAggregate(bool,(address,bytes)[])")
+
+
+def aggregate(eth_call, calls, multicall=MULTICALL, block="latest", batch_size=500):
+    """
+    Runs `calls` through tryAggregate, at most `batch_size` per eth_call.
+    Returns the decoded results. Failed calls are None
+    """
+    results = []
+    for start in range(0, len(calls), batch_size):
+        batch = calls[start : start + batch_size]
+        data = TRY_AGGREGATE + encode(["bool", "(address,bytes)[]"], [False, [(c.target, c.encode()) for c in batch]])
+        (returned,) = decode(["(bool,bytes)[]"], bytes(eth_call(multicall, data, block)))
+        results += [call.decode(ret) if success else None for call, (success, ret) in zip(batch, returned)]
+    return results
+
+
+def web3_call(web3):
+    """eth_call through a web3 instance, brownie's for example"""
+
+    def eth_call(to, data, block):
+        return web3.eth.call({"to": to, "data": "0x" + data.hex()}, block)
+
+    return eth_call
+
+
+class LenderStatus(NamedTuple):
+    address: str
+    name: str
+    nav: int
+    apr: int
+    has_assets: Optional[bool]
+    apr_after_deposit: Optional[int]
+    # None for plugins without rewards to harvest
+    harvest_trigger: Optional[bool]
+
+
+class StrategyParams(NamedTuple):
+    # vault.strategies() of a 0.4.3 vault
+    performance_fee: int
+    activation: int
+    debt_ratio: int
+    min_debt_per_harvest: int
+    max_debt_per_harvest: int
+    last_report: int
+    total_debt: int
+    total_gain: int
+    total_loss: int
+
+
+class StrategyStatus(NamedTuple):
+    address: str
+    vault: Optional[str]
+    estimated_total_assets: Optional[int]
+    estimated_apr: Optional[int]
+    harvest_trigger: Optional[bool]
+    tend_trigger: Optional[bool]
+    emergency_exit: Optional[bool]
+    params: Optional[StrategyParams]
+    lenders: List[LenderStatus]
+
+
+class Snapshot(NamedTuple):
+    block: Union[int, str]
+    strategies: List[StrategyStatus]
+
+
+STRATEGY_PARAMS = "(" + ",".join(["uint256"] * len(StrategyParams._fields)) + ")"
+LEND_STATUSES = "(string,uint256,uint256,address)[]"
+
+
+def strategy_calls(strategy, vault, call_cost):
+    calls = [
+        Call(strategy, "estimatedTotalAssets()", (), "uint256"),
+        Call(strategy, "estimatedAPR()", (), "uint256"),
+        Call(strategy, "harvestTrigger(uint256)", (call_cost,), "bool"),
+        Call(strategy, "tendTrigger(uint256)", (call_cost,), "bool"),
+        Call(strategy, "emergencyExit()", (), "bool"),
+    ]
+    if vault is not None:
+        calls.append(Call(vault, "strategies(address)", (strategy,), STRATEGY_PARAMS))
+    return calls
+
+
+def lender_calls(plugin, call_cost, amount):
+    return [
+        Call(plugin, "hasAssets()", (), "bool"),
+        Call(plugin, "aprAfterDeposit(uint256)", (amount,), "uint256"),
+        Call(plugin, "harvestTrigger(uint256)", (call_cost,), "bool"),
+    ]
+
+
+def snapshot(eth_call, strategies, call_cost=CALL_COST, amount=0, multicall=MULTICALL, block="latest", batch_size=500):
+    """
+    Status of every strategy in `strategies` and of its plugins.
+    call_cost is passed to every trigger, aprAfterDeposit is asked about `amount`.
+    `block` is a block number or "latest"
+    """
+    strategies = [to_checksum_address(str(s)) for s in strategies]
+
+    calls = []
+    for strategy in strategies:
+        calls += [Call(strategy, "vault()", (), "address"), Call(strategy, "lendStatuses()", (), LEND_STATUSES)]
+    results = aggregate(eth_call, calls, multicall, block, batch_size)
+
+    layout = []
+    calls = []
+    for i, strategy in enumerate(strategies):
+        vault, statuses = results[2 * i], results[2 * i + 1] or []
+        vault = to_checksum_address(vault) if vault is not None else None
+        layout.append((vault, statuses))
+        calls += strategy_calls(strategy, vault, call_cost)
+        for status in statuses:
+            calls += lender_calls(to_checksum_address(status[3]), call_cost, amount)
+    results = iter(aggregate(eth_call, calls, multicall, block, batch_size))
+
+    records = []
+    for strategy, (vault, statuses) in zip(strategies, layout):
+        total_assets, apr, harvest_trigger, tend_trigger, emergency_exit = [next(results) for _ in range(5)]
+        params = next(results) if vault is not None else None
+        lenders = []
+        for name, nav, rate, plugin in statuses:
+            has_assets, apr_after_deposit, plugin_trigger = [next(results) for _ in range(3)]
+            lenders.append(LenderStatus(to_checksum_address(plugin), name, nav, rate, has_assets, apr_after_deposit, plugin_trigger))
+        records.append(
+            StrategyStatus(
+                strategy,
+                vault,
+                total_assets,
+                apr,
+                harvest_trigger,
+                tend_trigger,
+                emergency_exit,
+                StrategyParams(*params) if params is not None else None,
+                lenders,
+            )
+        )
+    return Snapshot(block, records)
+
+
+def main():
+    from brownie import web3
+
+    calls = []
+    call = web3_call(web3)
+
+    def eth_call(to, data, block):
+        calls.append(len(data))
+        return call(to, data, block)
+
+    strategies = os.environ["STRATEGIES"].split(",")
+    snap = snapshot(eth_call, strategies, multicall=os.environ.get("MULTICALL", MULTICALL), block=web3.eth.block_number)
+
+    print(f"\n----block {snap.block}. {len(strategies)} strategies in {len(calls)} eth_calls----")
+    for s in snap.strategies:
+        print(f"\n{s.address} (vault {s.vault})")
+        print("Total assets estimate:", s.estimated_total_assets)
+        print(f"Estimated APR: {s.estimated_apr / 1e16:.3f}%" if s.estimated_apr is not None else "Estimated APR: -")
+        if s.params is not None:
+            print("Total Strategy Debt:", s.params.total_debt)
+            print("Total Strategy Gains:", s.params.total_gain)
+            print("Total Strategy losses:", s.params.total_loss)
+        print("Harvest Trigger:", s.harvest_trigger)
+        print("Tend Trigger:", s.tend_trigger)
+        print("Emergency Exit:", s.emergency_exit)
+        for lender in s.lenders:
+            print(
+                f"    {lender.name}: nav {lender.nav}, apr {lender.apr / 1e16:.3f}%, "
+                f"has assets {lender.has_assets}, harvest trigger {lender.harvest_trigger}"
+            )
@@ -52,4 +52,4 @@ def test_reinitialize(
     router2
 ):
     with brownie.reverts():
-        v3Plugin.initialize(wftm.address, router, router2, False)
+        v3Plugin.initialize(v3Plugin.lenderName(), wftm.address, router, router2, False)
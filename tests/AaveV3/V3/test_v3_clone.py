@@ -36,4 +36,4 @@ def test_double_initialize(
     new_plugin = GenericAaveV3.at(tx.return_value)
 
     with brownie.reverts():
-        new_plugin.initialize(wftm.address, router, router2, True, {"from":strategist})
+        new_plugin.initialize(new_plugin.lenderName(), wftm.address, router, router2, True, {"from":strategist})
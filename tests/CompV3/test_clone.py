@@ -40,7 +40,7 @@ def test_clone(
     cloned_strategy.addLender(cloned_lender, {"from": gov})
     
     with brownie.reverts():
-        cloned_lender.initialize(cUsdc, {'from': gov})
+        cloned_lender.initialize("ClonedCompUSDC", {'from': gov})
 
     starting_balance = usdc.balanceOf(strategist)
     currency = usdc
@@ -0,0 +1,124 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from scripts.fork_cache import ForkCache, Proxy, cache_key, post, serve
+
+SLOT = ["0xA0b86991c6218b36c1d19D4a2e9Eb0cE3606eB48", "0x0", "0xe4e1c0"]
+
+
+class Upstream:
+    """An upstream node answering every request with its method and parameters, counting what it is asked"""
+
+    def __init__(self):
+        self.requests = []
+        upstream = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                batch = payload if isinstance(payload, list) else [payload]
+                upstream.requests.extend(batch)
+                answers = [upstream.answer(request) for request in batch]
+                body = json.dumps(answers if isinstance(payload, list) else answers[0]).encode()
+                self.send_response(200)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def answer(self, request):
+        if request["method"] == "eth_fail":
+            return {"jsonrpc": "2.0", "id": request["id"], "error": {"code": -32000, "message": "failed"}}
+        return {"jsonrpc": "2.0", "id": request["id"], "result": f"{request['method']}{request['params']}"}
+
+
+@pytest.fixture
+def upstream():
+    upstream = Upstream()
+    yield upstream
+    upstream.server.shutdown()
+
+
+@pytest.fixture
+def path(tmp_path):
+    yield str(tmp_path / "fork-cache.sqlite")
+
+
+def request(method, params, id=1):
+    return {"jsonrpc": "2.0", "id": id, "method": method, "params": params}
+
+
+def test_cache_keys():
+    assert cache_key("eth_getStorageAt", SLOT) == (15_000_000, json.dumps(SLOT))
+    assert cache_key("eth_getCode", ["0xabc", {"blockNumber": "0x10"}])[0] == 16
+    assert cache_key("eth_chainId", [])[0] == -1
+    # only concrete block numbers
+    assert cache_key("eth_getCode", ["0xabc", "latest"]) is None
+    assert cache_key("eth_getCode", ["0xabc", {"blockHash": "0x12"}]) is None
+    assert cache_key("eth_getCode", ["0xabc"]) is None
+    assert cache_key("eth_sendRawTransaction", ["0x00"]) is None
+
+
+def test_repeated_reads_are_served_from_disk(upstream, path):
+    proxy = Proxy(upstream.url, ForkCache(path, 1))
+    first = proxy.handle(request("eth_getStorageAt", SLOT, id=7))
+    assert first == {"jsonrpc": "2.0", "id": 7, "result": f"eth_getStorageAt{SLOT}"}
+    assert proxy.handle(request("eth_getStorageAt", SLOT, id=8)) == dict(first, id=8)
+    assert len(upstream.requests) == 1
+
+    # a new process at the same block
+    proxy.cache.close()
+    proxy = Proxy(upstream.url, ForkCache(path, 1))
+    assert proxy.handle(request("eth_getStorageAt", SLOT)) == dict(first, id=1)
+    assert len(upstream.requests) == 1
+    assert (proxy.cache.hits, proxy.cache.misses) == (1, 0)
+
+    # another block or another chain is asked again
+    proxy.handle(request("eth_getStorageAt", SLOT[:2] + ["0xe4e1c1"]))
+    Proxy(upstream.url, ForkCache(path, 10)).handle(request("eth_getStorageAt", SLOT))
+    assert len(upstream.requests) == 3
+
+
+def test_latest_and_errors_pass_through(upstream, path):
+    proxy = Proxy(upstream.url, ForkCache(path, 1))
+    for _ in range(2):
+        proxy.handle(request("eth_getCode", ["0xabc", "latest"]))
+        proxy.handle(request("eth_blockNumber", []))
+        assert "error" in proxy.handle(request("eth_fail", []))
+    assert len(upstream.requests) == 6
+
+
+def test_batches_only_forward_the_misses(upstream, path):
+    proxy = Proxy(upstream.url, ForkCache(path, 1))
+    proxy.handle(request("eth_getStorageAt", SLOT))
+
+    # the node reuses ids within a batch
+    batch = [request("eth_getStorageAt", SLOT, id=1), request("eth_getCode", SLOT[:1] + SLOT[2:], id=1), request("eth_fail", [], id=2)]
+    answers = proxy.handle(batch)
+    assert [answer["id"] for answer in answers] == [1, 1, 2]
+    assert answers[0]["result"] == f"eth_getStorageAt{SLOT}"
+    assert answers[1]["result"] == f"eth_getCode{SLOT[:1] + SLOT[2:]}"
+    assert "error" in answers[2]
+    # one upstream batch of the two misses
+    assert [r["method"] for r in upstream.requests] == ["eth_getStorageAt", "eth_getCode", "eth_fail"]
+
+
+def test_serves_http(upstream, path):
+    server = serve(Proxy(upstream.url, ForkCache(path, 1)), port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        assert post(url, request("eth_getStorageAt", SLOT))["result"] == f"eth_getStorageAt{SLOT}"
+        assert post(url, [request("eth_getStorageAt", SLOT)])[0]["result"] == f"eth_getStorageAt{SLOT}"
+        assert len(upstream.requests) == 1
+    finally:
+        server.shutdown()
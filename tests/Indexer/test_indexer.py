@@ -0,0 +1,237 @@
+import pytest
+from eth_utils import to_checksum_address
+
+from scripts.indexer import EVENTS, SECONDS_PER_YEAR, Indexer, RpcError, Store, aprs, profits
+
+E18 = 10 ** 18
+VAULT = "0x" + "11" * 20
+STRATEGY = "0x" + "22" * 20
+LENDER = "0x" + "33" * 20
+OTHER = "0x" + "44" * 20
+TOPICS = {event.table: event.topic for event in EVENTS}
+BLOCK_TIME = 12
+BLOCKS_PER_YEAR = SECONDS_PER_YEAR // BLOCK_TIME
+
+
+def word(value):
+    if isinstance(value, str):
+        return value[2:].lower().rjust(64, "0")
+    return hex(value)[2:].rjust(64, "0")
+
+
+class Chain:
+    """A local chain that only emits logs and deploys, a block every BLOCK_TIME. eth_getLogs fails past max_logs results"""
+
+    def __init__(self, max_logs=1_000):
+        self.blocks = [[]]
+        self.max_logs = max_logs
+        self.requests = []
+        self.deployed = {}
+
+    def mine(self, n=1):
+        self.blocks += [[] for _ in range(n)]
+
+    def deploy(self, address):
+        self.deployed[address.lower()] = len(self.blocks) - 1
+
+    def emit(self, address, table, indexed=(), data=()):
+        block = len(self.blocks) - 1
+        self.blocks[block].append(
+            {
+                "address": address,
+                "topics": [TOPICS[table]] + ["0x" + word(value) for value in indexed],
+                "data": "0x" + "".join(word(value) for value in data),
+                "blockNumber": hex(block),
+                "logIndex": hex(len(self.blocks[block])),
+                "transactionHash": "0x" + word(block * 1_000 + len(self.blocks[block])),
+            }
+        )
+
+    def report(self, vault, strategy, gain, loss, total_debt):
+        self.emit(vault, "reports", [strategy], [gain, loss, 0, 0, 0, total_debt, 0, 10_000])
+        self.emit(strategy, "harvests", [], [gain, loss, 0, 0])
+
+    def call(self, method, params):
+        self.requests.append((method, params))
+        if method == "eth_blockNumber":
+            return hex(len(self.blocks) - 1)
+        if method == "eth_getBlockByNumber":
+            return {"timestamp": hex(int(params[0], 16) * BLOCK_TIME)}
+        if method == "eth_getCode":
+            deployed = self.deployed.get(params[0].lower())
+            return "0x" if deployed is None or int(params[1], 16) < deployed else "0x6080"
+        assert method == "eth_getLogs"
+        query = params[0]
+        addresses = {a.lower() for a in query["address"]}
+        logs = [
+            log
+            for block in self.blocks[int(query["fromBlock"], 16) : int(query["toBlock"], 16) + 1]
+            for log in block
+            if log["address"].lower() in addresses and log["topics"][0] in query["topics"][0]
+        ]
+        if len(logs) > self.max_logs:
+            raise RpcError("query returned more than 1000 results")
+        return logs
+
+
+@pytest.fixture
+def path(tmp_path):
+    yield str(tmp_path / "index.sqlite")
+
+
+@pytest.fixture
+def store(path):
+    store = Store(path)
+    yield store
+    store.close()
+
+
+def rows(store, table):
+    return store.db.execute(f"SELECT * FROM {table} ORDER BY block, log_index").fetchall()
+
+
+def test_indexes_reports_and_harvests(store):
+    chain = Chain()
+    chain.mine(10)
+    chain.report(VAULT, STRATEGY, E18, 0, 100 * E18)
+    chain.emit(STRATEGY, "lender_harvests", [LENDER])
+    chain.emit(OTHER, "harvests", [], [5, 0, 0, 0])
+    chain.mine(10)
+
+    store.track([VAULT, STRATEGY], 0)
+    assert Indexer(chain.call, store, step=4).run() == 20
+
+    [report] = rows(store, "reports")
+    assert report[:2] == (10, 0)
+    assert report[3:10] == (VAULT, STRATEGY, str(E18), "0", "0", "0", "0")
+    assert report[10] == str(100 * E18)
+    # the untracked strategy is left out
+    assert [row[3] for row in rows(store, "harvests")] == [STRATEGY]
+    assert rows(store, "lender_harvests")[0][3:] == (STRATEGY, LENDER)
+    assert store.db.execute("SELECT * FROM blocks").fetchall() == [(10, 120)]
+
+
+def test_resumes_from_the_checkpoint(store, path):
+    chain = Chain()
+    store.track([VAULT, STRATEGY], 0)
+    indexer = Indexer(chain.call, store, step=100, confirmations=2)
+
+    chain.report(VAULT, STRATEGY, E18, 0, 100 * E18)
+    chain.mine(5)
+    assert indexer.run() == 3
+    chain.mine(1)
+    chain.report(VAULT, STRATEGY, 2 * E18, 0, 100 * E18)
+    chain.mine(2)
+
+    chain.requests.clear()
+    assert indexer.run() == 6
+    logs = [params[0] for method, params in chain.requests if method == "eth_getLogs"]
+    assert [(q["fromBlock"], q["toBlock"]) for q in logs] == [("0x4", "0x6")]
+    assert [row[0] for row in rows(store, "reports")] == [0, 6]
+
+    # a new store on the same file carries on from there
+    chain.mine(3)
+    reopened = Store(path)
+    assert Indexer(chain.call, reopened, confirmations=2).run() == 9
+    assert reopened.checkpoint == store.checkpoint == 9
+    assert len(rows(store, "reports")) == 2
+    reopened.close()
+
+
+def test_tracks_clones_and_new_strategies(store):
+    chain = Chain()
+    clone = "0x" + "55" * 20
+    store.track([VAULT, LENDER], 0)
+
+    chain.mine(3)
+    # a strategy first seen reporting to the vault, a clone of the lender used in the same block
+    chain.report(VAULT, STRATEGY, E18, 0, 100 * E18)
+    chain.emit(LENDER, "clones", [clone])
+    chain.emit(STRATEGY, "lender_harvests", [clone])
+    chain.emit(clone, "clones", [OTHER])
+    chain.mine(3)
+    chain.emit(OTHER, "harvests", [], [1, 0, 0, 0])
+
+    Indexer(chain.call, store, step=100).run()
+    tracked = {address.lower(): block for address, block in store.addresses().items()}
+    assert tracked == {VAULT: 0, LENDER: 0, STRATEGY: 3, clone: 3, OTHER: 3}
+    assert [row[3].lower() for row in rows(store, "harvests")] == [STRATEGY, OTHER]
+    assert len(rows(store, "lender_harvests")) == 1
+    assert len(rows(store, "clones")) == 2
+
+
+def test_splits_ranges_the_node_refuses(store):
+    chain = Chain(max_logs=2)
+    store.track([VAULT, STRATEGY], 0)
+    for _ in range(4):
+        chain.report(VAULT, STRATEGY, E18, 0, 100 * E18)
+        chain.mine()
+
+    Indexer(chain.call, store, step=100).run()
+    assert len(rows(store, "reports")) == 4
+
+    # a single block the node refuses fails the run
+    chain.mine()
+    chain.report(VAULT, STRATEGY, E18, 0, 100 * E18)
+    chain.report(VAULT, STRATEGY, E18, 0, 100 * E18)
+    with pytest.raises(RpcError):
+        Indexer(chain.call, store).run()
+    # nothing of the failed range is stored
+    assert store.checkpoint == 4
+    assert len(rows(store, "reports")) == 4
+
+
+def test_profits_and_aprs(store):
+    chain = Chain()
+    store.track([VAULT], 0)
+    other = "0x" + "66" * 20
+
+    chain.report(VAULT, STRATEGY, 0, 0, 100 * E18)
+    # 1 on 100 over a hundredth of a year, 100%
+    chain.mine(BLOCKS_PER_YEAR // 100)
+    chain.report(VAULT, STRATEGY, E18, 0, 101 * E18)
+    chain.report(VAULT, other, 0, E18 // 2, 10 * E18)
+    chain.mine()
+    Indexer(chain.call, store, step=10_000).run()
+
+    assert profits(store) == pytest.approx({to_checksum_address(STRATEGY): E18, to_checksum_address(other): -E18 / 2})
+    [(block, apr)] = aprs(store, STRATEGY)
+    assert block == BLOCKS_PER_YEAR // 100
+    assert apr == pytest.approx(1.0, rel=1e-3)
+    assert aprs(store, other) == []
+
+
+def test_back_fills_addresses_tracked_later(store):
+    chain = Chain()
+    clone = "0x" + "55" * 20
+    store.track([VAULT], 0)
+    indexer = Indexer(chain.call, store, step=4)
+
+    chain.mine(2)
+    chain.deploy(STRATEGY)
+    chain.mine(1)
+    # reports to a vault that is not tracked
+    chain.report(OTHER, STRATEGY, E18, 0, 100 * E18)
+    chain.mine(2)
+    chain.emit(STRATEGY, "clones", [clone])
+    chain.mine(2)
+    chain.emit(clone, "harvests", [], [2, 0, 0, 0])
+    chain.mine(3)
+    assert indexer.run() == 10
+    assert rows(store, "harvests") == []
+
+    # tracked from its deployment, its history and the clone's are scanned up to the checkpoint first
+    chain.mine(2)
+    chain.report(VAULT, STRATEGY, E18, 0, 100 * E18)
+    chain.requests.clear()
+    indexer.track([STRATEGY, VAULT], 0)
+    assert indexer.run() == 12
+
+    tracked = {address.lower(): block for address, block in store.addresses().items()}
+    assert tracked == {VAULT: 0, STRATEGY: 2, clone: 5}
+    assert [(row[0], row[3].lower()) for row in rows(store, "harvests")] == [(3, STRATEGY), (7, clone), (12, STRATEGY)]
+    assert [row[0] for row in rows(store, "clones")] == [5]
+    assert store.behind() == {}
+    # the vault is not scanned again
+    logs = [params[0] for method, params in chain.requests if method == "eth_getLogs"]
+    assert all(int(q["fromBlock"], 16) > 10 for q in logs if to_checksum_address(VAULT) in q["address"])
@@ -0,0 +1,242 @@
+import re
+
+import pytest
+from brownie import chain, config, web3
+from brownie.convert import to_address
+
+# These fixtures run the strategy against in-repo stand-ins of Compound, Compound V3, Aave V3, dYdX and Iron Bank
+# on a plain local chain. No fork is needed: brownie test tests/Local --network development
+#
+# The plugins that talk to hard coded protocol addresses find the mocks there: a mock is deployed, its runtime
+# code is copied to the address the plugin source hard codes and it is configured afterwards, since its
+# constructor never ran there.
+# Every market has 10m of want supplied and 5m borrowed by the borrower account, so the rates are not zero
+
+E18 = 10 ** 18
+RAY = 10 ** 27
+MARKET_SUPPLY = 10_000_000 * E18
+MARKET_BORROW = 5_000_000 * E18
+MAX_UINT = 2 ** 256 - 1
+
+
+def hard_coded(container, name):
+    """the address the source of container hard codes for name, as a constant or wrapped inline like IBaseFee(0x..)"""
+    source = container._build["source"]
+    match = re.search(rf"(?:constant\s+{name}\s*=[^;]*?|\b{name}\(\s*)(0x[0-9a-fA-F]{{40}})", source)
+    if match is None:
+        raise ValueError(f"{container._name} hard codes no address for {name}")
+    return to_address(match.group(1))
+
+
+def etch(container, template, address):
+    """copies the runtime code of a deployed contract to address and returns the contract there"""
+    code = web3.eth.get_code(template.address).hex()
+    # ganache 7, hardhat and anvil
+    for method in ["evm_setAccountCode", "hardhat_setCode", "anvil_setCode"]:
+        if "error" not in web3.provider.make_request(method, [address, code]):
+            return container.at(address)
+    raise RuntimeError(f"{web3.clientVersion} can not set the code of {address}")
+
+
+@pytest.fixture(autouse=True)
+def isolation(fn_isolation):
+    pass
+
+
+@pytest.fixture
+def currency(MockERC20, gov):
+    yield gov.deploy(MockERC20, "Mock USD", "mUSD", 18)
+
+
+@pytest.fixture
+def whale(accounts, currency):
+    acc = accounts[5]
+    currency.mint(acc, 100_000_000 * E18, {"from": acc})
+    yield acc
+
+
+@pytest.fixture()
+def strategist(accounts, whale, currency):
+    currency.transfer(accounts[1], 100_000 * E18, {"from": whale})
+    yield accounts[1]
+
+
+@pytest.fixture
+def borrower(accounts, currency):
+    # supplies to every market and borrows half of it back
+    acc = accounts[6]
+    currency.mint(acc, 4 * MARKET_SUPPLY, {"from": acc})
+    yield acc
+
+
+@pytest.fixture
+def vault(gov, rewards, guardian, currency, pm):
+    Vault = pm(config["dependencies"][0]).Vault
+    vault = Vault.deploy({"from": guardian})
+    vault.initialize(currency, gov, rewards, "", "")
+    yield vault
+
+
+@pytest.fixture
+def weth(MockERC20, gov):
+    yield gov.deploy(MockERC20, "Mock WETH", "mWETH", 18)
+
+
+@pytest.fixture
+def comp(MockERC20, GenericCompound, GenericCompoundV3, gov):
+    assert hard_coded(GenericCompound, "comp") == hard_coded(GenericCompoundV3, "comp")
+    yield etch(MockERC20, gov.deploy(MockERC20, "Mock COMP", "mCOMP", 18), hard_coded(GenericCompound, "comp"))
+
+
+@pytest.fixture
+def uniswap_v2_router(MockUniswapV2Router, GenericCompound, gov):
+    yield etch(MockUniswapV2Router, gov.deploy(MockUniswapV2Router), hard_coded(GenericCompound, "uniswapRouter"))
+
+
+@pytest.fixture
+def uniswap_v3_router(MockUniswapV3Router, GenericCompoundV3, gov):
+    yield etch(MockUniswapV3Router, gov.deploy(MockUniswapV3Router), hard_coded(GenericCompoundV3, "router"))
+
+
+
+@pytest.fixture
+def base_fee(MockBaseFee, GenericCompoundV3, gov):
+    yield etch(MockBaseFee, gov.deploy(MockBaseFee), hard_coded(GenericCompoundV3, "IBaseFee"))
+
+
+@pytest.fixture
+def ctoken(MockCToken, MockInterestRateModel, currency, borrower, gov):
+    # jump rate model: 10% a year at full utilisation up to a kink at 80%
+    model = gov.deploy(MockInterestRateModel, 0, E18 // 10, E18, 8 * E18 // 10)
+    ctoken = gov.deploy(MockCToken, currency, model, 2 * 10 ** 26, E18 // 10, "Mock cUSD", "mcUSD")
+    currency.approve(ctoken, MAX_UINT, {"from": borrower})
+    ctoken.mint(MARKET_SUPPLY, {"from": borrower})
+    ctoken.borrow(MARKET_BORROW, {"from": borrower})
+    yield ctoken
+
+
+@pytest.fixture
+def comet(MockComet, MockCometRewards, MockChainlinkFeed, GenericCompoundV3, comp, currency, borrower, gov):
+    usd_feed = gov.deploy(MockChainlinkFeed, "mUSD / USD", 8, 10 ** 8)
+    comp_feed = gov.deploy(MockChainlinkFeed, "COMP / USD", 8, 50 * 10 ** 8)
+    comet = gov.deploy(MockComet, currency, usd_feed)
+    comet.setAssetPriceFeed(comp, comp_feed, {"from": gov})
+    # kinks at 80%, 2% supply and 6% borrow at half utilisation
+    comet.setRates(8 * E18 // 10, 4 * E18 // 100, E18, 0, 8 * E18 // 10, E18 // 10, E18, E18 // 100, {"from": gov})
+    # 0.0001 COMP a second for the suppliers
+    comet.setBaseTrackingSupplySpeed(10 ** 11, {"from": gov})
+
+    rewards = etch(MockCometRewards, gov.deploy(MockCometRewards), hard_coded(GenericCompoundV3, "rewardsContract"))
+    rewards.setRewardConfig(comet, comp, 10 ** 12, True, {"from": gov})
+    comp.mint(rewards, 1_000_000 * E18, {"from": gov})
+
+    currency.approve(comet, MAX_UINT, {"from": borrower})
+    comet.supply(currency, MARKET_SUPPLY, {"from": borrower})
+    comet.borrow(MARKET_BORROW, {"from": borrower})
+    yield comet
+
+
+@pytest.fixture
+def reward_token(MockERC20, gov):
+    yield gov.deploy(MockERC20, "Mock OP", "mOP", 18)
+
+
+@pytest.fixture
+def aave_pool(
+    MockAaveV3Pool, MockAaveDataProvider, MockRewardsController, GenericAaveV3, reward_token, weth, uniswap_v2_router, currency, borrower, gov
+):
+    # optimal usage at 80%, 4% then 75% slopes and a 10% reserve factor
+    pool = gov.deploy(MockAaveV3Pool, currency, 8 * RAY // 10, 0, 4 * RAY // 100, 75 * RAY // 100, 1_000)
+    provider = etch(MockAaveDataProvider, gov.deploy(MockAaveDataProvider), hard_coded(GenericAaveV3, "protocolDataProvider"))
+    provider.setPool(pool, {"from": gov})
+
+    # 0.001 reward token a second for a year. one reward token is worth 2 want
+    controller = gov.deploy(MockRewardsController)
+    pool.setIncentivesController(controller, {"from": gov})
+    controller.configureReward(pool, reward_token, 10 ** 15, chain.time() + 365 * 86400, {"from": gov})
+    reward_token.mint(controller, 1_000_000 * E18, {"from": gov})
+    uniswap_v2_router.setPrice(reward_token, weth, E18 // 1_000, {"from": gov})
+    uniswap_v2_router.setPrice(weth, currency, 2_000 * E18, {"from": gov})
+    currency.mint(uniswap_v2_router, 1_000_000 * E18, {"from": gov})
+
+    currency.approve(pool, MAX_UINT, {"from": borrower})
+    pool.supply(currency, MARKET_SUPPLY, borrower, 0, {"from": borrower})
+    pool.borrow(MARKET_BORROW, {"from": borrower})
+    yield pool
+
+
+@pytest.fixture
+def solo(MockSoloMargin, GenericDyDx, currency, borrower, gov):
+    solo = etch(MockSoloMargin, gov.deploy(MockSoloMargin), hard_coded(GenericDyDx, "SOLO"))
+    # 8% a year at full utilisation, linear: coefficients 0% for utilisation^0 and 100% for utilisation^1
+    solo.addMarket(currency, 8 * E18 // 100, 100 << 8, {"from": gov})
+
+    currency.approve(solo, MAX_UINT, {"from": borrower})
+    # (actionType, accountId, (sign, denomination, ref, value), primaryMarketId, secondaryMarketId, otherAddress, otherAccountId, data)
+    deposit = (0, 0, (True, 0, 0, MARKET_SUPPLY), 0, 0, borrower, 0, b"")
+    solo.operate([(borrower, 0)], [deposit], {"from": borrower})
+    solo.borrow(0, MARKET_BORROW, {"from": borrower})
+    yield solo
+
+
+@pytest.fixture
+def iron_bank(MockCToken, MockInterestRateModel, MockStakingRewardsFactory, GenericIronBank, currency, borrower, gov):
+    # the iToken market of want, with the jump rate model of ctoken. No staking rewards are listed,
+    # so the plugin holds the iTokens itself and ignores the IB rewards
+    model = gov.deploy(MockInterestRateModel, 0, E18 // 10, E18, 8 * E18 // 10)
+    itoken = gov.deploy(MockCToken, currency, model, 2 * 10 ** 26, E18 // 10, "Mock iUSD", "miUSD")
+    factory = etch(MockStakingRewardsFactory, gov.deploy(MockStakingRewardsFactory), hard_coded(GenericIronBank, "rewardsFactory"))
+    factory.setStakingToken(currency, itoken, {"from": gov})
+
+    currency.approve(itoken, MAX_UINT, {"from": borrower})
+    itoken.mint(MARKET_SUPPLY, {"from": borrower})
+    itoken.borrow(MARKET_BORROW, {"from": borrower})
+    yield itoken
+
+
+@pytest.fixture
+def strategy(
+    strategist,
+    keeper,
+    gov,
+    vault,
+    weth,
+    ctoken,
+    comet,
+    aave_pool,
+    solo,
+    uniswap_v2_router,
+    uniswap_v3_router,
+    base_fee,
+    Strategy,
+    EthToEthOracle,
+    GenericCompound,
+    GenericCompoundV3,
+    GenericAaveV3,
+    GenericDyDx,
+):
+    strategy = strategist.deploy(Strategy, vault)
+    strategy.setKeeper(keeper, {"from": strategist})
+    strategy.setPriceOracle(strategist.deploy(EthToEthOracle), {"from": strategist})
+
+    compoundPlugin = strategist.deploy(GenericCompound, strategy, "Compound", ctoken)
+    compoundV3Plugin = strategist.deploy(GenericCompoundV3, strategy, "CompoundV3", comet)
+    aaveV3Plugin = strategist.deploy(GenericAaveV3, strategy, weth, uniswap_v2_router, uniswap_v2_router, "AaveV3", True)
+    dydxPlugin = strategist.deploy(GenericDyDx, strategy, "DyDx")
+    for plugin in [compoundPlugin, compoundV3Plugin, aaveV3Plugin, dydxPlugin]:
+        strategy.addLender(plugin, {"from": gov})
+    assert strategy.numLenders() == 4
+    yield strategy
+
+
+@pytest.fixture
+def iron_bank_strategy(strategist, keeper, gov, vault, iron_bank, Strategy, EthToEthOracle, GenericIronBank):
+    # GenericIronBank is built for Optimism, so it gets a strategy of its own instead of joining the mainnet lenders
+    strategy = strategist.deploy(Strategy, vault)
+    strategy.setKeeper(keeper, {"from": strategist})
+    strategy.setPriceOracle(strategist.deploy(EthToEthOracle), {"from": strategist})
+
+    ironBankPlugin = strategist.deploy(GenericIronBank, strategy, "IronBank")
+    assert ironBankPlugin.cToken() == iron_bank
+    strategy.addLender(ironBankPlugin, {"from": gov})
+    yield strategy
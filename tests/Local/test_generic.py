@@ -0,0 +1,20 @@
+# The logic of tests/GenericTests run against the local mocks instead of a mainnet fork.
+# test_vault_shares_generic is left out: it compares share values exactly, which only held for the
+# interest the forked protocols happened to pay over a few blocks.
+# test_generic_iron_bank.py runs the same tests with GenericIronBank as the only lender.
+# The USDC, CompV3, AaveV3, Opt and FTM suites stay on their forks: they drive the live vaults, strategies
+# and whales of those chains. The plugin behaviour they check is covered against the mocks in test_protocols.py
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "GenericTests"))
+
+from test_clone import test_clone, test_double_initialize  # noqa: E402,F401
+from test_various import (  # noqa: E402,F401
+    test_apr_generic,
+    test_donations,
+    test_good_migration,
+    test_strat_emergency_exit_generic,
+    test_strat_graceful_exit_generic,
+    test_vault_emergency_exit_generic,
+)
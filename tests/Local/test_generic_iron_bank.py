@@ -0,0 +1,18 @@
+# The tests/GenericTests port of test_generic.py, with GenericIronBank as the only lender
+import pytest
+
+from test_generic import (  # noqa: F401
+    test_apr_generic,
+    test_clone,
+    test_donations,
+    test_double_initialize,
+    test_good_migration,
+    test_strat_emergency_exit_generic,
+    test_strat_graceful_exit_generic,
+    test_vault_emergency_exit_generic,
+)
+
+
+@pytest.fixture
+def strategy(iron_bank_strategy):
+    yield iron_bank_strategy
@@ -0,0 +1,445 @@
+import brownie
+import pytest
+from brownie import ZERO_ADDRESS, Wei, chain, web3
+
+from conftest import E18, hard_coded
+from scripts.benchmark import LENDER_CALLS, lender_gas
+
+MAX_UINT = 2 ** 256 - 1
+
+
+def invest(strategy, vault, currency, whale, gov, amount):
+    vault.setDepositLimit(MAX_UINT, {"from": gov})
+    vault.addStrategy(strategy, 10_000, 0, MAX_UINT, 1_000, {"from": gov})
+    currency.approve(vault, amount, {"from": whale})
+    vault.deposit(amount, {"from": whale})
+    strategy.harvest({"from": gov})
+
+
+def plugins(strategy, GenericCompound, GenericCompoundV3, GenericAaveV3, GenericDyDx):
+    containers = [GenericCompound, GenericCompoundV3, GenericAaveV3, GenericDyDx]
+    return [container.at(strategy.lenders(i)) for i, container in enumerate(containers)]
+
+
+def test_plugin_aprs_follow_the_mocks(strategy, aave_pool, GenericCompound, GenericCompoundV3, GenericAaveV3, GenericDyDx):
+    compound, compoundV3, aaveV3, dydx = plugins(strategy, GenericCompound, GenericCompoundV3, GenericAaveV3, GenericDyDx)
+    # half of every market is borrowed
+    # compound: 5% borrow rate, 10% reserve factor
+    assert compound.apr() == pytest.approx(0.0225 * E18, rel=1e-3)
+    # comet: 2% supply rate. the COMP rewards round to nothing for an 18 decimals base
+    assert compoundV3.apr() == pytest.approx(0.02 * E18, rel=1e-3)
+    # dydx: 4% borrow rate. the plugin counts a year as 31_153_900 seconds
+    assert dydx.apr() == pytest.approx(0.02 * E18 * 31_153_900 / (365 * 86400), rel=1e-3)
+    # aave: 2.5% borrow rate, 10% reserve factor, plus the incentives
+    assert aave_pool.currentLiquidityRate() // 10 ** 9 == pytest.approx(0.01125 * E18, rel=1e-3)
+    assert aaveV3.apr() > aave_pool.currentLiquidityRate() // 10 ** 9
+
+    # supplying more lowers the rates
+    for plugin in [compound, compoundV3, aaveV3, dydx]:
+        assert plugin.aprAfterDeposit(Wei("1000000 ether")) < plugin.apr()
+
+
+def test_every_plugin_earns_and_pays_back(
+    strategy, vault, currency, whale, gov, ctoken, GenericCompound, GenericCompoundV3, GenericAaveV3, GenericDyDx
+):
+    lenders = plugins(strategy, GenericCompound, GenericCompoundV3, GenericAaveV3, GenericDyDx)
+    before = currency.balanceOf(whale)
+    invest(strategy, vault, currency, whale, gov, Wei("1000 ether"))
+    strategy.manualAllocation([[p.address, 250] for p in lenders], {"from": gov})
+    navs = [p.nav() for p in lenders]
+
+    chain.sleep(30 * 86400)
+    chain.mine(100)
+    # the cToken only accrues when it is touched
+    ctoken.accrueInterest({"from": gov})
+    assert all(p.nav() > nav for p, nav in zip(lenders, navs))
+
+    strategy.harvest({"from": gov})
+    assert vault.strategies(strategy).dict()["totalGain"] > 0
+
+    # once the profit is unlocked everything comes back with interest
+    chain.sleep(86400)
+    vault.withdraw(vault.balanceOf(whale), {"from": whale})
+    assert currency.balanceOf(whale) > before
+
+
+def test_available_liquidity_follows_the_market_cash(
+    strategy, vault, currency, whale, gov, borrower, ctoken, GenericCompound, GenericCompoundV3, GenericAaveV3, GenericDyDx
+):
+    lenders = plugins(strategy, GenericCompound, GenericCompoundV3, GenericAaveV3, GenericDyDx)
+    invest(strategy, vault, currency, whale, gov, Wei("1000 ether"))
+    strategy.manualAllocation([[p.address, 250] for p in lenders], {"from": gov})
+    assert [p.availableLiquidity() for p in lenders] == [p.nav() for p in lenders]
+
+    # all but 100 of the compound cash is borrowed
+    ctoken.borrow(ctoken.getCash() - Wei("100 ether"), {"from": borrower})
+    assert lenders[0].availableLiquidity() == Wei("100 ether")
+
+    # the strategy only asks compound for what it has
+    vault.withdraw(Wei("900 ether"), {"from": whale})
+    assert currency.balanceOf(ctoken) == 0
+
+
+def test_comet_lending_out_its_reserves_does_not_block_withdrawals(
+    strategy, vault, currency, whale, gov, borrower, comet, GenericCompound, GenericCompoundV3, GenericAaveV3, GenericDyDx
+):
+    lenders = plugins(strategy, GenericCompound, GenericCompoundV3, GenericAaveV3, GenericDyDx)
+    compoundV3 = lenders[1]
+    invest(strategy, vault, currency, whale, gov, Wei("1000 ether"))
+    strategy.manualAllocation([[p.address, 250] for p in lenders], {"from": gov})
+
+    # reserves on top of the supply, lent out until 100 of cash is left
+    currency.mint(comet, Wei("1000000 ether"), {"from": gov})
+    comet.borrow(currency.balanceOf(comet) - Wei("100 ether"), {"from": borrower})
+    assert comet.totalBorrow() > comet.totalSupply()
+    assert compoundV3.availableLiquidity() == Wei("100 ether")
+
+    # the others pay the rest
+    before = currency.balanceOf(whale)
+    vault.withdraw(Wei("800 ether"), {"from": whale})
+    assert currency.balanceOf(whale) - before == Wei("800 ether")
+    assert compoundV3.nav() >= Wei("150 ether")
+
+
+def test_rewards_are_claimed_and_sold(
+    strategy,
+    vault,
+    currency,
+    whale,
+    gov,
+    comp,
+    comet,
+    reward_token,
+    uniswap_v2_router,
+    uniswap_v3_router,
+    GenericCompound,
+    GenericCompoundV3,
+    GenericAaveV3,
+    GenericDyDx,
+):
+    _, compoundV3, aaveV3, _ = plugins(strategy, GenericCompound, GenericCompoundV3, GenericAaveV3, GenericDyDx)
+    invest(strategy, vault, currency, whale, gov, Wei("1000 ether"))
+    strategy.manualAllocation([[compoundV3.address, 500], [aaveV3.address, 500]], {"from": gov})
+
+    # 50 want a COMP through weth
+    # the path goes through the weth GenericCompoundV3 hard codes, it only has to be priced
+    weth = hard_coded(GenericCompoundV3, "weth")
+    uniswap_v3_router.setPrice(comp, weth, E18 // 40, {"from": gov})
+    uniswap_v3_router.setPrice(weth, currency, 2_000 * E18, {"from": gov})
+    currency.mint(uniswap_v3_router, 1_000_000 * E18, {"from": gov})
+    compoundV3.setUniFees(3_000, 500, {"from": gov})
+    compoundV3.setMinRewardAmounts(0, 0, {"from": gov})
+
+    chain.sleep(30 * 86400)
+    comet.accrueAccount(compoundV3, {"from": gov})
+    assert compoundV3.getRewardsOwed() > 0
+    assert compoundV3.harvestTrigger(0)
+    assert aaveV3.harvestTrigger(0)
+
+    compoundV3.harvest({"from": gov})
+    aaveV3.harvest({"from": gov})
+
+    # sold for want and supplied back
+    assert compoundV3.getRewardsOwed() == 0
+    assert comp.balanceOf(compoundV3) == 0
+    assert currency.balanceOf(uniswap_v3_router) < 1_000_000 * E18
+    assert reward_token.balanceOf(aaveV3) == 0
+    assert currency.balanceOf(uniswap_v2_router) < 1_000_000 * E18
+    assert currency.balanceOf(compoundV3) == currency.balanceOf(aaveV3) == 0
+
+
+def test_aave_v3_apr_reads_the_cached_reward_config(
+    strategy,
+    aave_pool,
+    reward_token,
+    gov,
+    rando,
+    MockERC20,
+    MockRewardsController,
+    GenericCompound,
+    GenericCompoundV3,
+    GenericAaveV3,
+    GenericDyDx,
+):
+    _, _, aaveV3, _ = plugins(strategy, GenericCompound, GenericCompoundV3, GenericAaveV3, GenericDyDx)
+    controller = MockRewardsController.at(aave_pool.getIncentivesController())
+    assert aaveV3.getCachedRewards() == [reward_token.address]
+    # the mock pool is its own rate strategy
+    assert aaveV3.interestRateStrategy() == aave_pool
+    assert aaveV3.reserveFactor() == 1_000
+    end = controller.getDistributionEnd(aave_pool, reward_token)
+
+    # the emissions are read live, a new rate counts without a refresh
+    apr = aaveV3.apr()
+    controller.configureReward(aave_pool, reward_token, 2 * 10 ** 15, end, {"from": gov})
+    assert aaveV3.apr() > apr
+    assert aaveV3.lenderSnapshot(0)[2] == aaveV3.apr()
+
+    # a new reward token only counts once the cache is refreshed
+    other = gov.deploy(MockERC20, "Mock OP 2", "mOP2", 18)
+    controller.configureReward(aave_pool, other, 10 ** 15, end, {"from": gov})
+    assert aaveV3.getCachedRewards() == [reward_token.address]
+    with brownie.reverts("!keepers"):
+        aaveV3.refreshCache({"from": rando})
+    aaveV3.refreshCache({"from": gov})
+    assert aaveV3.getCachedRewards() == [reward_token.address, other.address]
+
+    # a finished distribution stops counting without a refresh
+    chain.sleep(end - chain.time() + 1)
+    chain.mine()
+    assert aaveV3.apr() == aave_pool.currentLiquidityRate() // 10 ** 9
+
+
+def test_aave_v3_apr_prices_rewards_with_the_twap(
+    strategy, aave_pool, reward_token, weth, uniswap_v2_router, gov, rando, RewardPriceOracle, GenericCompound, GenericCompoundV3, GenericAaveV3, GenericDyDx
+):
+    _, _, aaveV3, _ = plugins(strategy, GenericCompound, GenericCompoundV3, GenericAaveV3, GenericDyDx)
+    oracle = gov.deploy(RewardPriceOracle, 86400)
+    with brownie.reverts("!management"):
+        aaveV3.setRewardPriceOracle(oracle, {"from": rando})
+    aaveV3.setRewardPriceOracle(oracle, {"from": gov})
+
+    # nothing reported yet, the router is quoted
+    spot = aaveV3.apr()
+    aaveV3.harvest({"from": gov})
+    assert oracle.twap(aaveV3, reward_token) == 2 * E18
+    assert aaveV3.apr() == pytest.approx(spot, rel=1e-3)
+    spot = aaveV3.apr()
+
+    # a spike on the router does not move the apr, neither does reporting it
+    uniswap_v2_router.setPrice(reward_token, weth, E18 // 100, {"from": gov})
+    assert aaveV3.apr() == spot
+    aaveV3.harvest({"from": gov})
+    assert aaveV3.apr() == pytest.approx(spot, rel=1e-3)
+
+    # until it has stood for a while
+    chain.sleep(86400)
+    chain.mine()
+    assert spot < aaveV3.apr() < 10 * spot
+
+
+def test_compound_v3_reads_the_price_feeds_from_storage(
+    strategy, comet, comp, gov, rando, MockChainlinkFeed, GenericCompound, GenericCompoundV3, GenericAaveV3, GenericDyDx
+):
+    _, compoundV3, _, _ = plugins(strategy, GenericCompound, GenericCompoundV3, GenericAaveV3, GenericDyDx)
+    assert compoundV3.compPriceFeed() == compoundV3.getPriceFeedAddress(comp)
+    assert compoundV3.baseTokenPriceFeed() == comet.baseTokenPriceFeed()
+
+    # a new COMP feed is only used once the config is refreshed
+    feed = gov.deploy(MockChainlinkFeed, "COMP / USD", 8, 60 * 10 ** 8)
+    comet.setAssetPriceFeed(comp, feed, {"from": gov})
+    assert compoundV3.compPriceFeed() != feed.address
+    with brownie.reverts("!management"):
+        compoundV3.refreshCometConfig({"from": rando})
+    compoundV3.refreshCometConfig({"from": gov})
+    assert compoundV3.compPriceFeed() == feed.address
+    assert compoundV3.lenderSnapshot(0)[2] == compoundV3.apr()
+
+
+def test_compound_v3_snapshot_uses_comets_utilization(
+    strategy, comet, GenericCompound, GenericCompoundV3, GenericAaveV3, GenericDyDx
+):
+    _, compoundV3, _, _ = plugins(strategy, GenericCompound, GenericCompoundV3, GenericAaveV3, GenericDyDx)
+    # comet's utilization is at the stored indices, the totals are accrued. they drift apart until it accrues
+    chain.sleep(365 * 86400)
+    chain.mine()
+    assert comet.getUtilization() != comet.totalBorrow() * E18 // comet.totalSupply()
+
+    _, _, apr, aprAfterDeposit = compoundV3.lenderSnapshot(0)
+    assert apr == aprAfterDeposit == compoundV3.apr() == compoundV3.aprAfterDeposit(0)
+    assert compoundV3.lenderSnapshot(Wei("1000 ether"))[2:] == (compoundV3.apr(), compoundV3.aprAfterDeposit(Wei("1000 ether")))
+
+
+def test_v3_clones_read_their_constants_from_code(
+    strategy,
+    vault,
+    currency,
+    whale,
+    strategist,
+    gov,
+    comet,
+    uniswap_v2_router,
+    Strategy,
+    EthToEthOracle,
+    GenericCompound,
+    GenericCompoundV3,
+    GenericAaveV3,
+    GenericDyDx,
+):
+    _, compoundV3, aaveV3, _ = plugins(strategy, GenericCompound, GenericCompoundV3, GenericAaveV3, GenericDyDx)
+    other = strategist.deploy(Strategy, vault)
+    other.setPriceOracle(strategist.deploy(EthToEthOracle), {"from": strategist})
+
+    tx = compoundV3.cloneCompoundV3Lender(other, "ClonedCompoundV3", comet, {"from": gov})
+    compoundClone = GenericCompoundV3.at(tx.return_value)
+    tx = aaveV3.cloneAaveLender(other, uniswap_v2_router, uniswap_v2_router, "ClonedAaveV3", True, {"from": gov})
+    aaveClone = GenericAaveV3.at(tx.return_value)
+
+    # the EIP-1167 proxy followed by strategy, vault, want, comet, base scale and base index scale
+    code = web3.eth.get_code(compoundClone.address)
+    assert len(code) == 45 + 3 * 20 + 20 + 2 * 32
+    assert code[45:65] == bytes.fromhex(other.address[2:])
+    assert (compoundClone.strategy(), compoundClone.vault(), compoundClone.want(), compoundClone.comet()) == (
+        other.address,
+        vault.address,
+        currency.address,
+        comet.address,
+    )
+    assert (aaveClone.strategy(), aaveClone.want(), aaveClone.aToken()) == (other.address, currency.address, aaveV3.aToken())
+    assert compoundClone.lenderName() == "ClonedCompoundV3"
+    with brownie.reverts("Lender already initialized"):
+        compoundClone.initialize("again", {"from": gov})
+
+    # the clones lend on the same markets as the lenders they were cloned from
+    other.addLender(compoundClone, {"from": gov})
+    other.addLender(aaveClone, {"from": gov})
+    invest(other, vault, currency, whale, gov, Wei("1000 ether"))
+    other.manualAllocation([[compoundClone.address, 500], [aaveClone.address, 500]], {"from": gov})
+    assert compoundClone.nav() == pytest.approx(Wei("500 ether"), rel=1e-6)
+    assert aaveClone.nav() == pytest.approx(Wei("500 ether"), rel=1e-6)
+    assert (compoundClone.apr(), aaveClone.apr()) == (compoundV3.apr(), aaveV3.apr())
+
+
+def test_compound_v3_clone_prices_rewards_like_the_original(
+    strategy, vault, currency, whale, strategist, gov, comet, Strategy, EthToEthOracle, GenericCompound, GenericCompoundV3, GenericAaveV3, GenericDyDx
+):
+    _, compoundV3, _, _ = plugins(strategy, GenericCompound, GenericCompoundV3, GenericAaveV3, GenericDyDx)
+    other = strategist.deploy(Strategy, vault)
+    other.setPriceOracle(strategist.deploy(EthToEthOracle), {"from": strategist})
+    clone = GenericCompoundV3.at(compoundV3.cloneCompoundV3Lender(other, "ClonedCompoundV3", comet, {"from": gov}).return_value)
+
+    # base scale and base index scale are read back as the full words they were appended as
+    code = web3.eth.get_code(clone.address)
+    assert int.from_bytes(code[-64:-32], "big") == comet.baseScale()
+    assert int.from_bytes(code[-32:], "big") == comet.baseIndexScale()
+
+    # fast enough that the COMP rewards do not round to nothing for an 18 decimals base, about 0.16%
+    comet.setBaseTrackingSupplySpeed(10 ** 34, {"from": gov})
+    feed = compoundV3.compPriceFeed()
+    assert clone.getRewardAprForSupplyBase(feed, 0) == compoundV3.getRewardAprForSupplyBase(feed, 0) > 0
+    assert clone.apr() == compoundV3.apr()
+    assert clone.aprAfterDeposit(Wei("1000 ether")) == compoundV3.aprAfterDeposit(Wei("1000 ether"))
+    assert clone.lenderSnapshot(Wei("1000 ether"))[2:] == compoundV3.lenderSnapshot(Wei("1000 ether"))[2:]
+
+    # the strategy can plan and withdraw around a rewarded clone
+    other.addLender(clone, {"from": gov})
+    invest(other, vault, currency, whale, gov, Wei("1000 ether"))
+    assert clone.nav() == pytest.approx(Wei("1000 ether"), rel=1e-6)
+    vault.withdraw(Wei("500 ether"), {"from": whale})
+    assert clone.nav() == pytest.approx(Wei("500 ether"), rel=1e-6)
+
+
+def test_clone_gas(
+    strategy, vault, currency, whale, strategist, gov, comet, uniswap_v2_router, weth, Strategy, EthToEthOracle, GenericCompoundV3, GenericAaveV3
+):
+    other = strategist.deploy(Strategy, vault)
+    other.setPriceOracle(strategist.deploy(EthToEthOracle), {"from": strategist})
+    compoundV3 = strategist.deploy(GenericCompoundV3, other, "CompoundV3", comet)
+    aaveV3 = strategist.deploy(GenericAaveV3, other, weth, uniswap_v2_router, uniswap_v2_router, "AaveV3", True)
+    compoundTx = compoundV3.cloneCompoundV3Lender(other, "ClonedCompoundV3", comet, {"from": gov})
+    aaveTx = aaveV3.cloneAaveLender(other, uniswap_v2_router, uniswap_v2_router, "ClonedAaveV3", True, {"from": gov})
+    lenders = {
+        "CompoundV3": (compoundV3, compoundV3.tx),
+        "CompoundV3 clone": (GenericCompoundV3.at(compoundTx.return_value), compoundTx),
+        "AaveV3": (aaveV3, aaveV3.tx),
+        "AaveV3 clone": (GenericAaveV3.at(aaveTx.return_value), aaveTx),
+    }
+    for lender, _ in lenders.values():
+        other.addLender(lender, {"from": gov})
+    invest(other, vault, currency, whale, gov, Wei("1000 ether"))
+    other.manualAllocation([[lender.address, 250] for lender, _ in lenders.values()], {"from": gov})
+
+    gas = {name: lender_gas(lender, tx) for name, (lender, tx) in lenders.items()}
+    print(f"\n{'':>16} " + " ".join(f"{op:>18}" for op in ["deploy"] + LENDER_CALLS))
+    for name, ops in gas.items():
+        print(f"{name:>16} " + " ".join(f"{used:>18}" for used in ops.values()))
+
+    # a clone deploys the proxy and its args and runs initialize, not the whole plugin
+    for name in ["CompoundV3", "AaveV3"]:
+        assert gas[f"{name} clone"]["deploy"] * 3 < gas[name]["deploy"]
+        assert all(used > 0 for used in gas[f"{name} clone"].values())
+
+
+def test_harvest_lenders_harvests_the_due_plugins_in_one_transaction(
+    strategy,
+    vault,
+    currency,
+    whale,
+    gov,
+    keeper,
+    rando,
+    comp,
+    comet,
+    reward_token,
+    uniswap_v2_router,
+    uniswap_v3_router,
+    GenericCompound,
+    GenericCompoundV3,
+    GenericAaveV3,
+    GenericDyDx,
+):
+    _, compoundV3, aaveV3, _ = plugins(strategy, GenericCompound, GenericCompoundV3, GenericAaveV3, GenericDyDx)
+    invest(strategy, vault, currency, whale, gov, Wei("1000 ether"))
+    strategy.manualAllocation([[compoundV3.address, 500], [aaveV3.address, 500]], {"from": gov})
+    weth = hard_coded(GenericCompoundV3, "weth")
+    uniswap_v3_router.setPrice(comp, weth, E18 // 40, {"from": gov})
+    uniswap_v3_router.setPrice(weth, currency, 2_000 * E18, {"from": gov})
+    currency.mint(uniswap_v3_router, 1_000_000 * E18, {"from": gov})
+    compoundV3.setUniFees(3_000, 500, {"from": gov})
+    compoundV3.setMinRewardAmounts(0, 0, {"from": gov})
+
+    chain.sleep(30 * 86400)
+    comet.accrueAccount(compoundV3, {"from": gov})
+    navs = [compoundV3.nav(), aaveV3.nav()]
+    assert strategy.harvestLendersTrigger(0)
+    with brownie.reverts("!authorized"):
+        strategy.harvestLenders(0, {"from": rando})
+
+    # compound and dydx have no harvestTrigger and are skipped
+    tx = strategy.harvestLenders(0, {"from": keeper})
+    assert tx.return_value == 2
+    assert [e["lender"] for e in tx.events["LenderHarvested"]] == [compoundV3.address, aaveV3.address]
+
+    # the proceeds were supplied back in the same transaction
+    assert comp.balanceOf(compoundV3) == reward_token.balanceOf(aaveV3) == 0
+    assert currency.balanceOf(compoundV3) == currency.balanceOf(aaveV3) == 0
+    assert compoundV3.nav() > navs[0] and aaveV3.nav() > navs[1]
+
+
+def test_iron_bank_lends_to_the_itoken_market(
+    iron_bank_strategy, iron_bank, vault, currency, whale, gov, borrower, MockInterestRateModel, GenericIronBank
+):
+    ironBank = GenericIronBank.at(iron_bank_strategy.lenders(0))
+    assert ironBank.stakingRewards() == ZERO_ADDRESS and ironBank.ignorePrinting()
+
+    # the iToken rate a block times the seconds a year the plugin counts on Optimism
+    model = MockInterestRateModel.at(iron_bank.interestRateModel())
+    cash = currency.balanceOf(iron_bank)
+    amount = Wei("1000 ether")
+    assert ironBank.apr() == iron_bank.supplyRatePerBlock() * 3154 * 10 ** 4
+    assert ironBank.aprAfterDeposit(amount) == model.getSupplyRate(
+        cash + amount, iron_bank.totalBorrows(), iron_bank.totalReserves(), iron_bank.reserveFactorMantissa()
+    ) * (3154 * 10 ** 4)
+    assert ironBank.aprAfterDeposit(amount) < ironBank.apr()
+
+    invest(iron_bank_strategy, vault, currency, whale, gov, amount)
+    assert ironBank.nav() == pytest.approx(amount, rel=1e-9)
+    assert ironBank.availableLiquidity() == ironBank.nav()
+
+    # all but 100 of the cash is borrowed, the rest stays lent out
+    iron_bank.borrow(iron_bank.getCash() - Wei("100 ether"), {"from": borrower})
+    assert ironBank.availableLiquidity() == Wei("100 ether")
+    before = currency.balanceOf(whale)
+    vault.withdraw(Wei("500 ether"), {"from": whale})
+    assert currency.balanceOf(whale) - before == Wei("100 ether")
+    assert currency.balanceOf(iron_bank) == 0
+
+
+def test_iron_bank_clone_finds_the_same_itoken(iron_bank_strategy, iron_bank, strategist, GenericIronBank):
+    ironBank = GenericIronBank.at(iron_bank_strategy.lenders(0))
+    clone = GenericIronBank.at(ironBank.cloneIronBankLender(iron_bank_strategy, "IronBank clone", {"from": strategist}).return_value)
+
+    assert clone.cToken() == iron_bank
+    assert clone.apr() == ironBank.apr()
+    with brownie.reverts("GenericIB already initialized"):
+        clone.initialize({"from": strategist})
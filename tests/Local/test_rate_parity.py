@@ -0,0 +1,191 @@
+import random
+
+import pytest
+from brownie import Wei
+
+from conftest import E18, RAY
+from scripts.simulator import (
+    AaveV3Lender,
+    AaveV3RateStrategy,
+    CometRates,
+    CompoundLender,
+    CompoundV3Lender,
+    DoubleExponentInterestSetter,
+    DyDxLender,
+    JumpRateModel,
+)
+from scripts.simulator import curves
+
+# The single points tests/Simulator/test_curves.py checks against the python ports, evaluated by the mock rate
+# contracts and the plugins themselves. The python curves have to give back the solidity integers exactly
+
+EMPTY = "0x000000000000000000000000000000000000dEaD"
+AMOUNTS = [1, 10 ** 6, Wei("1000 ether"), Wei("1000000 ether"), Wei("50000000 ether"), 10 ** 27]
+
+
+def plugins(strategy, GenericCompound, GenericCompoundV3, GenericAaveV3, GenericDyDx):
+    containers = [GenericCompound, GenericCompoundV3, GenericAaveV3, GenericDyDx]
+    return [container.at(strategy.lenders(i)) for i, container in enumerate(containers)]
+
+
+def random_states(rng, n):
+    # utilizations from 0 to past 100% and a few zero borrow states, like test_curves
+    states = []
+    for i in range(n):
+        supply = rng.randrange(1, 10 ** 27)
+        borrows = 0 if i % 10 == 0 else rng.randrange(supply * 11 // 10)
+        states.append((supply, borrows))
+    return states
+
+
+def jump_rate_model(model):
+    return JumpRateModel(model.baseRatePerBlock(), model.multiplierPerBlock(), model.jumpMultiplierPerBlock(), model.kink())
+
+
+def comet_rates(comet):
+    return CometRates(
+        comet.supplyKink(),
+        comet.supplyPerSecondInterestRateBase(),
+        comet.supplyPerSecondInterestRateSlopeLow(),
+        comet.supplyPerSecondInterestRateSlopeHigh(),
+        comet.borrowKink(),
+        comet.borrowPerSecondInterestRateBase(),
+        comet.borrowPerSecondInterestRateSlopeLow(),
+        comet.borrowPerSecondInterestRateSlopeHigh(),
+    )
+
+
+def aave_rate_strategy(pool):
+    # the mock has no stable rate slopes or offsets
+    return AaveV3RateStrategy(pool.optimalUsageRatio(), pool.baseVariableBorrowRate(), pool.variableRateSlope1(), pool.variableRateSlope2())
+
+
+def test_jump_rate_model_points(ctoken, MockInterestRateModel):
+    model = MockInterestRateModel.at(ctoken.interestRateModel())
+    python = jump_rate_model(model)
+    rng = random.Random(1)
+    states = random_states(rng, 40)
+    cash = [max(s - b, 0) for s, b in states]
+    borrows = [b for _, b in states]
+    reserves = [rng.randrange(b // 10 + 1) for b in borrows]
+    factors = [rng.randrange(E18 // 2) for _ in states]
+
+    onchain = [model.getSupplyRate(*args) for args in zip(cash, borrows, reserves, factors)]
+    assert onchain == [python.get_supply_rate(*args) for args in zip(cash, borrows, reserves, factors)]
+    assert list(curves.jump_rate_supply_rate(python, *map(curves.amounts, (cash, borrows, reserves, factors)))) == onchain
+    assert [model.getBorrowRate(*args) for args in zip(cash, borrows, reserves)] == [
+        python.get_borrow_rate(*args) for args in zip(cash, borrows, reserves)
+    ]
+
+
+def test_comet_points(comet):
+    rates = comet_rates(comet)
+    utilizations = [0, rates.supply_kink, rates.supply_kink + 1, rates.borrow_kink, E18, 2 * E18] + list(range(0, 2 * E18, E18 // 17))
+
+    supply = [comet.getSupplyRate(u) for u in utilizations]
+    borrow = [comet.getBorrowRate(u) for u in utilizations]
+    assert supply == [rates.get_supply_rate(u) for u in utilizations] == list(curves.comet_supply_rate(rates, curves.amounts(utilizations)))
+    assert borrow == [rates.get_borrow_rate(u) for u in utilizations] == list(curves.comet_borrow_rate(rates, curves.amounts(utilizations)))
+
+
+def test_aave_points(aave_pool, currency):
+    strategy = aave_rate_strategy(aave_pool)
+    rng = random.Random(2)
+    rows = []
+    for supply, borrows in random_states(rng, 30):
+        stable = rng.randrange(borrows + 1)
+        rows.append((max(supply - borrows, 0), stable, borrows - stable, rng.randrange(RAY // 5), rng.randrange(5_000)))
+    unbacked = 10 ** 20
+
+    onchain = []
+    for available, stable, variable, average_stable_rate, reserve_factor in rows:
+        # an aToken without cash, the available liquidity is passed in as added liquidity
+        params = (unbacked, available, 0, stable, variable, average_stable_rate, reserve_factor, currency, EMPTY)
+        onchain.append(tuple(aave_pool.calculateInterestRates(params)))
+
+    assert onchain == [strategy.calculate_interest_rates(*row, unbacked=unbacked) for row in rows]
+    got = curves.aave_v3_rates(strategy, *[curves.amounts(list(column)) for column in zip(*rows)], unbacked=unbacked)
+    assert [tuple(rates[i] for rates in got) for i in range(len(rows))] == onchain
+
+
+def test_dydx_points(solo, weth, gov):
+    setter = DoubleExponentInterestSetter.from_list(E18, [0, 10, 10, 0, 0, 0, 0, 80])
+    solo.addMarket(weth, setter.max_apr, setter.coefficients, {"from": gov})
+    states = random_states(random.Random(3), 40)
+
+    onchain = [solo.getInterestRate(weth, b, s)[0] for s, b in states]
+    assert onchain == [setter.get_interest_rate(b, s) for s, b in states]
+    supply = curves.amounts([s for s, _ in states])
+    borrow = curves.amounts([b for _, b in states])
+    assert list(curves.dydx_interest_rate(setter, borrow, supply)) == onchain
+
+
+def test_plugins_apr_after_deposit(
+    strategy,
+    ctoken,
+    comet,
+    aave_pool,
+    solo,
+    currency,
+    weth,
+    reward_token,
+    uniswap_v2_router,
+    gov,
+    MockInterestRateModel,
+    MockRewardsController,
+    GenericCompound,
+    GenericCompoundV3,
+    GenericAaveV3,
+    GenericDyDx,
+):
+    compound, compoundV3, aaveV3, dydx = plugins(strategy, GenericCompound, GenericCompoundV3, GenericAaveV3, GenericDyDx)
+    # fast enough that the COMP rewards count for an 18 decimals base
+    comet.setBaseTrackingSupplySpeed(10 ** 34, {"from": gov})
+    [token] = aaveV3.getCachedRewards()
+    emissions = MockRewardsController.at(aave_pool.getIncentivesController()).getRewardsData(aaveV3.aToken(), token)[1]
+    par = solo.getMarketTotalPar(0)
+    index = solo.getMarketCurrentIndex(0)
+
+    models = {
+        compound: CompoundLender(
+            "GenericCompound",
+            jump_rate_model(MockInterestRateModel.at(ctoken.interestRateModel())),
+            cash=currency.balanceOf(ctoken),
+            borrows=ctoken.totalBorrows(),
+            reserves=ctoken.totalReserves(),
+            reserve_factor=ctoken.reserveFactorMantissa(),
+        ),
+        compoundV3: CompoundV3Lender(
+            "GenericCompoundV3",
+            comet_rates(comet),
+            total_supply=comet.totalSupply(),
+            total_borrow=comet.totalBorrow(),
+            base_tracking_supply_speed=comet.baseTrackingSupplySpeed(),
+            base_scale=comet.baseScale(),
+            base_index_scale=comet.baseIndexScale(),
+            reward_price=comet.getPrice(compoundV3.compPriceFeed()),
+            want_price=comet.getPrice(compoundV3.baseTokenPriceFeed()),
+        ),
+        aaveV3: AaveV3Lender(
+            "GenericAaveV3",
+            aave_rate_strategy(aave_pool),
+            cash=currency.balanceOf(aave_pool),
+            total_variable_debt=aave_pool.totalVariableDebt(),
+            reserve_factor=aave_pool.reserveFactor(),
+            # priced in want on the router like the plugin does without a reward price oracle
+            emissions_per_second=uniswap_v2_router.getAmountsOut(emissions, [token, weth, currency])[-1],
+        ),
+        dydx: DyDxLender(
+            "GenericDyDx",
+            DoubleExponentInterestSetter.from_list(8 * E18 // 100, [0, 100]),
+            supply=par["supply"] * index["supply"] // E18,
+            borrow=par["borrow"] * index["borrow"] // E18,
+        ),
+    }
+    assert models[compoundV3]._reward_apr(comet.totalSupply()) > 0
+    assert models[aaveV3].emissions_per_second > 0
+
+    for plugin, model in models.items():
+        onchain = [plugin.aprAfterDeposit(amount) for amount in AMOUNTS]
+        assert onchain == [model.apr_after_deposit(amount) for amount in AMOUNTS], model.name
+        assert list(curves.apr_after_deposit(model, AMOUNTS)) == onchain, model.name
@@ -0,0 +1,98 @@
+import pytest
+from brownie import config
+
+# These fixtures run the strategy against MockLender plugins on a plain local chain.
+# No fork is needed: brownie test tests/Mock --network development
+
+
+@pytest.fixture
+def currency(MockERC20, gov):
+    yield gov.deploy(MockERC20, "Mock USD", "mUSD", 18)
+
+
+@pytest.fixture
+def whale(accounts, currency):
+    acc = accounts[5]
+    currency.mint(acc, 100_000_000 * (10 ** 18), {"from": acc})
+    yield acc
+
+
+@pytest.fixture()
+def strategist(accounts, whale, currency):
+    currency.transfer(accounts[1], 100_000 * (10 ** 18), {"from": whale})
+    yield accounts[1]
+
+
+@pytest.fixture
+def vault(gov, rewards, guardian, currency, pm):
+    Vault = pm(config["dependencies"][0]).Vault
+    vault = Vault.deploy({"from": guardian})
+    vault.initialize(currency, gov, rewards, "", "")
+    vault.setDepositLimit(2 ** 256 - 1, {"from": gov})
+    vault.setManagementFee(0, {"from": gov})
+    yield vault
+
+
+@pytest.fixture
+def oracle(EthToEthOracle, gov):
+    # call costs are priced 1:1 in want
+    yield gov.deploy(EthToEthOracle)
+
+
+@pytest.fixture
+def strategy(strategist, keeper, gov, vault, oracle, Strategy):
+    strategy = strategist.deploy(Strategy, vault)
+    strategy.setKeeper(keeper, {"from": gov})
+    strategy.setPriceOracle(oracle, {"from": gov})
+    strategy.setWithdrawalThreshold(0, {"from": gov})
+    vault.addStrategy(strategy, 10_000, 0, 2 ** 256 - 1, 1_000, {"from": gov})
+    yield strategy
+
+
+@pytest.fixture
+def deploy_lenders(strategy, strategist, gov, MockLender):
+    # adds n mock lenders. apr of lender i starts at (2 + i)% on 1m of external supply
+    def deploy(n, externalSupply=1_000_000 * (10 ** 18)):
+        plugins = []
+        for i in range(n):
+            interest = externalSupply * (2 + i) // 100
+            plugin = strategist.deploy(MockLender, strategy, f"Mock{i}", interest, externalSupply)
+            strategy.addLender(plugin, {"from": gov})
+            plugins.append(plugin)
+        assert strategy.numLenders() == n
+        return plugins
+
+    yield deploy
+
+
+@pytest.fixture
+def lenders(deploy_lenders):
+    yield deploy_lenders(3)
+
+
+@pytest.fixture
+def deploy_strategy(strategist, keeper, gov, vault, oracle, Strategy, MockLender):
+    # another strategy on the same vault with n mock lenders, set up like the strategy fixture
+    def deploy(n, debtRatio, externalSupply=1_000_000 * (10 ** 18)):
+        strategy = strategist.deploy(Strategy, vault)
+        strategy.setKeeper(keeper, {"from": gov})
+        strategy.setPriceOracle(oracle, {"from": gov})
+        strategy.setWithdrawalThreshold(0, {"from": gov})
+        vault.addStrategy(strategy, debtRatio, 0, 2 ** 256 - 1, 1_000, {"from": gov})
+        for i in range(n):
+            interest = externalSupply * (2 + i) // 100
+            plugin = strategist.deploy(MockLender, strategy, f"Mock{i}", interest, externalSupply)
+            strategy.addLender(plugin, {"from": gov})
+        return strategy
+
+    yield deploy
+
+
+@pytest.fixture
+def multicall(MockMulticall, gov):
+    yield gov.deploy(MockMulticall)
+
+
+@pytest.fixture
+def legacy_scan(LegacyLenderScan, gov):
+    yield gov.deploy(LegacyLenderScan)
@@ -0,0 +1,83 @@
+import brownie
+import pytest
+from brownie import ZERO_ADDRESS, chain
+
+DAY = 86400
+
+
+@pytest.fixture
+def usdc(MockERC20, gov):
+    yield gov.deploy(MockERC20, "Mock USDC", "mUSDC", 6)
+
+
+@pytest.fixture
+def feeds(MockChainlinkFeed, gov):
+    # eth at 2000 usd
+    yield {
+        "usdc_eth": gov.deploy(MockChainlinkFeed, "USDC / ETH", 18, 5 * 10 ** 14),
+        "usdc_usd": gov.deploy(MockChainlinkFeed, "USDC / USD", 8, 10 ** 8),
+        "eth_usd": gov.deploy(MockChainlinkFeed, "ETH / USD", 8, 2000 * 10 ** 8),
+    }
+
+
+@pytest.fixture
+def direct(ChainlinkWantToEth, usdc, feeds, gov):
+    yield gov.deploy(ChainlinkWantToEth, usdc, feeds["usdc_eth"], DAY, ZERO_ADDRESS, ZERO_ADDRESS)
+
+
+@pytest.fixture
+def composed(ChainlinkUsdWantToEth, usdc, feeds, gov):
+    yield gov.deploy(ChainlinkUsdWantToEth, usdc, feeds["usdc_usd"], feeds["eth_usd"], DAY, 3600, ZERO_ADDRESS, ZERO_ADDRESS)
+
+
+def test_prices(direct, composed):
+    for oracle in [direct, composed]:
+        assert oracle.isValid()
+        assert oracle.ethToWant(10 ** 18) == 2000 * 10 ** 6
+        assert oracle.wantToEth(2000 * 10 ** 6) == 10 ** 18
+
+
+def test_stale_feeds_use_the_fallback(ChainlinkUsdWantToEth, usdc, feeds, composed, direct, gov):
+    chain.sleep(3601)
+    chain.mine()
+    # the eth feed has a one hour heartbeat, the usdc one a day
+    assert direct.isValid()
+    assert not composed.isValid()
+    with brownie.reverts("!price"):
+        composed.ethToWant(10 ** 18)
+
+    with_fallback = gov.deploy(ChainlinkUsdWantToEth, usdc, feeds["usdc_usd"], feeds["eth_usd"], DAY, 3600, ZERO_ADDRESS, direct)
+    assert with_fallback.ethToWant(10 ** 18) == 2000 * 10 ** 6
+
+    feeds["eth_usd"].setAnswer(2500 * 10 ** 8, {"from": gov})
+    assert with_fallback.ethToWant(10 ** 18) == 2500 * 10 ** 6
+
+
+def test_bad_answers_are_invalid(direct, feeds, gov):
+    feeds["usdc_eth"].setAnswer(0, {"from": gov})
+    assert not direct.isValid()
+    feeds["usdc_eth"].setAnswer(-1, {"from": gov})
+    assert not direct.isValid()
+
+
+def test_waits_for_the_sequencer(ChainlinkWantToEth, MockChainlinkFeed, usdc, feeds, gov):
+    sequencer = gov.deploy(MockChainlinkFeed, "L2 Sequencer Uptime", 0, 0)
+    oracle = gov.deploy(ChainlinkWantToEth, usdc, feeds["usdc_eth"], DAY, sequencer, ZERO_ADDRESS)
+    assert not oracle.isValid()
+
+    chain.sleep(3601)
+    chain.mine()
+    assert oracle.isValid()
+
+    # down
+    sequencer.setAnswer(1, {"from": gov})
+    assert not oracle.isValid()
+    chain.sleep(3601)
+    chain.mine()
+    assert not oracle.isValid()
+
+
+def test_strategy_prices_call_cost(strategy, currency, ChainlinkWantToEth, feeds, gov):
+    oracle = gov.deploy(ChainlinkWantToEth, currency, feeds["usdc_eth"], DAY, ZERO_ADDRESS, ZERO_ADDRESS)
+    strategy.setPriceOracle(oracle, {"from": gov})
+    assert strategy.ethToWant(10 ** 18) == 2000 * 10 ** 18
@@ -0,0 +1,31 @@
+from brownie import config
+
+from scripts.benchmark import OPERATIONS, regressions, run, success
+
+
+def test_benchmark_runs_on_a_local_chain(pm, accounts, Strategy, MockLender, MockERC20, EthToEthOracle):
+    Vault = pm(config["dependencies"][0]).Vault
+    results = run(Vault, Strategy, MockLender, MockERC20, EthToEthOracle, accounts[0], accounts[1], counts=[1, 4])
+
+    assert list(results) == ["1", "4"]
+    for ops in results.values():
+        assert list(ops) == OPERATIONS
+        assert all(gas > 0 for gas in ops.values())
+    # these loop over every lender
+    for op in ["harvest", "manualAllocation", "estimatedAPR", "lendStatuses"]:
+        assert results["4"][op] > results["1"][op]
+
+
+def test_large_withdrawals_are_paid_in_full(pm, accounts, Strategy, MockLender, MockERC20, EthToEthOracle):
+    Vault = pm(config["dependencies"][0]).Vault
+    assert success(Vault, Strategy, MockLender, MockERC20, EthToEthOracle, accounts[0], accounts[1], counts=[8, 10]) == {"8": 100, "10": 100}
+
+
+def test_regressions_over_threshold():
+    baseline = {"1": {"harvest": 100_000, "tend": 50_000}}
+
+    assert regressions({"1": {"harvest": 105_000, "tend": 40_000}}, baseline) == []
+    assert regressions({"1": {"harvest": 105_001, "tend": 50_000}}, baseline) == [("1", "harvest", 100_000, 105_001)]
+    assert regressions({"1": {"harvest": 109_000, "tend": 50_000}}, baseline, threshold=10) == []
+    # new measurements have nothing to regress from
+    assert regressions({"2": {"harvest": 10 ** 9}, "1": {"withdraw": 10 ** 9}}, baseline) == []
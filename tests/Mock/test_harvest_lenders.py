@@ -0,0 +1,31 @@
+from brownie import Wei
+
+CALL_COST = Wei("0.1 ether")
+
+
+def test_harvests_the_due_mocks(strategy, keeper, lenders, gov):
+    lenders[0].setPendingReward(CALL_COST + 1, {"from": gov})
+    lenders[2].setPendingReward(CALL_COST + 1, {"from": gov})
+    assert strategy.harvestLendersTrigger(CALL_COST)
+
+    # the strategy calls the plugins' harvest itself
+    tx = strategy.harvestLenders(CALL_COST, {"from": keeper})
+    assert tx.return_value == 2
+    assert [e["lender"] for e in tx.events["LenderHarvested"]] == [lenders[0].address, lenders[2].address]
+    assert [p.pendingReward() for p in lenders] == [0, 0, 0]
+    assert not strategy.harvestLendersTrigger(CALL_COST)
+
+
+def test_a_failing_harvest_does_not_block_the_others(strategy, keeper, lenders, gov):
+    for p in lenders:
+        p.setPendingReward(CALL_COST + 1, {"from": gov})
+    lenders[1].setHarvestFails(True, {"from": gov})
+
+    tx = strategy.harvestLenders(CALL_COST, {"from": keeper})
+    assert tx.return_value == 2
+    assert [e["lender"] for e in tx.events["LenderHarvested"]] == [lenders[0].address, lenders[2].address]
+    assert [e["lender"] for e in tx.events["LenderHarvestFailed"]] == [lenders[1].address]
+    assert [p.pendingReward() for p in lenders] == [0, CALL_COST + 1, 0]
+
+    # still due, it is tried again next time
+    assert strategy.harvestLendersTrigger(CALL_COST)
@@ -0,0 +1,60 @@
+import brownie
+import pytest
+from brownie import Wei
+
+
+def invest(strategy, vault, currency, whale, strategist):
+    currency.approve(vault, 2 ** 256 - 1, {"from": whale})
+    vault.deposit(Wei("30000 ether"), {"from": whale})
+    strategy.harvest({"from": strategist})
+
+
+def test_set_idle_buffer(strategy, gov, rando):
+    with brownie.reverts("!authorized"):
+        strategy.setIdleBuffer(500, {"from": rando})
+    with brownie.reverts("!buffer"):
+        strategy.setIdleBuffer(10_001, {"from": gov})
+
+    strategy.setIdleBuffer(500, {"from": gov})
+    assert strategy.idleBufferBps() == 500
+
+
+@pytest.mark.parametrize("mode,size", [(0, 0), (1, 20), (2, 16)])
+def test_adjust_position_keeps_the_buffer_loose(strategy, vault, currency, whale, strategist, lenders, gov, mode, size):
+    strategy.setAllocationMode(mode, size, {"from": gov})
+    strategy.setIdleBuffer(500, {"from": gov})
+    invest(strategy, vault, currency, whale, strategist)
+
+    assert strategy.idleBufferTarget() == Wei("1500 ether")
+    assert currency.balanceOf(strategy) == Wei("1500 ether")
+    assert strategy.lentTotalAssets() == Wei("28500 ether")
+
+
+def test_small_withdrawals_skip_the_lenders(strategy, vault, currency, whale, strategist, lenders, gov):
+    strategy.setIdleBuffer(500, {"from": gov})
+    invest(strategy, vault, currency, whale, strategist)
+    navs = [lender.nav() for lender in lenders]
+
+    tx = vault.withdraw(Wei("1000 ether"), {"from": whale})
+    assert [lender.nav() for lender in lenders] == navs
+
+    # a bigger one takes the rest from the lenders
+    vault.withdraw(Wei("1000 ether"), {"from": whale})
+    assert currency.balanceOf(strategy) == 0
+    assert strategy.lentTotalAssets() == Wei("28000 ether")
+
+    # the next harvest fills the buffer back up
+    strategy.harvest({"from": strategist})
+    assert currency.balanceOf(strategy) == strategy.idleBufferTarget() == Wei("1400 ether")
+
+
+def test_the_buffer_earns_nothing(strategy, vault, currency, whale, strategist, lenders, gov):
+    invest(strategy, vault, currency, whale, strategist)
+    full = strategy.estimatedAPR()
+    future = strategy.estimatedFutureAPR(Wei("60000 ether"))
+
+    strategy.setIdleBuffer(1_000, {"from": gov})
+    strategy.tend({"from": strategist})
+    assert currency.balanceOf(strategy) == Wei("3000 ether")
+    assert strategy.estimatedAPR() < full
+    assert strategy.estimatedFutureAPR(Wei("60000 ether")) < future
@@ -0,0 +1,122 @@
+import asyncio
+
+from brownie import Wei, web3
+
+from scripts.keeper import Action, BrownieSender, Job, Keeper
+from scripts.snapshot import web3_call
+
+
+def counting_call(reads):
+    call = web3_call(web3)
+
+    def eth_call(to, data, block):
+        reads.append(to)
+        return call(to, data, block)
+
+    return eth_call
+
+
+def run(keeper, *steps):
+    # runs the keeper at each time in steps and waits for its transactions
+    async def go():
+        results = []
+        for now in steps:
+            results.append(await asyncio.gather(*await keeper.step(now)))
+        return results
+
+    return asyncio.run(go())
+
+
+def deposit(vault, currency, whale, amount):
+    currency.approve(vault, 2 ** 256 - 1, {"from": whale})
+    vault.deposit(amount, {"from": whale})
+
+
+def test_harvests_every_strategy_in_one_step(vault, currency, whale, keeper, deploy_strategy):
+    strategies = [deploy_strategy(3, 3_000) for _ in range(3)]
+    deposit(vault, currency, whale, Wei("30000 ether"))
+    nonce = keeper.nonce
+
+    [results] = run(Keeper(web3_call(web3), BrownieSender(keeper), [Job(s) for s in strategies], 0), 0)
+
+    assert [r.action for r in results] == [Action(s.address, "harvest()") for s in strategies]
+    assert all(r.success for r in results)
+    # back to back from one queue
+    assert sorted(r.tx.nonce for r in results) == list(range(nonce, nonce + 3))
+    for strategy in strategies:
+        assert vault.strategies(strategy).dict()["totalDebt"] == Wei("9000 ether")
+        assert not strategy.harvestTrigger(0)
+
+
+def test_plugin_harvests_go_first(strategy, vault, currency, whale, keeper, lenders, gov):
+    deposit(vault, currency, whale, Wei("30000 ether"))
+    lenders[0].setPendingReward(Wei("1 ether"), {"from": gov})
+    lenders[2].setPendingReward(Wei("1 ether"), {"from": gov})
+
+    [results] = run(Keeper(web3_call(web3), BrownieSender(keeper), [Job(strategy)], Wei("0.1 ether")), 0)
+
+    assert [r.action for r in results] == [
+        Action(lenders[0].address, "harvest()"),
+        Action(lenders[2].address, "harvest()"),
+        Action(strategy.address, "harvest()"),
+    ]
+    assert all(r.success for r in results)
+    assert results[0].tx.nonce < results[1].tx.nonce < results[2].tx.nonce
+    assert [p.pendingReward() for p in lenders] == [0, 0, 0]
+
+
+def test_tends_when_a_better_lender_appears(strategy, vault, currency, whale, keeper, strategist, lenders, gov):
+    deposit(vault, currency, whale, Wei("30000 ether"))
+    strategy.harvest({"from": strategist})
+    keeperBot = Keeper(web3_call(web3), BrownieSender(keeper), [Job(strategy)], 0)
+    assert run(keeperBot, 0) == [[]]
+
+    # everything is in the last lender. make the first one pay more
+    lenders[0].setRates(Wei("1000000 ether"), Wei("1000000 ether"), {"from": gov})
+    [results] = run(keeperBot, 3600)
+
+    assert [r.action for r in results] == [Action(strategy.address, "tend()")]
+    assert results[0].success
+    assert lenders[0].nav() == Wei("30000 ether")
+
+
+def test_runs_without_strategies(keeper):
+    keeperBot = Keeper(web3_call(web3), BrownieSender(keeper), [], 0)
+    asyncio.run(keeperBot.run())
+    asyncio.run(keeperBot.run(duration=60))
+    assert keeperBot.results == []
+
+
+def test_each_strategy_has_its_own_cadence(vault, keeper, deploy_strategy):
+    fast, slow = deploy_strategy(1, 0), deploy_strategy(2, 0)
+    reads = []
+    keeperBot = Keeper(counting_call(reads), BrownieSender(keeper), [Job(fast, 600), Job(slow, 3600)], 0)
+
+    checked = []
+    for now in range(0, 7200, 600):
+        reads.clear()
+        run(keeperBot, now)
+        checked.append({a for a in reads if a in (fast.address, slow.address)})
+
+    assert all(fast.address in c for c in checked)
+    assert [slow.address in c for c in checked] == [i % 6 == 0 for i in range(12)]
+
+
+def test_a_failed_transaction_does_not_stop_the_queue(vault, currency, whale, keeper, strategist, accounts, deploy_strategy):
+    # the keeper account is not a keeper of the second strategy
+    strategies = [deploy_strategy(1, 3_000) for _ in range(3)]
+    strategies[1].setKeeper(accounts[9], {"from": strategist})
+    deposit(vault, currency, whale, Wei("30000 ether"))
+
+    keeperBot = Keeper(web3_call(web3), BrownieSender(keeper), [Job(s) for s in strategies], 0)
+    [results] = run(keeperBot, 0)
+
+    assert [r.success for r in results] == [True, False, True]
+    assert not strategies[0].harvestTrigger(0)
+    assert strategies[1].harvestTrigger(0)
+
+    # the nonce is still right for the next round
+    strategies[1].setKeeper(keeper, {"from": strategist})
+    [results] = run(keeperBot, 3600)
+    assert [r.action for r in results] == [Action(strategies[1].address, "harvest()")]
+    assert results[0].success
@@ -0,0 +1,117 @@
+import brownie
+import pytest
+from brownie import ZERO_ADDRESS, Wei
+
+NONE, TEND, HARVEST = 0, 1, 2
+GAS_LIMIT = 3_000_000
+
+
+@pytest.fixture
+def batcher(KeeperBatcher, gov, keeper):
+    batcher = gov.deploy(KeeperBatcher)
+    batcher.setKeeper(keeper, True, {"from": gov})
+    yield batcher
+
+
+def deposit(vault, currency, whale, amount):
+    currency.approve(vault, 2 ** 256 - 1, {"from": whale})
+    vault.deposit(amount, {"from": whale})
+
+
+def strategies(deploy_strategy, batcher, gov, n=3):
+    deployed = [deploy_strategy(3, 3_000) for _ in range(n)]
+    for strategy in deployed:
+        strategy.setKeeper(batcher, {"from": gov})
+    return deployed
+
+
+def report(tx):
+    return [(e["strategy"], e["action"], e["success"]) for e in tx.events["Worked"]]
+
+
+def test_only_keepers(batcher, gov, rando):
+    with brownie.reverts("!keepers"):
+        batcher.work([], 0, GAS_LIMIT, {"from": rando})
+    with brownie.reverts("!gov"):
+        batcher.setKeeper(rando, True, {"from": rando})
+
+    batcher.setKeeper(rando, True, {"from": gov})
+    batcher.work([], 0, GAS_LIMIT, {"from": rando})
+
+
+def test_harvests_every_due_strategy_in_one_transaction(batcher, vault, currency, whale, keeper, deploy_strategy, gov):
+    deployed = strategies(deploy_strategy, batcher, gov)
+    deposit(vault, currency, whale, Wei("30000 ether"))
+    assert batcher.workable(deployed, 0) == [HARVEST] * 3
+
+    tx = batcher.work(deployed, 0, GAS_LIMIT, {"from": keeper})
+    assert tx.return_value == 3
+    assert report(tx) == [(s.address, HARVEST, True) for s in deployed]
+    for strategy in deployed:
+        assert vault.strategies(strategy).dict()["totalDebt"] == Wei("9000 ether")
+
+    # nothing is due anymore. every strategy is still reported
+    tx = batcher.work(deployed, 0, GAS_LIMIT, {"from": keeper})
+    assert tx.return_value == 0
+    assert report(tx) == [(s.address, NONE, True) for s in deployed]
+
+
+def test_tends_when_the_lenders_move(batcher, vault, currency, whale, keeper, strategist, deploy_strategy, gov, MockLender):
+    [strategy] = strategies(deploy_strategy, batcher, gov, 1)
+    deposit(vault, currency, whale, Wei("30000 ether"))
+    batcher.work([strategy], 0, GAS_LIMIT, {"from": keeper})
+
+    # the 2% lender starts paying 10%
+    MockLender.at(strategy.lenders(0)).setRates(Wei("100000 ether"), Wei("1000000 ether"), {"from": strategist})
+    assert batcher.workable([strategy], Wei("0.01 ether")) == [TEND]
+    tx = batcher.work([strategy], Wei("0.01 ether"), GAS_LIMIT, {"from": keeper})
+    assert report(tx) == [(strategy.address, TEND, True)]
+    assert strategy.lastRebalance() == tx.timestamp
+
+
+def test_a_failing_strategy_does_not_block_the_rest(batcher, vault, currency, whale, keeper, deploy_strategy, gov):
+    deployed = strategies(deploy_strategy, batcher, gov)
+    deposit(vault, currency, whale, Wei("30000 ether"))
+    # the batcher is no longer the keeper of the second one, its harvest reverts
+    deployed[1].setKeeper(keeper, {"from": gov})
+
+    # an address without code is not due
+    tx = batcher.work(deployed + [ZERO_ADDRESS], 0, GAS_LIMIT, {"from": keeper})
+    assert tx.return_value == 2
+    assert report(tx) == [
+        (deployed[0].address, HARVEST, True),
+        (deployed[1].address, HARVEST, False),
+        (deployed[2].address, HARVEST, True),
+        (ZERO_ADDRESS, NONE, True),
+    ]
+    assert vault.strategies(deployed[1]).dict()["totalDebt"] == 0
+    assert vault.strategies(deployed[2]).dict()["totalDebt"] == Wei("9000 ether")
+
+
+def test_gas_limit_per_call(batcher, vault, currency, whale, keeper, deploy_strategy, gov):
+    deployed = strategies(deploy_strategy, batcher, gov, 2)
+    deposit(vault, currency, whale, Wei("30000 ether"))
+
+    # a harvest does not fit in 100k gas, it fails on its own without reverting the batch
+    tx = batcher.work(deployed, 0, 100_000, {"from": keeper})
+    assert tx.return_value == 0
+    assert report(tx) == [(s.address, HARVEST, False) for s in deployed]
+    assert all(e["gasUsed"] <= 100_000 + 5_000 for e in tx.events["Worked"])
+    assert batcher.workable(deployed, 0) == [HARVEST] * 2
+
+
+def test_reports_where_it_ran_out_of_gas(batcher, vault, currency, whale, keeper, deploy_strategy, gov):
+    deployed = strategies(deploy_strategy, batcher, gov)
+    deposit(vault, currency, whale, Wei("30000 ether"))
+    batcher.work(deployed[:1], 0, GAS_LIMIT, {"from": keeper})
+
+    # the first is not due, the transaction can not give the second its gas limit
+    tx = batcher.work(deployed, 0, GAS_LIMIT, {"from": keeper, "gas_limit": GAS_LIMIT // 2})
+    assert tx.return_value == 0
+    assert report(tx) == [(deployed[0].address, NONE, True)]
+    assert [e["next"] for e in tx.events["Stopped"]] == [1]
+    assert batcher.workable(deployed, 0) == [NONE, HARVEST, HARVEST]
+
+    # a batch that gets through all of them does not stop
+    tx = batcher.work(deployed, 0, GAS_LIMIT, {"from": keeper})
+    assert "Stopped" not in tx.events
@@ -0,0 +1,63 @@
+import pytest
+from brownie import Wei
+
+
+def spread_funds(strategy, vault, currency, whale, strategist, plugins, amount):
+    # deposit and park an equal share in every lender so that they all have assets
+    currency.approve(vault, 2 ** 256 - 1, {"from": whale})
+    vault.deposit(amount, {"from": whale})
+    strategy.harvest({"from": strategist})
+
+    share = 1000 // len(plugins)
+    positions = [[p.address, share] for p in plugins]
+    positions[-1][1] += 1000 - share * len(plugins)
+    strategy.manualAllocation(positions, {"from": strategist})
+
+
+def test_snapshot_matches_single_calls(strategy, vault, currency, whale, strategist, lenders):
+    spread_funds(strategy, vault, currency, whale, strategist, lenders, Wei("30000 ether"))
+
+    for extra in [0, Wei("1 ether"), Wei("50000 ether")]:
+        for plugin in lenders:
+            nav, hasAssets, apr, aprAfterDeposit = plugin.lenderSnapshot(extra)
+            assert nav == plugin.nav()
+            assert hasAssets == plugin.hasAssets()
+            assert apr == plugin.apr()
+            assert aprAfterDeposit == plugin.aprAfterDeposit(extra)
+
+
+@pytest.mark.parametrize("n", [1, 4, 6])
+def test_single_pass_matches_legacy_scan(
+    strategy, vault, currency, whale, strategist, deploy_lenders, legacy_scan, n
+):
+    plugins = deploy_lenders(n)
+    spread_funds(strategy, vault, currency, whale, strategist, plugins, Wei("60000 ether"))
+
+    # some loose want so aprAfterDeposit is asked about a real amount
+    currency.transfer(strategy, Wei("1000 ether"), {"from": whale})
+    loose = currency.balanceOf(strategy)
+
+    assert strategy.estimateAdjustPosition() == legacy_scan.estimateAdjustPosition(
+        plugins, loose
+    )
+
+    newGas = strategy.estimateAdjustPosition.estimate_gas()
+    legacyGas = legacy_scan.estimateAdjustPosition.estimate_gas(plugins, loose)
+    print(f"\n{n} lenders. lenderSnapshot scan: {newGas} gas, legacy scan: {legacyGas} gas")
+    assert newGas < legacyGas
+
+
+def test_tend_moves_lowest_to_highest(strategy, vault, currency, whale, strategist, lenders, keeper):
+    spread_funds(strategy, vault, currency, whale, strategist, lenders, Wei("30000 ether"))
+
+    lowest, lowestApr, highest, potential = strategy.estimateAdjustPosition()
+    assert lowest == 0
+    assert highest == len(lenders) - 1
+    assert potential > lowestApr
+
+    lowestNav = lenders[lowest].nav()
+    highestNav = lenders[highest].nav()
+    strategy.tend({"from": keeper})
+
+    assert lenders[lowest].nav() == 0
+    assert lenders[highest].nav() == highestNav + lowestNav
@@ -0,0 +1,86 @@
+import brownie
+from brownie import Wei
+
+
+def spread_funds(strategy, vault, currency, whale, strategist, plugins, amount):
+    # deposit and park an equal share in every lender
+    currency.approve(vault, 2 ** 256 - 1, {"from": whale})
+    vault.deposit(amount, {"from": whale})
+    strategy.harvest({"from": strategist})
+    strategy.manualAllocation([[p.address, 1000 // len(plugins)] for p in plugins], {"from": strategist})
+
+
+def test_only_the_difference_moves(strategy, vault, currency, whale, strategist, deploy_lenders):
+    plugins = deploy_lenders(4)
+    spread_funds(strategy, vault, currency, whale, strategist, plugins, Wei("4000 ether"))
+
+    tx = strategy.manualRebalance([[plugins[0], 400], [plugins[1], 300], [plugins[2], 300]], {"from": strategist})
+
+    assert [p.nav() for p in plugins] == [Wei("1600 ether"), Wei("1200 ether"), Wei("1200 ether"), 0]
+    moves = [(t["from"], t["to"], t["value"]) for t in tx.events["Transfer"]]
+    # the left out lender is emptied, and only what is missing goes out to the others
+    assert moves == [
+        (plugins[3].address, strategy.address, Wei("1000 ether")),
+        (strategy.address, plugins[0].address, Wei("600 ether")),
+        (strategy.address, plugins[1].address, Wei("200 ether")),
+        (strategy.address, plugins[2].address, Wei("200 ether")),
+    ]
+
+
+def test_same_allocation_as_manual_allocation(strategy, vault, currency, whale, strategist, deploy_lenders):
+    plugins = deploy_lenders(3)
+    spread_funds(strategy, vault, currency, whale, strategist, plugins, Wei("3000 ether"))
+
+    tx = strategy.manualRebalance([[plugins[0], 100], [plugins[1], 250], [plugins[2], 650]], {"from": strategist})
+    assert [p.nav() for p in plugins] == [Wei("300 ether"), Wei("750 ether"), Wei("1950 ether")]
+    # the two lenders above their target pay out, the third is the only deposit
+    assert len([t for t in tx.events["Transfer"] if t["to"] == strategy.address]) == 2
+    assert len([t for t in tx.events["Transfer"] if t["from"] == strategy.address]) == 1
+
+
+def test_small_moves_cost_less_than_manual_allocation(strategy, vault, currency, whale, strategist, deploy_lenders):
+    plugins = deploy_lenders(8)
+    spread_funds(strategy, vault, currency, whale, strategist, plugins, Wei("8000 ether"))
+    positions = [[p, 125] for p in plugins]
+    positions[0][1] -= 100
+    positions[-1][1] += 100
+
+    full = strategy.manualAllocation(positions, {"from": strategist}).gas_used
+    strategy.manualAllocation([[p, 125] for p in plugins], {"from": strategist})
+
+    assert strategy.manualRebalance(positions, {"from": strategist}).gas_used < full // 2
+
+
+def test_rebalance_checks(strategy, vault, currency, whale, strategist, rando, MockLender, deploy_lenders):
+    plugins = deploy_lenders(2)
+    spread_funds(strategy, vault, currency, whale, strategist, plugins, Wei("2000 ether"))
+    other = strategist.deploy(MockLender, strategy, "NotAdded", 0, 0)
+
+    with brownie.reverts("!authorized"):
+        strategy.manualRebalance([[plugins[0], 1000]], {"from": rando})
+    with brownie.reverts("NOT LENDER"):
+        strategy.manualRebalance([[plugins[0], 500], [other, 500]], {"from": strategist})
+    with brownie.reverts("SHARE!=1000"):
+        strategy.manualRebalance([[plugins[0], 500], [plugins[1], 400]], {"from": strategist})
+
+
+def test_lender_index_survives_removals(strategy, vault, currency, whale, strategist, gov, deploy_lenders):
+    plugins = deploy_lenders(3)
+    spread_funds(strategy, vault, currency, whale, strategist, plugins, Wei("3000 ether"))
+
+    # the last lender takes the place of the removed one
+    strategy.safeRemoveLender(plugins[0], {"from": strategist})
+    assert strategy.lenders(0) == plugins[2].address
+    with brownie.reverts("NOT LENDER"):
+        strategy.manualRebalance([[plugins[0], 1000]], {"from": strategist})
+    with brownie.reverts("NOT LENDER"):
+        strategy.safeRemoveLender(plugins[0], {"from": strategist})
+
+    strategy.manualRebalance([[plugins[2], 700], [plugins[1], 300]], {"from": strategist})
+    assert plugins[2].nav() == Wei("2100 ether")
+
+    with brownie.reverts("Already Added"):
+        strategy.addLender(plugins[1], {"from": gov})
+    strategy.addLender(plugins[0], {"from": gov})
+    strategy.manualRebalance([[plugins[0], 1000]], {"from": strategist})
+    assert plugins[0].nav() == Wei("3000 ether")
@@ -0,0 +1,87 @@
+import brownie
+import pytest
+from brownie import Wei
+
+from scripts.allocation import PARTIAL_MOVE, WATER_FILL, PoolLender, compare, estimate_partial_move, partial_move
+
+
+def spread_funds(strategy, vault, currency, whale, strategist, plugins, amount):
+    # deposit and park an equal share in every lender so that they all have assets
+    currency.approve(vault, 2 ** 256 - 1, {"from": whale})
+    vault.deposit(amount, {"from": whale})
+    strategy.harvest({"from": strategist})
+
+    share = 1000 // len(plugins)
+    positions = [[p.address, share] for p in plugins]
+    positions[-1][1] += 1000 - share * len(plugins)
+    strategy.manualAllocation(positions, {"from": strategist})
+
+
+def models(plugins):
+    return [PoolLender(p.lenderName(), p.interestPerYear(), p.externalSupply(), p.nav()) for p in plugins]
+
+
+@pytest.fixture
+def shallow_lenders(deploy_lenders):
+    # 2% and 3% on only 200k, so moving all of a 150k position overshoots by far
+    yield deploy_lenders(2, Wei("200000 ether"))
+
+
+def test_set_partial_move_mode(strategy, gov, strategist):
+    with brownie.reverts("!steps"):
+        strategy.setAllocationMode(PARTIAL_MOVE, 0, {"from": gov})
+    with brownie.reverts("!steps"):
+        strategy.setAllocationMode(PARTIAL_MOVE, 33, {"from": gov})
+
+    strategy.setAllocationMode(WATER_FILL, 20, {"from": strategist})
+    strategy.setAllocationMode(PARTIAL_MOVE, 16, {"from": strategist})
+    assert strategy.allocationMode() == PARTIAL_MOVE
+    assert strategy.partialMoveSteps() == 16
+    assert strategy.waterFillChunks() == 20
+
+
+@pytest.mark.parametrize("steps", [1, 16, 32])
+def test_estimate_matches_reference(strategy, vault, currency, whale, strategist, shallow_lenders, steps):
+    spread_funds(strategy, vault, currency, whale, strategist, shallow_lenders, Wei("300000 ether"))
+    currency.transfer(strategy, Wei("1000 ether"), {"from": whale})
+    strategy.setAllocationMode(PARTIAL_MOVE, steps, {"from": strategist})
+
+    expected = estimate_partial_move(models(shallow_lenders), currency.balanceOf(strategy), steps)
+    assert tuple(strategy.estimatePartialMove()) == expected
+    # only part of the donor moves
+    assert 0 < expected[2] < shallow_lenders[expected[0]].nav()
+
+
+def test_tend_damps_instead_of_ping_pong(strategy, vault, currency, whale, strategist, shallow_lenders, keeper):
+    spread_funds(strategy, vault, currency, whale, strategist, shallow_lenders, Wei("300000 ether"))
+    strategy.setAllocationMode(PARTIAL_MOVE, 20, {"from": strategist})
+
+    expected = models(shallow_lenders)
+    moves = []
+    for _ in range(3):
+        gapBefore = abs(shallow_lenders[0].apr() - shallow_lenders[1].apr())
+        moves.append(partial_move(expected, 0, 20))
+        strategy.tend({"from": keeper})
+
+        assert [p.nav() for p in shallow_lenders] == [m.nav for m in expected]
+        assert abs(shallow_lenders[0].apr() - shallow_lenders[1].apr()) < gapBefore
+        assert all(p.nav() > 0 for p in shallow_lenders)
+
+    # each tend corrects a fraction of the one before
+    assert moves[0] > 4 * moves[1] > 16 * moves[2]
+
+
+def test_partial_move_reaches_a_better_apr_than_bubble_sort():
+    # pure python: two lenders on thin markets. the bubble sort empties one into the other and is stuck there,
+    # the partial move settles where both pay the same and moves less to get there
+    e = 10 ** 18
+
+    def make_lenders():
+        return [
+            PoolLender("aave", 30_000 * e, 1_000_000 * e, 500_000 * e),
+            PoolLender("compound", 31_000 * e, 1_000_000 * e, 0),
+        ]
+
+    result = compare(make_lenders, 0, max_steps=20)
+    assert result["partial_move"]["apr"] > result["bubble_sort"]["apr"]
+    assert result["partial_move"]["moved"] < result["bubble_sort"]["moved"]
@@ -0,0 +1,59 @@
+import brownie
+import pytest
+from brownie import chain
+
+E18 = 10 ** 18
+HOUR = 3600
+
+
+@pytest.fixture
+def price_oracle(RewardPriceOracle, gov):
+    yield gov.deploy(RewardPriceOracle, 24 * HOUR)
+
+
+def report(price_oracle, reporter, token, price):
+    price_oracle.update(token, E18, price, {"from": reporter})
+
+
+def sleep(seconds):
+    chain.sleep(seconds)
+    chain.mine()
+
+
+def test_reporters_only_write_their_own_prices(price_oracle, currency, accounts):
+    assert price_oracle.twap(accounts[0], currency) == 0
+    assert price_oracle.consult(accounts[0], currency, E18) == 0
+
+    report(price_oracle, accounts[0], currency, 2 * E18)
+    assert price_oracle.consult(accounts[0], currency, 3 * E18) == 6 * E18
+    assert price_oracle.consult(accounts[1], currency, 3 * E18) == 0
+
+    with brownie.reverts("!amountIn"):
+        price_oracle.update(currency, 0, E18, {"from": accounts[0]})
+
+
+def test_prices_are_weighted_by_time(price_oracle, currency, accounts):
+    reporter = accounts[0]
+    report(price_oracle, reporter, currency, 2 * E18)
+    sleep(HOUR)
+
+    # a new price starts with no weight
+    report(price_oracle, reporter, currency, 20 * E18)
+    assert price_oracle.twap(reporter, currency) == pytest.approx(2 * E18, rel=1e-3)
+
+    # an hour of each
+    sleep(HOUR)
+    assert price_oracle.twap(reporter, currency) == pytest.approx(11 * E18, rel=1e-2)
+
+
+def test_the_window_follows_the_reports(price_oracle, currency, accounts):
+    reporter = accounts[0]
+    report(price_oracle, reporter, currency, 2 * E18)
+    sleep(48 * HOUR)
+    report(price_oracle, reporter, currency, 4 * E18)
+    sleep(HOUR)
+    report(price_oracle, reporter, currency, 4 * E18)
+
+    # the anchor moved up to the second report, the first price is out of the window
+    sleep(HOUR)
+    assert price_oracle.twap(reporter, currency) == 4 * E18
@@ -0,0 +1,92 @@
+from brownie import Wei, chain, web3
+
+from scripts.snapshot import CALL_COST, snapshot, web3_call
+
+
+def counting_call():
+    calls = []
+    call = web3_call(web3)
+
+    def eth_call(to, data, block):
+        calls.append(block)
+        return call(to, data, block)
+
+    return eth_call, calls
+
+
+def invest(vault, currency, whale, strategist, strategies, amount):
+    currency.approve(vault, 2 ** 256 - 1, {"from": whale})
+    vault.deposit(amount, {"from": whale})
+    for strategy in strategies:
+        strategy.harvest({"from": strategist})
+
+
+def test_snapshot_matches_single_calls(strategy, vault, currency, whale, strategist, gov, lenders, multicall):
+    invest(vault, currency, whale, strategist, [strategy], Wei("30000 ether"))
+    # one plugin has rewards worth claiming, the others are below the call cost
+    lenders[1].setPendingReward(CALL_COST + 1, {"from": gov})
+    amount = Wei("1000 ether")
+
+    snap = snapshot(web3_call(web3), [strategy], amount=amount, multicall=multicall.address, block=chain.height)
+
+    [status] = snap.strategies
+    assert status.address == strategy.address
+    assert status.vault == vault.address
+    assert status.estimated_total_assets == strategy.estimatedTotalAssets()
+    assert status.estimated_apr == strategy.estimatedAPR()
+    assert status.harvest_trigger == strategy.harvestTrigger(CALL_COST)
+    assert status.tend_trigger == strategy.tendTrigger(CALL_COST)
+    assert status.emergency_exit == strategy.emergencyExit()
+    assert tuple(status.params) == tuple(vault.strategies(strategy))
+    assert status.params.total_debt == Wei("30000 ether")
+
+    assert [lender.address for lender in status.lenders] == [p.address for p in lenders]
+    for lender, plugin, (name, assets, rate, _) in zip(status.lenders, lenders, strategy.lendStatuses()):
+        assert (lender.name, lender.nav, lender.apr) == (name, assets, rate)
+        assert lender.has_assets == plugin.hasAssets()
+        assert lender.apr_after_deposit == plugin.aprAfterDeposit(amount)
+        assert lender.harvest_trigger == plugin.harvestTrigger(CALL_COST)
+    assert [lender.harvest_trigger for lender in status.lenders] == [False, True, False]
+
+
+def test_many_strategies_in_a_few_calls(vault, currency, whale, strategist, deploy_strategy, multicall):
+    strategies = [deploy_strategy(1 + i % 4, 1_000) for i in range(10)]
+    invest(vault, currency, whale, strategist, strategies, Wei("100000 ether"))
+
+    eth_call, calls = counting_call()
+    snap = snapshot(eth_call, strategies, multicall=multicall.address, block=chain.height)
+
+    # vault and lendStatuses first, then everything else
+    assert calls == [chain.height] * 2
+    assert [s.address for s in snap.strategies] == [s.address for s in strategies]
+    single = sum(2 + 6 + 3 * len(s.lenders) for s in snap.strategies)
+    print(f"\n{len(strategies)} strategies: {len(calls)} eth_calls instead of {single}")
+
+    for status, strategy in zip(snap.strategies, strategies):
+        assert status.estimated_total_assets == strategy.estimatedTotalAssets()
+        assert tuple(status.params) == tuple(vault.strategies(strategy))
+        assert len(status.lenders) == strategy.numLenders()
+        # the mock lenders have no rewards to claim
+        assert all(lender.harvest_trigger is False for lender in status.lenders)
+
+    # smaller batches split the rounds. a block mined in between does not change the snapshot
+    chain.mine()
+    eth_call, calls = counting_call()
+    assert snapshot(eth_call, strategies, multicall=multicall.address, block=snap.block, batch_size=20) == snap
+    assert len(calls) > 2
+
+
+def test_failures_are_isolated(strategy, vault, currency, whale, strategist, lenders, multicall, accounts):
+    invest(vault, currency, whale, strategist, [strategy], Wei("30000 ether"))
+
+    # a plugin and an account without code are not strategies
+    snap = snapshot(web3_call(web3), [lenders[0], accounts[9], strategy], multicall=multicall.address)
+
+    plugin, account, status = snap.strategies
+    # plugins have a vault() too but nothing else a strategy has
+    assert plugin.vault == vault.address
+    assert (plugin.estimated_total_assets, plugin.lenders) == (None, [])
+    assert plugin.params.activation == 0
+    assert (account.vault, account.estimated_apr, account.lenders) == (None, None, [])
+    assert status.estimated_total_assets == strategy.estimatedTotalAssets()
+    assert len(status.lenders) == len(lenders)
@@ -0,0 +1,75 @@
+import brownie
+from brownie import Wei, chain
+
+CALL_COST = Wei("0.01 ether")
+
+
+def invest(strategy, vault, currency, whale, strategist, lenders):
+    # everything goes to the 4% lender, then the 2% lender starts paying 10%
+    currency.approve(vault, 2 ** 256 - 1, {"from": whale})
+    vault.deposit(Wei("30000 ether"), {"from": whale})
+    strategy.harvest({"from": strategist})
+    lenders[0].setRates(Wei("100000 ether"), Wei("1000000 ether"), {"from": strategist})
+
+
+def test_set_tend_limits(strategy, gov, rando):
+    with brownie.reverts("!authorized"):
+        strategy.setTendLimits(10 ** 16, 3600, {"from": rando})
+
+    strategy.setTendLimits(10 ** 16, 3600, {"from": gov})
+    assert strategy.minTendSpread() == 10 ** 16
+    assert strategy.tendCooldown() == 3600
+
+
+def test_min_spread(strategy, vault, currency, whale, strategist, lenders, gov):
+    invest(strategy, vault, currency, whale, strategist, lenders)
+    assert strategy.tendTrigger(CALL_COST)
+
+    # 10% against 4%
+    strategy.setTendLimits(7 * 10 ** 16, 0, {"from": gov})
+    assert not strategy.tendTrigger(CALL_COST)
+    strategy.setTendLimits(5 * 10 ** 16, 0, {"from": gov})
+    assert strategy.tendTrigger(CALL_COST)
+
+
+def test_tend_records_the_rebalance(strategy, vault, currency, whale, strategist, lenders, keeper):
+    invest(strategy, vault, currency, whale, strategist, lenders)
+    lowest, lowestApr, highest, potential = strategy.estimateAdjustPosition()
+
+    tx = strategy.tend({"from": keeper})
+    assert strategy.lastRebalance() == tx.timestamp
+    assert strategy.lastRebalanceSpread() == potential - lowestApr
+    assert lenders[highest].nav() == Wei("30000 ether")
+
+    # a tend that only deposits loose want is not a rebalance
+    currency.transfer(strategy, Wei("1 ether"), {"from": whale})
+    strategy.tend({"from": keeper})
+    assert strategy.lastRebalance() == tx.timestamp
+
+
+def test_cooldown(strategy, vault, currency, whale, strategist, lenders, keeper, gov):
+    invest(strategy, vault, currency, whale, strategist, lenders)
+    strategy.setTendLimits(0, 3600, {"from": gov})
+    strategy.tend({"from": keeper})
+
+    # the 3% lender jumps far ahead but the last rebalance was just now
+    lenders[1].setRates(Wei("1000000 ether"), Wei("1000000 ether"), {"from": strategist})
+    assert not strategy.tendTrigger(CALL_COST)
+    chain.sleep(3601)
+    chain.mine()
+    assert strategy.tendTrigger(CALL_COST)
+
+
+def test_moving_back_soon_needs_a_wider_spread(strategy, vault, currency, whale, strategist, lenders, keeper):
+    invest(strategy, vault, currency, whale, strategist, lenders)
+    strategy.tend({"from": keeper})
+    spread = strategy.lastRebalanceSpread()
+
+    # the 4% lender now pays a little more than the 10% one did. not enough within the report delay
+    lenders[2].setRates(Wei("110000 ether"), Wei("1000000 ether"), {"from": strategist})
+    lowest, lowestApr, _, potential = strategy.estimateAdjustPosition()
+    assert 0 < potential - lowestApr < spread
+    assert not strategy.tendTrigger(CALL_COST)
+
+    lenders[2].setRates(Wei("300000 ether"), Wei("1000000 ether"), {"from": strategist})
+    assert strategy.tendTrigger(CALL_COST)
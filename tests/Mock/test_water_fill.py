@@ -0,0 +1,144 @@
+import brownie
+import pytest
+from brownie import Wei
+
+from scripts.allocation import (
+    BUBBLE_SORT,
+    PARTIAL_MOVE,
+    WATER_FILL,
+    PoolLender,
+    compare,
+    estimate_water_fill,
+    water_fill,
+    weighted_apr,
+)
+
+
+def spread_funds(strategy, vault, currency, whale, strategist, plugins, amount):
+    # deposit and park an equal share in every lender so that they all have assets
+    currency.approve(vault, 2 ** 256 - 1, {"from": whale})
+    vault.deposit(amount, {"from": whale})
+    strategy.harvest({"from": strategist})
+
+    share = 1000 // len(plugins)
+    positions = [[p.address, share] for p in plugins]
+    positions[-1][1] += 1000 - share * len(plugins)
+    strategy.manualAllocation(positions, {"from": strategist})
+
+
+def models(plugins):
+    return [PoolLender(p.lenderName(), p.interestPerYear(), p.externalSupply(), p.nav()) for p in plugins]
+
+
+def test_set_allocation_mode(strategy, gov, strategist, rando):
+    assert strategy.allocationMode() == BUBBLE_SORT
+
+    with brownie.reverts("!authorized"):
+        strategy.setAllocationMode(WATER_FILL, 20, {"from": rando})
+    with brownie.reverts("!mode"):
+        strategy.setAllocationMode(PARTIAL_MOVE + 1, 20, {"from": gov})
+    with brownie.reverts("!chunks"):
+        strategy.setAllocationMode(WATER_FILL, 0, {"from": gov})
+    with brownie.reverts("!chunks"):
+        strategy.setAllocationMode(WATER_FILL, 101, {"from": gov})
+
+    strategy.setAllocationMode(WATER_FILL, 20, {"from": strategist})
+    assert strategy.allocationMode() == WATER_FILL
+    assert strategy.waterFillChunks() == 20
+
+    # each mode only sets its own size
+    strategy.setAllocationMode(PARTIAL_MOVE, 8, {"from": strategist})
+    strategy.setAllocationMode(BUBBLE_SORT, 0, {"from": strategist})
+    assert strategy.allocationMode() == BUBBLE_SORT
+    assert strategy.waterFillChunks() == 20
+    assert strategy.partialMoveSteps() == 8
+
+
+def test_estimate_before_chunks_are_set(strategy, vault, currency, whale, strategist, lenders):
+    # BUBBLE_SORT with a size leaves waterFillChunks at 0, the estimate plans one chunk instead of dividing by it
+    spread_funds(strategy, vault, currency, whale, strategist, lenders, Wei("300000 ether"))
+    strategy.setAllocationMode(BUBBLE_SORT, 20, {"from": strategist})
+    assert strategy.waterFillChunks() == 0
+
+    targets, navs, chunk = strategy.estimateWaterFill()
+    assert chunk == strategy.estimatedTotalAssets()
+    assert (list(targets), list(navs), chunk) == estimate_water_fill(models(lenders), currency.balanceOf(strategy), 0)
+
+
+def test_estimate_without_lenders(strategy, vault, currency, whale, gov):
+    strategy.setAllocationMode(WATER_FILL, 20, {"from": gov})
+    currency.approve(vault, 2 ** 256 - 1, {"from": whale})
+    vault.deposit(Wei("1000 ether"), {"from": whale})
+    strategy.harvest({"from": gov})
+
+    # the deposit stays loose, there is nothing to plan
+    assert strategy.estimateWaterFill() == ([], [], 0)
+    assert estimate_water_fill([], Wei("1000 ether"), 20) == ([], [], 0)
+    assert currency.balanceOf(strategy) == Wei("1000 ether")
+
+
+@pytest.mark.parametrize("chunks", [1, 20, 100])
+def test_estimate_matches_reference(strategy, vault, currency, whale, strategist, lenders, chunks):
+    spread_funds(strategy, vault, currency, whale, strategist, lenders, Wei("300000 ether"))
+    currency.transfer(strategy, Wei("1000 ether"), {"from": whale})
+    strategy.setAllocationMode(WATER_FILL, chunks, {"from": strategist})
+
+    targets, navs, chunk = strategy.estimateWaterFill()
+    assert (list(targets), list(navs), chunk) == estimate_water_fill(
+        models(lenders), currency.balanceOf(strategy), chunks
+    )
+    assert sum(targets) == strategy.estimatedTotalAssets()
+
+
+def test_tend_reaches_reference(strategy, vault, currency, whale, strategist, lenders, keeper):
+    spread_funds(strategy, vault, currency, whale, strategist, lenders, Wei("300000 ether"))
+    strategy.setAllocationMode(WATER_FILL, 20, {"from": strategist})
+
+    expected = models(lenders)
+    water_fill(expected, currency.balanceOf(strategy), 20)
+
+    aprBefore = strategy.estimatedAPR()
+    strategy.tend({"from": keeper})
+
+    assert [p.nav() for p in lenders] == [m.nav for m in expected]
+    assert strategy.estimatedAPR() >= aprBefore
+
+    # the plan is stable so a second tend moves nothing
+    navs = [p.nav() for p in lenders]
+    strategy.tend({"from": keeper})
+    assert [p.nav() for p in lenders] == navs
+
+
+def test_harvest_in_water_fill_mode(strategy, vault, currency, whale, strategist, lenders):
+    strategy.setAllocationMode(WATER_FILL, 50, {"from": strategist})
+    currency.approve(vault, 2 ** 256 - 1, {"from": whale})
+    vault.deposit(Wei("300000 ether"), {"from": whale})
+
+    strategy.harvest({"from": strategist})
+
+    # with 300k to place no single mock lender should take it all
+    assert currency.balanceOf(strategy) == 0
+    assert sum(p.nav() > 0 for p in lenders) > 1
+    assert strategy.estimatedTotalAssets() == Wei("300000 ether")
+
+
+def test_water_fill_beats_bubble_sort():
+    # pure python: from an uneven start water fill ends at a better apr than the bubble sort
+    # and gets there in a single adjustPosition
+    e = 10 ** 18
+
+    def make_lenders():
+        return [
+            PoolLender("a", 20_000 * e, 1_000_000 * e, 300_000 * e),
+            PoolLender("b", 30_000 * e, 1_000_000 * e, 300_000 * e),
+            PoolLender("c", 10_000 * e, 200_000 * e, 0),
+            PoolLender("d", 40_000 * e, 1_000_000 * e, 400_000 * e),
+        ]
+
+    for loose in [0, 100_000 * e]:
+        result = compare(make_lenders, loose, chunks=50)
+        assert result["water_fill"]["apr"] >= result["bubble_sort"]["apr"]
+        assert result["water_fill"]["steps"] == 1
+
+    start = make_lenders()
+    assert weighted_apr(start) < compare(make_lenders, 0)["water_fill"]["apr"]
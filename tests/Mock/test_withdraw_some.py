@@ -0,0 +1,79 @@
+from brownie import Wei
+
+
+def spread_funds(strategy, vault, currency, whale, strategist, plugins, amount):
+    # deposit and park an equal share in every lender
+    currency.approve(vault, 2 ** 256 - 1, {"from": whale})
+    vault.deposit(amount, {"from": whale})
+    strategy.harvest({"from": strategist})
+    strategy.manualAllocation([[p.address, 1000 // len(plugins)] for p in plugins], {"from": strategist})
+
+
+def withdraw(vault, currency, whale, shares):
+    before = currency.balanceOf(whale)
+    vault.withdraw(shares, {"from": whale})
+    return currency.balanceOf(whale) - before
+
+
+def test_large_withdrawal_goes_through_every_lender(strategy, vault, currency, whale, strategist, deploy_lenders):
+    plugins = deploy_lenders(8)
+    spread_funds(strategy, vault, currency, whale, strategist, plugins, Wei("8000 ether"))
+
+    # more than six lenders have to pay
+    assert withdraw(vault, currency, whale, Wei("7500 ether")) == Wei("7500 ether")
+
+    # from the worst rate up
+    assert [p.nav() for p in plugins] == [0] * 7 + [Wei("500 ether")]
+
+
+def test_illiquid_lenders_are_skipped(strategy, vault, currency, whale, strategist, gov, deploy_lenders):
+    plugins = deploy_lenders(8)
+    spread_funds(strategy, vault, currency, whale, strategist, plugins, Wei("8000 ether"))
+    for p in plugins[::2]:
+        p.setLiquidity(0, {"from": gov})
+    plugins[1].setLiquidity(Wei("400 ether"), {"from": gov})
+
+    assert withdraw(vault, currency, whale, Wei("3000 ether")) == Wei("3000 ether")
+    assert [p.nav() for p in plugins] == [Wei("1000 ether"), Wei("600 ether")] + [Wei("1000 ether"), 0] * 2 + [Wei("1000 ether"), Wei("400 ether")]
+
+
+def test_short_withdrawal_pays_what_is_liquid(strategy, vault, currency, whale, strategist, gov, deploy_lenders):
+    plugins = deploy_lenders(8)
+    spread_funds(strategy, vault, currency, whale, strategist, plugins, Wei("8000 ether"))
+    for p in plugins[1:]:
+        p.setLiquidity(0, {"from": gov})
+
+    # only the first lender can pay, the rest of the shares stay with the whale
+    assert withdraw(vault, currency, whale, Wei("4000 ether")) == Wei("1000 ether")
+    assert vault.balanceOf(whale) == Wei("7000 ether")
+    assert strategy.estimatedTotalAssets() == Wei("7000 ether")
+
+
+def test_available_liquidity(strategy, vault, currency, whale, strategist, gov, deploy_lenders):
+    plugins = deploy_lenders(2)
+    spread_funds(strategy, vault, currency, whale, strategist, plugins, Wei("2000 ether"))
+    plugins[1].setLiquidity(Wei("300 ether"), {"from": gov})
+
+    assert [p.availableLiquidity() for p in plugins] == [Wei("1000 ether"), Wei("300 ether")]
+
+
+def test_one_lender_pays_when_it_can(strategy, vault, currency, whale, strategist, gov, deploy_lenders):
+    plugins = deploy_lenders(3)
+    spread_funds(strategy, vault, currency, whale, strategist, plugins, Wei("3000 ether"))
+    plugins[0].setLiquidity(Wei("100 ether"), {"from": gov})
+
+    # the worst rate could only pay part of it, the next one pays it all
+    tx = vault.withdraw(Wei("500 ether"), {"from": whale})
+    assert [p.nav() for p in plugins] == [Wei("1000 ether"), Wei("500 ether"), Wei("1000 ether")]
+    assert [t["from"] for t in tx.events["Transfer"] if t["to"] == strategy.address] == [plugins[1].address]
+
+
+def test_a_reverting_lender_does_not_block_withdrawals(strategy, vault, currency, whale, strategist, gov, deploy_lenders):
+    plugins = deploy_lenders(3)
+    spread_funds(strategy, vault, currency, whale, strategist, plugins, Wei("3000 ether"))
+    plugins[0].setLiquidityFails(True, {"from": gov})
+
+    # the others pay, the one that reverts is not asked
+    assert withdraw(vault, currency, whale, Wei("1500 ether")) == Wei("1500 ether")
+    assert plugins[0].nav() == Wei("1000 ether")
+    assert plugins[1].nav() + plugins[2].nav() == Wei("500 ether")
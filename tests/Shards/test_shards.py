@@ -0,0 +1,59 @@
+import xml.etree.ElementTree as ET
+
+from scripts.shards import Shard, discover, merge_gas, merge_junit, network_for, shard
+
+
+def test_networks_follow_the_directories():
+    assert network_for("tests/USDC/test_usdc.py") == "mainnet-fork"
+    assert network_for("tests/test_live.py") == "mainnet-fork"
+    assert network_for("tests/Opt/test_usdc.py") == "optimism-main-fork"
+    assert network_for("tests/FTM/DAI/test_dai.py") == "ftm-main-fork"
+    assert network_for("tests/AaveV3/V3/test_logic.py") == "ftm-main-fork"
+    assert network_for("tests/AaveV3/V3Rewards/test_rewards.py") == "avax-main-fork"
+    assert network_for("tests/Mock/test_keeper.py") == "development"
+
+
+def test_discover(tmp_path):
+    for name in ["A/test_a.py", "A/test_b.py", "A/helpers.py", "B/C/test_c.py"]:
+        (tmp_path / name).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / name).touch()
+    found = discover([tmp_path / "B", tmp_path, tmp_path / "A" / "test_a.py"])
+    assert found == [(tmp_path / name).as_posix() for name in ["B/C/test_c.py", "A/test_a.py", "A/test_b.py"]]
+
+
+def test_shards_keep_a_directory_on_one_network():
+    modules = [f"tests/USDC/test_{i}.py" for i in range(6)] + ["tests/Opt/test_usdc.py", "tests/Mock/test_keeper.py"]
+    shards = shard(modules, max_modules=4)
+    assert shards == [
+        Shard("mainnet-fork", modules[:4]),
+        Shard("mainnet-fork", modules[4:6]),
+        Shard("optimism-main-fork", ["tests/Opt/test_usdc.py"]),
+        Shard("development", ["tests/Mock/test_keeper.py"]),
+    ]
+    assert sorted(m for s in shards for m in s.modules) == sorted(modules)
+
+
+def test_merge_gas():
+    first = {"Strategy": {"harvest": {"avg": 100, "high": 150, "low": 50, "count": 3}}}
+    second = {
+        "Strategy": {"harvest": {"avg": 200, "high": 300, "low": 100, "count": 1}, "tend": {"avg": 1, "high": 1, "low": 1, "count": 1}},
+        "Vault": {"deposit": {"avg": 5, "high": 5, "low": 5, "count": 2}},
+    }
+    merged = merge_gas([first, second])
+    assert merged["Strategy"]["harvest"] == {"avg": 125, "high": 300, "low": 50, "count": 4}
+    assert merged["Strategy"]["tend"] == second["Strategy"]["tend"]
+    assert merged["Vault"] == second["Vault"]
+    # the inputs are left alone
+    assert first["Strategy"]["harvest"]["count"] == 3
+
+
+def test_merge_junit(tmp_path):
+    (tmp_path / "a.xml").write_text(
+        '<testsuites><testsuite name="pytest" tests="3" failures="1" errors="0" skipped="1"><testcase name="a"/></testsuite></testsuites>'
+    )
+    (tmp_path / "b.xml").write_text('<testsuite name="pytest" tests="2" failures="0" errors="1" skipped="0"><testcase name="b"/></testsuite>')
+    totals = merge_junit([tmp_path / "a.xml", tmp_path / "b.xml"], tmp_path / "junit.xml")
+    assert totals == {"tests": 5, "failures": 1, "errors": 1, "skipped": 1}
+    root = ET.parse(tmp_path / "junit.xml").getroot()
+    assert root.get("tests") == "5"
+    assert [case.get("name") for case in root.iter("testcase")] == ["a", "b"]
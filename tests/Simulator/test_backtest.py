@@ -0,0 +1,148 @@
+import time
+
+import pytest
+
+from scripts.allocation import BUBBLE_SORT, WATER_FILL
+from scripts.simulator import CompoundLender, JumpRateModel, StrategyModel, VaultModel
+from scripts.simulator.backtest import Snapshot, backtest, dump, load, replay, six_lenders, snapshot_of, synthetic
+from scripts.simulator.rates import WAD
+from scripts.simulator.scenarios import USDC, usdc_lenders
+
+HOUR = 3600
+
+
+def two_markets():
+    model = JumpRateModel.from_yearly(0, 10 * WAD // 100, kink=WAD)
+    return [
+        CompoundLender("A", model, cash=50_000_000 * USDC, borrows=50_000_000 * USDC),
+        CompoundLender("B", model, cash=80_000_000 * USDC, borrows=20_000_000 * USDC),
+    ]
+
+
+def market(a_borrows, b_borrows):
+    return {
+        "A": {"cash": 100_000_000 * USDC - a_borrows, "borrows": a_borrows},
+        "B": {"cash": 100_000_000 * USDC - b_borrows, "borrows": b_borrows},
+    }
+
+
+def test_snapshots_leave_the_strategy_out():
+    lenders = two_markets()
+    lenders[0].deposit(1_000 * USDC)
+    snapshot = snapshot_of(lenders, 0)
+    assert snapshot.lenders["A"]["cash"] == 50_000_000 * USDC
+    assert snapshot.lenders["B"]["cash"] == 80_000_000 * USDC
+
+    # replayed on top of the strategy's balance
+    strategy = StrategyModel(two_markets(), withdrawal_threshold=0)
+    vault = VaultModel()
+    vault.add_strategy(strategy)
+    strategy.lenders[1].deposit(500 * USDC)
+    replay([snapshot._replace(timestamp=HOUR)])(HOUR, strategy, vault)
+    assert strategy.lenders[1].cash == 80_000_000 * USDC + 500 * USDC
+    assert strategy.lenders[1].timestamp == HOUR
+
+    with pytest.raises(ValueError):
+        replay([Snapshot(0, {"A": {"total_supply": 1}})])(0, strategy, vault)
+
+
+def test_recordings_round_trip(tmp_path):
+    snapshots = [Snapshot(0, market(50_000_000 * USDC, 20_000_000 * USDC)), Snapshot(HOUR, market(1, 2), flow=-5)]
+    dump(snapshots, tmp_path / "recording.jsonl")
+    assert load(tmp_path / "recording.jsonl") == snapshots
+
+
+def test_follows_the_recorded_rates():
+    # B starts as the better market, A takes over after a month
+    month = 30 * 24
+    snapshots = [Snapshot(i * HOUR, market(50_000_000 * USDC, 60_000_000 * USDC)) for i in range(month)]
+    snapshots += [Snapshot(i * HOUR, market(80_000_000 * USDC, 20_000_000 * USDC)) for i in range(month, 2 * month)]
+
+    runs = backtest(snapshots, two_markets, {"allocation_mode": [BUBBLE_SORT, WATER_FILL]}, 1_000_000 * USDC, gas_price=0)
+    results = {combination["allocation_mode"]: r for combination, r in runs}
+    for r in results.values():
+        assert r["steps"] == 2 * month - 1
+        # the deposit goes to B before the replay starts, and moves to A when A takes over
+        assert r["rebalances"] == 1
+        assert r["moved"] > 0
+        assert r["earned"] > 0
+        assert r["gas_cost"] == 0
+
+    # a rebalance is a tend or a harvest that moved funds
+    assert results[BUBBLE_SORT]["rebalances"] <= results[BUBBLE_SORT]["harvests"] + results[BUBBLE_SORT]["tends"]
+
+
+def ranked_walk(lenders, amount):
+    """what Strategy._withdrawSome asks each lender for, written the way the solidity is"""
+    order, available, aprs, ranked = [0] * len(lenders), [0] * len(lenders), [0] * len(lenders), 0
+    for i, lender in enumerate(lenders):
+        liquidity = lender.available_liquidity()
+        if liquidity == 0:
+            continue
+        apr = lender.apr()
+        j = ranked
+        while j > 0 and aprs[j - 1] > apr:
+            order[j], available[j], aprs[j] = order[j - 1], available[j - 1], aprs[j - 1]
+            j -= 1
+        order[j], available[j], aprs[j] = i, liquidity, apr
+        ranked += 1
+
+    asked = [0] * len(lenders)
+    for j in range(ranked):
+        if available[j] >= amount:
+            asked[order[j]] = amount
+            return asked
+    withdrawn = 0
+    for j in range(ranked):
+        if withdrawn >= amount:
+            break
+        asked[order[j]] = min(available[j], amount - withdrawn)
+        withdrawn += asked[order[j]]
+    return asked
+
+
+def test_outflows_follow_the_contracts_ranked_walk():
+    lenders = usdc_lenders()
+    strategy = StrategyModel(lenders, withdrawal_threshold=0)
+    vault = VaultModel()
+    vault.add_strategy(strategy)
+    vault.deposit(4_000_000 * USDC)
+    strategy.harvest(0)
+    # a million in each, like a manualAllocation
+    best = max(lenders, key=lambda lender: lender.nav)
+    best.withdraw(3_000_000 * USDC)
+    for lender in lenders:
+        if lender is not best:
+            lender.deposit(1_000_000 * USDC)
+
+    # the Comet is borrowed past what the others supply, only half of our balance can come out
+    market = snapshot_of(lenders, HOUR).lenders
+    comet = market["GenericCompoundV3"]
+    comet["total_borrow"] = comet["total_supply"] + 500_000 * USDC
+    replay([Snapshot(HOUR, market)])(HOUR, strategy, vault)
+    assert lenders[1].available_liquidity() == 500_000 * USDC
+
+    # more than the strategy can pay, every lender is walked and the Comet, the best rate, pays last
+    asked = ranked_walk(lenders, 3_600_000 * USDC)
+    assert asked == [1_000_000 * USDC, 500_000 * USDC, 1_000_000 * USDC, 1_000_000 * USDC]
+    navs = [lender.nav for lender in lenders]
+    replay([Snapshot(HOUR, market, flow=-3_600_000 * USDC)])(HOUR, strategy, vault)
+
+    assert [before - lender.nav for before, lender in zip(navs, lenders)] == asked
+    assert vault.withdrawn == sum(asked)
+
+
+def test_a_year_of_hourly_snapshots_of_six_lenders_in_seconds():
+    snapshots = synthetic(six_lenders())
+    assert len(snapshots) == 365 * 24 + 1
+
+    started = time.perf_counter()
+    [(_, result)] = backtest(
+        snapshots, six_lenders, {"allocation_mode": [WATER_FILL]}, 20_000_000 * USDC, eth_to_want=lambda amount: amount * 2_000 * USDC // WAD
+    )
+    assert time.perf_counter() - started < 10
+
+    assert result["steps"] == 365 * 24
+    assert result["rebalances"] > 0
+    assert 0 < result["gas_cost"] < result["earned"]
+    assert result["net_apr"] > 0
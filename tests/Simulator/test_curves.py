@@ -0,0 +1,185 @@
+import random
+import time
+
+import numpy as np
+import pytest
+
+from scripts.simulator import (
+    AaveLender,
+    AaveV2RateStrategy,
+    AaveV3Lender,
+    AaveV3RateStrategy,
+    AlphaHomoLender,
+    CometRates,
+    CompoundLender,
+    DoubleExponentInterestSetter,
+    JumpRateModel,
+    TripleSlopeModel,
+    UniswapV2Path,
+)
+from scripts.simulator import curves
+from scripts.simulator.rates import RAY, WAD
+from scripts.simulator.scenarios import usdc_lenders
+
+E = 10 ** 18
+
+
+def all_lenders():
+    # the example market plus the lender types it does not use, with rewards that end at t=1000
+    return usdc_lenders() + [
+        AaveLender(
+            "GenericAave",
+            AaveV2RateStrategy(8 * RAY // 10, 0, 4 * RAY // 100, 75 * RAY // 100, 2 * RAY // 100, 75 * RAY // 100),
+            cash=100_000_000 * E,
+            total_variable_debt=300_000_000 * E,
+            reserve_factor=1_000,
+            total_stable_debt=50_000_000 * E,
+            average_stable_borrow_rate=7 * RAY // 100,
+            market_borrow_rate=3 * RAY // 100,
+            emissions_per_second=E // 10,
+            distribution_end=1_000,
+        ),
+        AaveV3Lender(
+            "GenericAaveV3 stable",
+            AaveV3RateStrategy(
+                8 * RAY // 10, RAY // 100, 4 * RAY // 100, 75 * RAY // 100, 2 * RAY // 100, 75 * RAY // 100, RAY // 100, 8 * RAY // 100, 2 * RAY // 10
+            ),
+            cash=100_000_000 * E,
+            total_variable_debt=300_000_000 * E,
+            reserve_factor=1_000,
+            total_stable_debt=150_000_000 * E,
+            average_stable_borrow_rate=7 * RAY // 100,
+            unbacked=1_000_000 * E,
+            emissions_per_second=E // 10,
+            distribution_end=1_000,
+        ),
+        AlphaHomoLender("AlphaHomo", floating=50_000 * E, glb_debt=150_000 * E, total_eth=200_000 * E),
+        CompoundLender(
+            "GenericIronBank",
+            JumpRateModel(10 ** 9, 10 ** 10, 10 ** 11, 8 * 10 ** 17),
+            cash=1_000_000 * E,
+            borrows=4_000_000 * E,
+            reserves=10_000 * E,
+            reserve_factor=10 ** 17,
+            blocks_per_year=3154 * 10 ** 4,
+            reward_rate=10 ** 16,
+            reward_staked=5_000_000 * E,
+            reward_to_want=UniswapV2Path([(10 ** 24, 5 * 10 ** 23), (10 ** 25, 10 ** 25)]),
+            period_finish=1_000,
+        ),
+    ]
+
+
+# these check the vectorised curves against the scalar ports in rates.py and lenders.py. the ports themselves are
+# checked against the mock rate contracts and the plugins in tests/Local/test_rate_parity.py
+@pytest.mark.parametrize("index", range(len(all_lenders())))
+def test_apr_after_deposit_is_bit_exact(index):
+    lender = all_lenders()[index]
+    rng = random.Random(index)
+    amounts = [0, 1, 10 ** 6] + [rng.randrange(10 ** 27) for _ in range(200)]
+    timestamps = [rng.randrange(2_000) for _ in amounts]
+
+    got = curves.apr_after_deposit(lender, amounts, timestamps)
+
+    for amount, timestamp, value in zip(amounts, timestamps, got):
+        lender.timestamp = timestamp
+        assert type(value) is int
+        assert value == lender.apr_after_deposit(amount)
+
+
+@pytest.mark.parametrize("index", range(len(all_lenders())))
+def test_float_curves_are_close(index):
+    lender = all_lenders()[index]
+    amounts = np.linspace(0, 1e27, 1_000)
+
+    exact = curves.apr_after_deposit(lender, curves.amounts(amounts)).astype(np.float64)
+    fast = curves.apr_after_deposit(lender, amounts, exact=False)
+
+    assert fast.dtype == np.float64
+    # per block rates are ~1e9 so the integer floors alone are ~1e-9 of the rate
+    assert np.allclose(fast, exact, rtol=1e-8, atol=1)
+
+
+def test_timestamps_end_rewards():
+    lender = all_lenders()[-1]
+    aprs = curves.apr_after_deposit(lender, [0, 0], [999, 1_001])
+    assert aprs[0] > aprs[1] == curves.jump_rate_supply_rate(
+        lender.model, lender.cash, lender.borrows, lender.reserves, lender.reserve_factor
+    ) * lender.blocks_per_year
+
+
+def random_states(rng, n):
+    # utilizations from 0 to past 100% and a few zero borrow states
+    states = []
+    for i in range(n):
+        supply = rng.randrange(1, 10 ** 27)
+        borrows = 0 if i % 10 == 0 else rng.randrange(supply * 11 // 10)
+        states.append((supply, borrows))
+    return states
+
+
+def test_jump_rate_model_points():
+    model = JumpRateModel.from_yearly(2 * WAD // 100, 20 * WAD // 100, 2 * WAD, kink=8 * WAD // 10)
+    rng = random.Random(1)
+    states = random_states(rng, 500)
+    cash = [max(s - b, 0) for s, b in states]
+    borrows = [b for _, b in states]
+    reserves = [rng.randrange(b // 10 + 1) for b in borrows]
+    factors = [rng.randrange(WAD // 2) for _ in states]
+
+    got = curves.jump_rate_supply_rate(model, *map(curves.amounts, (cash, borrows, reserves, factors)))
+    assert list(got) == [model.get_supply_rate(*args) for args in zip(cash, borrows, reserves, factors)]
+
+
+def test_comet_points():
+    rates = CometRates(9 * WAD // 10, 10 ** 8, 10 ** 9, 10 ** 10, 8 * WAD // 10, 10 ** 8, 2 * 10 ** 9, 3 * 10 ** 10)
+    utilizations = [0, rates.supply_kink, rates.supply_kink + 1, rates.borrow_kink, WAD, 2 * WAD] + list(range(0, 2 * WAD, WAD // 97))
+
+    got_supply = curves.comet_supply_rate(rates, curves.amounts(utilizations))
+    got_borrow = curves.comet_borrow_rate(rates, curves.amounts(utilizations))
+    assert list(got_supply) == [rates.get_supply_rate(u) for u in utilizations]
+    assert list(got_borrow) == [rates.get_borrow_rate(u) for u in utilizations]
+
+
+def test_aave_points():
+    v3 = AaveV3RateStrategy(9 * RAY // 10, RAY // 100, 4 * RAY // 100, 60 * RAY // 100, 2 * RAY // 100, 80 * RAY // 100, RAY // 100, 8 * RAY // 100, RAY // 5)
+    v2 = AaveV2RateStrategy(9 * RAY // 10, RAY // 100, 4 * RAY // 100, 60 * RAY // 100, 2 * RAY // 100, 80 * RAY // 100)
+    rng = random.Random(2)
+    rows = []
+    for supply, borrows in random_states(rng, 300):
+        stable = rng.randrange(borrows + 1)
+        rows.append((max(supply - borrows, 0), stable, borrows - stable, rng.randrange(RAY // 5), rng.randrange(5_000)))
+    columns = [curves.amounts(list(column)) for column in zip(*rows)]
+
+    got = curves.aave_v3_rates(v3, *columns, unbacked=10 ** 20)
+    for i, row in enumerate(rows):
+        assert tuple(rates[i] for rates in got) == v3.calculate_interest_rates(*row, unbacked=10 ** 20)
+
+    got = curves.aave_v2_rates(v2, *columns, market_borrow_rate=3 * RAY // 100)
+    for i, row in enumerate(rows):
+        assert tuple(rates[i] for rates in got) == v2.calculate_interest_rates(*row, market_borrow_rate=3 * RAY // 100)
+
+
+def test_dydx_and_alpha_points():
+    setter = DoubleExponentInterestSetter.from_list(WAD, [0, 10, 10, 0, 0, 0, 0, 80])
+    alpha = TripleSlopeModel()
+    states = random_states(random.Random(3), 500)
+    supply = curves.amounts([s for s, _ in states])
+    borrow = curves.amounts([b for _, b in states])
+
+    assert list(curves.dydx_interest_rate(setter, borrow, supply)) == [setter.get_interest_rate(b, s) for s, b in states]
+    assert list(curves.triple_slope_interest_rate(borrow, supply)) == [alpha.get_interest_rate(b, s) for s, b in states]
+
+
+def test_ten_thousand_points_in_milliseconds():
+    lender = usdc_lenders()[2]
+    amounts = np.linspace(0, 10_000_000 * 10 ** 6, 10_000)
+
+    started = time.perf_counter()
+    aprs = curves.apr_after_deposit(lender, amounts, exact=False)
+    elapsed = time.perf_counter() - started
+
+    assert aprs.shape == (10_000,)
+    # deposits only lower the rate
+    assert np.all(np.diff(aprs) <= 0)
+    assert elapsed < 0.1
@@ -0,0 +1,294 @@
+import time
+
+from scripts.allocation import PoolLender, estimate_water_fill, water_fill
+from scripts.simulator import (
+    AaveV3RateStrategy,
+    CometRates,
+    DoubleExponentInterestSetter,
+    JumpRateModel,
+    StrategyModel,
+    VaultModel,
+    grid,
+    simulate,
+)
+from scripts.simulator.rates import RAY, WAD
+from scripts.simulator.scenarios import build, random_flows, usdc_lenders
+
+E = 10 ** 18
+
+
+def test_jump_rate_model():
+    model = JumpRateModel(base_rate_per_block=0, multiplier_per_block=10 ** 10, jump_multiplier_per_block=10 ** 11, kink=8 * 10 ** 17)
+
+    # 50% utilization is below the kink
+    assert model.get_borrow_rate(50 * E, 50 * E, 0) == 5 * 10 ** 9
+    # supply rate = util * borrow rate * (1 - reserve factor)
+    assert model.get_supply_rate(50 * E, 50 * E, 0, 10 ** 17) == 5 * 10 ** 9 * 9 // 10 // 2
+    # 90% is 10% over the kink
+    assert model.get_borrow_rate(10 * E, 90 * E, 0) == 8 * 10 ** 9 + 10 ** 10
+
+
+def test_comet_rates_are_continuous_at_the_kink():
+    rates = CometRates(supply_kink=8 * 10 ** 17, supply_base=10, supply_slope_low=10 ** 9, supply_slope_high=10 ** 10)
+    kink = rates.get_supply_rate(8 * 10 ** 17)
+    assert kink == 10 + 8 * 10 ** 8
+    assert rates.get_supply_rate(8 * 10 ** 17 + 10 ** 17) == kink + 10 ** 9
+
+
+def test_aave_v3_liquidity_rate():
+    strategy = AaveV3RateStrategy(9 * RAY // 10, 0, 4 * RAY // 100, 60 * RAY // 100)
+
+    # 50% usage: variable rate = 4% * 0.5 / 0.9, liquidity rate = variable * 0.5 * 0.9
+    liquidity, _, variable = strategy.calculate_interest_rates(100 * E, 0, 100 * E, 0, 1_000)
+    assert abs(variable - 4 * RAY // 100 * 5 // 9) <= 1
+    assert abs(liquidity - variable * 45 // 100) <= 1
+
+    # a deposit dilutes usage so the rate goes down
+    after, _, _ = strategy.calculate_interest_rates(100 * E, 0, 100 * E, 0, 1_000, liquidity_added=100 * E)
+    assert after < liquidity
+
+
+def test_dydx_setter():
+    setter = DoubleExponentInterestSetter.from_list(WAD, [0, 0, 100])
+    year = DoubleExponentInterestSetter.SECONDS_IN_A_YEAR
+
+    assert setter.get_interest_rate(0, 100 * E) == 0
+    assert setter.get_interest_rate(100 * E, 100 * E) == WAD // year
+    # only the utilization^2 term: 50% -> 25% of max apr
+    assert setter.get_interest_rate(50 * E, 100 * E) == WAD // 4 // year
+
+
+def test_lender_models_answer_like_plugins():
+    for lender in usdc_lenders():
+        nav, has_assets, apr, after = lender.snapshot(10 ** 6 * 10 ** 6)
+        assert (nav, has_assets) == (0, False)
+        assert apr == lender.apr() > 0
+        # depositing lowers the rate
+        assert after < apr
+
+        lender.deposit(1_000 * 10 ** 6)
+        assert lender.has_assets()
+        assert lender.weighted_apr() == lender.apr() * lender.nav
+        assert lender.withdraw_all() == 1_000 * 10 ** 6
+        assert lender.nav == 0
+
+
+def test_withdraw_is_capped_by_pool_liquidity():
+    for lender in usdc_lenders():
+        lender.deposit(1_000 * 10 ** 6)
+        assert lender.available_liquidity() == 1_000 * 10 ** 6
+        lender.external_borrow(lender._liquidity())
+        assert lender._liquidity() == lender.available_liquidity() == 0
+        assert lender.withdraw(1_000 * 10 ** 6) == 0
+
+
+def make_strategy(lenders, **kwargs):
+    strategy = StrategyModel(lenders, withdrawal_threshold=0, **kwargs)
+    vault = VaultModel()
+    vault.add_strategy(strategy)
+    vault.deposit(30_000 * E)
+    return strategy, vault
+
+
+def pool_lenders():
+    return [PoolLender(f"Mock{i}", 1_000_000 * E * (2 + i) // 100, 1_000_000 * E) for i in range(3)]
+
+
+def test_harvest_and_withdraw():
+    strategy, vault = make_strategy(pool_lenders())
+
+    strategy.harvest(0)
+    # everything goes to the best lender, like tests/Mock
+    assert [lender.nav for lender in strategy.lenders] == [0, 0, 30_000 * E]
+    assert vault.total_debt == 30_000 * E
+
+    # 10 of interest
+    strategy.lenders[2].nav += 10 * E
+    assert strategy.prepare_return(0) == (10 * E, 0, 0)
+
+    # withdrawals come out of the lowest apr lender that can pay them in full
+    strategy.lenders[0].deposit(5_000 * E)
+    strategy.lenders[2].withdraw(5_000 * E)
+    loose = strategy.loose
+    assert vault.withdraw(4_000 * E) == 4_000 * E
+    assert strategy.lenders[0].nav == 1_000 * E + loose
+    # and from the lowest apr up when none can
+    assert vault.withdraw(25_500 * E) == 25_500 * E
+    assert [lender.nav for lender in strategy.lenders] == [0, 0, 510 * E]
+
+
+def test_withdrawals_walk_every_lender():
+    # more lenders than the old six rounds could reach, the worst rate pays first
+    lenders = [PoolLender(f"Mock{i}", 1_000_000 * E * (2 + i) // 100, 1_000_000 * E) for i in range(8)]
+    strategy = StrategyModel(lenders, withdrawal_threshold=0)
+    for lender in lenders:
+        lender.deposit(1_000 * E)
+
+    assert strategy._withdraw_some(7_500 * E) == 7_500 * E
+    assert strategy.loose == 7_500 * E
+    assert [lender.nav for lender in lenders] == [0] * 7 + [500 * E]
+
+
+def test_illiquid_lenders_are_skipped():
+    # same as tests/Mock/test_withdraw_some.py
+    lenders = [PoolLender(f"Mock{i}", 1_000_000 * E * (2 + i) // 100, 1_000_000 * E, 1_000 * E) for i in range(8)]
+    for lender in lenders[::2]:
+        lender.liquidity = 0
+    lenders[1].liquidity = 400 * E
+    strategy = StrategyModel(lenders, withdrawal_threshold=0)
+
+    assert strategy._withdraw_some(3_000 * E) == 3_000 * E
+    assert [lender.nav for lender in lenders] == [1_000 * E, 600 * E] + [1_000 * E, 0] * 2 + [1_000 * E, 400 * E]
+
+
+def test_one_lender_pays_when_it_can():
+    lenders = [PoolLender(f"Mock{i}", 1_000_000 * E * (2 + i) // 100, 1_000_000 * E, 1_000 * E) for i in range(3)]
+    lenders[0].liquidity = 100 * E
+    strategy = StrategyModel(lenders, withdrawal_threshold=0)
+
+    # the worst rate could only pay part of it, the next one pays it all
+    assert strategy._withdraw_some(500 * E) == 500 * E
+    assert [lender.nav for lender in lenders] == [1_000 * E, 500 * E, 1_000 * E]
+
+
+def test_withdrawal_threshold_skips_small_withdrawals():
+    strategy, vault = make_strategy(pool_lenders())
+    strategy.harvest(0)
+
+    strategy.withdrawal_threshold = 1_000 * E
+    assert vault.withdraw(999 * E) == 0
+    assert vault.withdraw(1_000 * E) == 1_000 * E
+
+
+def test_idle_buffer_pays_small_withdrawals():
+    strategy, vault = make_strategy(pool_lenders(), idle_buffer_bps=500)
+    strategy.harvest(0)
+    # 5% of 30k stays loose
+    assert strategy.loose == 1_500 * E
+    assert [lender.nav for lender in strategy.lenders] == [0, 0, 28_500 * E]
+
+    # paid from the buffer without touching a lender
+    assert vault.withdraw(1_000 * E) == 1_000 * E
+    assert strategy.lenders[2].nav == 28_500 * E
+
+    # the next harvest tops it back up from the lenders
+    strategy.harvest(1)
+    assert strategy.loose == 29_000 * E * 500 // 10_000
+    assert strategy.loose + strategy.lent_total_assets() == 29_000 * E
+
+
+def test_idle_buffer_lowers_the_apr_estimates():
+    strategy, vault = make_strategy(pool_lenders())
+    strategy.harvest(0)
+    full = strategy.estimated_apr(), strategy.estimated_future_apr(vault.total_debt * 2)
+
+    strategy, vault = make_strategy(pool_lenders(), idle_buffer_bps=1_000)
+    strategy.harvest(0)
+    assert strategy.estimated_apr() < full[0]
+    assert strategy.estimated_future_apr(vault.total_debt * 2) < full[1]
+
+
+def test_tend_trigger_follows_profit_factor():
+    strategy, vault = make_strategy(pool_lenders(), max_report_delay=30 * 86400)
+    strategy.harvest(0)
+
+    # move the best lender's rate down so the strategy is in the wrong place
+    strategy.lenders[2].interest_per_year = 0
+    now = 3600
+    assert strategy.tend_trigger(10 ** 15, now)
+    strategy.profit_factor = 10 ** 9
+    assert not strategy.tend_trigger(10 ** 15, now)
+
+    strategy.tend(now)
+    assert strategy.lenders[1].nav == 30_000 * E
+
+
+def test_tend_trigger_hysteresis_and_cooldown():
+    strategy, vault = make_strategy(pool_lenders(), max_report_delay=30 * 86400, profit_factor=1)
+    strategy.harvest(0)
+    strategy.lenders[2].interest_per_year = 0
+    assert strategy.tend_trigger(10 ** 15, 3600)
+
+    strategy.min_tend_spread = 10 ** 18
+    assert not strategy.tend_trigger(10 ** 15, 3600)
+    strategy.min_tend_spread = 0
+
+    strategy.tend(3600)
+    spread = strategy.last_rebalance_spread
+    assert strategy.last_rebalance == 3600 and spread > 0
+
+    # the rates swing back a little. within the interlude the move back has to beat the spread we moved on
+    strategy.lenders[2].interest_per_year = strategy.lenders[1].interest_per_year * 3 // 2
+    assert not strategy.tend_trigger(10 ** 15, 7200)
+    strategy.lenders[2].interest_per_year = strategy.lenders[1].interest_per_year * 10
+    assert strategy.tend_trigger(10 ** 15, 7200)
+
+    # no tend within the cooldown, however big the spread
+    strategy.tend_cooldown = 86400
+    assert not strategy.tend_trigger(10 ** 15, 7200)
+    assert strategy.tend_trigger(10 ** 15, 3600 + 86400)
+
+
+def test_recent_rebalance_pays_for_the_move_back():
+    strategy, vault = make_strategy(pool_lenders(), max_report_delay=30 * 86400)
+    strategy.harvest(0)
+    strategy.lenders[2].interest_per_year = 0
+    strategy.tend(3600)
+
+    strategy.lenders[2].interest_per_year = strategy.lenders[1].interest_per_year * 10
+    # the largest call cost the move pays for when nothing was rebalanced before
+    last_rebalance, strategy.last_rebalance = strategy.last_rebalance, None
+    cost = 1
+    while strategy.tend_trigger(cost * 2, 7200):
+        cost *= 2
+    assert strategy.tend_trigger(cost, 7200)
+
+    # an hour after a rebalance the same move has to pay for two tends
+    strategy.last_rebalance = last_rebalance
+    assert not strategy.tend_trigger(cost, 7200)
+    assert strategy.tend_trigger(cost // 2, 7200)
+
+
+def test_estimated_future_apr():
+    strategy, vault = make_strategy(pool_lenders())
+    strategy.harvest(0)
+
+    current = strategy.estimated_apr()
+    assert strategy.estimated_future_apr(vault.total_debt * 2) < current
+    # the decrease estimate takes the change out of the worst lender. here it holds nothing
+    assert strategy.estimated_future_apr(vault.total_debt // 2) == current
+
+
+def test_simulation_conserves_assets():
+    strategy, vault = build()
+    start = vault.idle + strategy.estimated_total_assets()
+    result = simulate(strategy, vault, 30 * 86400)
+
+    assert result["harvests"] > 0
+    assert result["loss"] == 0
+    # everything reported as profit is still there. interest since the last harvest is not reported yet
+    assert result["total_assets"] - start >= result["profit"] > 0
+
+
+def test_grid_runs_thousands_of_cycles_per_second():
+    params = {"profit_factor": [10, 100], "max_report_delay": [86400, 7 * 86400]}
+    started = time.perf_counter()
+    results = grid(build, params, scenario=random_flows, duration=30 * 86400)
+    elapsed = time.perf_counter() - started
+
+    assert len(results) == 4
+    assert [r["net_apr"] for _, r in results] == sorted((r["net_apr"] for _, r in results), reverse=True)
+    steps = sum(r["steps"] for _, r in results)
+    assert steps / elapsed > 1_000
+
+
+def test_water_fill_without_lenders():
+    # Strategy.estimateWaterFill returns an empty plan and adjustPosition keeps everything loose
+    assert estimate_water_fill([], 1000 * E, 20) == ([], [], 0)
+    assert water_fill([], 1000 * E, 20) == 0
+
+
+def test_water_fill_without_a_chunk_count():
+    # waterFillChunks is 0 until WATER_FILL is set, the estimate plans everything as one chunk
+    lenders = [PoolLender("a", 50 * E, 1000 * E, 100 * E), PoolLender("b", 60 * E, 1000 * E, 100 * E)]
+    assert estimate_water_fill(lenders, 0, 0) == ([0, 200 * E], [100 * E, 100 * E], 200 * E)
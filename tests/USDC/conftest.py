@@ -2,49 +2,56 @@ import pytest
 from brownie import Wei, config, Contract
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def live_strat_usdc_1(Strategy):
     yield Strategy.at("0x2216E44fA633ABd2540dB72Ad34b42C7F1557cd4")
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def live_vault_usdc(pm):
     Vault = pm(config["dependencies"][0]).Vault
     yield Vault.at("0xa354F35829Ae975e850e23e9615b11Da1B3dC4DE")
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def live_vault_usdt(pm):
     Vault = pm(config["dependencies"][0]).Vault
     vault = Vault.at('0xAf322a2eDf31490250fdEb0D712621484b09aBB6')
     yield vault
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def live_GenericCompound_usdc_1(GenericCompound):
     yield GenericCompound.at("0x33D4c129586562adfd993ebb54E830481F31ef37")
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def live_GenericCream_usdc_1(GenericCream):
     yield GenericCream.at("0x1bAaCef951d24c5d70a8cA88D89cE16B37472fB3")
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def live_GenericDyDx_usdc_1(GenericDyDx):
     yield GenericDyDx.at("0x6C842746F21Ca34542EDC6895dFfc8D4e7D2bC1c")
 
+# The accounts, the vault and the strategy are deployed once per session on top of the fork and every test
+# reverts to them through fn_snapshot, instead of redeploying the whole graph from the fork for each test.
+# A fixture that deploys or moves funds has to stay session scoped to be part of that snapshot.
+# Anything that resets the chain under the session (module_isolation, fn_isolation, a chain.reset elsewhere)
+# throws the graph away while pytest keeps handing out the cached fixtures, so every test checks it is still there
+
 # change these fixtures for generic tests
-@pytest.fixture
+@pytest.fixture(scope="session")
 def currency(dai, usdc, weth):
     yield usdc
 
 
 @pytest.fixture(autouse=True)
-def isolation(fn_isolation):
-    pass
+def isolation(session_deployment, web3, fn_snapshot):
+    wiped = [address for address in session_deployment if len(web3.eth.get_code(address)) == 0]
+    assert not wiped, f"the session deployment {wiped} was reset away. do not use module_isolation or fn_isolation here"
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def whale(accounts, web3, weth):
     # big binance7 wallet
     # acc = accounts.at('0xBE0eB53F46cd790Cd13851d5EFf43D12404d33E8', force=True)
@@ -60,87 +67,88 @@ def whale(accounts, web3, weth):
     yield acc
 
 
-@pytest.fixture()
+@pytest.fixture(scope="session")
 def strategist(accounts, whale, currency):
     decimals = currency.decimals()
     currency.transfer(accounts[1], 100_000 * (10 ** decimals), {"from": whale})
     yield accounts[1]
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def samdev(accounts):
     yield accounts.at("0xC3D6880fD95E06C816cB030fAc45b3ffe3651Cb0", force=True)
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def gov(accounts):
     yield accounts[3]
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def rewards(gov):
     yield gov  # TODO: Add rewards contract
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def guardian(accounts):
     # YFI Whale, probably
     yield accounts[2]
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def keeper(accounts):
     # This is our trusty bot!
     yield accounts[4]
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def rando(accounts):
     yield accounts[9]
 
 
 # specific addresses
-@pytest.fixture
+@pytest.fixture(scope="session")
 def usdc(interface):
     yield interface.ERC20("0xA0b86991c6218b36c1d19D4a2e9Eb0cE3606eB48")
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def dai(interface):
     yield interface.ERC20("0x6b175474e89094c44da98b954eedeac495271d0f")
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def weth(interface):
     yield interface.IWETH("0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2")
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def cdai(interface):
     yield interface.CErc20I("0x5d3a536e4d6dbd6114cc1ead35777bab948e3643")
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def cUsdc(interface):
     yield interface.CErc20I("0xc3d688B66703497DAA19211EEdff47f25384cdc3")
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def crUsdc(interface):
     yield interface.CErc20I("0x44fbeBd2F576670a6C33f6Fc0B00aA8c5753b322")
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def aUsdc(interface):
     yield interface.IAToken("0xBcca60bB61934080951369a648Fb03DF4F96263C")
 
 
-@pytest.fixture(scope="module", autouse=True)
-def shared_setup(module_isolation):
-    pass
+@pytest.fixture(scope="session", autouse=True)
+def shared_setup(chain):
+    # start from the fork block even after other directories ran, there is no module_isolation here
+    chain.reset()
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def vault(gov, rewards, guardian, currency, pm):
     Vault = pm(config["dependencies"][0]).Vault
     vault = Vault.deploy({"from": guardian})
@@ -149,7 +157,7 @@ def vault(gov, rewards, guardian, currency, pm):
     yield vault
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def strategy(
     strategist,
     gov,
@@ -173,3 +181,9 @@ def strategy(
     assert strategy.numLenders() == 1
 
     yield strategy
+
+
+@pytest.fixture(scope="session")
+def session_deployment(vault, strategy):
+    # the contracts every test reverts to, deployed before the first fn_snapshot is taken
+    yield [vault.address, strategy.address] + [strategy.lenders(i) for i in range(strategy.numLenders())]
@@ -39,6 +39,16 @@ def isolation(fn_isolation):
     pass
 
 
+@pytest.fixture
+def fn_snapshot(chain):
+    # fn_isolation without the module_isolation under it. module_isolation resets the chain for every module,
+    # throwing away what session scoped fixtures deployed, so conftests that share a deployed graph between
+    # all their tests revert to it with this instead
+    chain.snapshot()
+    yield
+    chain.revert()
+
+
 @pytest.fixture
 def whale(accounts, web3, weth, gov):
     # big binance7 wallet